@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Script para agregar width, height, decoding y loading a los <img> de las páginas
+
+Las dimensiones se leen de la cabecera de cada imagen (PNG, GIF, JPEG, WebP,
+SVG) sin decodificarla, respetando la orientación EXIF de los JPEG (la misma
+que aplica generate_image_variants.py), y se guardan en .image-dimensions.json
+por ruta y mtime para no volver a abrir imágenes que no cambiaron.
+"""
+
+import json
+import re
+import struct
+from pathlib import Path
+
+from build_manifest import hash_archivo
+from build_output import escribir_json, escribir_texto
+from build_utils import MODIFICADO, crear_parser, procesar_archivos, ruta_local
+from html_regions import (
+    ABRE, CIERRA, agregar_atributos, iter_tokens, leer_atributos, reemplazar_regiones,
+)
+from site_graph import grafo_actualizado
+
+CACHE_DIMENSIONES = '.image-dimensions.json'
+
+# Ancho mínimo (px) para considerar un <img> como imagen principal de la página
+ANCHO_IMAGEN_PRINCIPAL = 200
+# Clases de imágenes que nunca son la principal aunque el archivo sea grande
+_CLASES_SECUNDARIAS = re.compile(r'avatar|icon|logo', re.IGNORECASE)
+
+def _dimensiones_png(cabecera, f):
+    if cabecera[12:16] == b'IHDR':
+        return struct.unpack('>II', cabecera[16:24])
+    return None
+
+def _dimensiones_gif(cabecera, f):
+    return struct.unpack('<HH', cabecera[6:10])
+
+def _dimensiones_webp(cabecera, f):
+    formato = cabecera[12:16]
+    if formato == b'VP8 ':
+        ancho, alto = struct.unpack('<HH', cabecera[26:30])
+        return ancho & 0x3FFF, alto & 0x3FFF
+    if formato == b'VP8L':
+        bits = int.from_bytes(cabecera[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if formato == b'VP8X':
+        return (
+            int.from_bytes(cabecera[24:27], 'little') + 1,
+            int.from_bytes(cabecera[27:30], 'little') + 1,
+        )
+    return None
+
+# Orientaciones EXIF que rotan la imagen 90° o 270°: ancho y alto se invierten
+_ORIENTACIONES_ROTADAS = {5, 6, 7, 8}
+
+def _orientacion_exif(datos):
+    """Valor de la etiqueta Orientation (0x0112) del IFD0 de un segmento APP1 Exif"""
+    if not datos.startswith(b'Exif\0\0'):
+        return 1
+    tiff = datos[6:]
+    orden = {b'II': '<', b'MM': '>'}.get(tiff[:2])
+    if orden is None:
+        return 1
+    ifd = struct.unpack(orden + 'I', tiff[4:8])[0]
+    cantidad = struct.unpack(orden + 'H', tiff[ifd:ifd + 2])[0]
+    for i in range(cantidad):
+        entrada = ifd + 2 + 12 * i
+        etiqueta = struct.unpack(orden + 'H', tiff[entrada:entrada + 2])[0]
+        if etiqueta == 0x0112:
+            return struct.unpack(orden + 'H', tiff[entrada + 8:entrada + 10])[0]
+    return 1
+
+def _dimensiones_jpeg(cabecera, f):
+    """Recorre los segmentos hasta el marcador SOFn sin leer los datos de imagen"""
+    f.seek(2)
+    orientacion = 1
+    while True:
+        marcador = f.read(2)
+        while marcador[:1] == b'\xff' and marcador[1:2] == b'\xff':
+            marcador = marcador[1:] + f.read(1)
+        if len(marcador) < 2 or marcador[0] != 0xFF:
+            return None
+        codigo = marcador[1]
+        if codigo in (0xD8, 0x01) or 0xD0 <= codigo <= 0xD7:
+            continue
+        longitud = f.read(2)
+        if len(longitud) < 2:
+            return None
+        tamano = struct.unpack('>H', longitud)[0]
+        if 0xC0 <= codigo <= 0xCF and codigo not in (0xC4, 0xC8, 0xCC):
+            datos = f.read(5)
+            if len(datos) < 5:
+                return None
+            alto, ancho = struct.unpack('>HH', datos[1:5])
+            if orientacion in _ORIENTACIONES_ROTADAS:
+                return alto, ancho
+            return ancho, alto
+        if codigo == 0xE1 and orientacion == 1:
+            orientacion = _orientacion_exif(f.read(tamano - 2))
+            continue
+        f.seek(tamano - 2, 1)
+
+_SVG_RAIZ = re.compile(rb'<svg\b[^>]*>', re.IGNORECASE)
+_SVG_NUMERO = re.compile(r'^\s*([\d.]+)\s*(px)?\s*$')
+
+def _dimensiones_svg(cabecera, f):
+    f.seek(0)
+    m = _SVG_RAIZ.search(f.read(4096))
+    if not m:
+        return None
+    atributos = leer_atributos(m.group().decode('utf-8', 'replace'))
+    ancho = _SVG_NUMERO.match(atributos.get('width', ''))
+    alto = _SVG_NUMERO.match(atributos.get('height', ''))
+    if ancho and alto:
+        return round(float(ancho.group(1))), round(float(alto.group(1)))
+    caja = atributos.get('viewbox', '').replace(',', ' ').split()
+    if len(caja) == 4:
+        return round(float(caja[2])), round(float(caja[3]))
+    return None
+
+def leer_dimensiones(ruta):
+    """(ancho, alto) de una imagen leyendo solo su cabecera, o None"""
+    with open(ruta, 'rb') as f:
+        cabecera = f.read(32)
+        if cabecera.startswith(b'\x89PNG\r\n\x1a\n'):
+            lector = _dimensiones_png
+        elif cabecera[:6] in (b'GIF87a', b'GIF89a'):
+            lector = _dimensiones_gif
+        elif cabecera[:4] == b'RIFF' and cabecera[8:12] == b'WEBP':
+            lector = _dimensiones_webp
+        elif cabecera.startswith(b'\xff\xd8'):
+            lector = _dimensiones_jpeg
+        elif ruta.suffix.lower() == '.svg':
+            lector = _dimensiones_svg
+        else:
+            return None
+        try:
+            return lector(cabecera, f)
+        except (struct.error, ValueError):
+            return None
+
+class CacheDimensiones:
+    """Dimensiones por ruta, válidas mientras no cambie el mtime del archivo"""
+
+    def __init__(self, entradas=None):
+        self.entradas = entradas if entradas is not None else {}
+        self.nuevas = {}
+
+    @staticmethod
+    def _version():
+        # Si cambia la lectura de cabeceras, las dimensiones guardadas dejan de servir
+        return hash_archivo(__file__)
+
+    @classmethod
+    def cargar(cls, ruta):
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+            if datos.get('version') == cls._version():
+                return cls(datos['entradas'])
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        return cls()
+
+    def dimensiones(self, ruta):
+        clave = str(ruta)
+        try:
+            mtime = ruta.stat().st_mtime_ns
+        except OSError:
+            return None
+        entrada = self.entradas.get(clave)
+        if entrada is None or entrada[0] != mtime:
+            entrada = [mtime, leer_dimensiones(ruta)]
+            self.entradas[clave] = entrada
+            self.nuevas[clave] = entrada
+        return entrada[1]
+
+    def guardar(self, ruta):
+        escribir_json(ruta, {'version': self._version(), 'entradas': self.entradas}, sort_keys=True)
+
+def agregar_dimensiones_html(contenido, base_dir, cache):
+    """Devuelve el HTML con width/height/decoding/loading en cada <img>.
+
+    La primera imagen grande fuera de <header>/<nav> recibe fetchpriority="high";
+    todas las demás, loading="lazy" (también cuando ninguna es la principal).
+    """
+    reemplazos = []
+    principal_encontrada = False
+    en_navegacion = 0
+    for token in iter_tokens(contenido):
+        if token.nombre in ('header', 'nav'):
+            if token.tipo == ABRE:
+                en_navegacion += 1
+            elif token.tipo == CIERRA and en_navegacion:
+                en_navegacion -= 1
+            continue
+        if token.tipo != ABRE or token.nombre != 'img':
+            continue
+
+        etiqueta = contenido[token.inicio:token.fin]
+        atributos = leer_atributos(etiqueta)
+        nuevos = {}
+
+        ruta = ruta_local(base_dir, atributos.get('src', ''))
+        dimensiones = cache.dimensiones(ruta) if ruta is not None else None
+        if dimensiones and 'width' not in atributos and 'height' not in atributos:
+            nuevos['width'], nuevos['height'] = dimensiones
+
+        if 'decoding' not in atributos:
+            nuevos['decoding'] = 'async'
+
+        ancho = int(atributos['width']) if atributos.get('width', '').isdigit() else (
+            dimensiones[0] if dimensiones else 0
+        )
+        candidata = (
+            not en_navegacion
+            and ancho >= ANCHO_IMAGEN_PRINCIPAL
+            and not _CLASES_SECUNDARIAS.search(atributos.get('class', ''))
+        )
+        if not principal_encontrada and candidata:
+            principal_encontrada = True
+            if 'loading' not in atributos and 'fetchpriority' not in atributos:
+                nuevos['fetchpriority'] = 'high'
+        elif 'loading' not in atributos:
+            nuevos['loading'] = 'lazy'
+
+        if nuevos:
+            reemplazos.append((token.inicio, token.fin, agregar_atributos(etiqueta, nuevos)))
+
+    return reemplazar_regiones(contenido, reemplazos)
+
+_cache = None
+
+def cache_proceso(base_dir):
+    """Caché de dimensiones, cargada una vez por proceso"""
+    global _cache
+    if _cache is None:
+        _cache = CacheDimensiones.cargar(base_dir / CACHE_DIMENSIONES)
+    return _cache
+
+def agregar_dimensiones(archivo_html):
+    """Agrega dimensiones y atributos de carga a los <img> de una página.
+
+    Devuelve (modificado, dimensiones_nuevas) para actualizar la caché.
+    """
+    with open(archivo_html, 'r', encoding='utf-8') as f:
+        contenido = f.read()
+
+    cache = cache_proceso(archivo_html.parent)
+    cache.nuevas = {}
+    nuevo_contenido = agregar_dimensiones_html(contenido, archivo_html.parent, cache)
+
+    if nuevo_contenido == contenido:
+        return False, cache.nuevas
+
+    escribir_texto(archivo_html, nuevo_contenido)
+
+    print(f"✓ {archivo_html.name} - Dimensiones de imágenes agregadas")
+    return True, cache.nuevas
+
+def main():
+    """Procesa todos los archivos HTML"""
+    args = crear_parser(__doc__).parse_args()
+
+    # Directorio raíz del proyecto
+    directorio = Path(__file__).parent
+    archivos = grafo_actualizado(directorio).archivos('imagenes')
+
+    print("\n🔄 Agregando dimensiones de imágenes a archivos HTML...\n")
+
+    cache = cache_proceso(directorio)
+    resultados = procesar_archivos(agregar_dimensiones, archivos, args.jobs, con_datos=True)
+    for _, nuevas in resultados:
+        cache.entradas.update(nuevas or {})
+    cache.guardar(directorio / CACHE_DIMENSIONES)
+
+    archivos_totales = len(resultados)
+    archivos_modificados = sum(estado == MODIFICADO for estado, _ in resultados)
+
+    print(f"\n✅ Proceso completado:")
+    print(f"   - Archivos procesados: {archivos_totales}")
+    print(f"   - Archivos modificados: {archivos_modificados}")
+    print(f"   - Archivos sin cambios: {archivos_totales - archivos_modificados}\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Script para agregar resource hints (preconnect, preload, prefetch) a las páginas HTML
+
+Antes js/performance.js los agregaba en el navegador, después de la carga, con
+una lista fija de dominios (incluso alguno que ninguna página usa) y un
+prefetch al azar de buscar.html y perfil.html. Ahora se calculan al construir
+el sitio con el índice del sitio (site_graph.py):
+
+- preconnect a los orígenes externos de los que la página carga algo, salvo
+  los que ya tienen su <link rel="preconnect">;
+- preload de las hojas que la página carga con @import (css/tokens.css desde
+  components.css), que el navegador recién descubre al descargar la hoja que
+  las importa;
+- prefetch de las páginas a las que es más probable ir desde esta: según
+  navegacion.json ({"buscar.html": {"proveedor.html": 812, ...}}, exportado de
+  las analíticas) si la página figura ahí, y si no las que enlaza más veces
+  (las tarjetas de resultados y de categoría llevan a proveedor.html).
+
+Los preload y los prefetch de cada página, juntos, no superan PRESUPUESTO_BYTES
+(los prefetch son además como mucho MAX_PREFETCH): una página de destino que no
+entra en lo que queda se saltea. Las hojas se miden por su tamaño, que el build
+no modifica; las páginas de destino por su peso propio en el índice del sitio
+(site_graph.peso_propio: sin el <head>, los parciales ni los <script>), que
+tampoco cambia al construirlas. Con el tamaño del archivo los hints de una
+página dependerían de lo que el mismo build escribe en las demás y build_site
+necesitaría otra pasada para llegar al punto fijo. Los hints quedan marcados
+con data-hint y al volver a ejecutarlo se recalculan.
+"""
+
+import json
+import re
+from collections import Counter
+from pathlib import Path
+
+from build_manifest import hash_json
+from build_output import escribir_texto
+from build_utils import MODIFICADO, crear_parser, procesar_archivos, ruta_local
+from css_rules import imports_css
+from html_regions import buscar_head, iter_etiquetas, leer_atributos
+from site_graph import analizar_pagina, grafo_actualizado, grafo_guardado
+
+NAVEGACION_FILE = Path(__file__).parent / 'navegacion.json'
+
+PRESUPUESTO_BYTES = 100 * 1024
+MAX_PRECONNECT = 4
+MAX_PREFETCH = 2
+# Con datos de navegación, solo destinos con al menos esta fracción de las visitas
+UMBRAL_NAVEGACION = 0.1
+
+# Orígenes que no aparecen en el HTML pero que usa otro: la hoja de Google
+# Fonts descarga las fuentes de fonts.gstatic.com
+ORIGENES_DERIVADOS = {'https://fonts.googleapis.com': ('https://fonts.gstatic.com',)}
+# Orígenes que se piden en modo CORS (fuentes): la conexión tiene que ser anónima
+ORIGENES_CORS = {'https://fonts.gstatic.com'}
+
+MARCA = 'data-hint'
+_HINT_ANTERIOR = re.compile(r'[ \t]*<link [^>]*\s%s>\n?' % MARCA)
+_PRECONNECT = re.compile(r'<link rel="preconnect"[^>]*>')
+_REL_HINT = re.compile(r'<link rel="(\w+)"[^>]*\s%s>' % MARCA)
+# La primera hoja, o el <style data-critical-css> que critical_css pone delante
+_HOJA = re.compile(r'<link [^>]*rel="stylesheet"|<style\b')
+
+def _conteo_enlaces(contenido, base_dir):
+    """{página: veces que se la enlaza}"""
+    conteo = Counter()
+    for etiqueta in iter_etiquetas(contenido, 'a'):
+        href = leer_atributos(contenido[etiqueta.inicio:etiqueta.fin]).get('href', '')
+        ruta = ruta_local(base_dir, href)
+        if ruta is not None and ruta.suffix == '.html':
+            conteo[ruta.relative_to(base_dir.resolve()).as_posix()] += 1
+    return conteo
+
+class ResourceHints:
+    """Calcula los hints de cada página.
+
+    navegacion.json se lee la primera vez que se necesita y los @import de cada
+    hoja se leen una vez por versión del archivo. Lo que no está en la página
+    (páginas de destino, su peso, cuántas páginas las enlazan y los @import) sale del
+    índice del sitio, así que dependencias() solo cambia si cambia alguna de
+    esas entradas.
+    """
+
+    def __init__(self, navegacion=None, ruta_navegacion=NAVEGACION_FILE):
+        self._navegacion = navegacion
+        self.ruta_navegacion = Path(ruta_navegacion)
+        self._imports = {}
+
+    @property
+    def navegacion(self):
+        if self._navegacion is None:
+            try:
+                with open(self.ruta_navegacion, 'r', encoding='utf-8') as f:
+                    self._navegacion = json.load(f)
+            except FileNotFoundError:
+                self._navegacion = {}
+        return self._navegacion
+
+    def recargar(self):
+        """Vuelve a leer navegacion.json en el próximo uso"""
+        self._navegacion = None
+
+    def _importadas(self, hoja, base_dir):
+        """[(ruta relativa, bytes)] de lo que la hoja carga con @import"""
+        ruta = base_dir / hoja
+        try:
+            stat = ruta.stat()
+        except OSError:
+            return []
+        clave = (ruta, stat.st_mtime_ns, stat.st_size)
+        importadas = self._imports.get(clave)
+        if importadas is None:
+            base = base_dir.resolve()
+            importadas = [
+                (importada.relative_to(base).as_posix(), importada.stat().st_size)
+                for importada in imports_css(ruta, base_dir)
+            ]
+            self._imports[clave] = importadas
+        return importadas
+
+    def _candidatas(self, pagina, conteo, grafo):
+        """Páginas a las que se puede ir desde esta, de la más probable a la menos"""
+        visitas = self.navegacion.get(pagina)
+        if visitas:
+            total = sum(visitas.values())
+            destinos = {
+                destino: n for destino, n in visitas.items()
+                if n >= total * UMBRAL_NAVEGACION and destino != pagina and destino in grafo
+            }
+            return sorted(destinos, key=lambda destino: -destinos[destino])
+        destinos = [destino for destino in conteo if destino != pagina and destino in grafo]
+        # A igual cantidad de enlaces, la página más enlazada del sitio
+        return sorted(destinos, key=lambda destino: (
+            -conteo[destino], -len(grafo.paginas_que_referencian(destino)), destino
+        ))
+
+    def calcular(self, contenido, pagina, grafo):
+        """[(rel, href, atributos extra), ...] con los hints de la página"""
+        base_dir = grafo.base_dir
+        hechos = analizar_pagina(contenido, base_dir)
+        hints = []
+
+        conectados = set(
+            leer_atributos(etiqueta).get('href', '').rstrip('/') for etiqueta in _PRECONNECT.findall(contenido)
+        )
+        origenes = []
+        for origen in hechos['origenes']:
+            origenes += [origen, *ORIGENES_DERIVADOS.get(origen, ())]
+        for origen in list(dict.fromkeys(o for o in origenes if o not in conectados))[:MAX_PRECONNECT]:
+            hints.append(('preconnect', origen, ' crossorigin' if origen in ORIGENES_CORS else ''))
+
+        restante = PRESUPUESTO_BYTES
+        for hoja in hechos['estilos']:
+            for importada, tamano in self._importadas(hoja, base_dir):
+                if importada in hechos['estilos'] or tamano > restante \
+                        or any(href == importada for _, href, _ in hints):
+                    continue
+                hints.append(('preload', importada, ' as="style"'))
+                restante -= tamano
+
+        prefetch = 0
+        for destino in self._candidatas(pagina, _conteo_enlaces(contenido, base_dir), grafo):
+            if prefetch == MAX_PREFETCH:
+                break
+            if grafo.peso(destino) > restante:
+                continue
+            hints.append(('prefetch', destino, ''))
+            restante -= grafo.peso(destino)
+            prefetch += 1
+        return hints
+
+    def bloque(self, hints, sangria='  '):
+        return ''.join(
+            f'{sangria}<link rel="{rel}" href="{href}"{extra} {MARCA}>\n' for rel, href, extra in hints
+        )
+
+    def aplicar(self, contenido, pagina, grafo):
+        """Devuelve el HTML con los hints recalculados, o None si no hay <head>"""
+        contenido = _HINT_ANTERIOR.sub('', contenido)
+        head = buscar_head(contenido)
+        if head is None:
+            return None
+        hints = self.calcular(contenido, pagina, grafo)
+        if not hints:
+            return contenido
+
+        # Después de los preconnect escritos a mano (el bloque SEO termina en el
+        # primero), si no antes de la primera hoja o <style>, si no al final del <head>,
+        # con la sangría de la etiqueta vecina
+        preconnects = list(_PRECONNECT.finditer(contenido, head.fin_apertura, head.inicio_cierre))
+        hoja = _HOJA.search(contenido, head.fin_apertura, head.inicio_cierre)
+        if preconnects:
+            vecina = preconnects[-1].start()
+            posicion = contenido.find('\n', preconnects[-1].end(), head.inicio_cierre) + 1
+        elif hoja:
+            vecina = hoja.start()
+            posicion = contenido.rfind('\n', head.fin_apertura, vecina) + 1
+        else:
+            vecina = None
+            posicion = contenido.rfind('\n', head.fin_apertura, head.inicio_cierre) + 1
+        posicion = posicion or head.inicio_cierre
+
+        sangria = '  '
+        if vecina is not None:
+            inicio_linea = contenido.rfind('\n', 0, vecina) + 1
+            if not contenido[inicio_linea:vecina].strip():
+                sangria = contenido[inicio_linea:vecina]
+        return contenido[:posicion] + self.bloque(hints, sangria) + contenido[posicion:]
+
+    def dependencias(self, pagina, grafo):
+        """Hash de lo que, fuera de la página, influye en sus hints"""
+        base_dir = grafo.base_dir
+        destinos = dict.fromkeys(grafo.enlaces_de(pagina) + list(self.navegacion.get(pagina, {})))
+        return hash_json([
+            self.navegacion.get(pagina),
+            [
+                [destino, destino in grafo and [
+                    len(grafo.paginas_que_referencian(destino)), grafo.peso(destino),
+                ]]
+                for destino in destinos
+            ],
+            [self._importadas(hoja, base_dir) for hoja in grafo.assets_de(pagina, 'estilos')],
+        ])
+
+# Instancia compartida: no lee navegacion.json hasta el primer uso
+renderer = ResourceHints()
+
+def agregar_hints_html(contenido, pagina, grafo, hints=renderer):
+    """Devuelve el HTML con los hints de la página, o None si no tiene <head>"""
+    return hints.aplicar(contenido, pagina, grafo)
+
+def agregar_hints(archivo_html):
+    """Agrega los hints de la página a su <head>"""
+
+    with open(archivo_html, 'r', encoding='utf-8') as f:
+        contenido = f.read()
+
+    grafo = grafo_guardado(archivo_html.parent)
+    nuevo_contenido = agregar_hints_html(contenido, archivo_html.name, grafo)
+    if nuevo_contenido is None:
+        print(f"✗ {archivo_html.name} - No se encontró el <head>")
+        return False
+
+    if nuevo_contenido == contenido:
+        print(f"○ {archivo_html.name} - Sin cambios necesarios")
+        return False
+
+    escribir_texto(archivo_html, nuevo_contenido)
+
+    rels = Counter(_REL_HINT.findall(nuevo_contenido))
+    print(f"✓ {archivo_html.name} - " + ', '.join(f"{n} {rel}" for rel, n in sorted(rels.items())))
+    return True
+
+def main():
+    """Procesa todos los archivos HTML"""
+    args = crear_parser(__doc__).parse_args()
+    base_dir = Path(__file__).parent
+
+    html_files = grafo_actualizado(base_dir).archivos('hints')
+
+    print(f"\n🔗 Agregando resource hints a {len(html_files)} archivos HTML...\n")
+
+    estados = procesar_archivos(agregar_hints, html_files, args.jobs)
+    updated_count = estados.count(MODIFICADO)
+
+    print(f"\n✅ Proceso completado: {updated_count} archivos actualizados\n")
+
+if __name__ == '__main__':
+    main()
@@ -1,100 +1,260 @@
 #!/usr/bin/env python3
 """
-Script para agregar el módulo schema.js a todas las páginas HTML
-Inserta el script antes de los demás scripts, después de accesibilidad.js
+Script para incrustar los datos estructurados schema.org (JSON-LD) en las páginas HTML
+
+Antes cada página cargaba js/schema.js, que armaba el JSON-LD en el navegador
+después de la carga. Ahora se genera al construir el sitio a partir de
+seo-config.json y queda al final del <head> como <script type="application/ld+json">,
+visible también para los buscadores que no ejecutan JS. Se quita la referencia
+a js/schema.js y, al volver a ejecutarlo, se reemplazan los bloques anteriores.
 """
 
-import os
+import json
 import re
 from pathlib import Path
 
+from build_output import escribir_texto
+from build_utils import MODIFICADO, crear_parser, procesar_archivos
+from html_regions import buscar_head
+from site_graph import grafo_actualizado
+from update_seo_tags import renderer as seo
+
+PAIS = 'AR'
+
+# Páginas de categoría: (serviceType, name, description)
+SERVICIOS = {
+    'jardineria.html': ('Jardinería', 'Servicios de Jardinería', 'Mantenimiento y diseño de jardines profesional'),
+    'plomeria.html': ('Plomería', 'Servicios de Plomería', 'Instalación y reparación de sistemas de agua'),
+    'electricidad.html': ('Electricidad', 'Servicios de Electricidad', 'Instalaciones y reparaciones eléctricas certificadas'),
+    'limpieza.html': ('Limpieza', 'Servicios de Limpieza', 'Limpieza profesional de hogares y oficinas'),
+    'construccion.html': ('Construcción', 'Servicios de Construcción', 'Construcción y remodelación profesional'),
+    'abogacia.html': ('Abogacía', 'Servicios Legales', 'Asesoría y representación legal'),
+    'contaduria.html': ('Contaduría', 'Servicios Contables', 'Contabilidad y asesoría financiera'),
+    'veterinaria.html': ('Veterinaria', 'Servicios Veterinarios', 'Atención médica para mascotas'),
+    'mecanica.html': ('Mecánica', 'Servicios de Mecánica', 'Reparación y mantenimiento de vehículos'),
+}
+
+MARCA = 'data-schema'
+_APERTURA = f'<script type="application/ld+json" {MARCA}>'
+_BLOQUE_ANTERIOR = re.compile(r'[ \t]*<script type="application/ld\+json" %s>.*?</script>\n?' % MARCA, re.DOTALL)
+_SCRIPT_RUNTIME = re.compile(r'[ \t]*<script src="js/schema\.js"></script>\n?')
+
+def _json(entidad):
+    """JSON compacto que no puede cerrar el <script> que lo contiene: cada '<'
+    va como \\u003c, que sigue siendo JSON válido (cubre </script> y <!--)"""
+    texto = json.dumps(entidad, ensure_ascii=False, separators=(',', ':'))
+    return texto.replace('<', '\\u003c')
+
+class SchemaRenderer:
+    """Genera los bloques JSON-LD de cada página.
+
+    Cada entidad se serializa una sola vez y se guarda por clave: Organization,
+    WebSite y los Service o BreadcrumbList de cada página se reutilizan tal cual
+    en todas las páginas (y en todas las de proveedores) que los incluyen.
+    """
+
+    def __init__(self, seo=seo):
+        self.seo = seo
+        self._entidades = {}
+
+    def recargar(self):
+        """Olvida las entidades serializadas (después de cambiar seo-config.json)"""
+        self._entidades = {}
+
+    def _entidad(self, clave, construir):
+        texto = self._entidades.get(clave)
+        if texto is None:
+            texto = _json(construir())
+            self._entidades[clave] = texto
+        return texto
+
+    @property
+    def sitio(self):
+        return self.seo.config['siteUrl'].rstrip('/')
+
+    def organizacion(self):
+        return self._entidad(('organizacion',), lambda: {
+            '@context': 'https://schema.org',
+            '@type': 'Organization',
+            'name': self.seo.config['siteName'],
+            'url': self.sitio,
+            'logo': f"{self.sitio}/imagen/favicon.svg",
+            'description': 'Plataforma que conecta vecinos con profesionales de servicios locales verificados',
+            'address': {'@type': 'PostalAddress', 'addressCountry': PAIS},
+            'sameAs': [],
+        })
+
+    def sitio_web(self):
+        return self._entidad(('sitio_web',), lambda: {
+            '@context': 'https://schema.org',
+            '@type': 'WebSite',
+            'name': self.seo.config['siteName'],
+            'url': self.sitio,
+            'potentialAction': {
+                '@type': 'SearchAction',
+                'target': {
+                    '@type': 'EntryPoint',
+                    'urlTemplate': f"{self.sitio}/buscar.html?q={{search_term_string}}",
+                },
+                'query-input': 'required name=search_term_string',
+            },
+        })
+
+    def servicio(self, pagina):
+        tipo, nombre, descripcion = SERVICIOS[pagina]
+        return self._entidad(('servicio', pagina), lambda: {
+            '@context': 'https://schema.org',
+            '@type': 'Service',
+            'serviceType': tipo,
+            'name': nombre,
+            'description': descripcion,
+            'provider': {'@type': 'Organization', 'name': self.seo.config['siteName'], 'url': self.sitio},
+            'areaServed': {'@type': 'Country', 'name': 'Argentina'},
+            'availableChannel': {'@type': 'ServiceChannel', 'serviceUrl': f"{self.sitio}/{pagina}"},
+        })
+
+    def migas(self, items):
+        """BreadcrumbList de items ((nombre, url), ...)"""
+        return self._entidad(('migas', tuple(items)), lambda: {
+            '@context': 'https://schema.org',
+            '@type': 'BreadcrumbList',
+            'itemListElement': [
+                {'@type': 'ListItem', 'position': i, 'name': nombre, 'item': url}
+                for i, (nombre, url) in enumerate(items, 1)
+            ],
+        })
+
+    def negocio_local(self, datos):
+        """LocalBusiness de un proveedor; no se guarda porque cada uno es único.
+
+        datos: nombre, descripcion, imagen, ubicacion, url, calificacion,
+        cantidad_resenas, resenas [{autor, fecha, calificacion, texto}] y,
+        opcionalmente, telefono.
+        """
+        entidad = {
+            '@context': 'https://schema.org',
+            '@type': 'LocalBusiness',
+            'name': datos['nombre'],
+            'description': datos['descripcion'],
+            'url': datos['url'],
+            'image': [datos['imagen']] if datos['imagen'] else [],
+            'telephone': datos.get('telefono', ''),
+            'address': {
+                '@type': 'PostalAddress',
+                'addressLocality': datos['ubicacion'],
+                'addressCountry': PAIS,
+            },
+        }
+        if datos['calificacion'] and datos['cantidad_resenas'] > 0:
+            entidad['aggregateRating'] = {
+                '@type': 'AggregateRating',
+                'ratingValue': datos['calificacion'],
+                'reviewCount': datos['cantidad_resenas'],
+                'bestRating': 5,
+                'worstRating': 1,
+            }
+        if datos['resenas']:
+            entidad['review'] = [
+                {
+                    '@type': 'Review',
+                    'author': {'@type': 'Person', 'name': resena['autor']},
+                    'datePublished': resena['fecha'],
+                    'reviewRating': {
+                        '@type': 'Rating',
+                        'ratingValue': resena['calificacion'],
+                        'bestRating': 5,
+                        'worstRating': 1,
+                    },
+                    'reviewBody': resena['texto'],
+                }
+                for resena in datos['resenas']
+            ]
+        return _json(entidad)
+
+    def entidades(self, pagina):
+        """JSON de las entidades de una página del sitio, en orden"""
+        inicio = ('Inicio', f"{self.sitio}/")
+        if pagina == 'index.html':
+            return [self.organizacion(), self.sitio_web()]
+        if pagina in SERVICIOS:
+            return [self.organizacion(), self.servicio(pagina), self.migas((
+                inicio,
+                ('Servicios', f"{self.sitio}/todos_los_servicios.html"),
+                (SERVICIOS[pagina][1], f"{self.sitio}/{pagina}"),
+            ))]
+        if pagina == 'buscar.html':
+            return [self.organizacion(), self.migas((
+                inicio, ('Buscar Profesionales', f"{self.sitio}/buscar.html"),
+            ))]
+        return []
+
+    def entidades_proveedor(self, datos):
+        """Entidades de una página generada de proveedor"""
+        return [self.organizacion(), self.negocio_local(datos), self.migas((
+            ('Inicio', f"{self.sitio}/"),
+            ('Profesionales', f"{self.sitio}/buscar.html"),
+            (datos['nombre'], datos['url']),
+        ))]
+
+    def bloque(self, entidades, sangria='  '):
+        """<script> de cada entidad, uno por línea"""
+        return ''.join(f"{sangria}{_APERTURA}{texto}</script>\n" for texto in entidades)
+
+# Instancia compartida: no lee seo-config.json hasta el primer uso
+renderer = SchemaRenderer()
+
+def insertar_jsonld(contenido, bloque):
+    """Quita js/schema.js y los bloques JSON-LD anteriores y agrega bloque al final
+    del <head>. Devuelve None si no hay <head>"""
+    contenido = _SCRIPT_RUNTIME.sub('', _BLOQUE_ANTERIOR.sub('', contenido))
+    head = buscar_head(contenido)
+    if head is None:
+        return None
+    # Justo después de la última línea del <head>
+    posicion = contenido.rfind('\n', head.fin_apertura, head.inicio_cierre) + 1 or head.inicio_cierre
+    return contenido[:posicion] + bloque + contenido[posicion:]
+
+def agregar_schema_html(contenido, pagina, schema=renderer):
+    """Devuelve el HTML con el JSON-LD de la página, o None si no tiene <head>"""
+    return insertar_jsonld(contenido, schema.bloque(schema.entidades(pagina)))
+
 def agregar_schema_script(archivo_html):
-    """Agrega el script schema.js si no existe"""
-    
+    """Incrusta el JSON-LD de la página en su <head>"""
+
     with open(archivo_html, 'r', encoding='utf-8') as f:
         contenido = f.read()
-    
-    # Verificar si ya tiene el script
-    if 'js/schema.js' in contenido:
-        print(f"✓ {archivo_html.name} - Ya tiene schema.js")
+
+    nuevo_contenido = agregar_schema_html(contenido, archivo_html.name)
+    if nuevo_contenido is None:
+        print(f"✗ {archivo_html.name} - No se encontró el <head>")
         return False
-    
-    # Buscar la línea de accesibilidad.js o el primer script
-    patron = r'(\s*<script src="js/accesibilidad\.js"></script>)'
-    
-    if re.search(patron, contenido):
-        # Insertar después de accesibilidad.js
-        nuevo_contenido = re.sub(
-            patron,
-            r'\1\n  <script src="js/schema.js"></script>',
-            contenido,
-            count=1
-        )
-    else:
-        # Si no encuentra accesibilidad.js, buscar cualquier script antes de </body>
-        patron_script = r'(\s*<script[^>]*>.*?</script>)(\s*</body>)'
-        if re.search(patron_script, contenido, re.DOTALL):
-            # Insertar antes del primer script
-            nuevo_contenido = re.sub(
-                r'(\s*)(<script)',
-                r'\1<script src="js/schema.js"></script>\n\1\2',
-                contenido,
-                count=1
-            )
-        else:
-            print(f"✗ {archivo_html.name} - No se encontró dónde insertar el script")
-            return False
-    
+
+    if nuevo_contenido == contenido:
+        print(f"✓ {archivo_html.name} - JSON-LD al día")
+        return False
+
     # Guardar cambios
-    with open(archivo_html, 'w', encoding='utf-8') as f:
-        f.write(nuevo_contenido)
-    
-    print(f"✓ {archivo_html.name} - Script agregado")
+    escribir_texto(archivo_html, nuevo_contenido)
+
+    entidades = nuevo_contenido.count(_APERTURA)
+    print(f"✓ {archivo_html.name} - {entidades} entidades JSON-LD")
     return True
 
 def main():
     """Procesa todos los archivos HTML"""
-    
+    args = crear_parser(__doc__).parse_args()
+
     # Directorio raíz del proyecto
     directorio = Path(__file__).parent
-    
-    # Archivos HTML en la raíz (excluir componentes.html que es demo)
-    archivos_html = [
-        'index.html',
-        'buscar.html',
-        'proveedor.html',
-        'jardineria.html',
-        'plomeria.html',
-        'electricidad.html',
-        'limpieza.html',
-        'construccion.html',
-        'abogacia.html',
-        'contaduria.html',
-        'veterinaria.html',
-        'mecanica.html',
-        'ferreteria.html',
-        'corralon.html',
-        'todos_los_servicios.html',
-        'login.html',
-        'registro.html',
-        'perfil.html',
-        'politicas.html'
-    ]
-    
-    archivos_modificados = 0
-    archivos_totales = 0
-    
-    print("\n🔄 Agregando schema.js a archivos HTML...\n")
-    
-    for nombre_archivo in archivos_html:
-        archivo = directorio / nombre_archivo
-        if archivo.exists():
-            archivos_totales += 1
-            if agregar_schema_script(archivo):
-                archivos_modificados += 1
-        else:
-            print(f"⚠ {nombre_archivo} - Archivo no encontrado")
-    
+
+    archivos = grafo_actualizado(directorio).archivos('schema')
+
+    print("\n🔄 Generando JSON-LD de los archivos HTML...\n")
+
+    estados = procesar_archivos(agregar_schema_script, archivos, args.jobs)
+    archivos_totales = len(estados)
+    archivos_modificados = estados.count(MODIFICADO)
+
     print(f"\n✅ Proceso completado:")
     print(f"   - Archivos procesados: {archivos_totales}")
     print(f"   - Archivos modificados: {archivos_modificados}")
@@ -3,9 +3,64 @@
 Script para agregar los scripts necesarios a todas las páginas HTML
 """
 
-import os
-import re
 from pathlib import Path
+from urllib.parse import urlsplit
+
+from build_output import escribir_texto
+from build_utils import MODIFICADO, crear_parser, procesar_archivos
+from fingerprint_assets import nombre_original
+from html_regions import CIERRA, bloque_scripts_final, iter_etiquetas, iter_tokens, leer_atributos
+from site_graph import grafo_actualizado
+
+def _fuentes_script(content, token):
+    """Scripts locales que carga una etiqueta <script>, por su nombre original:
+    'js/pwa.js' también para js/pwa.<hash>.js o para un bundle que lo incluye"""
+    atributos = leer_atributos(content[token.inicio:token.fin])
+    urls = [atributos.get('src', '')] + atributos.get('data-fuentes', '').split()
+    return {nombre_original(urlsplit(url.strip()).path.lstrip('/')) for url in urls if url.strip()}
+
+def scripts_cargados(content):
+    """Nombres originales de todos los scripts locales de la página"""
+    cargados = set()
+    for token in iter_etiquetas(content, 'script'):
+        cargados |= _fuentes_script(content, token)
+    return cargados
+
+def agregar_despues_de(content, fuente, etiqueta):
+    """Devuelve el HTML con la etiqueta en la línea siguiente al <script> que
+    carga fuente, o None si la página no lo carga"""
+    for token in iter_etiquetas(content, 'script'):
+        if fuente not in _fuentes_script(content, token):
+            continue
+        for cierre in iter_tokens(content, token.fin):
+            if cierre.tipo == CIERRA and cierre.nombre == 'script':
+                return content[:cierre.fin] + '\n  ' + etiqueta + content[cierre.fin:]
+        return None
+    return None
+
+def add_scripts_to_html(content):
+    """Devuelve el HTML con los scripts necesarios antes del cierre de </body>"""
+    cargados = scripts_cargados(content)
+    # Verificar si ya tiene componentes.js
+    if 'js/componentes.js' in cargados:
+        return content
+    
+    # Verificar si tiene accesibilidad.js para usarlo como referencia
+    if 'js/accesibilidad.js' in cargados:
+        # Agregar componentes.js después de accesibilidad.js
+        nuevo = agregar_despues_de(content, 'js/accesibilidad.js', '<script src="js/componentes.js"></script>')
+        return content if nuevo is None else nuevo
+    
+    # Agregar ambos scripts al final del bloque de scripts que cierra el
+    # <body>: solo ahí, no en cada '</body>' del documento
+    bloque = bloque_scripts_final(content)
+    cierre = bloque.inicio_cierre if bloque is not None else content.rfind('</body>')
+    if cierre == -1:
+        return content
+    scripts = '''  <script src="js/accesibilidad.js"></script>
+  <script src="js/componentes.js"></script>
+'''
+    return content[:cierre] + scripts + content[cierre:]
 
 def add_scripts_to_file(filepath):
     """Agrega los scripts necesarios antes del cierre de </body>"""
@@ -14,27 +69,14 @@ def add_scripts_to_file(filepath):
             content = f.read()
         
         # Verificar si ya tiene componentes.js
-        if 'js/componentes.js' in content:
+        if 'js/componentes.js' in scripts_cargados(content):
             print(f"✓ {filepath.name} - Ya tiene componentes.js")
             return False
         
-        # Verificar si tiene accesibilidad.js para usarlo como referencia
-        if 'js/accesibilidad.js' in content:
-            # Agregar componentes.js después de accesibilidad.js
-            new_content = content.replace(
-                '<script src="js/accesibilidad.js"></script>',
-                '<script src="js/accesibilidad.js"></script>\n  <script src="js/componentes.js"></script>'
-            )
-        else:
-            # Agregar ambos scripts antes de </body>
-            scripts = '''  <script src="js/accesibilidad.js"></script>
-  <script src="js/componentes.js"></script>
-</body>'''
-            new_content = content.replace('</body>', scripts)
+        new_content = add_scripts_to_html(content)
         
         if new_content != content:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(new_content)
+            escribir_texto(filepath, new_content)
             print(f"✓ {filepath.name} - Scripts agregados")
             return True
         else:
@@ -47,18 +89,14 @@ def add_scripts_to_file(filepath):
 
 def main():
     """Procesar todos los archivos HTML"""
+    args = crear_parser(__doc__).parse_args()
     base_dir = Path(__file__).parent
-    html_files = list(base_dir.glob('*.html'))
-    
-    # Excluir componentes.html si existe
-    html_files = [f for f in html_files if f.name != 'componentes.html']
+    html_files = grafo_actualizado(base_dir).archivos('scripts')
     
     print(f"\n🔧 Agregando scripts a {len(html_files)} archivos HTML...\n")
     
-    updated_count = 0
-    for html_file in sorted(html_files):
-        if add_scripts_to_file(html_file):
-            updated_count += 1
+    estados = procesar_archivos(add_scripts_to_file, html_files, args.jobs)
+    updated_count = estados.count(MODIFICADO)
     
     print(f"\n✅ Proceso completado: {updated_count} archivos actualizados\n")
 
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+Benchmark de las transformaciones HTML con un corpus sintético
+
+Genera en un directorio temporal --paginas páginas (de 100 a 100000) parecidas
+a las del sitio antes del build: <head> con charset, viewport y preconnect,
+header c-navbar, tarjetas que enlazan a otras páginas del corpus, footer con el
+enlace a políticas y js/schema.js. --mezcla reparte las páginas entre tres
+tipos:
+
+- chica: del tamaño de las páginas reales (unos 20 KB);
+- grande: tarjetas hasta --mb-grande MB;
+- script: una página chica con un <script> inline de --kb-script KB, con '<',
+  '</div>' y enlaces a políticas dentro de cadenas.
+
+Cada etapa de build_site.py se mide por separado sobre cada página (en memoria,
+sin contar la lectura) y después el pipeline completo (leer, aplicar todas las
+etapas y escribir, con -j procesos). Se informan páginas/s, MB/s y el pico de
+memoria: el de cada etapa con tracemalloc, en una pasada aparte sobre la página
+más grande de cada tipo para no distorsionar los tiempos, y el del proceso
+(RSS máximo) para el pipeline. update_html_file, agregar_meta_pwa,
+update_navbar_in_file y los demás scripts son estas mismas etapas con una
+lectura y una escritura alrededor.
+
+Los casos patológicos (CASOS_PATOLOGICOS) se miden aparte, con --kb-patologico
+KB y con cuatro veces más: si el tiempo de una etapa crece bastante más de
+cuatro veces, alguna expresión regular retrocede de forma cuadrática.
+
+Los resultados se guardan en JSON (--salida, por defecto
+.benchmarks/<commit>.json) y --comparar anterior.json muestra las diferencias y
+termina con error si alguna etapa perdió más de --tolerancia % de páginas/s.
+"""
+
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from add_resource_hints import agregar_hints_html
+from build_site import ETAPAS, aplicar_etapas
+from build_utils import ERROR, crear_parser, procesar_archivos
+from site_graph import grafo_actualizado, grafo_guardado
+
+DIRECTORIO_RESULTADOS = '.benchmarks'
+FORMATO = 1
+
+MEZCLA = 'chica=90,script=8,grande=2'
+TARJETAS_CHICA = 30
+MB_GRANDE = 2
+KB_SCRIPT = 512
+KB_PATOLOGICO = 4
+SEMILLA = 1
+
+# Caída de páginas/s (en %) que --comparar considera una regresión
+TOLERANCIA = 10
+# Al cuadruplicar la entrada, un crecimiento mayor que este indica retroceso
+CRECIMIENTO_SOSPECHOSO = 8
+# Por debajo de esto el cociente es ruido
+MINIMO_SOSPECHOSO_S = 0.01
+REPETICIONES_PATOLOGICOS = 3
+
+MB = 1024 * 1024
+
+SERVICIOS = (
+    'Plomería', 'Electricidad', 'Jardinería', 'Limpieza', 'Construcción',
+    'Abogacía', 'Contaduría', 'Veterinaria', 'Mecánica',
+)
+BARRIOS = ('Centro', 'Palermo', 'Belgrano', 'Caballito', 'Almagro', 'Flores', 'Nuñez')
+PALABRAS = (
+    'servicio', 'profesional', 'presupuesto', 'garantía', 'urgencias', 'matriculado',
+    'experiencia', 'zona', 'atención', 'trabajos', 'reparación', 'instalación',
+)
+
+PLANTILLA_PAGINA = '''<!DOCTYPE html>
+<html lang="es">
+<head>
+  <meta charset="UTF-8" />
+  <meta name="viewport" content="width=device-width, initial-scale=1.0"/>
+  <title>{titulo}</title>
+  <link rel="preconnect" href="https://fonts.googleapis.com">
+  <link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Inter:wght@400;600&display=swap">
+  <link rel="stylesheet" href="css/styles.css">
+  <link rel="stylesheet" href="css/components.css">
+{head_extra}</head>
+<body>
+  <header class="c-navbar" role="banner">
+    <nav class="c-navbar__nav">
+      <a href="index.html" class="c-navbar__logo">ServiLocal</a>
+      <a href="buscar.html">Buscar</a>
+      <a href="login.html">Ingresar</a>
+    </nav>
+  </header>
+  <main>
+    <h1>{titulo}</h1>
+    <section class="grid">
+{cuerpo}    </section>
+  </main>
+  <footer>
+    <p>&copy; ServiLocal</p>
+    <a href="politicas.html">Políticas de privacidad</a>
+    <a href="terminos.html">Términos</a>
+  </footer>
+{scripts}  <script src="js/schema.js"></script>
+  <script src="js/accesibilidad.js"></script>
+</body>
+</html>
+'''
+
+def _texto(azar, palabras):
+    return ' '.join(azar.choice(PALABRAS) for _ in range(palabras)).capitalize() + '.'
+
+def _tarjeta(azar, n_paginas):
+    servicio = azar.choice(SERVICIOS)
+    return f'''      <article class="card">
+        <a href="pagina-{azar.randrange(n_paginas)}.html">
+          <img src="imagenes/servicio-{azar.randrange(40)}.jpg" alt="{servicio}" loading="lazy">
+          <h3>{servicio} en {azar.choice(BARRIOS)}</h3>
+        </a>
+        <p>{_texto(azar, 40)}</p>
+        <span class="rating" data-valor="{azar.randint(30, 50) / 10}">★★★★☆</span>
+      </article>
+'''
+
+def _script_inline(azar, kb):
+    lineas = ['  <script>\n', '    const tarjetas = [];\n']
+    tamano = 0
+    i = 0
+    while tamano < kb * 1024:
+        linea = (
+            f'    const plantilla{i} = `<div class="card"><a href="proveedor.html?id={i}">'
+            f'${{nombre}}</a> <a href="politicas.html">políticas</a></div>`;\n'
+            f'    if (total < {azar.randrange(1000)} && actual > {i}) {{ tarjetas.push(plantilla{i}); }}\n'
+        )
+        lineas.append(linea)
+        tamano += len(linea)
+        i += 1
+    lineas.append('  </script>\n')
+    return ''.join(lineas)
+
+def generar_pagina(azar, tipo, n_paginas, mb_grande=MB_GRANDE, kb_script=KB_SCRIPT):
+    """HTML de una página sintética del tipo pedido"""
+    tarjetas = []
+    if tipo == 'grande':
+        tamano = 0
+        while tamano < mb_grande * MB:
+            tarjetas.append(_tarjeta(azar, n_paginas))
+            tamano += len(tarjetas[-1])
+    else:
+        tarjetas = [_tarjeta(azar, n_paginas) for _ in range(TARJETAS_CHICA)]
+    return PLANTILLA_PAGINA.format(
+        titulo=f"{azar.choice(SERVICIOS)} en {azar.choice(BARRIOS)} | ServiLocal",
+        head_extra='',
+        cuerpo=''.join(tarjetas),
+        scripts=_script_inline(azar, kb_script) if tipo == 'script' else '',
+    )
+
+def _pagina_con(head_extra='', cuerpo=''):
+    return PLANTILLA_PAGINA.format(
+        titulo='Caso patológico | ServiLocal', head_extra=head_extra, cuerpo=cuerpo, scripts=''
+    )
+
+def _repetir(fragmento, kb):
+    return fragmento * max(1, kb * 1024 // len(fragmento))
+
+# Entradas que hacen retroceder a las expresiones regulares: cada una recibe
+# el tamaño en KB del fragmento problemático
+CASOS_PATOLOGICOS = {
+    # [ \t]* al comienzo de un patrón se prueba desde cada espacio de la línea
+    'espacios': lambda kb: _pagina_con(head_extra='  ' + _repetir(' \t', kb) + '<meta name="x">\n'),
+    # Bloque PWA anterior que empieza pero no termina
+    'comentarios-pwa': lambda kb: _pagina_con(head_extra=_repetir('  <!-- PWA Meta Tags -->\n', kb)),
+    # Punto de inclusión con parámetros y sin -->
+    'parcial-sin-cerrar': lambda kb: _pagina_con(
+        cuerpo=_repetir('<!-- parcial:navbar' + ' activo="x"' * 20 + '\n', kb)
+    ),
+    # Etiquetas y comillas sin cerrar
+    'etiquetas-sin-cerrar': lambda kb: _pagina_con(
+        cuerpo=_repetir('<a href="politicas.html" title="sin cerrar ', kb)
+    ),
+    # <link> largos que no son hints
+    'links-largos': lambda kb: _pagina_con(
+        head_extra=_repetir('  <link rel="preload" ' + 'data-a="b" ' * 200 + 'href="x.css">\n', kb)
+    ),
+}
+
+def leer_mezcla(texto):
+    """'chica=90,script=8,grande=2' -> {'chica': 0.9, ...}"""
+    pesos = {}
+    for parte in texto.split(','):
+        tipo, _, peso = parte.partition('=')
+        tipo = tipo.strip()
+        if tipo not in ('chica', 'grande', 'script'):
+            raise ValueError(f"tipo de página desconocido: {tipo}")
+        pesos[tipo] = float(peso)
+    total = sum(pesos.values())
+    if total <= 0:
+        raise ValueError("la mezcla no tiene ninguna página")
+    return {tipo: peso / total for tipo, peso in pesos.items()}
+
+def tipos_corpus(n_paginas, mezcla):
+    """Tipo de cada página, con las cantidades de la mezcla intercaladas"""
+    cantidades = {tipo: round(n_paginas * fraccion) for tipo, fraccion in mezcla.items()}
+    # El redondeo se corrige en el tipo más frecuente
+    mayor = max(mezcla, key=mezcla.get)
+    cantidades[mayor] += n_paginas - sum(cantidades.values())
+    tipos = []
+    for tipo, cantidad in cantidades.items():
+        tipos += [(i / cantidad, tipo) for i in range(cantidad)]
+    return [tipo for _, tipo in sorted(tipos)]
+
+def generar_corpus(directorio, n_paginas, mezcla, mb_grande, kb_script, semilla=SEMILLA):
+    """Escribe el corpus en directorio y devuelve [(ruta, tipo, bytes)]"""
+    azar = random.Random(semilla)
+    paginas = []
+    for i, tipo in enumerate(tipos_corpus(n_paginas, mezcla)):
+        ruta = directorio / f"pagina-{i}.html"
+        datos = generar_pagina(azar, tipo, n_paginas, mb_grande, kb_script).encode('utf-8')
+        ruta.write_bytes(datos)
+        paginas.append((ruta, tipo, len(datos)))
+    return paginas
+
+@lru_cache(maxsize=None)
+def _etapas_corpus(base_dir):
+    """Las etapas de build_site, aplicadas a todas las páginas y con los hints
+    calculados con el índice del corpus"""
+    grafo = grafo_guardado(base_dir)
+    etapas = []
+    for etapa in ETAPAS:
+        if etapa.nombre == 'hints':
+            etapa = etapa._replace(transformar=lambda c, p: agregar_hints_html(c, p, grafo))
+        etapas.append(etapa._replace(aplica=lambda pagina: True))
+    return etapas
+
+def procesar_corpus(archivo):
+    """Lee una página del corpus, le aplica todas las etapas y la escribe"""
+    contenido = archivo.read_text(encoding='utf-8')
+    nuevo, _, errores = aplicar_etapas(contenido, archivo.name, _etapas_corpus(archivo.parent))
+    if errores:
+        raise ValueError('; '.join(errores))
+    if nuevo == contenido:
+        return False
+    archivo.write_text(nuevo, encoding='utf-8')
+    return True
+
+def _pico(funcion, *args):
+    """Pico de memoria (bytes) que reserva la llamada, según tracemalloc"""
+    tracemalloc.start()
+    try:
+        funcion(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def _rss_maximo():
+    """RSS máximo (bytes) de este proceso y de sus hijos, o None"""
+    if resource is None:
+        return None
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    factor = 1 if sys.platform == 'darwin' else 1024
+    return factor * max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+
+def _metricas(segundos, paginas, bytes_totales, **extra):
+    return dict(
+        segundos=round(segundos, 4),
+        paginas_s=round(paginas / segundos, 1) if segundos else None,
+        mb_s=round(bytes_totales / MB / segundos, 2) if segundos else None,
+        **extra,
+    )
+
+def medir_etapas(paginas, etapas):
+    """Tiempo de cada etapa sobre cada página y pico de memoria sobre la más
+    grande de cada tipo"""
+    tiempos = {etapa.nombre: 0.0 for etapa in etapas}
+    errores = {etapa.nombre: 0 for etapa in etapas}
+    for ruta, _, _ in paginas:
+        contenido = ruta.read_text(encoding='utf-8')
+        for etapa in etapas:
+            inicio = time.perf_counter()
+            try:
+                etapa.transformar(contenido, ruta.name)
+            except Exception:
+                errores[etapa.nombre] += 1
+            tiempos[etapa.nombre] += time.perf_counter() - inicio
+
+    mayores = {}
+    for ruta, tipo, tamano in paginas:
+        if tamano > mayores.get(tipo, (None, 0))[1]:
+            mayores[tipo] = (ruta, tamano)
+    picos = {etapa.nombre: 0 for etapa in etapas}
+    for ruta, _ in mayores.values():
+        contenido = ruta.read_text(encoding='utf-8')
+        for etapa in etapas:
+            try:
+                pico = _pico(etapa.transformar, contenido, ruta.name)
+            except Exception:
+                continue
+            picos[etapa.nombre] = max(picos[etapa.nombre], pico)
+
+    bytes_totales = sum(tamano for _, _, tamano in paginas)
+    return {
+        etapa.nombre: _metricas(
+            tiempos[etapa.nombre], len(paginas), bytes_totales,
+            pico_kb=round(picos[etapa.nombre] / 1024, 1), errores=errores[etapa.nombre],
+        )
+        for etapa in etapas
+    }
+
+def medir_patologicos(kb, etapas):
+    """{caso: {etapa: {'segundos': [con kb, con 4*kb], 'crecimiento': cociente}}}"""
+    resultados = {}
+    for caso, generar in CASOS_PATOLOGICOS.items():
+        paginas = (generar(kb), generar(4 * kb))
+        resultados[caso] = {}
+        for etapa in etapas:
+            tiempos = []
+            for contenido in paginas:
+                mejor = None
+                for _ in range(REPETICIONES_PATOLOGICOS):
+                    inicio = time.perf_counter()
+                    try:
+                        etapa.transformar(contenido, f"{caso}.html")
+                    except Exception:
+                        pass
+                    transcurrido = time.perf_counter() - inicio
+                    mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+                tiempos.append(mejor)
+            resultados[caso][etapa.nombre] = {
+                'segundos': [round(t, 5) for t in tiempos],
+                'crecimiento': round(tiempos[1] / tiempos[0], 1) if tiempos[0] else None,
+            }
+    return resultados
+
+def sospechosos(patologicos):
+    """[(caso, etapa, medición)] de las etapas que crecen más que linealmente"""
+    return [
+        (caso, etapa, medicion)
+        for caso, etapas in patologicos.items()
+        for etapa, medicion in etapas.items()
+        if medicion['crecimiento'] and medicion['crecimiento'] > CRECIMIENTO_SOSPECHOSO
+        and medicion['segundos'][1] > MINIMO_SOSPECHOSO_S
+    ]
+
+def commit_actual(base_dir):
+    try:
+        resultado = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=base_dir,
+            capture_output=True, text=True, check=True,
+        )
+        return resultado.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'sin-git'
+
+def guardar_json(ruta, datos):
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_name(ruta.name + '.tmp')
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, indent=1, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+def comparar(anterior, actual, tolerancia=TOLERANCIA):
+    """Imprime las diferencias de páginas/s y devuelve las regresiones"""
+    if anterior.get('corpus') != actual['corpus']:
+        print("⚠ Los corpus no son iguales: las diferencias pueden no ser comparables")
+    regresiones = []
+    mediciones = [
+        *(('etapa ' + nombre, datos) for nombre, datos in actual['etapas'].items()),
+        ('pipeline', actual['pipeline']),
+    ]
+    print(f"\n   Comparado con {anterior.get('commit', '?')}:")
+    for nombre, datos in mediciones:
+        if nombre == 'pipeline':
+            previo = anterior.get('pipeline', {})
+        else:
+            previo = anterior.get('etapas', {}).get(nombre[len('etapa '):], {})
+        antes, ahora = previo.get('paginas_s'), datos['paginas_s']
+        if not antes or not ahora:
+            continue
+        cambio = (ahora - antes) / antes * 100
+        marca = '✓'
+        if cambio < -tolerancia:
+            marca = '✗'
+            regresiones.append(nombre)
+        print(f"   {marca} {nombre}: {antes:.1f} → {ahora:.1f} páginas/s ({cambio:+.1f}%)")
+    return regresiones
+
+def main():
+    """Generar el corpus, medir y guardar los resultados"""
+    parser = crear_parser(__doc__)
+    parser.add_argument('--paginas', type=int, default=1000, help='páginas del corpus (por defecto %(default)s)')
+    parser.add_argument('--mezcla', default=MEZCLA, help='proporción de cada tipo de página (por defecto %(default)s)')
+    parser.add_argument('--mb-grande', type=float, default=MB_GRANDE, help='MB de las páginas grandes')
+    parser.add_argument('--kb-script', type=int, default=KB_SCRIPT, help='KB del script inline')
+    parser.add_argument('--kb-patologico', type=int, default=KB_PATOLOGICO,
+                        help='KB de los casos patológicos (0 = no medirlos)')
+    parser.add_argument('--semilla', type=int, default=SEMILLA)
+    parser.add_argument('--salida', metavar='ARCHIVO', help='JSON de resultados (por defecto .benchmarks/<commit>.json)')
+    parser.add_argument('--comparar', metavar='ARCHIVO', help='resultados anteriores con los que comparar')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA,
+                        help='caída de páginas/s (%%) que se considera regresión')
+    args = parser.parse_args()
+    base_dir = Path(__file__).parent
+    mezcla = leer_mezcla(args.mezcla)
+    commit = commit_actual(base_dir)
+
+    directorio = Path(tempfile.mkdtemp(prefix='servilocal-bench-'))
+    try:
+        print(f"\n🧪 Generando {args.paginas} páginas ({args.mezcla})...")
+        paginas = generar_corpus(directorio, args.paginas, mezcla, args.mb_grande, args.kb_script, args.semilla)
+        bytes_totales = sum(tamano for _, _, tamano in paginas)
+        print(f"   {bytes_totales / MB:.1f} MB en {directorio}")
+
+        inicio = time.perf_counter()
+        grafo_actualizado(directorio)
+        indice = _metricas(time.perf_counter() - inicio, len(paginas), bytes_totales)
+        etapas = _etapas_corpus(directorio)
+
+        print(f"\n⏱  Midiendo {len(etapas)} etapas por separado...")
+        por_etapa = medir_etapas(paginas, etapas)
+
+        print(f"⏱  Midiendo el pipeline completo ({args.jobs} procesos)...")
+        inicio = time.perf_counter()
+        estados = procesar_archivos(procesar_corpus, [ruta for ruta, _, _ in paginas], args.jobs)
+        pipeline = _metricas(
+            time.perf_counter() - inicio, len(paginas), bytes_totales,
+            rss_mb=round(_rss_maximo() / MB, 1) if resource else None,
+            errores=estados.count(ERROR), jobs=args.jobs,
+        )
+
+        patologicos = {}
+        if args.kb_patologico > 0:
+            print(f"⏱  Midiendo {len(CASOS_PATOLOGICOS)} casos patológicos "
+                  f"({args.kb_patologico} y {4 * args.kb_patologico} KB)...")
+            patologicos = medir_patologicos(args.kb_patologico, etapas)
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    resultados = {
+        'formato': FORMATO,
+        'commit': commit,
+        'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'corpus': {
+            'paginas': args.paginas, 'mezcla': args.mezcla, 'mb_grande': args.mb_grande,
+            'kb_script': args.kb_script, 'semilla': args.semilla, 'bytes': bytes_totales,
+        },
+        'indice': indice,
+        'etapas': por_etapa,
+        'pipeline': pipeline,
+        'kb_patologico': args.kb_patologico,
+        'patologicos': patologicos,
+    }
+
+    print(f"\n📊 Resultados ({commit}):\n")
+    print(f"   {'':12} {'páginas/s':>10} {'MB/s':>8} {'pico':>10}")
+    print(f"   {'índice':12} {indice['paginas_s']:>10.1f} {indice['mb_s']:>8.2f}")
+    for nombre, datos in por_etapa.items():
+        errores = f"  ({datos['errores']} errores)" if datos['errores'] else ''
+        print(f"   {nombre:12} {datos['paginas_s']:>10.1f} {datos['mb_s']:>8.2f} "
+              f"{datos['pico_kb']:>7.0f} KB{errores}")
+    rss = f"{pipeline['rss_mb']:>7.0f} MB" if pipeline['rss_mb'] is not None else ''
+    print(f"   {'pipeline':12} {pipeline['paginas_s']:>10.1f} {pipeline['mb_s']:>8.2f} {rss}")
+
+    for caso, etapa, medicion in sospechosos(patologicos):
+        antes, despues = medicion['segundos']
+        print(f"   ⚠ {caso} / {etapa}: {antes * 1000:.1f} → {despues * 1000:.1f} ms "
+              f"con 4 veces la entrada (x{medicion['crecimiento']})")
+
+    salida = Path(args.salida) if args.salida else base_dir / DIRECTORIO_RESULTADOS / f"{commit}.json"
+    guardar_json(salida, resultados)
+    print(f"\n   Guardado en {salida}")
+
+    regresiones = []
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            regresiones = comparar(json.load(f), resultados, args.tolerancia)
+
+    print(f"\n✅ Proceso completado: {len(paginas)} páginas, {bytes_totales / MB:.1f} MB\n")
+    if regresiones:
+        print(f"✗ Regresiones de más del {args.tolerancia:g}%: {', '.join(regresiones)}\n")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Manifest persistente de build incremental.
+
+Guarda, por página, el hash del contenido de entrada y de salida, el stat
+(mtime/tamaño) del archivo escrito y los hashes de todas las configuraciones
+y plantillas de las que dependen sus transformaciones. Una página solo se
+vuelve a procesar cuando alguno de esos datos cambió.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from build_output import escribir_json
+
+MANIFEST_FILE = '.build-manifest.json'
+MANIFEST_VERSION = 1
+
+def hash_bytes(datos):
+    """Hash corto y estable de un bloque de bytes"""
+    return hashlib.blake2b(datos, digest_size=16).hexdigest()
+
+def hash_texto(texto):
+    return hash_bytes(texto.encode('utf-8'))
+
+def hash_archivo(ruta):
+    with open(ruta, 'rb') as f:
+        return hash_bytes(f.read())
+
+def hash_json(valor):
+    """Hash de un valor JSON independiente del orden de las claves"""
+    return hash_texto(json.dumps(valor, sort_keys=True, ensure_ascii=False))
+
+class BuildManifest:
+    """Estado del último build, indexado por nombre de página"""
+
+    def __init__(self, ruta, paginas=None):
+        self.ruta = Path(ruta)
+        self.paginas = paginas if paginas is not None else {}
+
+    @classmethod
+    def cargar(cls, ruta):
+        """Carga el manifest; si no existe o es de otra versión empieza vacío"""
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return cls(ruta)
+        if datos.get('version') != MANIFEST_VERSION:
+            return cls(ruta)
+        return cls(ruta, datos.get('paginas', {}))
+
+    def sin_cambios_por_stat(self, pagina, stat, dependencias):
+        """True si el archivo y sus dependencias no cambiaron desde el último build.
+
+        Solo compara el stat, así que no hace falta leer el archivo.
+        """
+        registro = self.paginas.get(pagina)
+        return (
+            registro is not None
+            and registro['mtime_ns'] == stat.st_mtime_ns
+            and registro['size'] == stat.st_size
+            and registro['dependencias'] == dependencias
+        )
+
+    def sin_cambios_por_hash(self, pagina, hash_actual, dependencias):
+        """True si el contenido coincide con la última salida (archivo solo tocado)"""
+        registro = self.paginas.get(pagina)
+        return (
+            registro is not None
+            and registro['salida'] == hash_actual
+            and registro['dependencias'] == dependencias
+        )
+
+    def registrar(self, pagina, registro):
+        self.paginas[pagina] = registro
+
+    def conservar(self, paginas):
+        """Elimina las entradas de páginas que ya no existen"""
+        paginas = set(paginas)
+        for pagina in list(self.paginas):
+            if pagina not in paginas:
+                del self.paginas[pagina]
+
+    def guardar(self):
+        escribir_json(
+            self.ruta, {'version': MANIFEST_VERSION, 'paginas': self.paginas},
+            indent=1, sort_keys=True,
+        )
+
+def crear_registro(stat, hash_entrada, hash_salida, dependencias):
+    """Entrada de manifest para una página recién procesada"""
+    return {
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'entrada': hash_entrada,
+        'salida': hash_salida,
+        'dependencias': dependencias,
+    }
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Escritura de los archivos que generan los scripts de build
+
+Todos los scripts escriben con escribir_texto, escribir_bytes o escribir_json
+(o escribir_lineas, para archivos grandes que se generan por partes):
+
+- si el archivo ya tiene ese contenido no se toca (ni su mtime), así los
+  cachés que miran el mtime (el CDN, rsync, compress_assets, el manifest) no
+  ven cambios que no existen;
+- se escribe en un temporal del mismo directorio y se renombra: una ejecución
+  interrumpida deja el archivo anterior o el nuevo, nunca uno a medias;
+- los fsync se hacen todos juntos al terminar (los archivos y una vez cada
+  directorio) en lugar de esperar al disco en cada escritura;
+- las rutas publicadas que cambiaron (no las que empiezan con '.', como los
+  manifests y cachés) se agregan a .changed-files.txt. Los archivos borrados
+  no se anotan: de eso se encarga un deploy completo (rsync --delete).
+
+El deploy puede subir solo lo que cambió y después vaciar la lista:
+
+  rsync -a --files-from=.changed-files.txt . destino/
+  python3 build_output.py --vaciar
+
+Las etapas que generan archivos que no enlaza ninguna página (el sitemap, el
+índice de búsqueda, las páginas de proveedores) los anotan con
+registrar_salidas en .publish-outputs.json; compress_assets los comprime
+junto con las páginas y sus assets sin llevar su propia lista.
+
+Los procesos del pool confirman lo suyo al terminar cada archivo y le pasan
+las rutas al proceso principal junto con la salida.
+"""
+
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import stat
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+ARCHIVOS_MODIFICADOS = '.changed-files.txt'
+SALIDAS_PUBLICADAS = '.publish-outputs.json'
+
+def _mismo_contenido(ruta, datos):
+    try:
+        if ruta.stat().st_size != len(datos):
+            return False
+        return ruta.read_bytes() == datos
+    except OSError:
+        return False
+
+def _mismo_archivo(ruta, otra):
+    """Compara dos archivos por bloques, sin leerlos enteros"""
+    try:
+        if ruta.stat().st_size != otra.stat().st_size:
+            return False
+        with open(ruta, 'rb') as a, open(otra, 'rb') as b:
+            while True:
+                bloque = a.read(1 << 16)
+                if bloque != b.read(1 << 16):
+                    return False
+                if not bloque:
+                    return True
+    except OSError:
+        return False
+
+def _fsync(ruta):
+    try:
+        fd = os.open(ruta, os.O_RDONLY)
+    except OSError:
+        # Windows no abre directorios; el archivo pudo borrarse después
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+class Escrituras:
+    """Archivos escritos por este proceso: los pendientes de fsync y los que
+    cambiaron"""
+
+    def __init__(self):
+        self.pendientes = []
+        self.modificados = []
+        self._al_salir = False
+
+    def registrar(self, ruta):
+        ruta = Path(os.path.abspath(ruta))
+        self.pendientes.append(ruta)
+        try:
+            relativa = ruta.relative_to(BASE_DIR)
+        except ValueError:
+            relativa = None
+        if relativa is not None and not any(parte.startswith('.') for parte in relativa.parts):
+            self.modificados.append(relativa.as_posix())
+        if not self._al_salir:
+            self._al_salir = True
+            atexit.register(self.confirmar)
+
+    def sincronizar(self):
+        """fsync de los archivos escritos y de sus directorios, una vez cada uno"""
+        pendientes = list(dict.fromkeys(self.pendientes))
+        self.pendientes = []
+        for ruta in pendientes:
+            _fsync(ruta)
+        for directorio in dict.fromkeys(ruta.parent for ruta in pendientes):
+            _fsync(directorio)
+
+    def extraer(self):
+        """En un proceso del pool: sincroniza y devuelve las rutas modificadas"""
+        self.sincronizar()
+        modificados, self.modificados = self.modificados, []
+        return modificados
+
+    def agregar(self, modificados):
+        if modificados:
+            self.modificados.extend(modificados)
+            if not self._al_salir:
+                self._al_salir = True
+                atexit.register(self.confirmar)
+
+    def confirmar(self):
+        """Sincroniza y agrega las rutas modificadas a .changed-files.txt"""
+        self.sincronizar()
+        if not self.modificados:
+            return
+        lista = BASE_DIR / ARCHIVOS_MODIFICADOS
+        try:
+            anteriores = lista.read_text(encoding='utf-8').splitlines()
+        except FileNotFoundError:
+            anteriores = []
+        ya_listadas = set(anteriores)
+        nuevos = [ruta for ruta in dict.fromkeys(self.modificados) if ruta not in ya_listadas]
+        self.modificados = []
+        if nuevos:
+            escribir_texto(lista, ''.join(f"{ruta}\n" for ruta in anteriores + nuevos))
+            self.sincronizar()
+
+    def _despues_de_fork(self):
+        # Un proceso del pool no hereda lo escrito por el principal
+        self.pendientes, self.modificados = [], []
+        self._al_salir = True
+
+# Instancia del proceso
+escrituras = Escrituras()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=escrituras._despues_de_fork)
+
+def _temporal(ruta):
+    return ruta.with_name(f".{ruta.name}.{os.getpid()}.tmp")
+
+def _abrir_temporal(temporal):
+    # 0o666 menos la umask, como open()
+    return open(os.open(temporal, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666), 'wb')
+
+def _reemplazar(ruta, temporal):
+    """Renombra el temporal sobre ruta conservando el modo que tenía"""
+    try:
+        os.chmod(temporal, stat.S_IMODE(ruta.stat().st_mode))
+    except OSError:
+        pass
+    os.replace(temporal, ruta)
+    escrituras.registrar(ruta)
+
+def escribir_bytes(ruta, datos):
+    """Escribe datos en ruta salvo que ya los tenga. Devuelve True si escribió"""
+    ruta = Path(ruta)
+    if _mismo_contenido(ruta, datos):
+        return False
+    temporal = _temporal(ruta)
+    try:
+        with _abrir_temporal(temporal) as f:
+            f.write(datos)
+        _reemplazar(ruta, temporal)
+    except BaseException:
+        temporal.unlink(missing_ok=True)
+        raise
+    return True
+
+def escribir_lineas(ruta, lineas, hash_previo=None, encoding='utf-8'):
+    """Escribe las líneas (un generador) en el temporal a medida que llegan,
+    sin armar el archivo en memoria, calculando su hash.
+
+    Si el hash es hash_previo (el de la última escritura) y el archivo existe,
+    ni siquiera lo compara. Devuelve (hash, escrito).
+    """
+    ruta = Path(ruta)
+    temporal = _temporal(ruta)
+    resumen = hashlib.blake2b(digest_size=16)
+    try:
+        with _abrir_temporal(temporal) as f:
+            for linea in lineas:
+                datos = linea.encode(encoding)
+                resumen.update(datos)
+                f.write(datos)
+        nuevo = resumen.hexdigest()
+        if (nuevo == hash_previo and ruta.exists()) or _mismo_archivo(ruta, temporal):
+            temporal.unlink()
+            return nuevo, False
+        _reemplazar(ruta, temporal)
+    except BaseException:
+        temporal.unlink(missing_ok=True)
+        raise
+    return nuevo, True
+
+def escribir_texto(ruta, texto, encoding='utf-8'):
+    return escribir_bytes(ruta, texto.encode(encoding))
+
+def escribir_json(ruta, datos, **opciones):
+    """json.dump(datos, **opciones) en ruta, con las mismas garantías"""
+    return escribir_texto(ruta, json.dumps(datos, **opciones))
+
+def _leer_salidas(base_dir):
+    try:
+        with open(Path(base_dir) / SALIDAS_PUBLICADAS, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def registrar_salidas(base_dir, etapa, *rutas):
+    """Anota los archivos o directorios (relativos a base_dir) que publica la
+    etapa, en lugar de los que anotó la vez anterior"""
+    salidas = _leer_salidas(base_dir)
+    salidas[etapa] = sorted(rutas)
+    escribir_json(Path(base_dir) / SALIDAS_PUBLICADAS, salidas, indent=1, sort_keys=True)
+
+def salidas_publicadas(base_dir):
+    """Archivos que existen dentro de lo que registraron las etapas (rutas completas)"""
+    archivos = set()
+    for rutas in _leer_salidas(base_dir).values():
+        for relativa in rutas:
+            ruta = Path(base_dir) / relativa
+            if ruta.is_dir():
+                archivos.update(
+                    r for r in ruta.rglob('*')
+                    if r.is_file() and not any(p.startswith('.') for p in r.relative_to(base_dir).parts)
+                )
+            elif ruta.is_file():
+                archivos.add(ruta)
+    return sorted(archivos)
+
+def main():
+    """Mostrar o vaciar la lista de archivos modificados"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--vaciar', action='store_true', help='vaciar la lista (después del deploy)')
+    args = parser.parse_args()
+    lista = BASE_DIR / ARCHIVOS_MODIFICADOS
+
+    if args.vaciar:
+        lista.unlink(missing_ok=True)
+        print(f"✅ {ARCHIVOS_MODIFICADOS} vaciado")
+        return
+    try:
+        rutas = lista.read_text(encoding='utf-8').splitlines()
+    except FileNotFoundError:
+        rutas = []
+    for ruta in rutas:
+        print(ruta)
+    print(f"\n✅ {len(rutas)} archivos modificados desde el último deploy\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Script para generar el índice de búsqueda de buscar.html
+
+Se indexan los mismos proveedores que publica generate_providers.py (nombre,
+categoría, ubicación, descripción y servicios). El texto se normaliza igual en
+Python y en js/busqueda.js: sin tildes, en minúsculas, sin palabras vacías y
+recortado a su raíz con una lista de sufijos del español ("plomería",
+"plomero" y "plomeros" quedan en "plom"). La lista de sufijos y de palabras
+vacías viaja en busqueda/indice.json, así que el cliente no puede quedar
+desincronizado.
+
+Cada proveedor recibe un id la primera vez que se indexa y lo conserva
+(.search-index-state.json), así que cambiar una calificación o agregar un
+proveedor no renumera a los demás ni reescribe sus shards; los ids de los
+proveedores que desaparecen no se reutilizan. Las listas de postings están en
+orden de id y los tres órdenes (recomendados, calificados, cercanos) se
+resuelven con las claves precalculadas. En busqueda/:
+
+  indice.json      parámetros, categorías y cantidad de documentos
+  t-<xx>.json      términos que empiezan por xx -> ids en deltas base 36
+  c-<categoria>.txt  ids de la categoría, en deltas base 36
+  d-<n>.json       datos de las tarjetas de un bloque de documentos
+  k-<n>.txt        claves de orden precalculadas (calificación, distancia)
+  o-<orden>-<n>.txt  ids en ese orden, para buscar sin filtros
+
+El cliente descarga solo los shards de los términos de la consulta, las claves
+de los bloques donde caen los resultados y los datos de la página que muestra.
+Solo se reescriben los archivos cuyo contenido cambió.
+"""
+
+import argparse
+import json
+import math
+import re
+import unicodedata
+from pathlib import Path
+
+from build_manifest import hash_texto
+from build_output import escribir_json, escribir_texto, registrar_salidas
+from build_utils import crear_parser
+from generate_providers import (
+    DATOS_POR_DEFECTO, calificacion_y_resenas, iter_registros, nombre_archivo, normalizar,
+    resumen, slug,
+)
+from generate_sitemap import DIRECTORIO_PROVEEDORES
+from html_regions import ABRE, CIERRA, TEXTO, iter_tokens, leer_atributos
+
+DIRECTORIO_INDICE = 'busqueda'
+ESTADO_INDICE = '.search-index-state.json'
+VERSION_INDICE = 3
+PAGINA_BUSQUEDA = 'buscar.html'
+
+LARGO_PREFIJO = 2
+BLOQUE_DOCUMENTOS = 256
+BLOQUE_CLAVES = 4096
+RAIZ_MINIMA = 3
+
+# El mismo punto por defecto que js/mapa.js
+ORIGEN_POR_DEFECTO = (19.4326, -99.1332)
+
+PALABRAS_VACIAS = sorted({
+    'al', 'con', 'de', 'del', 'el', 'en', 'es', 'la', 'las', 'lo', 'los', 'mas', 'mi',
+    'no', 'para', 'por', 'se', 'sin', 'su', 'sus', 'un', 'una', 'unos', 'unas', 'que',
+    'tu', 'te', 'le', 'les', 'ya', 'hs', 'hrs',
+})
+
+# Se quita el más largo que deje al menos RAIZ_MINIMA letras
+SUFIJOS = sorted([
+    'amientos', 'imientos', 'amiento', 'imiento', 'aciones', 'uciones', 'adoras',
+    'adores', 'ancias', 'idades', 'mente', 'acion', 'ucion', 'adora', 'ador', 'ancia',
+    'idad', 'ismos', 'istas', 'ismo', 'ista', 'ables', 'ibles', 'able', 'ible', 'osos',
+    'osas', 'oso', 'osa', 'erias', 'eria', 'eros', 'eras', 'ero', 'era', 'es', 'os',
+    'as', 's', 'o', 'a', 'e',
+], key=lambda sufijo: (-len(sufijo), sufijo))
+
+CAMPOS_DOCUMENTO = [
+    'id', 'nombre', 'categoria', 'categoriaDisplay', 'ubicacion', 'descripcion',
+    'experiencia', 'imagen', 'url', 'calificacion', 'resenas', 'distancia',
+    'verificado', 'destacado', 'proveedor',
+]
+ORDENES = ['recomendados', 'calificados', 'cercanos']
+
+_DIACRITICOS = re.compile('[\u0300-\u036f]')
+_PALABRA = re.compile(r'[a-z0-9]+')
+_DIGITOS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+def plegar(texto):
+    """Minúsculas sin tildes (igual que normalize('NFD') en el cliente)"""
+    return _DIACRITICOS.sub('', unicodedata.normalize('NFD', texto)).lower()
+
+def raiz(palabra):
+    for sufijo in SUFIJOS:
+        if palabra.endswith(sufijo) and len(palabra) - len(sufijo) >= RAIZ_MINIMA:
+            return palabra[:-len(sufijo)]
+    return palabra
+
+_VACIAS = frozenset(PALABRAS_VACIAS)
+
+def tokenizar(texto):
+    """Raíces de las palabras del texto, en orden y con repeticiones"""
+    return [
+        raiz(palabra) for palabra in _PALABRA.findall(plegar(texto))
+        if len(palabra) >= LARGO_PREFIJO and palabra not in _VACIAS
+    ]
+
+def base36(n):
+    digitos = ''
+    while True:
+        n, resto = divmod(n, 36)
+        digitos = _DIGITOS[resto] + digitos
+        if n == 0:
+            return digitos
+
+def codificar_postings(ids):
+    """Ids crecientes como diferencias en base 36 separadas por comas"""
+    anterior = 0
+    partes = []
+    for i in ids:
+        partes.append(base36(i - anterior))
+        anterior = i
+    return ','.join(partes)
+
+def _ancho(maximo):
+    return len(base36(max(maximo, 0)))
+
+def categorias_de_pagina(base_dir):
+    """{valor: nombre visible} de las opciones de <select id="categoria"> de buscar.html"""
+    contenido = (base_dir / PAGINA_BUSQUEDA).read_text(encoding='utf-8')
+    categorias = {}
+    en_select = False
+    valor = None
+    for token in iter_tokens(contenido):
+        if token.tipo == ABRE and token.nombre == 'select':
+            en_select = leer_atributos(contenido[token.inicio:token.fin]).get('id') == 'categoria'
+        elif token.tipo == CIERRA and token.nombre == 'select' and en_select:
+            break
+        elif en_select and token.tipo == ABRE and token.nombre == 'option':
+            valor = leer_atributos(contenido[token.inicio:token.fin]).get('value')
+        elif en_select and token.tipo == TEXTO and valor:
+            categorias[valor] = contenido[token.inicio:token.fin].strip()
+            valor = None
+    return categorias
+
+def _distancia_km(origen, destino):
+    """Distancia haversine en km"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (*origen, *destino))
+    a = math.sin((lat2 - lat1) / 2) ** 2 \
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * 6371 * math.asin(math.sqrt(a))
+
+def alias_categorias(categorias):
+    """Valor del <select> para cada forma aceptada: el valor o el nombre visible"""
+    alias = {slug(nombre): valor for valor, nombre in categorias.items()}
+    alias.update((valor, valor) for valor in categorias)
+    return alias
+
+def documento(registro, categorias, alias, origen):
+    """(id del proveedor, datos de la tarjeta, texto a indexar) de un registro, o
+    None si no es proveedor"""
+    proveedor = normalizar(registro)
+    if proveedor is None:
+        return None
+
+    original = str(registro.get('category') or registro.get('categoria') or '')
+    categoria = alias.get(original) or alias.get(slug(original), slug(original))
+
+    distancia = registro.get('distance')
+    if distancia is None and proveedor['coordenadas']:
+        distancia = _distancia_km(origen, proveedor['coordenadas'])
+    calificacion, cantidad = calificacion_y_resenas(proveedor)
+
+    datos = {
+        'nombre': proveedor['nombre'],
+        'categoria': categoria,
+        'categoriaDisplay': categorias.get(categoria, original),
+        'ubicacion': proveedor['ubicacion'],
+        'descripcion': resumen(proveedor['descripcion']),
+        'experiencia': str(registro.get('experience') or ''),
+        'imagen': proveedor['avatar'],
+        'url': f"{DIRECTORIO_PROVEEDORES}/{nombre_archivo(proveedor)}",
+        'calificacion': round(calificacion, 1),
+        'resenas': cantidad,
+        'distancia': round(float(distancia), 1) if distancia is not None else None,
+        'verificado': bool(registro.get('verified')),
+        'destacado': bool(registro.get('featured')),
+        # El id del documento es interno del índice; el del proveedor es este
+        'proveedor': proveedor['id'],
+    }
+    texto = ' '.join([
+        proveedor['nombre'], datos['categoriaDisplay'], proveedor['ubicacion'],
+        proveedor['descripcion'], *proveedor['servicios'],
+    ])
+    return proveedor['id'], datos, texto
+
+def _clave_recomendados(datos):
+    return (not datos['destacado'], -datos['calificacion'], -datos['resenas'], datos['nombre'])
+
+def _claves_orden(documentos):
+    return {
+        'recomendados': lambda i: (_clave_recomendados(documentos[i]), i),
+        'calificados': lambda i: (-documentos[i]['calificacion'], -documentos[i]['resenas'], i),
+        'cercanos': lambda i: (documentos[i]['distancia'] is None, documentos[i]['distancia'] or 0, i),
+    }
+
+def cargar_estado(base_dir):
+    try:
+        with open(base_dir / ESTADO_INDICE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'ids': {}, 'siguiente': 0}
+
+def construir_indice(registros, categorias, origen, estado):
+    """{ruta relativa: contenido} de todos los archivos del índice.
+
+    estado ({'ids': {proveedor: id}, 'siguiente': n}) se actualiza con los ids
+    de los proveedores nuevos y pierde los de los que ya no están.
+    """
+    alias = alias_categorias(categorias)
+    ids = {}
+    entradas = {}
+    for registro in registros:
+        doc = documento(registro, categorias, alias, origen)
+        if doc is None:
+            continue
+        proveedor, datos, texto = doc
+        if proveedor not in ids:
+            ids[proveedor] = estado['ids'].get(proveedor)
+            if ids[proveedor] is None:
+                ids[proveedor] = estado['siguiente']
+                estado['siguiente'] += 1
+        entradas[ids[proveedor]] = datos, texto
+    estado['ids'] = ids
+    documentos = {i: datos for i, (datos, _) in entradas.items()}
+
+    postings = {}
+    por_categoria = {}
+    for i in sorted(entradas):
+        datos, texto = entradas[i]
+        for termino in dict.fromkeys(tokenizar(texto)):
+            postings.setdefault(termino, []).append(i)
+        if datos['categoria']:
+            por_categoria.setdefault(datos['categoria'], []).append(i)
+    del entradas
+
+    archivos = {}
+    shards = {}
+    for termino in sorted(postings):
+        shards.setdefault(termino[:LARGO_PREFIJO], {})[termino] = codificar_postings(postings[termino])
+    for prefijo, terminos in shards.items():
+        archivos[f"t-{prefijo}.json"] = json.dumps(terminos, separators=(',', ':'))
+    for categoria, ids_categoria in sorted(por_categoria.items()):
+        archivos[f"c-{categoria}.txt"] = codificar_postings(ids_categoria)
+
+    # Los bloques se arman por id: un bloque sin documentos no tiene archivo
+    bloques = {}
+    for i in sorted(documentos):
+        bloques.setdefault(i // BLOQUE_DOCUMENTOS, []).append(
+            [i] + [documentos[i][campo] for campo in CAMPOS_DOCUMENTO[1:]]
+        )
+    for bloque, filas in bloques.items():
+        archivos[f"d-{bloque}.json"] = json.dumps(filas, ensure_ascii=False, separators=(',', ':'))
+
+    # Rango de cada documento en cada orden, con ancho fijo para leerlo por
+    # posición; los ids sin documento quedan en cero
+    ancho = _ancho(len(documentos) - 1)
+    rangos = {}
+    for orden, clave in _claves_orden(documentos).items():
+        orden_ids = sorted(documentos, key=clave)
+        rangos[orden] = {i: posicion for posicion, i in enumerate(orden_ids)}
+        for inicio in range(0, len(orden_ids), BLOQUE_CLAVES):
+            archivos[f"o-{orden}-{inicio // BLOQUE_CLAVES}.txt"] = ','.join(
+                base36(i) for i in orden_ids[inicio:inicio + BLOQUE_CLAVES]
+            )
+    ultimo = max(documentos, default=-1)
+    for bloque in sorted({i // BLOQUE_CLAVES for i in documentos}):
+        posiciones = range(bloque * BLOQUE_CLAVES, min((bloque + 1) * BLOQUE_CLAVES, ultimo + 1))
+        archivos[f"k-{bloque}.txt"] = '\n'.join(
+            ''.join(base36(rangos[orden].get(i, 0)).rjust(ancho, '0') for i in posiciones)
+            for orden in ORDENES
+        )
+
+    indice = {
+        'version': hash_texto(''.join(f"{ruta}\0{texto}" for ruta, texto in sorted(archivos.items()))),
+        'formato': VERSION_INDICE,
+        'documentos': len(documentos),
+        'campos': CAMPOS_DOCUMENTO,
+        'ordenes': ORDENES,
+        'largoPrefijo': LARGO_PREFIJO,
+        'bloqueDocumentos': BLOQUE_DOCUMENTOS,
+        'bloqueClaves': BLOQUE_CLAVES,
+        'anchoClave': ancho,
+        'raizMinima': RAIZ_MINIMA,
+        'sufijos': SUFIJOS,
+        'vacias': PALABRAS_VACIAS,
+        'prefijos': sorted(shards),
+        'categorias': {c: categorias.get(c, c) for c in sorted(por_categoria)},
+    }
+    archivos['indice.json'] = json.dumps(indice, ensure_ascii=False, separators=(',', ':'))
+    return archivos
+
+def _origen(valor):
+    try:
+        lat, lng = (float(parte) for parte in valor.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError("se espera lat,lng")
+    return lat, lng
+
+def main():
+    """Regenerar los shards del índice de búsqueda que cambiaron"""
+    parser = crear_parser(__doc__)
+    parser.add_argument(
+        'datos', nargs='?', default=DATOS_POR_DEFECTO,
+        help=f'export de usuarios en JSON o JSONL (por defecto {DATOS_POR_DEFECTO})'
+    )
+    parser.add_argument(
+        '--origen', type=_origen, default=ORIGEN_POR_DEFECTO,
+        help='punto lat,lng desde el que se calcula la distancia si el registro no la trae'
+    )
+    args = parser.parse_args()
+    base_dir = Path(__file__).parent
+    datos = Path(args.datos)
+    if not datos.is_absolute():
+        datos = base_dir / datos
+    if not datos.is_file():
+        print(f"✗ No se encontró el dataset {args.datos}")
+        return
+
+    print(f"\n🔎 Indexando proveedores de {datos.name}...\n")
+    estado = cargar_estado(base_dir)
+    archivos = construir_indice(
+        iter_registros(datos), categorias_de_pagina(base_dir), args.origen, estado
+    )
+
+    salida = base_dir / DIRECTORIO_INDICE
+    salida.mkdir(exist_ok=True)
+    escritos = 0
+    # indice.json al final: la versión nueva se publica con sus shards ya escritos
+    for nombre in sorted(archivos, key=lambda n: n == 'indice.json'):
+        if escribir_texto(salida / nombre, archivos[nombre]):
+            escritos += 1
+    eliminados = 0
+    for ruta in salida.iterdir():
+        if ruta.is_file() and ruta.name not in archivos:
+            ruta.unlink()
+            eliminados += 1
+    escribir_json(base_dir / ESTADO_INDICE, estado, sort_keys=True)
+    registrar_salidas(base_dir, 'busqueda', DIRECTORIO_INDICE)
+
+    indice = json.loads(archivos['indice.json'])
+    total = sum(len(texto.encode('utf-8')) for texto in archivos.values())
+    print(f"✓ {indice['documentos']} proveedores, {len(indice['prefijos'])} shards de términos, "
+          f"{len(indice['categorias'])} categorías")
+    print(f"✓ {escritos} de {len(archivos)} archivos reescritos, {eliminados} eliminados "
+          f"({total / 1024:.1f} KB en total)")
+    print(f"\n✅ Proceso completado: índice {indice['version'][:12]} en {DIRECTORIO_INDICE}/\n")
+
+if __name__ == '__main__':
+    main()
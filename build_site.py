@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Pipeline único de reescritura HTML para ServiLocal.
+
+Lee cada página una sola vez, aplica en memoria las mismas transformaciones que
+add_scripts.py, update_navbars.py, update_seo_tags.py, add_pwa_meta.py,
+render_partials.py, update_politicas_links.py, add_schema_script.py y
+add_resource_hints.py (en ese orden) y escribe el resultado una sola vez. El
+resultado es idéntico a ejecutar los ocho scripts uno detrás de otro.
+
+El build es incremental: .build-manifest.json guarda el hash de cada página y
+de las plantillas/configuración de las que depende cada etapa, y solo se
+reprocesan las páginas con alguna entrada modificada (--force lo desactiva).
+La dependencia de la etapa de parciales es el hash de los fragmentos que
+incluye cada página: al cambiar un parcial solo se reescriben esas páginas.
+Qué páginas hay y qué parciales incluye cada una sale del índice del sitio
+(site_graph.py), que solo vuelve a leer las páginas modificadas.
+"""
+
+import sys
+from collections import namedtuple
+from functools import lru_cache, partial
+from pathlib import Path
+
+from add_pwa_meta import agregar_meta_pwa_html
+from add_resource_hints import agregar_hints_html, renderer as hints
+from add_schema_script import agregar_schema_html, renderer as schema
+from add_scripts import add_scripts_to_html
+from build_manifest import (
+    MANIFEST_FILE, BuildManifest, crear_registro, hash_archivo, hash_json, hash_texto,
+)
+from build_output import escribir_texto
+from build_trace import traza
+from build_utils import MODIFICADO, crear_parser, procesar_archivos
+from render_partials import renderer as parciales
+from site_graph import REGLAS, grafo_actualizado, grafo_guardado
+from update_navbars import update_navbar_html
+from update_politicas_links import update_politicas_html
+from update_seo_tags import renderer as seo
+
+# Una etapa recibe (contenido, nombre_pagina) y devuelve el nuevo contenido,
+# o None si no pudo aplicarse (el contenido queda como estaba). dependencias(pagina)
+# devuelve el hash de todo lo que, además de la página, influye en su salida.
+Etapa = namedtuple('Etapa', ['nombre', 'transformar', 'aplica', 'dependencias'])
+
+@lru_cache(maxsize=None)
+def _hash_modulo(nombre):
+    """Hash del código fuente de un script de transformación"""
+    return hash_archivo(sys.modules[nombre].__file__)
+
+def _deps(modulo, *plantillas):
+    """Dependencias que no varían por página: el código y sus plantillas"""
+    @lru_cache(maxsize=None)
+    def calcular():
+        return hash_texto(_hash_modulo(modulo) + ''.join(plantillas))
+    return lambda pagina: calcular()
+
+@lru_cache(maxsize=None)
+def _hash_seo_global():
+    globales = {k: v for k, v in seo.config.items() if k != 'pages'}
+    return hash_texto(_hash_modulo('update_seo_tags') + hash_json(globales))
+
+def _deps_schema(pagina):
+    """El JSON-LD solo depende del nombre de la página, del código y de
+    siteName/siteUrl"""
+    return hash_texto(_hash_modulo('add_schema_script') + _hash_seo_global())
+
+def _grafo():
+    return grafo_guardado(Path(__file__).parent)
+
+def _deps_parciales(pagina):
+    """Hash de los fragmentos que incluye la página, según el índice del sitio"""
+    grafo = _grafo()
+    if pagina not in grafo:
+        grafo.actualizar()
+    inclusiones = grafo.inclusiones_de(pagina)
+    try:
+        if inclusiones is None:
+            raise ValueError("punto de inclusión sin cerrar")
+        return hash_texto(_hash_modulo('render_partials') + parciales.dependencias(inclusiones))
+    except ValueError as e:
+        # La etapa va a fallar y la página se reintenta en el próximo build
+        return f"error: {e}"
+
+def _deps_hints(pagina):
+    """Páginas enlazadas, navegacion.json y los @import de las hojas de la página"""
+    return hash_texto(_hash_modulo('add_resource_hints') + hints.dependencias(pagina, _grafo()))
+
+def _deps_seo(pagina):
+    """Solo la entrada de la página y los valores globales de seo-config.json"""
+    return hash_texto(_hash_seo_global() + hash_json(seo.entrada(pagina)))
+
+# Orden fijo: el mismo en que se ejecutan los scripts por separado
+# (las páginas de cada etapa las decide site_graph.REGLAS)
+ETAPAS = [
+    Etapa('scripts', lambda c, p: add_scripts_to_html(c),
+          REGLAS['scripts'], _deps('add_scripts')),
+    Etapa('navbar', update_navbar_html,
+          REGLAS['navbar'], _deps('update_navbars')),
+    Etapa('seo', seo.actualizar_head,
+          REGLAS['seo'], _deps_seo),
+    # pwa, parciales y schema van después de seo: cuando una página no tiene la
+    # estructura esperada, seo reescribe el <head> entero y solo conserva los <link>
+    Etapa('pwa', lambda c, p: agregar_meta_pwa_html(c),
+          REGLAS['pwa'], _deps('add_pwa_meta')),
+    Etapa('parciales', lambda c, p: parciales.aplicar(c),
+          REGLAS['parciales'], _deps_parciales),
+    Etapa('politicas', lambda c, p: update_politicas_html(c),
+          REGLAS['politicas'], _deps('update_politicas_links')),
+    Etapa('schema', agregar_schema_html,
+          REGLAS['schema'], _deps_schema),
+    Etapa('hints', lambda c, p: agregar_hints_html(c, p, _grafo()),
+          REGLAS['hints'], _deps_hints),
+]
+
+def recargar_configuracion():
+    """Vuelve a leer seo-config.json en el próximo uso (para procesos que
+    siguen abiertos después de un cambio, como watch_site.py)"""
+    seo.recargar()
+    schema.recargar()
+    _hash_seo_global.cache_clear()
+
+def dependencias_pagina(pagina, etapas=ETAPAS):
+    """Hashes de dependencias de cada etapa que aplica a la página"""
+    return {
+        etapa.nombre: etapa.dependencias(pagina)
+        for etapa in etapas if etapa.aplica(pagina)
+    }
+
+def aplicar_etapas(contenido, pagina, etapas=ETAPAS):
+    """Aplica en orden las etapas que corresponden a la página.
+
+    Devuelve (nuevo_contenido, etapas_con_cambios, errores).
+    """
+    cambios = []
+    errores = []
+    for etapa in etapas:
+        if not etapa.aplica(pagina):
+            continue
+        try:
+            with traza.medir(etapa.nombre, 'etapa', pagina=pagina):
+                resultado = etapa.transformar(contenido, pagina)
+        except Exception as e:
+            errores.append(f"{etapa.nombre}: {e}")
+            continue
+        if resultado is not None and resultado != contenido:
+            contenido = resultado
+            cambios.append(etapa.nombre)
+    return contenido, cambios, errores
+
+_manifest_previo = None
+
+def cargar_manifest_previo(base_dir):
+    """Manifest del build anterior, cargado una vez por proceso"""
+    global _manifest_previo
+    if _manifest_previo is None:
+        _manifest_previo = BuildManifest.cargar(base_dir / MANIFEST_FILE)
+    return _manifest_previo
+
+def paginas_del_sitio(grafo):
+    """Rutas de las páginas del índice a las que aplica alguna etapa"""
+    return [
+        grafo.base_dir / pagina for pagina in grafo.paginas()
+        if any(etapa.aplica(pagina) for etapa in ETAPAS)
+    ]
+
+def procesar_pagina(filepath, forzar=False, etapas=ETAPAS):
+    """Lee, transforma y escribe (una sola vez) una página HTML.
+
+    Devuelve (modificado, registro) con la entrada de manifest de la página, o
+    registro None si alguna etapa falló y la página debe reintentarse.
+    """
+    content = filepath.read_text(encoding='utf-8')
+    hash_entrada = hash_texto(content)
+    dependencias = dependencias_pagina(filepath.name, etapas)
+
+    if not forzar:
+        manifest = cargar_manifest_previo(filepath.parent)
+        if manifest.sin_cambios_por_hash(filepath.name, hash_entrada, dependencias):
+            registro = crear_registro(filepath.stat(), hash_entrada, hash_entrada, dependencias)
+            return False, registro
+
+    new_content, cambios, errores = aplicar_etapas(content, filepath.name, etapas)
+
+    for error in errores:
+        print(f"✗ {filepath.name} - Error en {error}")
+
+    if new_content == content:
+        print(f"○ {filepath.name} - Sin cambios necesarios")
+    else:
+        escribir_texto(filepath, new_content)
+        print(f"✓ {filepath.name} - {', '.join(cambios)}")
+
+    registro = None
+    if not errores:
+        registro = crear_registro(
+            filepath.stat(), hash_entrada, hash_texto(new_content), dependencias
+        )
+    return new_content != content, registro
+
+def paginas_pendientes(archivos, manifest, forzar=False):
+    """Las páginas que cambiaron, o alguna de sus dependencias, desde el último
+    build (solo compara el stat)"""
+    return [
+        f for f in archivos
+        if forzar or not manifest.sin_cambios_por_stat(f.name, f.stat(), dependencias_pagina(f.name))
+    ]
+
+def reconstruir(archivos, manifest, jobs=1, forzar=False):
+    """Procesa las páginas y registra el resultado en el manifest (sin
+    guardarlo). Devuelve las páginas reescritas."""
+    resultados = procesar_archivos(
+        partial(procesar_pagina, forzar=forzar), archivos, jobs, con_datos=True
+    )
+    reescritas = []
+    for html_file, (estado, registro) in zip(archivos, resultados):
+        if estado == MODIFICADO:
+            reescritas.append(html_file)
+        if registro is not None:
+            manifest.registrar(html_file.name, registro)
+        else:
+            manifest.paginas.pop(html_file.name, None)
+    return reescritas
+
+def main():
+    """Procesar todos los archivos HTML en una sola pasada"""
+    parser = crear_parser(__doc__)
+    parser.add_argument(
+        '--force', action='store_true',
+        help='reprocesar todas las páginas ignorando el manifest'
+    )
+    args = parser.parse_args()
+    base_dir = Path(__file__).parent
+    grafo = grafo_actualizado(base_dir)
+    html_files = paginas_del_sitio(grafo)
+
+    if args.force:
+        manifest = BuildManifest(base_dir / MANIFEST_FILE)
+    else:
+        manifest = cargar_manifest_previo(base_dir)
+
+    pendientes = paginas_pendientes(html_files, manifest, args.force)
+
+    print(f"\n🔧 Procesando {len(pendientes)} de {len(html_files)} archivos HTML ({len(ETAPAS)} etapas)...\n")
+
+    updated_count = len(reconstruir(pendientes, manifest, args.jobs, args.force))
+
+    manifest.conservar(f.name for f in html_files)
+    manifest.guardar()
+
+    print(f"\n✅ Proceso completado: {updated_count} archivos actualizados, "
+          f"{len(html_files) - len(pendientes)} sin cambios desde el último build\n")
+
+if __name__ == '__main__':
+    main()
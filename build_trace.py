@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Medición opcional de los scripts de build (--traza).
+
+Con --traza archivo.json (la agrega crear_parser a todos los scripts), cada
+archivo que pasa por procesar_archivos y cada etapa de build_site queda
+registrado con su tiempo real, su tiempo de CPU, los bytes leídos y escritos
+(de /proc/self/io, solo en Linux) y el tiempo que pasó en las expresiones
+regulares de los scripts. Al terminar se escribe una traza en el formato Trace
+Event de Chrome (se abre en chrome://tracing o en ui.perfetto.dev) y se
+imprime un resumen con los archivos, etapas y expresiones más lentos.
+
+Los procesos del pool miden lo suyo y se lo devuelven al principal junto con
+la salida de cada archivo. Sin --traza, medir() devuelve un contexto vacío.
+"""
+
+import atexit
+import json
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+VARIABLE_ENTORNO = 'SERVILOCAL_TRAZA'
+TOP_RESUMEN = 10
+
+def _io():
+    """(bytes leídos, bytes escritos) del proceso hasta ahora, o None"""
+    try:
+        with open('/proc/self/io', 'rb') as f:
+            valores = dict(linea.split(b': ') for linea in f.read().splitlines())
+        return int(valores[b'rchar']), int(valores[b'wchar'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+def _ahora_us():
+    # perf_counter es CLOCK_MONOTONIC: comparable entre los procesos del pool
+    return time.perf_counter_ns() // 1000
+
+class _Nulo:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULO = _Nulo()
+
+class _Medicion:
+    __slots__ = ('traza', 'nombre', 'categoria', 'args', 'inicio', 'cpu', 'io', 'regex')
+
+    def __init__(self, traza, nombre, categoria, args):
+        self.traza = traza
+        self.nombre = nombre
+        self.categoria = categoria
+        self.args = args
+        self.regex = 0
+
+    def __enter__(self):
+        self.traza._pila.append(self)
+        self.io = _io()
+        self.cpu = time.process_time_ns()
+        self.inicio = _ahora_us()
+        return self
+
+    def __exit__(self, *exc):
+        fin = _ahora_us()
+        cpu = time.process_time_ns() - self.cpu
+        io = _io()
+        self.traza._pila.pop()
+        args = dict(self.args, cpu_ms=round(cpu / 1e6, 3), regex_ms=round(self.regex / 1e6, 3))
+        if io is not None and self.io is not None:
+            args['bytes_leidos'] = io[0] - self.io[0]
+            args['bytes_escritos'] = io[1] - self.io[1]
+        self.traza.eventos.append({
+            'name': self.nombre, 'cat': self.categoria, 'ph': 'X',
+            'ts': self.inicio, 'dur': fin - self.inicio,
+            'pid': os.getpid(), 'tid': threading.get_ident() & 0xffffffff, 'args': args,
+        })
+        return False
+
+class PatronMedido:
+    """Envuelve un re.Pattern y suma el tiempo de cada llamada a las mediciones
+    abiertas y al total de la expresión (en sub() incluye el del reemplazo)"""
+
+    def __init__(self, patron, nombre, traza):
+        self._patron = patron
+        self.nombre = nombre
+        self._traza = traza
+
+    def __getattr__(self, atributo):
+        return getattr(self._patron, atributo)
+
+    def _sumar(self, inicio):
+        duracion = time.perf_counter_ns() - inicio
+        for medicion in self._traza._pila:
+            medicion.regex += duracion
+        total = self._traza.regex.setdefault(self.nombre, [0, 0])
+        total[0] += duracion
+        total[1] += 1
+
+    def _llamar(self, metodo, *args, **kwargs):
+        inicio = time.perf_counter_ns()
+        try:
+            return getattr(self._patron, metodo)(*args, **kwargs)
+        finally:
+            self._sumar(inicio)
+
+    def search(self, *args, **kwargs):
+        return self._llamar('search', *args, **kwargs)
+
+    def match(self, *args, **kwargs):
+        return self._llamar('match', *args, **kwargs)
+
+    def fullmatch(self, *args, **kwargs):
+        return self._llamar('fullmatch', *args, **kwargs)
+
+    def findall(self, *args, **kwargs):
+        return self._llamar('findall', *args, **kwargs)
+
+    def split(self, *args, **kwargs):
+        return self._llamar('split', *args, **kwargs)
+
+    def sub(self, *args, **kwargs):
+        return self._llamar('sub', *args, **kwargs)
+
+    def subn(self, *args, **kwargs):
+        return self._llamar('subn', *args, **kwargs)
+
+    def finditer(self, *args, **kwargs):
+        # El trabajo se hace al iterar: se mide cada paso
+        iterador = self._patron.finditer(*args, **kwargs)
+        while True:
+            inicio = time.perf_counter_ns()
+            try:
+                m = next(iterador)
+            except StopIteration:
+                self._sumar(inicio)
+                return
+            self._sumar(inicio)
+            yield m
+
+class Traza:
+    """Eventos medidos en este proceso y totales por expresión regular"""
+
+    def __init__(self):
+        self.activa = False
+        self.ruta = None
+        self.eventos = []
+        self.regex = {}
+        self._pila = []
+        self._instrumentada = False
+        self._inicio = None
+
+    def activar(self, ruta=None):
+        """Empieza a medir; con ruta, este es el proceso principal y al salir
+        escribe la traza y el resumen"""
+        self.activa = True
+        os.environ[VARIABLE_ENTORNO] = '1'
+        if ruta is not None and self.ruta is None:
+            self.ruta = Path(ruta)
+            self._inicio = _ahora_us()
+            atexit.register(self.terminar)
+
+    def _instrumentar(self):
+        """Reemplaza las expresiones compiladas a nivel de módulo de los scripts
+        del repositorio por PatronMedido"""
+        self._instrumentada = True
+        directorio = Path(__file__).resolve().parent
+        medidos = {}
+        for modulo in list(sys.modules.values()):
+            archivo = getattr(modulo, '__file__', None)
+            if not archivo or Path(archivo).resolve().parent != directorio:
+                continue
+            for atributo, valor in list(vars(modulo).items()):
+                if isinstance(valor, re.Pattern):
+                    if id(valor) not in medidos:
+                        medidos[id(valor)] = PatronMedido(valor, f"{Path(archivo).stem}.{atributo}", self)
+                    setattr(modulo, atributo, medidos[id(valor)])
+
+    def medir(self, nombre, categoria, **args):
+        """Contexto que registra un evento (no hace nada si la traza no está activa)"""
+        if not self.activa:
+            return _NULO
+        if not self._instrumentada:
+            self._instrumentar()
+        return _Medicion(self, nombre, categoria, args)
+
+    def _despues_de_fork(self):
+        # Un proceso del pool no hereda lo medido por el principal
+        self.eventos, self.regex, self._pila = [], {}, []
+        self.ruta = None
+
+    def extraer(self):
+        """Eventos y totales acumulados desde la última llamada (para enviarlos
+        del pool al proceso principal), o None si no hay traza"""
+        if not self.activa:
+            return None
+        datos = (self.eventos, self.regex)
+        self.eventos, self.regex = [], {}
+        return datos
+
+    def agregar(self, datos):
+        if datos is None:
+            return
+        eventos, regex = datos
+        self.eventos.extend(eventos)
+        for nombre, (duracion, llamadas) in regex.items():
+            total = self.regex.setdefault(nombre, [0, 0])
+            total[0] += duracion
+            total[1] += llamadas
+
+    def terminar(self):
+        """Escribe la traza y muestra el resumen"""
+        script = Path(sys.argv[0]).name
+        eventos = list(self.eventos)
+        eventos.append({
+            'name': script, 'cat': 'script', 'ph': 'X', 'ts': self._inicio,
+            'dur': _ahora_us() - self._inicio, 'pid': os.getpid(),
+            'tid': threading.get_ident() & 0xffffffff, 'args': {'argv': sys.argv[1:]},
+        })
+        for pid in sorted({evento['pid'] for evento in eventos}):
+            nombre = script if pid == os.getpid() else f"{script} (proceso {pid})"
+            eventos.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': nombre}})
+
+        temporal = self.ruta.with_name(self.ruta.name + '.tmp')
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ms'}, f)
+        os.replace(temporal, self.ruta)
+        self.resumen()
+        print(f"   Traza: {self.ruta} (chrome://tracing o ui.perfetto.dev)\n")
+
+    def resumen(self, top=TOP_RESUMEN):
+        def totales(categoria):
+            agrupados = {}
+            for evento in self.eventos:
+                if evento['cat'] != categoria:
+                    continue
+                total = agrupados.setdefault(evento['name'], {'ms': 0, 'cpu_ms': 0, 'regex_ms': 0, 'veces': 0})
+                total['ms'] += evento['dur'] / 1000
+                total['cpu_ms'] += evento['args']['cpu_ms']
+                total['regex_ms'] += evento['args']['regex_ms']
+                total['veces'] += 1
+            return sorted(agrupados.items(), key=lambda e: -e[1]['ms'])[:top]
+
+        print(f"\n⏱  Resumen de la traza")
+        for titulo, categoria in (('Archivos más lentos', 'archivo'), ('Etapas (total)', 'etapa')):
+            filas = totales(categoria)
+            if not filas:
+                continue
+            print(f"\n   {titulo}:")
+            for nombre, t in filas:
+                veces = f", {t['veces']} veces" if t['veces'] > 1 else ''
+                print(f"   - {nombre}: {t['ms']:.1f} ms (CPU {t['cpu_ms']:.1f} ms, "
+                      f"regex {t['regex_ms']:.1f} ms{veces})")
+
+        if self.regex:
+            print(f"\n   Expresiones regulares:")
+            for nombre, (duracion, llamadas) in sorted(self.regex.items(), key=lambda e: -e[1][0])[:top]:
+                print(f"   - {nombre}: {duracion / 1e6:.1f} ms ({llamadas} llamadas)")
+        print()
+
+# Instancia del proceso: los procesos del pool la activan por la variable de entorno
+traza = Traza()
+if os.environ.get(VARIABLE_ENTORNO):
+    traza.activa = True
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=traza._despues_de_fork)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Utilidades compartidas por los scripts de reescritura HTML
+"""
+
+import argparse
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from urllib.parse import unquote, urlsplit
+
+from build_output import escrituras
+from build_trace import traza
+
+MODIFICADO = 'modificado'
+SIN_CAMBIOS = 'sin_cambios'
+ERROR = 'error'
+
+class _ActivarTraza(argparse.Action):
+    def __call__(self, parser, namespace, valor, option_string=None):
+        traza.activar(valor)
+        setattr(namespace, self.dest, valor)
+
+def crear_parser(descripcion):
+    """Parser de argumentos común con las opciones --jobs y --traza"""
+    parser = argparse.ArgumentParser(description=descripcion)
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=1,
+        help='procesos en paralelo (0 = todos los núcleos, por defecto 1)'
+    )
+    parser.add_argument(
+        '--traza', metavar='ARCHIVO', action=_ActivarTraza,
+        help='medir tiempos, CPU, E/S y expresiones regulares y escribir una traza de Chrome'
+    )
+    return parser
+
+def ruta_local(base_dir, url):
+    """Archivo local al que apunta una URL de una página de la raíz, o None.
+
+    Devuelve None para URLs externas, data:, anclas o rutas fuera de base_dir.
+    """
+    partes = urlsplit(url.strip())
+    if partes.scheme or partes.netloc or not partes.path:
+        return None
+    try:
+        ruta = (base_dir / unquote(partes.path).lstrip('/')).resolve()
+        ruta.relative_to(base_dir.resolve())
+    except ValueError:
+        # Fuera de base_dir, o con caracteres que no puede tener una ruta
+        return None
+    return ruta
+
+def _ejecutar(funcion, archivo, con_datos=False):
+    """Ejecuta la función sobre un archivo y devuelve (estado, dato)"""
+    try:
+        with traza.medir(archivo.name, 'archivo'):
+            if con_datos:
+                modificado, dato = funcion(archivo)
+            else:
+                modificado, dato = funcion(archivo), None
+        return (MODIFICADO if modificado else SIN_CAMBIOS), dato
+    except Exception as e:
+        print(f"✗ {archivo.name} - Error: {e}")
+        return ERROR, None
+
+def _ejecutar_capturando(funcion, archivo, con_datos=False):
+    """Igual que _ejecutar pero devuelve también lo impreso, para mostrarlo en
+    orden, lo que midió la traza y los archivos que escribió"""
+    salida = io.StringIO()
+    with redirect_stdout(salida):
+        resultado = _ejecutar(funcion, archivo, con_datos)
+    return resultado, salida.getvalue(), traza.extraer(), escrituras.extraer()
+
+def procesar_archivos(funcion, archivos, jobs=1, con_datos=False):
+    """Aplica funcion(archivo) a cada archivo y devuelve los estados en el mismo orden.
+
+    funcion debe devolver True si modificó el archivo. Con con_datos=True debe
+    devolver (modificado, dato) y se devuelve una lista de (estado, dato).
+    Con jobs != 1 los archivos se reparten en un ProcessPoolExecutor (funcion
+    tiene que poder serializarse con pickle); la salida de cada archivo se
+    imprime en el orden de entrada.
+    """
+    archivos = list(archivos)
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    if jobs == 1 or len(archivos) < 2:
+        resultados = [_ejecutar(funcion, archivo, con_datos) for archivo in archivos]
+    else:
+        resultados = []
+        chunksize = max(1, len(archivos) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for resultado, salida, medido, escritos in executor.map(
+                _ejecutar_capturando,
+                [funcion] * len(archivos),
+                archivos,
+                [con_datos] * len(archivos),
+                chunksize=chunksize,
+            ):
+                print(salida, end='')
+                traza.agregar(medido)
+                escrituras.agregar(escritos)
+                resultados.append(resultado)
+
+    if con_datos:
+        return resultados
+    return [estado for estado, _ in resultados]
@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""
+Script para agrupar y minificar los CSS/JS de cada página
+
+Cada grupo de <link rel="stylesheet"> o <script src> locales consecutivos de
+una página se reemplaza por un único bundle minificado en bundles/. Los
+bundles se nombran por su contenido y se comparten entre todas las páginas que
+usan el mismo conjunto de archivos en el mismo orden. bundles/bundles.json
+guarda los archivos de cada bundle para que, al volver a ejecutar el script,
+los bundles se regeneren a partir de las fuentes actualizadas.
+
+Cada bundle lleva en data-fuentes los archivos que reemplaza: las etapas de
+build_site que buscan un script en la página (add_scripts, add_pwa_meta) lo
+siguen encontrando y no lo vuelven a agregar.
+
+Un comentario corta el grupo: así un bundle nunca se come los comentarios
+<!-- parcial:... --> que delimitan los parciales. Los archivos de partials/
+se agrupan igual que las páginas, para que la próxima vez que se rendericen
+los parciales las páginas conserven sus bundles.
+
+Es un paso de publicación: bundles/ no se versiona en git, y el texto que
+reemplazó cada bundle se guarda en bundles/originales.json. Con --deshacer
+las páginas y los parciales vuelven a cargar los archivos originales y se
+borra bundles/, así que el árbol queda como antes de ejecutarlo.
+"""
+
+import html
+import json
+import re
+from functools import partial
+from pathlib import Path
+
+from build_manifest import hash_texto
+from build_output import escribir_json, escribir_texto
+from build_utils import MODIFICADO, crear_parser, procesar_archivos, ruta_local
+from css_rules import leer_css
+from html_regions import (
+    ABRE, CIERRA, COMENTARIO, TEXTO, iter_tokens, leer_atributos, reemplazar_regiones,
+)
+from render_partials import DIRECTORIO_PARCIALES
+from site_graph import grafo_actualizado
+
+DIRECTORIO_BUNDLES = 'bundles'
+INDICE_BUNDLES = 'bundles/bundles.json'
+ORIGINALES_BUNDLES = 'bundles/originales.json'
+
+# Solo se agrupan etiquetas sin atributos que cambien cómo se cargan
+_ATRIBUTOS_SCRIPT = {'src', 'type', 'data-fuentes'}
+_ATRIBUTOS_LINK = {'rel', 'href', 'type', 'media', 'data-fuentes'}
+
+# ---------------------------------------------------------------------------
+# Minificación
+# ---------------------------------------------------------------------------
+
+_COMENTARIO_CSS = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CADENA_CSS = re.compile(r'''"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*\'''')
+
+def minificar_css(css):
+    """Quita comentarios y espacios innecesarios sin tocar el contenido de las cadenas"""
+    partes = []
+    pos = 0
+    for cadena in _CADENA_CSS.finditer(css):
+        partes.append((css[pos:cadena.start()], False))
+        partes.append((cadena.group(), True))
+        pos = cadena.end()
+    partes.append((css[pos:], False))
+
+    codigo = ''.join(f'\0{i}\0' if protegido else texto for i, (texto, protegido) in enumerate(partes))
+    codigo = _COMENTARIO_CSS.sub('', codigo)
+    codigo = re.sub(r'\s+', ' ', codigo)
+    # No se quitan espacios antes de ':' (combinador descendiente) ni alrededor
+    # de + y - (calc)
+    codigo = re.sub(r'\s*([{};,>])\s*', r'\1', codigo)
+    codigo = re.sub(r':\s+', ':', codigo)
+    codigo = codigo.replace(';}', '}')
+    return re.sub(r'\0(\d+)\0', lambda m: partes[int(m.group(1))][0], codigo).strip()
+
+_ANTES_DE_REGEX = set('(,=:[!&|?{};+-*%<>~^')
+_PALABRAS_ANTES_DE_REGEX = {
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+    'throw', 'case', 'do', 'else', 'yield', 'await',
+}
+# Después del ')' que cierra su condición, una '/' empieza un regex
+_PALABRAS_CONDICION = {'if', 'while', 'for', 'with'}
+
+def _fin_cadena(js, i):
+    """Índice después de la cadena que empieza en js[i]"""
+    comilla = js[i]
+    i += 1
+    while i < len(js):
+        c = js[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == comilla or c == '\n':
+            return i + 1
+        i += 1
+    return i
+
+def _fin_template(js, i):
+    """Índice después del template literal que empieza en js[i] (con ${...} anidados)"""
+    i += 1
+    while i < len(js):
+        c = js[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '`':
+            return i + 1
+        if c == '$' and js.startswith('${', i):
+            i = _fin_expresion(js, i + 2)
+            continue
+        i += 1
+    return i
+
+def _fin_expresion(js, i):
+    """Índice después de la '}' que cierra una expresión ${...}"""
+    profundidad = 1
+    while i < len(js):
+        c = js[i]
+        if c in '"\'':
+            i = _fin_cadena(js, i)
+            continue
+        if c == '`':
+            i = _fin_template(js, i)
+            continue
+        if c == '{':
+            profundidad += 1
+        elif c == '}':
+            profundidad -= 1
+            if profundidad == 0:
+                return i + 1
+        i += 1
+    return i
+
+def _fin_regex(js, i):
+    """Índice después del literal /regex/flags que empieza en js[i]"""
+    i += 1
+    en_clase = False
+    while i < len(js):
+        c = js[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '\n':
+            return i
+        if c == '[':
+            en_clase = True
+        elif c == ']':
+            en_clase = False
+        elif c == '/' and not en_clase:
+            i += 1
+            while i < len(js) and (js[i].isalnum() or js[i] == '_'):
+                i += 1
+            return i
+        i += 1
+    return i
+
+def _contexto_regex(ultimo, palabra, tras_condicion):
+    """True si una '/' después del último carácter significativo empieza un
+    regex. tras_condicion: ese ')' cierra la condición de un if/while/for"""
+    if ultimo == ')':
+        return tras_condicion
+    return not ultimo or ultimo in _ANTES_DE_REGEX or palabra in _PALABRAS_ANTES_DE_REGEX
+
+def _compactar_codigo(codigo):
+    codigo = re.sub(r'[ \t]+', ' ', codigo)
+    return re.sub(r' ?\n[\s]*', '\n', codigo)
+
+def minificar_js(js):
+    """Minificación conservadora: quita comentarios, sangrías y líneas vacías.
+
+    Conserva los saltos de línea (inserción automática de ';') y copia
+    literalmente cadenas, templates y expresiones regulares. Si no se puede
+    saber si una '/' es una división o un regex (después de '}': fin de un
+    bloque o de un objeto) el archivo se copia sin minificar.
+    """
+    salida = []
+    codigo = []
+    # Último carácter significativo y la palabra que termina en él, para
+    # distinguir una división de un literal regex
+    ultimo = ''
+    palabra = ''
+    # Por cada '(' abierto, si es la condición de un if/while/for
+    parentesis = []
+    tras_condicion = False
+    i = 0
+    n = len(js)
+    while i < n:
+        c = js[i]
+        es_barra = c == '/' and not js.startswith(('//', '/*'), i)
+        if es_barra and ultimo == '}':
+            return js
+        es_regex = es_barra and _contexto_regex(ultimo, palabra, tras_condicion)
+        if c in '"\'`' or es_regex:
+            if c == '`':
+                fin = _fin_template(js, i)
+            elif es_regex:
+                fin = _fin_regex(js, i)
+            else:
+                fin = _fin_cadena(js, i)
+            salida.append(_compactar_codigo(''.join(codigo)))
+            salida.append(js[i:fin])
+            codigo = []
+            ultimo, palabra, tras_condicion = js[fin - 1], '', False
+            i = fin
+            continue
+        if js.startswith('//', i):
+            fin = js.find('\n', i)
+            i = n if fin == -1 else fin
+            continue
+        if js.startswith('/*', i):
+            fin = js.find('*/', i + 2)
+            fin = n if fin == -1 else fin + 2
+            codigo.append('\n' if '\n' in js[i:fin] else ' ')
+            i = fin
+            continue
+        if not c.isspace():
+            tras_condicion = False
+            if c == '(':
+                parentesis.append(ultimo.isalnum() and palabra in _PALABRAS_CONDICION)
+            elif c == ')':
+                tras_condicion = parentesis.pop() if parentesis else False
+            if c.isalnum() or c in '_$':
+                palabra = palabra + c if ultimo == js[i - 1:i] else c
+            else:
+                palabra = ''
+            ultimo = c
+        codigo.append(c)
+        i += 1
+    salida.append(_compactar_codigo(''.join(codigo)))
+    return ''.join(salida).strip() + '\n'
+
+# ---------------------------------------------------------------------------
+# Bundles
+# ---------------------------------------------------------------------------
+
+_DECLARACION_GLOBAL = re.compile(r'^(?:const|let|class)\s+([A-Za-z_$][\w$]*)', re.MULTILINE)
+
+def construir_bundle(tipo, fuentes, base_dir):
+    """Escribe el bundle de las fuentes (rutas relativas) y devuelve su ruta relativa"""
+    if tipo == 'css':
+        incluidos = set()
+        contenido = '\n'.join(
+            minificar_css(leer_css(base_dir / f, base_dir / DIRECTORIO_BUNDLES, incluidos))
+            for f in fuentes
+        )
+    else:
+        # El ';' inicial evita que un 'use strict' del primer archivo se
+        # aplique a todo el bundle
+        contenido = ';' + ';\n'.join(
+            minificar_js((base_dir / f).read_text(encoding='utf-8')) for f in fuentes
+        )
+
+    nombre = f"{DIRECTORIO_BUNDLES}/{hash_texto(contenido)[:12]}.min.{tipo}"
+    destino = base_dir / nombre
+    if not destino.exists():
+        destino.parent.mkdir(exist_ok=True)
+        escribir_texto(destino, contenido)
+        print(f"✓ {nombre} - {len(fuentes)} archivos")
+    return nombre
+
+def _recurso_agrupable(contenido, token, base_dir, indice):
+    """('css'|'js', [fuentes]) si la etiqueta se puede agrupar, si no None"""
+    atributos = leer_atributos(contenido[token.inicio:token.fin])
+    if token.nombre == 'script':
+        tipo, url = 'js', atributos.get('src')
+        if not set(atributos) <= _ATRIBUTOS_SCRIPT or atributos.get('type', 'text/javascript') != 'text/javascript':
+            return None
+    else:
+        tipo, url = 'css', atributos.get('href')
+        if atributos.get('rel') != 'stylesheet' or not set(atributos) <= _ATRIBUTOS_LINK \
+                or atributos.get('media', 'all') != 'all':
+            return None
+    ruta = ruta_local(base_dir, url or '')
+    if ruta is None or not ruta.is_file():
+        return None
+    relativa = ruta.relative_to(base_dir.resolve()).as_posix()
+    # Un bundle anterior vuelve a sus fuentes originales
+    return tipo, indice.get(relativa, [relativa])
+
+def grupos_de_pagina(contenido, base_dir, indice):
+    """Grupos de etiquetas agrupables consecutivas: [(tipo, inicio, fin, fuentes), ...]
+
+    Ningún grupo contiene un comentario (en particular, los de los parciales).
+    """
+    grupos = []
+    actual = None
+    tokens = iter_tokens(contenido)
+    for token in tokens:
+        if token.tipo == TEXTO and not contenido[token.inicio:token.fin].strip():
+            continue
+        if token.tipo == COMENTARIO:
+            actual = None
+            continue
+        if token.tipo == ABRE and token.nombre == 'noscript':
+            # Los <link> de respaldo de critical_css.py no se agrupan
+            for token in tokens:
+                if token.tipo == CIERRA and token.nombre == 'noscript':
+                    break
+            actual = None
+            continue
+
+        recurso = None
+        fin = token.fin
+        if token.tipo == ABRE and token.nombre in ('script', 'link'):
+            recurso = _recurso_agrupable(contenido, token, base_dir, indice)
+            if recurso is not None and token.nombre == 'script':
+                # El <script src> tiene que estar vacío y cerrarse a continuación
+                siguiente = next(tokens, None)
+                if siguiente is not None and siguiente.tipo == TEXTO and not contenido[siguiente.inicio:siguiente.fin].strip():
+                    siguiente = next(tokens, None)
+                if siguiente is None or siguiente.tipo != CIERRA or siguiente.nombre != 'script':
+                    recurso = None
+                else:
+                    fin = siguiente.fin
+
+        if recurso is None:
+            actual = None
+            continue
+        tipo, fuentes = recurso
+        if actual is not None and actual[0] == tipo:
+            actual[2] = fin
+            actual[3].extend(fuentes)
+        else:
+            actual = [tipo, token.inicio, fin, list(fuentes)]
+            grupos.append(actual)
+    return [tuple(g) for g in grupos]
+
+def _separar_declaraciones(fuentes, base_dir):
+    """Divide una lista de JS donde dos archivos declaran la misma const/let/class global.
+
+    En scripts separados solo falla el segundo; en un bundle fallaría todo.
+    """
+    partes = [[]]
+    declaradas = set()
+    for fuente in fuentes:
+        nombres = set(_DECLARACION_GLOBAL.findall((base_dir / fuente).read_text(encoding='utf-8')))
+        if nombres & declaradas:
+            partes.append([])
+            declaradas = set()
+        partes[-1].append(fuente)
+        declaradas |= nombres
+    return partes
+
+def _etiqueta_bundle(tipo, url, fuentes):
+    fuentes = html.escape(' '.join(fuentes))
+    if tipo == 'css':
+        return f'<link rel="stylesheet" href="{url}" data-fuentes="{fuentes}">'
+    return f'<script src="{url}" data-fuentes="{fuentes}"></script>'
+
+def agrupar_html(contenido, base_dir, indice, bundles, originales=None):
+    """Devuelve el HTML con cada grupo reemplazado por su bundle.
+
+    bundles es un dict (tipo, tuple(fuentes)) -> ruta del bundle. Si se pasa
+    originales ({texto del bundle: texto reemplazado} del archivo), se
+    completa con los grupos reemplazados.
+    """
+    reemplazos = []
+    for tipo, inicio, fin, fuentes in grupos_de_pagina(contenido, base_dir, indice):
+        if '<!--' in contenido[inicio:fin]:
+            continue
+        partes = _separar_declaraciones(fuentes, base_dir) if tipo == 'js' else [fuentes]
+        etiquetas = []
+        for parte in partes:
+            clave = (tipo, tuple(parte))
+            if clave not in bundles:
+                bundles[clave] = construir_bundle(tipo, parte, base_dir)
+            etiquetas.append(_etiqueta_bundle(tipo, bundles[clave], parte))
+        # Se conserva la sangría de la línea del primer elemento del grupo
+        linea = contenido.rfind('\n', 0, inicio) + 1
+        sangria = contenido[linea:inicio] if not contenido[linea:inicio].strip() else ''
+        texto = ('\n' + sangria).join(etiquetas)
+        if originales is not None and texto != contenido[inicio:fin]:
+            # Un grupo que ya tenía bundles guarda lo que había antes de ellos
+            originales[texto] = desagrupar_html(contenido[inicio:fin], originales)
+        reemplazos.append((inicio, fin, texto))
+    return reemplazar_regiones(contenido, reemplazos)
+
+def _bundle_de_etiqueta(contenido, token):
+    """(tipo, fuentes) si la etiqueta carga un bundle de bundles/, si no None"""
+    atributos = leer_atributos(contenido[token.inicio:token.fin])
+    url = atributos.get('src' if token.nombre == 'script' else 'href', '')
+    if 'data-fuentes' not in atributos or not url.lstrip('/').startswith(DIRECTORIO_BUNDLES + '/'):
+        return None
+    return ('js' if token.nombre == 'script' else 'css'), html.unescape(atributos['data-fuentes']).split()
+
+def desagrupar_html(contenido, originales):
+    """Devuelve el HTML con cada bundle reemplazado por las etiquetas originales.
+
+    originales es {texto del bundle: texto reemplazado} del archivo; un bundle
+    que no está ahí vuelve a una etiqueta por archivo de data-fuentes.
+    """
+    for texto, original in originales.items():
+        contenido = contenido.replace(texto, original)
+
+    reemplazos = []
+    tokens = iter_tokens(contenido)
+    for token in tokens:
+        if token.tipo != ABRE or token.nombre not in ('script', 'link'):
+            continue
+        bundle = _bundle_de_etiqueta(contenido, token)
+        if bundle is None:
+            continue
+        tipo, fuentes = bundle
+        fin = token.fin
+        if token.nombre == 'script':
+            cierre = next((t for t in tokens if t.tipo == CIERRA and t.nombre == 'script'), None)
+            fin = cierre.fin if cierre is not None else fin
+        linea = contenido.rfind('\n', 0, token.inicio) + 1
+        sangria = contenido[linea:token.inicio] if not contenido[linea:token.inicio].strip() else ''
+        if tipo == 'css':
+            etiquetas = [f'<link rel="stylesheet" href="{f}">' for f in fuentes]
+        else:
+            etiquetas = [f'<script src="{f}"></script>' for f in fuentes]
+        reemplazos.append((token.inicio, fin, ('\n' + sangria).join(etiquetas)))
+    return reemplazar_regiones(contenido, reemplazos)
+
+def _cargar_json(ruta):
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _clave_archivo(filepath, base_dir):
+    return filepath.resolve().relative_to(base_dir.resolve()).as_posix()
+
+def agrupar_archivo(filepath, indice, bundles, base_dir=None):
+    """Reemplaza los CSS/JS de una página (o de un parcial, cuyas URLs son
+    relativas a base_dir) por sus bundles"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    new_content = agrupar_html(content, base_dir or filepath.parent, indice, bundles)
+
+    if new_content != content:
+        escribir_texto(filepath, new_content)
+        print(f"✓ {filepath.name} - Bundles actualizados")
+        return True
+    return False
+
+def desagrupar_archivo(filepath, originales, base_dir):
+    """Vuelve a poner en una página o parcial las etiquetas que reemplazaron sus bundles"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    new_content = desagrupar_html(content, originales.get(_clave_archivo(filepath, base_dir), {}))
+
+    if new_content != content:
+        escribir_texto(filepath, new_content)
+        print(f"✓ {filepath.name} - Archivos originales restaurados")
+        return True
+    return False
+
+def deshacer(base_dir, html_files, jobs):
+    """Etiquetas originales en las páginas y los parciales, sin bundles/"""
+    originales = _cargar_json(base_dir / ORIGINALES_BUNDLES)
+    estados = procesar_archivos(
+        partial(desagrupar_archivo, originales=originales, base_dir=base_dir), html_files, jobs
+    )
+    directorio_bundles = base_dir / DIRECTORIO_BUNDLES
+    borrados = []
+    if directorio_bundles.exists():
+        for ruta in sorted(directorio_bundles.glob('*.min.*')):
+            ruta.unlink()
+            borrados.append(ruta)
+        (base_dir / INDICE_BUNDLES).unlink(missing_ok=True)
+        (base_dir / ORIGINALES_BUNDLES).unlink(missing_ok=True)
+        if not any(directorio_bundles.iterdir()):
+            directorio_bundles.rmdir()
+    return estados, borrados
+
+def main():
+    """Generar los bundles y actualizar todas las páginas"""
+    parser = crear_parser(__doc__)
+    parser.add_argument(
+        '--deshacer', action='store_true',
+        help='volver a los archivos originales y borrar bundles/'
+    )
+    args = parser.parse_args()
+    base_dir = Path(__file__).parent
+    directorio_bundles = base_dir / DIRECTORIO_BUNDLES
+
+    # Los parciales también: si no, el próximo render desharía los bundles
+    html_files = grafo_actualizado(base_dir).archivos() + sorted((base_dir / DIRECTORIO_PARCIALES).glob('*.html'))
+
+    if args.deshacer:
+        print(f"\n📦 Volviendo a los CSS/JS originales de {len(html_files)} archivos HTML...\n")
+        estados, borrados = deshacer(base_dir, html_files, args.jobs)
+        print(f"\n✅ Proceso completado: {len(borrados)} bundles borrados, "
+              f"{estados.count(MODIFICADO)} archivos HTML actualizados\n")
+        return
+
+    indice = _cargar_json(base_dir / INDICE_BUNDLES)
+    originales = _cargar_json(base_dir / ORIGINALES_BUNDLES)
+    print(f"\n📦 Agrupando CSS/JS de {len(html_files)} archivos HTML...\n")
+
+    # Los bundles se construyen en este proceso (una vez por conjunto) y las
+    # páginas se reescriben después, en paralelo si se pide
+    bundles = {}
+    for html_file in html_files:
+        agrupar_html(
+            html_file.read_text(encoding='utf-8'), base_dir, indice, bundles,
+            originales.setdefault(_clave_archivo(html_file, base_dir), {}),
+        )
+    estados = procesar_archivos(
+        partial(agrupar_archivo, indice=indice, bundles=bundles, base_dir=base_dir), html_files, args.jobs
+    )
+
+    nuevo_indice = {ruta: list(fuentes) for (tipo, fuentes), ruta in bundles.items()}
+    for bundle in directorio_bundles.glob('*.min.*') if directorio_bundles.exists() else []:
+        if f"{DIRECTORIO_BUNDLES}/{bundle.name}" not in nuevo_indice:
+            bundle.unlink()
+    if nuevo_indice:
+        directorio_bundles.mkdir(exist_ok=True)
+        escribir_json(base_dir / INDICE_BUNDLES, nuevo_indice, indent=2, sort_keys=True)
+        escribir_json(
+            base_dir / ORIGINALES_BUNDLES, {k: v for k, v in originales.items() if v}, indent=1, sort_keys=True
+        )
+
+    print(f"\n✅ Proceso completado: {len(set(bundles.values()))} bundles, "
+          f"{estados.count(MODIFICADO)} archivos HTML actualizados\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Script para controlar el peso de cada página contra los presupuestos de presupuestos.json
+
+Para cada página se suma lo que descarga el navegador: el HTML, las hojas de
+estilo (con sus @import), los scripts, las imágenes y los preload locales, sin
+comprimir y comprimidos con gzip 9 como los sirve compress_assets.py (las
+imágenes ya vienen comprimidas y se cuentan igual). También se cuentan las
+peticiones, los recursos que bloquean el renderizado (hojas y scripts síncronos
+del <head>, con los @import de esas hojas), los scripts y los orígenes
+externos. Del peso de lo externo no se sabe nada: solo cuenta como petición.
+
+presupuestos.json tiene los límites "predeterminados" y, en "paginas", los de
+las páginas que necesitan otros. .budget-report.json guarda las mediciones del
+último control y se informa qué cambió desde entonces. Si alguna página supera
+un límite el script termina con error, para cortar el build.
+
+Las páginas se miden en paralelo (-j) y los tamaños de cada archivo se guardan
+en .asset-sizes.json por ruta, mtime y tamaño: solo se vuelve a comprimir lo
+que cambió.
+"""
+
+import gzip
+import json
+import sys
+from pathlib import Path
+
+from build_output import escribir_json
+from build_utils import ERROR, crear_parser, procesar_archivos, ruta_local
+from compress_assets import EXTENSIONES, TAMANO_MINIMO
+from css_rules import imports_css
+from html_regions import ABRE, buscar_head, iter_tokens, leer_atributos
+from site_graph import grafo_actualizado, origen_externo
+
+PRESUPUESTOS_FILE = Path(__file__).parent / 'presupuestos.json'
+CACHE_TAMANOS = '.asset-sizes.json'
+INFORME = '.budget-report.json'
+
+# Clave del presupuesto: (métrica, divisor para expresarla en la unidad del límite)
+LIMITES = {
+    'peso_kb': ('peso', 1024),
+    'peso_comprimido_kb': ('peso_comprimido', 1024),
+    'imagenes_kb': ('imagenes', 1024),
+    'peticiones': ('peticiones', 1),
+    'bloqueantes': ('bloqueantes', 1),
+    'scripts': ('scripts', 1),
+    'origenes_externos': ('origenes_externos', 1),
+}
+
+TIPOS = ('html', 'estilos', 'scripts', 'imagenes', 'fuentes')
+# <link rel="preload" as="..."> -> tipo
+_PRELOAD = {'style': 'estilos', 'script': 'scripts', 'image': 'imagenes', 'font': 'fuentes'}
+
+def _comprimido(ruta, tamano):
+    """Bytes que se transfieren con gzip 9 (lo que genera compress_assets.py)"""
+    if ruta.suffix not in EXTENSIONES or tamano < TAMANO_MINIMO:
+        return tamano
+    return min(tamano, len(gzip.compress(ruta.read_bytes(), compresslevel=9, mtime=0)))
+
+class CacheTamanos:
+    """(bytes, bytes comprimidos) por ruta, válidos mientras no cambie el archivo"""
+
+    def __init__(self, base_dir, entradas=None):
+        self.base = Path(base_dir).resolve()
+        self.entradas = entradas if entradas is not None else {}
+        self.nuevas = {}
+        self._imports = {}
+
+    @classmethod
+    def cargar(cls, base_dir):
+        try:
+            with open(Path(base_dir) / CACHE_TAMANOS, 'r', encoding='utf-8') as f:
+                return cls(base_dir, json.load(f))
+        except (OSError, ValueError):
+            return cls(base_dir)
+
+    def tamanos(self, ruta):
+        """(bytes, bytes comprimidos) del archivo, o None si no existe"""
+        try:
+            stat = ruta.stat()
+        except OSError:
+            return None
+        clave = ruta.relative_to(self.base).as_posix()
+        entrada = self.entradas.get(clave)
+        if entrada is None or entrada[0] != stat.st_mtime_ns or entrada[1] != stat.st_size:
+            entrada = [stat.st_mtime_ns, stat.st_size, _comprimido(ruta, stat.st_size)]
+            self.entradas[clave] = entrada
+            self.nuevas[clave] = entrada
+        return entrada[1], entrada[2]
+
+    def importadas(self, hoja, base_dir):
+        """Lo que la hoja carga con @import, leído una vez por versión del archivo"""
+        try:
+            stat = hoja.stat()
+        except OSError:
+            return []
+        clave = (hoja, stat.st_mtime_ns, stat.st_size)
+        if clave not in self._imports:
+            self._imports[clave] = imports_css(hoja, base_dir)
+        return self._imports[clave]
+
+    def guardar(self):
+        escribir_json(self.base / CACHE_TAMANOS, self.entradas, sort_keys=True)
+
+def medir_pagina(contenido, archivo_html, cache):
+    """Métricas de una página: pesos por tipo, peticiones, bloqueantes, scripts
+    y orígenes externos"""
+    base_dir = archivo_html.parent
+    head = buscar_head(contenido)
+    locales = {archivo_html.resolve(): 'html'}
+    externos = {}
+    origenes = set()
+    bloqueantes = 0
+
+    def recurso(url, tipo, bloquea=False):
+        nonlocal bloqueantes
+        ruta = ruta_local(base_dir, url)
+        if ruta is None:
+            origen = origen_externo(url)
+            if origen is not None and url not in externos:
+                externos[url] = tipo
+                origenes.add(origen)
+                bloqueantes += bloquea
+            return
+        if ruta in locales:
+            return
+        locales[ruta] = tipo
+        bloqueantes += bloquea
+        if tipo == 'estilos':
+            for importada in cache.importadas(ruta, base_dir):
+                if importada not in locales:
+                    locales[importada] = 'estilos'
+                    bloqueantes += bloquea
+
+    for token in iter_tokens(contenido):
+        if token.tipo != ABRE or token.nombre not in ('link', 'script', 'img'):
+            continue
+        atributos = leer_atributos(contenido[token.inicio:token.fin])
+        en_head = head is not None and head.fin_apertura <= token.inicio < head.inicio_cierre
+        if token.nombre == 'link':
+            rel = atributos.get('rel', '').lower().split()
+            href = atributos.get('href', '')
+            if 'stylesheet' in rel and href:
+                recurso(href, 'estilos', en_head and atributos.get('media', 'all').strip() != 'print')
+            elif 'preload' in rel and href and atributos.get('as') in _PRELOAD:
+                recurso(href, _PRELOAD[atributos['as']])
+        elif token.nombre == 'script':
+            if atributos.get('src'):
+                sincrono = not ({'async', 'defer'} & atributos.keys()) and atributos.get('type') != 'module'
+                recurso(atributos['src'], 'scripts', en_head and sincrono)
+        elif atributos.get('src'):
+            # Del srcset el navegador descarga un solo candidato: cuenta el src
+            recurso(atributos['src'], 'imagenes')
+
+    por_tipo = {tipo: {'bytes': 0, 'comprimido': 0} for tipo in TIPOS}
+    faltantes = []
+    base = base_dir.resolve()
+    for ruta, tipo in locales.items():
+        tamanos = cache.tamanos(ruta)
+        if tamanos is None:
+            faltantes.append(ruta.relative_to(base).as_posix())
+            continue
+        por_tipo[tipo]['bytes'] += tamanos[0]
+        por_tipo[tipo]['comprimido'] += tamanos[1]
+
+    return {
+        'peso': sum(t['bytes'] for t in por_tipo.values()),
+        'peso_comprimido': sum(t['comprimido'] for t in por_tipo.values()),
+        'imagenes': por_tipo['imagenes']['bytes'],
+        'peticiones': len(locales) + len(externos),
+        'bloqueantes': bloqueantes,
+        'scripts': sum(tipo == 'scripts' for tipo in [*locales.values(), *externos.values()]),
+        'origenes_externos': len(origenes),
+        'por_tipo': por_tipo,
+        'faltantes': sorted(faltantes),
+    }
+
+_cache = None
+
+def cache_proceso(base_dir):
+    """Caché de tamaños, cargada una vez por proceso"""
+    global _cache
+    if _cache is None:
+        _cache = CacheTamanos.cargar(base_dir)
+    return _cache
+
+def medir(archivo_html):
+    """Mide una página. Devuelve (False, (métricas, tamaños nuevos))"""
+    cache = cache_proceso(archivo_html.parent)
+    cache.nuevas = {}
+    contenido = archivo_html.read_text(encoding='utf-8')
+    return False, (medir_pagina(contenido, archivo_html, cache), cache.nuevas)
+
+def cargar_presupuestos(ruta=PRESUPUESTOS_FILE):
+    with open(ruta, 'r', encoding='utf-8') as f:
+        presupuestos = json.load(f)
+    for limites in [presupuestos.get('predeterminados', {}), *presupuestos.get('paginas', {}).values()]:
+        desconocidos = set(limites) - set(LIMITES)
+        if desconocidos:
+            raise ValueError(f"límites desconocidos en {Path(ruta).name}: {', '.join(sorted(desconocidos))}")
+    return presupuestos
+
+def excesos(pagina, metricas, presupuestos):
+    """[(límite, valor, máximo)] de la página que superan su presupuesto"""
+    limites = {**presupuestos.get('predeterminados', {}), **presupuestos.get('paginas', {}).get(pagina, {})}
+    resultado = []
+    for clave, maximo in limites.items():
+        if maximo is None:
+            continue
+        metrica, divisor = LIMITES[clave]
+        valor = metricas[metrica] / divisor
+        if valor > maximo:
+            resultado.append((clave, round(valor, 1), maximo))
+    return resultado
+
+def _kb(n):
+    return f"{n / 1024:.1f} KB"
+
+def diferencias(anterior, actual):
+    """Líneas con lo que cambió en cada página desde el último control"""
+    lineas = []
+    for pagina in sorted(anterior.keys() | actual.keys()):
+        if pagina not in actual:
+            lineas.append(f"   - {pagina}: ya no se mide")
+            continue
+        if pagina not in anterior:
+            lineas.append(f"   + {pagina}: {_kb(actual[pagina]['peso_comprimido'])} comprimido")
+            continue
+        antes, ahora = anterior[pagina], actual[pagina]
+        cambios = []
+        for metrica in ('peso_comprimido', 'peso'):
+            if antes.get(metrica) != ahora[metrica] and antes.get(metrica) is not None:
+                diferencia = ahora[metrica] - antes[metrica]
+                cambios.append(
+                    f"{metrica.replace('_', ' ')} {_kb(antes[metrica])} → {_kb(ahora[metrica])} "
+                    f"({'+' if diferencia > 0 else '-'}{_kb(abs(diferencia))})"
+                )
+        for metrica in ('peticiones', 'bloqueantes', 'scripts', 'origenes_externos'):
+            if antes.get(metrica) != ahora[metrica] and antes.get(metrica) is not None:
+                cambios.append(f"{metrica.replace('_', ' ')} {antes[metrica]} → {ahora[metrica]}")
+        if cambios:
+            lineas.append(f"   ~ {pagina}: {', '.join(cambios)}")
+    return lineas
+
+def main():
+    """Medir todas las páginas y compararlas con sus presupuestos"""
+    parser = crear_parser(__doc__)
+    parser.add_argument(
+        '--presupuestos', default=PRESUPUESTOS_FILE, type=Path,
+        help='archivo de presupuestos (por defecto presupuestos.json)'
+    )
+    args = parser.parse_args()
+    base_dir = Path(__file__).parent
+
+    presupuestos = cargar_presupuestos(args.presupuestos)
+    html_files = grafo_actualizado(base_dir).archivos('presupuestos')
+
+    print(f"\n📏 Midiendo {len(html_files)} archivos HTML...\n")
+
+    cache = cache_proceso(base_dir)
+    resultados = procesar_archivos(medir, html_files, args.jobs, con_datos=True)
+    actual = {}
+    for archivo, (estado, datos) in zip(html_files, resultados):
+        if estado == ERROR:
+            continue
+        metricas, nuevas = datos
+        cache.entradas.update(nuevas)
+        actual[archivo.name] = metricas
+    cache.guardar()
+
+    paginas_con_excesos = 0
+    for pagina, metricas in actual.items():
+        encontrados = excesos(pagina, metricas, presupuestos)
+        marca = '✗' if encontrados else '✓'
+        print(f"{marca} {pagina} - {_kb(metricas['peso_comprimido'])} comprimido "
+              f"({_kb(metricas['peso'])}), {metricas['peticiones']} peticiones, "
+              f"{metricas['bloqueantes']} bloqueantes, {metricas['scripts']} scripts, "
+              f"{metricas['origenes_externos']} orígenes externos")
+        for clave, valor, maximo in encontrados:
+            print(f"    {clave}: {valor:g} (máximo {maximo:g})")
+        for faltante in metricas['faltantes']:
+            print(f"    ⚠ no existe {faltante}")
+        paginas_con_excesos += bool(encontrados)
+
+    try:
+        with open(base_dir / INFORME, 'r', encoding='utf-8') as f:
+            anterior = json.load(f)
+    except (OSError, ValueError):
+        anterior = None
+    if anterior is not None:
+        lineas = diferencias(anterior, actual)
+        print(f"\n📊 Cambios desde el último control: {len(lineas) or 'ninguno'}")
+        for linea in lineas:
+            print(linea)
+    escribir_json(base_dir / INFORME, actual, indent=1, sort_keys=True)
+
+    if paginas_con_excesos:
+        print(f"\n✗ {paginas_con_excesos} de {len(actual)} páginas superan su presupuesto\n")
+        sys.exit(1)
+    print(f"\n✅ Proceso completado: {len(actual)} páginas dentro del presupuesto\n")
+
+if __name__ == '__main__':
+    main()
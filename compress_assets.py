@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Script para generar versiones precomprimidas (.br y .gz) de los assets de texto
+
+Netlify y nginx (brotli_static / gzip_static) sirven archivo.br o archivo.gz
+si existen en lugar de comprimir en cada petición. Los archivos se comprimen
+con el nivel máximo (brotli 11, gzip 9) en un pool de procesos, y
+.compress-manifest.json guarda el hash de cada uno para no recomprimir los que
+no cambiaron. Brotli es opcional (pip install brotli): sin él solo se
+generan los .gz.
+
+Qué se comprime no es una lista propia: son las páginas del índice del sitio
+(site_graph.py), lo que cargan (hojas con sus @import, scripts, imágenes,
+manifest e íconos) y lo que las etapas de publicación anotaron con
+build_output.registrar_salidas (sitemap, índice de búsqueda, páginas de
+proveedores). Lo que ninguna página carga, como presupuestos.json, no se
+comprime.
+"""
+
+import gzip
+from functools import partial
+from pathlib import Path
+
+from build_manifest import BuildManifest, crear_registro, hash_bytes
+from build_output import escribir_bytes, salidas_publicadas
+from build_utils import ERROR, MODIFICADO, crear_parser, procesar_archivos
+from css_rules import imports_css
+from site_graph import TIPOS_ASSET, grafo_actualizado
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST_COMPRESION = '.compress-manifest.json'
+
+EXTENSIONES = {'.html', '.css', '.js', '.json', '.svg', '.xml', '.txt', '.webmanifest'}
+FORMATOS = ('br', 'gz')
+
+# Por debajo de este tamaño la cabecera de compresión no compensa
+TAMANO_MINIMO = 256
+
+def archivos_publicados(base_dir):
+    """Archivos que se sirven: las páginas del índice del sitio, lo que cargan y
+    las salidas registradas por las etapas de publicación"""
+    base = base_dir.resolve()
+    grafo = grafo_actualizado(base_dir)
+    rutas = set(salidas_publicadas(base_dir))
+    for pagina in grafo.paginas():
+        rutas.add(base_dir / pagina)
+        for relativa in grafo.assets_de(pagina, *TIPOS_ASSET, 'otros'):
+            ruta = base_dir / relativa
+            rutas.add(ruta)
+            if ruta.suffix == '.css' and ruta.is_file():
+                rutas.update(imports_css(ruta, base_dir))
+    relativas = {ruta.resolve().relative_to(base) for ruta in rutas}
+    return sorted(
+        base_dir / relativa for relativa in relativas
+        if (base_dir / relativa).is_file() and not any(parte.startswith('.') for parte in relativa.parts)
+    )
+
+def archivos_de_texto(base_dir):
+    return [ruta for ruta in archivos_publicados(base_dir) if ruta.suffix in EXTENSIONES]
+
+def _formatos():
+    return list(FORMATOS) if brotli is not None else ['gz']
+
+def comprimir(ruta, formatos):
+    """Escribe ruta.br / ruta.gz. Devuelve (True, {'original': n, 'br': n, 'gz': n})"""
+    datos = ruta.read_bytes()
+    tamanos = {'original': len(datos)}
+    for formato in formatos:
+        destino = ruta.with_name(f"{ruta.name}.{formato}")
+        if formato == 'br':
+            comprimido = brotli.compress(datos, quality=11, mode=brotli.MODE_TEXT)
+        else:
+            # mtime=0 para que el mismo contenido dé siempre los mismos bytes
+            comprimido = gzip.compress(datos, compresslevel=9, mtime=0)
+        if len(comprimido) >= len(datos):
+            # No sirve de nada: el servidor usará el original
+            destino.unlink(missing_ok=True)
+            continue
+        escribir_bytes(destino, comprimido)
+        tamanos[formato] = len(comprimido)
+    return True, tamanos
+
+def _kb(n):
+    return f"{n / 1024:.1f} KB"
+
+def _linea_informe(marca, relativa, tamanos):
+    partes = [f"{formato} {_kb(tamanos[formato])}" for formato in ('br', 'gz') if formato in tamanos]
+    return f"{marca} {relativa} - {_kb(tamanos['original'])} → {' · '.join(partes) or 'sin comprimir'}"
+
+def _hermanos_vigentes(ruta, formatos, tamanos):
+    return all(
+        ruta.with_name(f"{ruta.name}.{formato}").exists()
+        for formato in formatos if formato in tamanos
+    )
+
+def main():
+    """Comprimir los assets nuevos o modificados e informar los tamaños"""
+    parser = crear_parser(__doc__)
+    # Comprimir al nivel máximo es lo más costoso del build: todos los núcleos
+    parser.set_defaults(jobs=0)
+    args = parser.parse_args()
+    base_dir = Path(__file__).parent
+
+    formatos = _formatos()
+    if brotli is None:
+        print("○ brotli no está instalado (pip install brotli): solo se generan .gz")
+
+    archivos = [r for r in archivos_de_texto(base_dir) if r.stat().st_size >= TAMANO_MINIMO]
+    manifest = BuildManifest.cargar(base_dir / MANIFEST_COMPRESION)
+    dependencias = {'formatos': formatos}
+
+    pendientes = []
+    informe = {}
+    for ruta in archivos:
+        relativa = ruta.relative_to(base_dir).as_posix()
+        stat = ruta.stat()
+        registro = manifest.paginas.get(relativa)
+        vigente = registro is not None and _hermanos_vigentes(ruta, formatos, registro['tamanos'])
+        if vigente and not manifest.sin_cambios_por_stat(relativa, stat, dependencias):
+            # Stat distinto (checkout, touch): se compara el contenido
+            hash_actual = hash_bytes(ruta.read_bytes())
+            vigente = manifest.sin_cambios_por_hash(relativa, hash_actual, dependencias)
+            if vigente:
+                nuevo = crear_registro(stat, hash_actual, hash_actual, dependencias)
+                nuevo['tamanos'] = registro['tamanos']
+                manifest.registrar(relativa, nuevo)
+        if vigente:
+            informe[relativa] = ('○', registro['tamanos'])
+        else:
+            pendientes.append(ruta)
+
+    print(f"\n🗜  Comprimiendo {len(pendientes)} de {len(archivos)} assets "
+          f"({', '.join(formatos)})...\n")
+
+    resultados = procesar_archivos(
+        partial(comprimir, formatos=formatos), pendientes, args.jobs, con_datos=True
+    )
+    for ruta, (estado, tamanos) in zip(pendientes, resultados):
+        if estado == ERROR:
+            continue
+        relativa = ruta.relative_to(base_dir).as_posix()
+        hash_actual = hash_bytes(ruta.read_bytes())
+        registro = crear_registro(ruta.stat(), hash_actual, hash_actual, dependencias)
+        registro['tamanos'] = tamanos
+        manifest.registrar(relativa, registro)
+        informe[relativa] = ('✓', tamanos)
+
+    # .br/.gz de archivos que ya no se publican, que quedaron por debajo del
+    # mínimo o de un formato que ya no se genera
+    vigentes = {ruta.relative_to(base_dir).as_posix() for ruta in archivos}
+    anteriores = set(manifest.paginas)
+    manifest.conservar(vigentes)
+    for relativa in sorted(anteriores | vigentes):
+        for formato in FORMATOS:
+            if relativa not in vigentes or formato not in formatos:
+                (base_dir / f"{relativa}.{formato}").unlink(missing_ok=True)
+    manifest.guardar()
+
+    # Solo los formatos que se generan; un archivo sin su .br/.gz (no achicaba)
+    # se sirve sin comprimir y suma su tamaño original
+    total = {'original': 0, **{formato: 0 for formato in formatos}}
+    for relativa in sorted(informe):
+        marca, tamanos = informe[relativa]
+        print(_linea_informe(marca, relativa, tamanos))
+        for clave in total:
+            total[clave] += tamanos.get(clave, tamanos['original'])
+
+    procesados = sum(1 for estado, _ in resultados if estado == MODIFICADO)
+    print(f"\n✅ Proceso completado: {procesados} assets comprimidos, "
+          f"{len(archivos) - len(pendientes)} sin cambios")
+    print(f"   {_linea_informe('-', f'{len(informe)} archivos', total)[2:]}\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Script para incrustar el CSS crítico de cada página en su <head>
+
+Para cada página se buscan las reglas de sus hojas de estilo locales que
+coinciden con algún elemento del HTML estático. Esas reglas se incrustan en un
+<style data-critical-css> justo antes de la primera de esas hojas (fuera del
+bloque de meta tags SEO, que update_seo_tags regenera) y las hojas
+completas pasan a cargarse de forma asíncrona (rel="preload" + onload, con un
+<noscript> de respaldo). Al volver a ejecutarlo se deshace lo anterior y se
+recalcula, así que puede correr después de bundle_assets.py o
+fingerprint_assets.py.
+
+Las coincidencias de selectores se guardan por cadena de elementos
+(html > body > ... > elemento), de modo que el navbar y el footer que comparten
+las páginas se evalúan una sola vez por hoja de estilo.
+"""
+
+import re
+from pathlib import Path
+
+from build_output import escribir_texto
+from build_utils import MODIFICADO, crear_parser, procesar_archivos, ruta_local
+from bundle_assets import minificar_css
+from css_rules import (
+    IndiceSelectores, creador_elementos, iter_cadenas, leer_css, parsear_css, texto_regla,
+)
+from html_regions import (
+    ABRE, COMENTARIO, TEXTO, buscar_head, iter_tokens, leer_atributos, reemplazar_regiones,
+)
+from site_graph import grafo_actualizado
+
+MARCA = 'data-critical-css'
+
+_APERTURA_STYLE = f'<style {MARCA}>'
+_LINK_ASINCRONO = re.compile(
+    r'<link [^>]*\b%s\b[^>]*><noscript %s>(<link [^>]*>)</noscript>' % (MARCA, MARCA)
+)
+
+def quitar_css_critico(contenido):
+    """Deshace una ejecución anterior: quita el <style> y restaura los <link> originales"""
+    inicio = contenido.find(_APERTURA_STYLE)
+    if inicio != -1:
+        fin = contenido.find('</style>', inicio)
+        if fin != -1:
+            fin += len('</style>')
+            # Y el salto de línea y la sangría que se agregaron detrás
+            while fin < len(contenido) and contenido[fin] in ' \t\n':
+                fin += 1
+            contenido = contenido[:inicio] + contenido[fin:]
+    return _LINK_ASINCRONO.sub(lambda m: m.group(1), contenido)
+
+_indices = {}
+
+def indice_hoja(ruta, directorio_pagina):
+    """IndiceSelectores de una hoja de estilo, reutilizado mientras no cambie"""
+    clave = (ruta, ruta.stat().st_mtime_ns, directorio_pagina)
+    indice = _indices.get(clave)
+    if indice is None:
+        css = leer_css(ruta, directorio_pagina)
+        indice = IndiceSelectores(parsear_css(css))
+        _indices[clave] = indice
+    return indice
+
+def hojas_de_estilo(contenido, base_dir, head):
+    """[(token, ruta)] de los <link rel="stylesheet"> locales del <head>"""
+    hojas = []
+    for token in iter_tokens(contenido, head.fin_apertura):
+        if token.inicio >= head.inicio_cierre:
+            break
+        if token.tipo != ABRE or token.nombre != 'link':
+            continue
+        atributos = leer_atributos(contenido[token.inicio:token.fin])
+        if atributos.get('rel') != 'stylesheet' or atributos.get('media', 'all') != 'all':
+            continue
+        ruta = ruta_local(base_dir, atributos.get('href', ''))
+        if ruta is not None and ruta.is_file():
+            hojas.append((token, ruta))
+    return hojas
+
+def css_critico(contenido, indices):
+    """CSS minificado con las reglas de los índices que coinciden con el HTML"""
+    crear_elemento = creador_elementos(
+        set().union(*(indice.atributos_usados for indice in indices))
+    )
+
+    coincidencias = [set() for _ in indices]
+    for cadena in iter_cadenas(contenido, crear_elemento):
+        for indice, encontradas in zip(indices, coincidencias):
+            encontradas |= indice.coincidencias(cadena)
+
+    partes = []
+    for indice, encontradas in zip(indices, coincidencias):
+        partes.extend(texto_regla(indice.reglas[i]) for i in sorted(encontradas))
+    return minificar_css('\n'.join(partes))
+
+def agregar_css_critico_html(contenido, base_dir):
+    """Devuelve el HTML con el CSS crítico incrustado y las hojas cargadas en diferido"""
+    contenido = quitar_css_critico(contenido)
+    head = buscar_head(contenido)
+    if head is None:
+        return contenido
+    hojas = hojas_de_estilo(contenido, base_dir, head)
+    if not hojas:
+        return contenido
+
+    indices = [indice_hoja(ruta, base_dir.resolve()) for _, ruta in hojas]
+    css = css_critico(contenido, indices)
+
+    # El <style> va antes de la primera hoja (o del comentario que la encabeza,
+    # como <!-- Fonts -->): el bloque SEO termina antes de los preconnect y
+    # update_seo_tags lo regenera entero, con lo que haya adentro
+    posicion = hojas[0][0].inicio
+    comentario = None
+    for token in iter_tokens(contenido, head.fin_apertura):
+        if token.inicio >= posicion:
+            posicion = posicion if comentario is None else comentario
+            break
+        texto = contenido[token.inicio:token.fin]
+        if token.tipo == COMENTARIO and 'parcial:' not in texto:
+            comentario = token.inicio if comentario is None else comentario
+        elif token.tipo != TEXTO or texto.strip():
+            comentario = None
+    linea = contenido.rfind('\n', 0, posicion) + 1
+    sangria = contenido[linea:posicion]
+    if sangria.strip():
+        sangria = ''
+
+    reemplazos = [(posicion, posicion, f"{_APERTURA_STYLE}{css}</style>\n{sangria}")]
+    for token, _ in hojas:
+        original = contenido[token.inicio:token.fin]
+        href = leer_atributos(original)['href']
+        reemplazos.append((token.inicio, token.fin, (
+            f'<link rel="preload" href="{href}" as="style" '
+            f'onload="this.onload=null;this.rel=\'stylesheet\'" {MARCA}>'
+            f'<noscript {MARCA}>{original}</noscript>'
+        )))
+    return reemplazar_regiones(contenido, reemplazos)
+
+def agregar_css_critico(filepath):
+    """Incrusta el CSS crítico de una página"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    new_content = agregar_css_critico_html(content, filepath.parent)
+
+    if new_content != content:
+        escribir_texto(filepath, new_content)
+        inicio = new_content.find(_APERTURA_STYLE)
+        tamano = new_content.find('</style>', inicio) - inicio - len(_APERTURA_STYLE) if inicio != -1 else 0
+        print(f"✓ {filepath.name} - CSS crítico: {tamano} bytes")
+        return True
+    return False
+
+def main():
+    """Incrustar el CSS crítico en todas las páginas"""
+    args = crear_parser(__doc__).parse_args()
+    base_dir = Path(__file__).parent
+
+    html_files = grafo_actualizado(base_dir).archivos('css_critico')
+    print(f"\n🎨 Calculando CSS crítico de {len(html_files)} archivos HTML...\n")
+
+    estados = procesar_archivos(agregar_css_critico, html_files, args.jobs)
+
+    print(f"\n✅ Proceso completado: {estados.count(MODIFICADO)} archivos HTML actualizados\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Reglas CSS y coincidencia de selectores contra el HTML estático de las páginas.
+
+parsear_css divide una hoja en reglas (con las posiciones de cada una en el
+texto original y los @media/@supports que la contienen) con un recorrido
+lineal. IndiceSelectores agrupa los selectores por su parte más a la derecha
+(id, clase o etiqueta), así que para cada elemento solo se prueban los
+selectores que pueden coincidir con él.
+
+La coincidencia es conservadora: las pseudoclases (:hover, :nth-child, :not...)
+y los pseudoelementos se ignoran y los combinadores de hermanos (+, ~) solo
+exigen el ancestro común, así que un selector puede coincidir de más pero
+nunca de menos.
+"""
+
+import os
+import re
+from collections import namedtuple
+from pathlib import Path
+from urllib.parse import urljoin
+
+from build_utils import ruta_local
+from html_regions import ABRE, CIERRA, iter_tokens, leer_atributos
+
+# tipo: 'estilo' para reglas con selector, 'at' para @font-face, @keyframes,
+# @import... (se conservan enteras). medios: preludios de los @media/@supports
+# que la contienen, del exterior al interior.
+Regla = namedtuple('Regla', ['tipo', 'prelude', 'cuerpo', 'medios', 'inicio', 'fin'])
+
+_AT_AGRUPADORES = {'@media', '@supports', '@layer', '@container', '@document'}
+_COMENTARIO = re.compile(r'/\*.*?\*/', re.DOTALL)
+
+def _saltar_cadena(css, i):
+    comilla = css[i]
+    i += 1
+    while i < len(css):
+        if css[i] == '\\':
+            i += 2
+            continue
+        if css[i] == comilla or css[i] == '\n':
+            return i + 1
+        i += 1
+    return i
+
+def _buscar(css, i, fin, caracteres):
+    """Primera posición >= i de un carácter de caracteres fuera de cadenas, comentarios y paréntesis"""
+    parentesis = 0
+    while i < fin:
+        c = css[i]
+        if c in '"\'':
+            i = _saltar_cadena(css, i)
+            continue
+        if css.startswith('/*', i):
+            cierre = css.find('*/', i + 2)
+            i = fin if cierre == -1 else cierre + 2
+            continue
+        if c == '(':
+            parentesis += 1
+        elif c == ')' and parentesis:
+            parentesis -= 1
+        elif c in caracteres and not parentesis:
+            return i
+        i += 1
+    return fin
+
+def _cierre_bloque(css, i, fin):
+    """Posición de la '}' que cierra el bloque cuya '{' está en i"""
+    profundidad = 0
+    while i < fin:
+        i = _buscar(css, i, fin, '{}')
+        if i >= fin:
+            return fin
+        profundidad += 1 if css[i] == '{' else -1
+        if profundidad == 0:
+            return i
+        i += 1
+    return fin
+
+def _limpiar(texto):
+    return ' '.join(_COMENTARIO.sub(' ', texto).split())
+
+def parsear_css(css, inicio=0, fin=None, medios=()):
+    """Lista de Regla de css[inicio:fin], en orden"""
+    fin = len(css) if fin is None else fin
+    reglas = []
+    i = inicio
+    while i < fin:
+        # Espacios y comentarios entre reglas
+        while i < fin and (css[i].isspace() or css.startswith('/*', i)):
+            if css[i].isspace():
+                i += 1
+            else:
+                cierre = css.find('*/', i + 2)
+                i = fin if cierre == -1 else cierre + 2
+        if i >= fin:
+            break
+
+        if css[i] == '}':
+            # Llave sobrante: se ignora como haría el navegador
+            i += 1
+            continue
+
+        corte = _buscar(css, i, fin, '{;' if css[i] == '@' else '{')
+        prelude = _limpiar(css[i:corte])
+        if corte >= fin or css[corte] == ';':
+            reglas.append(Regla('at', prelude, '', medios, i, min(corte + 1, fin)))
+            i = corte + 1
+            continue
+
+        cierre = _cierre_bloque(css, corte, fin)
+        nombre_at = prelude.split(None, 1)[0].lower() if prelude.startswith('@') else None
+        if nombre_at in _AT_AGRUPADORES:
+            reglas.extend(parsear_css(css, corte + 1, cierre, medios + (prelude,)))
+        else:
+            reglas.append(Regla(
+                'at' if nombre_at else 'estilo', prelude, css[corte + 1:cierre].strip(),
+                medios, i, min(cierre + 1, fin),
+            ))
+        i = cierre + 1
+    return reglas
+
+def partir_selectores(prelude):
+    """'a, b:is(c, d)' -> ['a', 'b:is(c, d)']"""
+    partes = []
+    i = 0
+    while i <= len(prelude):
+        corte = _buscar(prelude, i, len(prelude), ',')
+        parte = prelude[i:corte].strip()
+        if parte:
+            partes.append(parte)
+        i = corte + 1
+    return partes
+
+def texto_regla(regla):
+    """Texto CSS de la regla, envuelto en sus @media/@supports"""
+    if regla.tipo == 'estilo':
+        texto = f"{regla.prelude}{{{regla.cuerpo}}}"
+    elif regla.cuerpo:
+        texto = f"{regla.prelude}{{{regla.cuerpo}}}"
+    else:
+        texto = f"{regla.prelude};"
+    for medio in reversed(regla.medios):
+        texto = f"{medio}{{{texto}}}"
+    return texto
+
+# ---------------------------------------------------------------------------
+# Selectores
+# ---------------------------------------------------------------------------
+
+# Un selector compuesto: etiqueta (None = cualquiera), id, clases y atributos
+# [(nombre, operador, valor)]
+Compuesto = namedtuple('Compuesto', ['etiqueta', 'id', 'clases', 'atributos'])
+
+_PARTE_SELECTOR = re.compile(r'''
+    (?P<combinador>\s*[>+~]\s*|\s+)
+  | (?P<etiqueta>\*|[A-Za-z][\w-]*)
+  | \#(?P<id>(?:[\w-]|\\.)+)
+  | \.(?P<clase>(?:[\w-]|\\.)+)
+  | \[\s*(?P<atributo>[\w:-]+)\s*(?:(?P<operador>[~|^$*]?=)\s*(?P<valor>"[^"]*"|'[^']*'|[^\]\s]+)\s*(?:[iIsS]\s*)?)?\]
+  | (?P<pseudo>::?[\w-]+)
+''', re.VERBOSE)
+
+def _quitar_escapes(texto):
+    return re.sub(r'\\(.)', r'\1', texto)
+
+def _quitar_argumentos(selector):
+    """Elimina el contenido de :not(...), :nth-child(...)... dejando el nombre"""
+    salida = []
+    profundidad = 0
+    for c in selector:
+        if c == '(':
+            profundidad += 1
+        elif c == ')':
+            profundidad -= 1
+        elif not profundidad:
+            salida.append(c)
+    return ''.join(salida)
+
+def compilar_selector(selector):
+    """Lista de (combinador, Compuesto) de derecha a izquierda, o None si no se entiende.
+
+    El combinador de cada compuesto es el que lo une con el siguiente a su
+    izquierda (' ', '>', '+', '~', o None en el último).
+    """
+    texto = _quitar_argumentos(selector.strip())
+    compuestos = []
+    actual = {'etiqueta': None, 'id': None, 'clases': [], 'atributos': []}
+    combinadores = []
+    pos = 0
+    while pos < len(texto):
+        m = _PARTE_SELECTOR.match(texto, pos)
+        if not m:
+            return None
+        pos = m.end()
+        if m.group('combinador') is not None:
+            if pos >= len(texto):
+                break
+            compuestos.append(actual)
+            combinadores.append(m.group('combinador').strip() or ' ')
+            actual = {'etiqueta': None, 'id': None, 'clases': [], 'atributos': []}
+        elif m.group('etiqueta'):
+            if m.group('etiqueta') != '*':
+                actual['etiqueta'] = m.group('etiqueta').lower()
+        elif m.group('id'):
+            actual['id'] = _quitar_escapes(m.group('id'))
+        elif m.group('clase'):
+            actual['clases'].append(_quitar_escapes(m.group('clase')))
+        elif m.group('atributo'):
+            valor = m.group('valor')
+            if valor and valor[0] in '"\'':
+                valor = valor[1:-1]
+            actual['atributos'].append((m.group('atributo').lower(), m.group('operador'), valor))
+        elif m.group('pseudo').lower() == ':root':
+            actual['etiqueta'] = 'html'
+    compuestos.append(actual)
+
+    resultado = []
+    for i, c in enumerate(reversed(compuestos)):
+        combinador = combinadores[len(compuestos) - 2 - i] if i < len(compuestos) - 1 else None
+        resultado.append((combinador, Compuesto(
+            c['etiqueta'], c['id'], frozenset(c['clases']), tuple(c['atributos'])
+        )))
+    return resultado
+
+# Un elemento del HTML con solo los datos que pueden usar los selectores
+Elemento = namedtuple('Elemento', ['etiqueta', 'id', 'clases', 'atributos'])
+
+def _coincide_atributo(valor_elemento, operador, valor):
+    if valor_elemento is None:
+        return False
+    if operador is None:
+        return True
+    if operador == '=':
+        return valor_elemento == valor
+    if operador == '~=':
+        return valor in valor_elemento.split()
+    if operador == '|=':
+        return valor_elemento == valor or valor_elemento.startswith(valor + '-')
+    if operador == '^=':
+        return bool(valor) and valor_elemento.startswith(valor)
+    if operador == '$=':
+        return bool(valor) and valor_elemento.endswith(valor)
+    return bool(valor) and valor in valor_elemento
+
+def _coincide_compuesto(compuesto, elemento):
+    if compuesto.etiqueta is not None and compuesto.etiqueta != elemento.etiqueta:
+        return False
+    if compuesto.id is not None and compuesto.id != elemento.id:
+        return False
+    if not compuesto.clases <= elemento.clases:
+        return False
+    atributos = dict(elemento.atributos)
+    return all(
+        _coincide_atributo(atributos.get(nombre), operador, valor)
+        for nombre, operador, valor in compuesto.atributos
+    )
+
+def coincide(partes, cadena, i=None, k=0):
+    """True si el selector compilado coincide con cadena[i] (por defecto el último)"""
+    i = len(cadena) - 1 if i is None else i
+    combinador, compuesto = partes[k]
+    if not _coincide_compuesto(compuesto, cadena[i]):
+        return False
+    if combinador is None:
+        return True
+    if combinador in ('+', '~'):
+        # Hermano anterior: no se comprueba, se sigue con el mismo padre
+        return _coincide_desde_padre(partes, cadena, i, k + 1)
+    if combinador == '>':
+        return i > 0 and coincide(partes, cadena, i - 1, k + 1)
+    return any(coincide(partes, cadena, j, k + 1) for j in range(i - 1, -1, -1))
+
+def _coincide_desde_padre(partes, cadena, i, k):
+    """El compuesto k se da por coincidente (es un hermano) y se sigue con el resto"""
+    combinador = partes[k][0]
+    if combinador is None:
+        return True
+    if combinador in ('+', '~'):
+        return _coincide_desde_padre(partes, cadena, i, k + 1)
+    if combinador == '>':
+        return i > 0 and coincide(partes, cadena, i - 1, k + 1)
+    return any(coincide(partes, cadena, j, k + 1) for j in range(i - 1, -1, -1))
+
+class IndiceSelectores:
+    """Selectores de una lista de reglas agrupados por su compuesto de la derecha.
+
+    coincidencias(cadena) devuelve los índices de las reglas con algún selector
+    que coincide con el último elemento de la cadena; el resultado se guarda por
+    cadena, así que el navbar y el footer compartidos entre páginas se evalúan
+    una sola vez.
+    """
+
+    def __init__(self, reglas):
+        self.reglas = reglas
+        self.por_id = {}
+        self.por_clase = {}
+        self.por_etiqueta = {}
+        self.universales = []
+        self.atributos_usados = set()
+        self._cache = {}
+        for indice, regla in enumerate(reglas):
+            if regla.tipo != 'estilo':
+                continue
+            for selector in partir_selectores(regla.prelude):
+                partes = compilar_selector(selector)
+                if partes is None:
+                    # Selector que no se entiende: se asume que coincide
+                    partes = [(None, Compuesto(None, None, frozenset(), ()))]
+                compuesto = partes[0][1]
+                entrada = (indice, partes)
+                if compuesto.id is not None:
+                    self.por_id.setdefault(compuesto.id, []).append(entrada)
+                elif compuesto.clases:
+                    clase = min(compuesto.clases)
+                    self.por_clase.setdefault(clase, []).append(entrada)
+                elif compuesto.etiqueta is not None:
+                    self.por_etiqueta.setdefault(compuesto.etiqueta, []).append(entrada)
+                else:
+                    self.universales.append(entrada)
+                for _, c in partes:
+                    self.atributos_usados.update(nombre for nombre, _, _ in c.atributos)
+
+    def coincidencias(self, cadena):
+        resultado = self._cache.get(cadena)
+        if resultado is not None:
+            return resultado
+        elemento = cadena[-1]
+        candidatos = list(self.universales)
+        candidatos += self.por_etiqueta.get(elemento.etiqueta, [])
+        if elemento.id is not None:
+            candidatos += self.por_id.get(elemento.id, [])
+        for clase in elemento.clases:
+            candidatos += self.por_clase.get(clase, [])
+        resultado = frozenset(
+            indice for indice, partes in candidatos if coincide(partes, cadena)
+        )
+        self._cache[cadena] = resultado
+        return resultado
+
+# ---------------------------------------------------------------------------
+# HTML
+# ---------------------------------------------------------------------------
+
+ETIQUETAS_VACIAS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'param', 'source', 'track', 'wbr',
+}
+
+def creador_elementos(atributos_usados):
+    """Función (etiqueta, atributos) -> Elemento que solo conserva los atributos
+    que aparecen en algún selector, para que más cadenas sean iguales"""
+    def crear_elemento(etiqueta, atributos):
+        return Elemento(
+            etiqueta,
+            atributos.get('id'),
+            frozenset(atributos.get('class', '').split()),
+            tuple(sorted((n, v) for n, v in atributos.items() if n in atributos_usados)),
+        )
+    return crear_elemento
+
+def iter_cadenas(html, crear_elemento):
+    """Genera, para cada elemento del documento, la tupla de elementos desde <html>.
+
+    crear_elemento(etiqueta, atributos) convierte una etiqueta en Elemento.
+    Los cierres que faltan se toleran como lo hace el navegador: un cierre
+    cierra hasta su apertura más cercana.
+    """
+    pila = []
+    nombres = []
+    for token in iter_tokens(html):
+        if token.tipo == ABRE:
+            etiqueta = html[token.inicio:token.fin]
+            cadena = tuple(pila) + (crear_elemento(token.nombre, leer_atributos(etiqueta)),)
+            yield cadena
+            if token.nombre not in ETIQUETAS_VACIAS and not etiqueta.endswith('/>'):
+                pila.append(cadena[-1])
+                nombres.append(token.nombre)
+        elif token.tipo == CIERRA and token.nombre in nombres:
+            while nombres:
+                pila.pop()
+                if nombres.pop() == token.nombre:
+                    break
+
+# ---------------------------------------------------------------------------
+# Archivos
+# ---------------------------------------------------------------------------
+
+_URL_CSS = re.compile(r'''url\(\s*(['"]?)([^'")]+)\1\s*\)''')
+_IMPORT_CSS = re.compile(r'''@import\s+(?:url\(\s*)?(['"]?)([^'")\s;]+)\1\s*\)?\s*;''')
+
+def leer_css(ruta, directorio_destino, incluidos=None):
+    """CSS del archivo con sus @import incluidos y las url() relativas a directorio_destino"""
+    incluidos = set() if incluidos is None else incluidos
+    ruta = Path(ruta).resolve()
+    if ruta in incluidos:
+        return ''
+    incluidos.add(ruta)
+    css = ruta.read_text(encoding='utf-8')
+    destino = Path(directorio_destino).resolve()
+
+    def url_relativa(m):
+        url = m.group(2)
+        if re.match(r'^(?:[a-z]+:|/|#)', url):
+            return m.group(0)
+        relativa = os.path.relpath((ruta.parent / url).resolve(), destino)
+        return f"url({m.group(1)}{Path(relativa).as_posix()}{m.group(1)})"
+
+    def incluir_import(m):
+        importado = (ruta.parent / m.group(2)).resolve()
+        if not importado.is_file():
+            return m.group(0)
+        return leer_css(importado, directorio_destino, incluidos)
+
+    css = _URL_CSS.sub(url_relativa, css)
+    return _IMPORT_CSS.sub(incluir_import, css)
+
+def imports_css(ruta, base_dir, visitados=None):
+    """Archivos locales que carga el CSS con @import (también los anidados), en
+    el orden en que el navegador los descubre"""
+    visitados = set() if visitados is None else visitados
+    base = Path(base_dir).resolve()
+    ruta = Path(ruta).resolve()
+    visitados.add(ruta)
+    importados = []
+    for m in _IMPORT_CSS.finditer(ruta.read_text(encoding='utf-8')):
+        importado = ruta_local(base_dir, urljoin(f"/{ruta.relative_to(base).as_posix()}", m.group(2)))
+        if importado is None or importado in visitados or not importado.is_file():
+            continue
+        importados.append(importado)
+        importados.extend(imports_css(importado, base_dir, visitados))
+    return importados
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Script para unificar las imágenes repetidas de imagenes/
+
+albune/, perfile/ y perfilemuestra/ tienen la misma foto con varios nombres
+(albun63867.png y color-palette-design.png, "images (2).png", perfil1.png y
+perfil1.jpg...). Cada imagen se indexa por el hash de su contenido y por un
+hash perceptual (dHash de 64 bits). Las copias exactas se agrupan por el hash.
+Las casi copias (la misma foto guardada en otro formato o recomprimida) se
+buscan en un árbol BK por distancia de Hamming, sin comparar todas contra
+todas, y solo se unen si tienen la misma proporción y la misma transparencia.
+
+Cada grupo se reduce a un único archivo con nombre por contenido,
+imagenes/_unicas/<hash>.<ext>. Se conserva la versión de mayor resolución y,
+a igual resolución, la más liviana. Las referencias de las páginas, los
+parciales, js/, css/ y backend/ pasan a apuntar a ese archivo y las copias se
+borran. imagenes/_unicas/alias.json guarda cada ruta anterior y su reemplazo.
+
+Sin --aplicar solo informa qué haría. El análisis de cada imagen se guarda en
+.image-hashes.json por ruta, mtime y tamaño. El hash perceptual requiere
+Pillow (pip install Pillow); sin Pillow solo se unifican las copias exactas.
+"""
+
+import json
+import re
+from functools import lru_cache, partial
+from pathlib import Path
+from urllib.parse import quote
+
+from build_manifest import hash_bytes
+from build_output import escribir_bytes, escribir_json, escribir_texto
+from build_utils import ERROR, MODIFICADO, crear_parser, procesar_archivos
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+DIRECTORIO_IMAGENES = 'imagenes'
+DIRECTORIO_UNICAS = 'imagenes/_unicas'
+ALIAS_FILE = 'imagenes/_unicas/alias.json'
+CACHE_HASHES = '.image-hashes.json'
+EXTENSIONES = {'.png', '.jpg', '.jpeg', '.webp', '.gif', '.svg'}
+# Salidas de otros scripts: no son imágenes de la biblioteca
+EXCLUIDOS = ('imagenes/_variantes', DIRECTORIO_UNICAS)
+
+# Archivos de texto donde se buscan referencias a las imágenes
+REFERENCIAS = ('*.html', 'partials/*.html', 'js/**/*.js', 'css/**/*.css', 'manifest.json', 'backend/**/*.js')
+
+# Bits distintos de dHash hasta los que dos imágenes se consideran la misma
+UMBRAL_HAMMING = 4
+# Diferencia relativa de proporción (ancho/alto) tolerada dentro de un grupo
+TOLERANCIA_PROPORCION = 0.01
+
+def dhash(imagen):
+    """Hash perceptual de 64 bits: gradiente horizontal de la imagen en 9x8 grises"""
+    if imagen.mode == 'P':
+        # Paleta con transparencia: convert('L') directo la ignora (y avisa)
+        imagen = imagen.convert('RGBA')
+    grises = imagen.convert('L').resize((9, 8), Image.LANCZOS)
+    pixeles = grises.tobytes()
+    valor = 0
+    for fila in range(8):
+        for columna in range(8):
+            i = fila * 9 + columna
+            valor = (valor << 1) | (pixeles[i] < pixeles[i + 1])
+    return valor
+
+def analizar_imagen(ruta):
+    """(True, {sha, bytes, dhash, ancho, alto, alfa}) de un archivo de imagen"""
+    datos = ruta.read_bytes()
+    entrada = {
+        'sha': hash_bytes(datos), 'bytes': len(datos),
+        'dhash': None, 'ancho': None, 'alto': None, 'alfa': None,
+    }
+    if Image is not None and ruta.suffix.lower() != '.svg':
+        try:
+            with Image.open(ruta) as imagen:
+                imagen.load()
+                entrada['ancho'], entrada['alto'] = imagen.size
+                entrada['alfa'] = imagen.mode in ('RGBA', 'LA', 'PA') or 'transparency' in imagen.info
+                entrada['dhash'] = f"{dhash(imagen):016x}"
+        except (OSError, ValueError, Image.DecompressionBombError):
+            # Extensión de imagen pero otro contenido (hay un MP4 como .png):
+            # solo participa de las copias exactas
+            pass
+    return True, entrada
+
+def _distancia(a, b):
+    return bin(a ^ b).count('1')
+
+class ArbolBK:
+    """Árbol BK sobre la distancia de Hamming: buscar los hashes a distancia
+    <= radio recorre solo las ramas cuya distancia al nodo puede cumplirla"""
+
+    def __init__(self):
+        self._raiz = None
+
+    def agregar(self, clave, valor):
+        nodo = [clave, valor, {}]
+        if self._raiz is None:
+            self._raiz = nodo
+            return
+        actual = self._raiz
+        while True:
+            distancia = _distancia(clave, actual[0])
+            hijo = actual[2].get(distancia)
+            if hijo is None:
+                actual[2][distancia] = nodo
+                return
+            actual = hijo
+
+    def buscar(self, clave, radio):
+        """[(distancia, valor), ...] de los nodos a distancia <= radio, de menor a mayor"""
+        encontrados = []
+        pendientes = [self._raiz] if self._raiz is not None else []
+        while pendientes:
+            nodo = pendientes.pop()
+            distancia = _distancia(clave, nodo[0])
+            if distancia <= radio:
+                encontrados.append((distancia, nodo[1]))
+            for d, hijo in nodo[2].items():
+                if distancia - radio <= d <= distancia + radio:
+                    pendientes.append(hijo)
+        return sorted(encontrados, key=lambda e: e[0])
+
+def _compatibles(a, b):
+    """Misma proporción y misma transparencia: no se une un recorte ni un PNG
+    transparente con un JPEG"""
+    if a['alfa'] != b['alfa']:
+        return False
+    proporcion_a = a['ancho'] / a['alto']
+    proporcion_b = b['ancho'] / b['alto']
+    return abs(proporcion_a - proporcion_b) <= TOLERANCIA_PROPORCION * max(proporcion_a, proporcion_b)
+
+def _mejor(entradas, rutas):
+    """La ruta a conservar: mayor resolución y, a igualdad, menos bytes"""
+    return min(rutas, key=lambda ruta: (
+        -((entradas[ruta]['ancho'] or 0) * (entradas[ruta]['alto'] or 0)), entradas[ruta]['bytes'], ruta,
+    ))
+
+def agrupar(entradas, umbral=UMBRAL_HAMMING):
+    """Grupos de rutas con la misma imagen (solo los de más de una ruta).
+
+    Primero por hash de contenido; después cada grupo exacto se compara, por
+    su mejor versión, con los representantes de los grupos ya formados que
+    están a distancia <= umbral en el árbol BK.
+    """
+    exactos = {}
+    for ruta in sorted(entradas):
+        exactos.setdefault(entradas[ruta]['sha'], []).append(ruta)
+
+    grupos = []
+    arbol = ArbolBK()
+    for rutas in exactos.values():
+        representante = _mejor(entradas, rutas)
+        entrada = entradas[representante]
+        if entrada['dhash'] is None or umbral < 0:
+            grupos.append(rutas)
+            continue
+        clave = int(entrada['dhash'], 16)
+        for _, indice in arbol.buscar(clave, umbral):
+            if _compatibles(entrada, entradas[_mejor(entradas, grupos[indice])]):
+                grupos[indice].extend(rutas)
+                break
+        else:
+            arbol.agregar(clave, len(grupos))
+            grupos.append(rutas)
+    return [sorted(grupo) for grupo in grupos if len(grupo) > 1]
+
+def destino_unico(entradas, ruta):
+    """imagenes/_unicas/<hash>.<ext> para el contenido de la ruta"""
+    extension = Path(ruta).suffix.lower()
+    if extension == '.jpeg':
+        extension = '.jpg'
+    return f"{DIRECTORIO_UNICAS}/{entradas[ruta]['sha'][:16]}{extension}"
+
+def _formas(ruta):
+    """Cómo puede aparecer la ruta en el código: tal cual o con %XX"""
+    return dict.fromkeys([ruta, quote(ruta, safe='/()'), quote(ruta)])
+
+@lru_cache(maxsize=None)
+def _compilar_reemplazos(alias):
+    """(patrón, {forma: reemplazo}) para todas las formas de las rutas de alias"""
+    reemplazos = {}
+    for anterior, nueva in alias:
+        for forma in _formas(anterior):
+            reemplazos[forma] = nueva if forma == anterior else quote(nueva)
+    alternativas = '|'.join(re.escape(forma) for forma in sorted(reemplazos, key=len, reverse=True))
+    return re.compile(r'(?<![\w.%%-])(?:%s)(?![\w.%%-])' % alternativas), reemplazos
+
+def reescribir_referencias(archivo, alias):
+    """Cambia las referencias a imágenes unificadas de un archivo de texto.
+
+    alias es una tupla de (ruta anterior, ruta nueva): se compila una vez por proceso.
+    """
+    with open(archivo, 'r', encoding='utf-8') as f:
+        contenido = f.read()
+
+    patron, reemplazos = _compilar_reemplazos(alias)
+    nuevo_contenido, cantidad = patron.subn(lambda m: reemplazos[m.group(0)], contenido)
+    if nuevo_contenido == contenido:
+        return False
+
+    escribir_texto(archivo, nuevo_contenido)
+    print(f"✓ {archivo.name} - {cantidad} referencias actualizadas")
+    return True
+
+def cargar_json(ruta):
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def guardar_json(ruta, datos):
+    escribir_json(ruta, datos, indent=1, sort_keys=True, ensure_ascii=False)
+
+def _kb(n):
+    return f"{n / 1024:.1f} KB"
+
+def main():
+    """Informar (o, con --aplicar, unificar) las imágenes repetidas"""
+    parser = crear_parser(__doc__)
+    parser.add_argument(
+        '--aplicar', action='store_true',
+        help='mover cada grupo a imagenes/_unicas, reescribir las referencias y borrar las copias'
+    )
+    parser.add_argument(
+        '--umbral', type=int, default=UMBRAL_HAMMING,
+        help='bits distintos de hash perceptual tolerados (por defecto %(default)s, -1 = solo copias exactas)'
+    )
+    args = parser.parse_args()
+    base_dir = Path(__file__).parent
+
+    if Image is None:
+        print("⚠ Pillow no está instalado: solo se buscan copias exactas (pip install Pillow)")
+
+    imagenes = sorted(
+        ruta for ruta in (base_dir / DIRECTORIO_IMAGENES).rglob('*')
+        if ruta.is_file() and ruta.suffix.lower() in EXTENSIONES
+        and not ruta.relative_to(base_dir).as_posix().startswith(EXCLUIDOS)
+    )
+
+    # Solo se vuelven a leer las imágenes nuevas o modificadas
+    cache = cargar_json(base_dir / CACHE_HASHES)
+    entradas = {}
+    pendientes = []
+    for ruta in imagenes:
+        clave = ruta.relative_to(base_dir).as_posix()
+        stat = ruta.stat()
+        anterior = cache.get(clave)
+        # Una entrada calculada sin Pillow se recalcula cuando Pillow está
+        if anterior and anterior['mtime_ns'] == stat.st_mtime_ns and anterior['size'] == stat.st_size \
+                and (anterior['perceptual'] or Image is None):
+            entradas[clave] = anterior['entrada']
+        else:
+            pendientes.append(ruta)
+
+    print(f"\n🖼  Indexando {len(pendientes)} de {len(imagenes)} imágenes...\n")
+    resultados = procesar_archivos(analizar_imagen, pendientes, args.jobs, con_datos=True)
+    for ruta, (estado, entrada) in zip(pendientes, resultados):
+        if estado != ERROR:
+            entradas[ruta.relative_to(base_dir).as_posix()] = entrada
+    nuevo_cache = {}
+    for ruta in imagenes:
+        clave = ruta.relative_to(base_dir).as_posix()
+        if clave in entradas:
+            stat = ruta.stat()
+            nuevo_cache[clave] = {
+                'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+                'perceptual': Image is not None, 'entrada': entradas[clave],
+            }
+    if nuevo_cache != cache:
+        guardar_json(base_dir / CACHE_HASHES, nuevo_cache)
+
+    grupos = agrupar(entradas, args.umbral)
+    alias = {}
+    ahorro = 0
+    for grupo in grupos:
+        conservada = _mejor(entradas, grupo)
+        destino = destino_unico(entradas, conservada)
+        ahorro += sum(entradas[ruta]['bytes'] for ruta in grupo) - entradas[conservada]['bytes']
+        print(f"○ {destino} ← {conservada} ({_kb(entradas[conservada]['bytes'])})")
+        for ruta in grupo:
+            alias[ruta] = destino
+            if ruta != conservada:
+                exacta = entradas[ruta]['sha'] == entradas[conservada]['sha']
+                print(f"    {ruta} ({_kb(entradas[ruta]['bytes'])}, {'copia exacta' if exacta else 'similar'})")
+
+    duplicadas = sum(len(grupo) - 1 for grupo in grupos)
+    if not args.aplicar:
+        print(f"\n✅ Análisis completado (sin cambios; usar --aplicar para unificar):")
+        print(f"   - Imágenes: {len(imagenes)}")
+        print(f"   - Grupos repetidos: {len(grupos)} ({duplicadas} copias)")
+        print(f"   - Ahorro estimado: {_kb(ahorro)}\n")
+        return
+
+    print(f"\n📦 Unificando {len(grupos)} grupos en {DIRECTORIO_UNICAS}/...\n")
+    (base_dir / DIRECTORIO_UNICAS).mkdir(parents=True, exist_ok=True)
+    for grupo in grupos:
+        conservada = _mejor(entradas, grupo)
+        destino = base_dir / alias[conservada]
+        if not destino.exists():
+            escribir_bytes(destino, (base_dir / conservada).read_bytes())
+
+    archivos = sorted({
+        archivo for patron in REFERENCIAS for archivo in base_dir.glob(patron)
+        if 'node_modules' not in archivo.parts
+    })
+    estados = []
+    if alias:
+        estados = procesar_archivos(
+            partial(reescribir_referencias, alias=tuple(sorted(alias.items()))), archivos, args.jobs
+        )
+
+    for ruta in alias:
+        (base_dir / ruta).unlink(missing_ok=True)
+    guardar_json(base_dir / ALIAS_FILE, {**cargar_json(base_dir / ALIAS_FILE), **alias})
+
+    print(f"\n✅ Proceso completado:")
+    print(f"   - Grupos unificados: {len(grupos)} ({duplicadas} copias borradas)")
+    print(f"   - Archivos con referencias actualizadas: {estados.count(MODIFICADO)}")
+    print(f"   - Ahorro: {_kb(ahorro)}\n")
+
+if __name__ == '__main__':
+    main()
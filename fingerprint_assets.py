@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Script para versionar por contenido los archivos de css/ y js/
+
+Cada archivo se copia como nombre.<hash>.ext (css/tokens.css ->
+css/tokens.1a2b3c4d5e.css), las referencias <link>/<script> de todas las
+páginas pasan a apuntar a la copia versionada y service-worker.js recibe la
+lista de precache y el CACHE_NAME calculados a partir de esos hashes. Los
+navegadores con caché de un año (netlify.toml) solo descargan de nuevo los
+archivos cuyo contenido cambió. El mapa original -> versionado queda en
+asset-manifest.json.
+
+Es un paso de publicación: las copias versionadas y asset-manifest.json no
+se versionan en git, y la lista de precache original de service-worker.js
+se guarda en .service-worker-fuente.json. Con --deshacer las páginas, los
+parciales y service-worker.js vuelven a apuntar a los archivos originales y
+se borran las copias, así que el árbol queda como antes de ejecutarlo.
+"""
+
+import json
+import re
+from functools import partial
+from pathlib import Path
+
+from build_manifest import hash_bytes, hash_texto
+from build_output import escribir_bytes, escribir_json, escribir_texto, registrar_salidas
+from build_utils import MODIFICADO, crear_parser, procesar_archivos, ruta_local
+from html_regions import ABRE, iter_tokens, leer_atributos, reemplazar_regiones
+from render_partials import DIRECTORIO_PARCIALES
+from site_graph import grafo_actualizado
+
+DIRECTORIOS_ASSETS = ['css', 'js']
+ASSET_MANIFEST = 'asset-manifest.json'
+SERVICE_WORKER = 'service-worker.js'
+FUENTE_SERVICE_WORKER = '.service-worker-fuente.json'
+
+LONGITUD_HASH = 10
+# css/tokens.1a2b3c4d5e.css -> ('css/tokens', 'css')
+_VERSIONADO = re.compile(r'^(.*)\.[0-9a-f]{%d}\.(css|js)$' % LONGITUD_HASH)
+_IMPORT_CSS = re.compile(r'''@import\s+(?:url\(\s*)?(['"]?)([^'")\s;]+)\1''')
+
+def nombre_original(ruta_relativa):
+    """'css/tokens.1a2b3c4d5e.css' -> 'css/tokens.css' (y sin cambios si no está versionado)"""
+    m = _VERSIONADO.match(ruta_relativa)
+    return f"{m.group(1)}.{m.group(2)}" if m else ruta_relativa
+
+def _es_versionado(ruta):
+    return _VERSIONADO.match(ruta.name) is not None
+
+def fuentes_assets(base_dir):
+    """{ruta relativa: ruta} de los archivos originales (sin versionar) de css/ y js/"""
+    fuentes = {}
+    for directorio in DIRECTORIOS_ASSETS:
+        for ruta in sorted((base_dir / directorio).rglob('*')):
+            if ruta.suffix in ('.css', '.js') and not _es_versionado(ruta):
+                fuentes[ruta.relative_to(base_dir).as_posix()] = ruta
+    return fuentes
+
+def versionar_assets(base_dir):
+    """Crea las copias versionadas y devuelve {original: versionado} (rutas relativas)"""
+    fuentes = fuentes_assets(base_dir)
+    mapa = {}
+
+    def versionar(relativa, visitados=()):
+        """Versiona un archivo después de sus @import, que cambian su contenido"""
+        if relativa in mapa:
+            return mapa[relativa]
+        ruta = fuentes[relativa]
+        contenido = ruta.read_bytes()
+
+        if ruta.suffix == '.css':
+            texto = contenido.decode('utf-8')
+
+            def reemplazar_import(m):
+                destino = (ruta.parent / m.group(2)).resolve()
+                try:
+                    importado = destino.relative_to(base_dir.resolve()).as_posix()
+                except ValueError:
+                    return m.group(0)
+                importado = nombre_original(importado)
+                if importado not in fuentes or importado in visitados:
+                    return m.group(0)
+                versionado = versionar(importado, visitados + (relativa,))
+                nuevo = Path(versionado).name if Path(importado).parent == Path(relativa).parent else '/' + versionado
+                return m.group(0).replace(m.group(2), nuevo)
+
+            contenido = _IMPORT_CSS.sub(reemplazar_import, texto).encode('utf-8')
+
+        h = hash_bytes(contenido)[:LONGITUD_HASH]
+        destino = ruta.with_name(f"{ruta.stem}.{h}{ruta.suffix}")
+        if escribir_bytes(destino, contenido):
+            print(f"✓ {relativa} -> {destino.name}")
+
+        # Copias de versiones anteriores
+        for anterior in ruta.parent.glob(f"{ruta.stem}.*{ruta.suffix}"):
+            if anterior != destino and anterior != ruta and _es_versionado(anterior) \
+                    and Path(anterior.stem).stem == ruta.stem:
+                anterior.unlink()
+
+        mapa[relativa] = destino.relative_to(base_dir).as_posix()
+        return mapa[relativa]
+
+    for relativa in fuentes:
+        versionar(relativa)
+    return mapa
+
+def _url_versionada(url, base_dir, mapa):
+    """Misma URL apuntando a la copia versionada, o None si no es un asset versionable"""
+    ruta = ruta_local(base_dir, url)
+    if ruta is None:
+        return None
+    try:
+        relativa = ruta.relative_to(base_dir.resolve()).as_posix()
+    except ValueError:
+        return None
+    versionado = mapa.get(nombre_original(relativa))
+    if versionado is None or versionado == relativa:
+        return None
+    prefijo = '/' if url.strip().startswith('/') else ''
+    return prefijo + versionado
+
+def versionar_referencias_html(contenido, base_dir, mapa):
+    """Devuelve el HTML con <link href> y <script src> apuntando a los assets versionados"""
+    reemplazos = []
+    for token in iter_tokens(contenido):
+        if token.tipo != ABRE or token.nombre not in ('link', 'script'):
+            continue
+        etiqueta = contenido[token.inicio:token.fin]
+        atributo = 'href' if token.nombre == 'link' else 'src'
+        url = leer_atributos(etiqueta).get(atributo)
+        if not url:
+            continue
+        nueva = _url_versionada(url, base_dir, mapa)
+        if nueva is None:
+            continue
+        nueva_etiqueta = re.sub(
+            r'(\s%s\s*=\s*)(["\']?)%s\2' % (atributo, re.escape(url)),
+            lambda m: m.group(1) + m.group(2) + nueva + m.group(2),
+            etiqueta, count=1,
+        )
+        reemplazos.append((token.inicio, token.fin, nueva_etiqueta))
+    return reemplazar_regiones(contenido, reemplazos)
+
+def versionar_referencias_archivo(filepath, mapa, base_dir=None):
+    """Actualiza las referencias a assets de una página (o de un parcial, cuyas
+    URLs son relativas a base_dir)"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    new_content = versionar_referencias_html(content, base_dir or filepath.parent, mapa)
+
+    if new_content != content:
+        escribir_texto(filepath, new_content)
+        print(f"✓ {filepath.name} - Referencias actualizadas")
+        return True
+    return False
+
+_CRITICAL_RESOURCES = re.compile(r'(const CRITICAL_RESOURCES = \[)(.*?)(\n\];)', re.DOTALL)
+_CACHE_NAME = re.compile(r"const CACHE_NAME = '([^']*)';")
+
+def _con_lista(contenido, bloque, recursos, cache):
+    lista = ''.join(f"\n  '{url}'," for url in recursos).rstrip(',')
+    nuevo = contenido[:bloque.start(2)] + lista + contenido[bloque.end(2):]
+    return _CACHE_NAME.sub(f"const CACHE_NAME = '{cache}';", nuevo, count=1)
+
+def fuente_service_worker(base_dir, actuales, cache):
+    """Lista de precache y CACHE_NAME escritos a mano. Si la lista no tiene
+    assets versionados es la original y se guarda; si no, la guardada"""
+    ruta = base_dir / FUENTE_SERVICE_WORKER
+    if all(nombre_original(url.lstrip('/')) == url.lstrip('/') for url in actuales):
+        escribir_json(ruta, {'recursos': actuales, 'cache': cache}, indent=1)
+        return actuales, cache
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            fuente = json.load(f)
+        return fuente['recursos'], fuente['cache']
+    except (OSError, ValueError, KeyError):
+        # Sin el archivo, los originales de cada asset (las páginas agregadas quedan)
+        return list(dict.fromkeys('/' + nombre_original(url.lstrip('/')) if url.startswith('/') else url
+                                  for url in actuales)), cache
+
+def actualizar_service_worker(base_dir, mapa, grafo=None):
+    """Regenera CRITICAL_RESOURCES y CACHE_NAME de service-worker.js"""
+    if grafo is None:
+        grafo = grafo_actualizado(base_dir)
+    ruta = base_dir / SERVICE_WORKER
+    contenido = ruta.read_text(encoding='utf-8')
+
+    bloque = _CRITICAL_RESOURCES.search(contenido)
+    if bloque is None:
+        print(f"✗ {SERVICE_WORKER} - No se encontró CRITICAL_RESOURCES")
+        return False
+    cache = _CACHE_NAME.search(contenido)
+    actuales, _ = fuente_service_worker(
+        base_dir, re.findall(r"'([^']*)'", bloque.group(2)), cache.group(1) if cache else None
+    )
+
+    recursos = []
+    for url in actuales:
+        # Los assets locales se reemplazan por su versión actual
+        local = nombre_original(url.lstrip('/'))
+        if local in mapa:
+            url = '/' + mapa[local]
+        if url not in recursos:
+            recursos.append(url)
+
+    # Más todo lo que cargan las páginas precacheadas
+    for url in actuales:
+        pagina = url.lstrip('/')
+        if not pagina.endswith('.html') or pagina not in grafo:
+            continue
+        for relativa in grafo.assets_de(pagina, 'estilos', 'scripts'):
+            relativa = nombre_original(relativa)
+            if relativa in mapa and '/' + mapa[relativa] not in recursos:
+                recursos.append('/' + mapa[relativa])
+
+    version = hash_texto(json.dumps(recursos))[:LONGITUD_HASH]
+    nuevo = _con_lista(contenido, bloque, recursos, f"servilocal-{version}")
+
+    if nuevo == contenido:
+        return False
+    escribir_texto(ruta, nuevo)
+    print(f"✓ {SERVICE_WORKER} - Precache actualizado (servilocal-{version})")
+    return True
+
+def restaurar_service_worker(base_dir):
+    """Vuelve a poner en service-worker.js la lista de precache y el CACHE_NAME originales"""
+    ruta = base_dir / SERVICE_WORKER
+    fuente = base_dir / FUENTE_SERVICE_WORKER
+    try:
+        with open(fuente, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+    except FileNotFoundError:
+        return False
+    contenido = ruta.read_text(encoding='utf-8')
+    bloque = _CRITICAL_RESOURCES.search(contenido)
+    if bloque is None:
+        print(f"✗ {SERVICE_WORKER} - No se encontró CRITICAL_RESOURCES")
+        return False
+    nuevo = _con_lista(contenido, bloque, datos['recursos'], datos['cache'])
+    if escribir_texto(ruta, nuevo):
+        print(f"✓ {SERVICE_WORKER} - Precache original restaurado")
+    fuente.unlink()
+    return True
+
+def deshacer(base_dir, html_files, jobs):
+    """Referencias a los originales, sin copias versionadas ni asset-manifest.json"""
+    originales = {relativa: relativa for relativa in fuentes_assets(base_dir)}
+    estados = procesar_archivos(
+        partial(versionar_referencias_archivo, mapa=originales, base_dir=base_dir), html_files, jobs
+    )
+    restaurar_service_worker(base_dir)
+    copias = [
+        ruta for directorio in DIRECTORIOS_ASSETS for ruta in sorted((base_dir / directorio).rglob('*'))
+        if ruta.suffix in ('.css', '.js') and _es_versionado(ruta)
+        and nombre_original(ruta.relative_to(base_dir).as_posix()) in originales
+    ]
+    for ruta in copias:
+        ruta.unlink()
+    (base_dir / ASSET_MANIFEST).unlink(missing_ok=True)
+    return estados, copias
+
+def main():
+    """Versionar assets y actualizar todas las referencias"""
+    parser = crear_parser(__doc__)
+    parser.add_argument(
+        '--deshacer', action='store_true',
+        help='volver a los archivos originales y borrar las copias versionadas'
+    )
+    args = parser.parse_args()
+    base_dir = Path(__file__).parent
+    # Los parciales también: si no, el próximo build volvería a las URLs sin versionar
+    html_files = sorted(base_dir.glob('*.html')) + sorted((base_dir / DIRECTORIO_PARCIALES).glob('*.html'))
+
+    if args.deshacer:
+        print("\n🔖 Volviendo a los assets originales de css/ y js/...\n")
+        estados, copias = deshacer(base_dir, html_files, args.jobs)
+        print(f"\n✅ Proceso completado: {len(copias)} copias versionadas borradas, "
+              f"{estados.count(MODIFICADO)} archivos HTML actualizados\n")
+        return
+
+    print("\n🔖 Versionando assets de css/ y js/...\n")
+    mapa = versionar_assets(base_dir)
+    escribir_json(base_dir / ASSET_MANIFEST, mapa, indent=2, sort_keys=True)
+
+    estados = procesar_archivos(
+        partial(versionar_referencias_archivo, mapa=mapa, base_dir=base_dir), html_files, args.jobs
+    )
+    # El índice vuelve a leer las páginas recién reescritas
+    actualizar_service_worker(base_dir, mapa, grafo_actualizado(base_dir))
+    # Lo registra pwa.js, no una página
+    registrar_salidas(base_dir, 'fingerprint', SERVICE_WORKER)
+
+    print(f"\n✅ Proceso completado: {len(mapa)} assets versionados, "
+          f"{estados.count(MODIFICADO)} archivos HTML actualizados\n")
+
+if __name__ == '__main__':
+    main()
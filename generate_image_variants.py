@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Script para generar variantes redimensionadas de las imágenes de imagenes/
+y reescribir los <img> de las páginas con srcset/sizes.
+
+Las variantes se guardan en imagenes/_variantes/ con el hash del contenido de
+la imagen original y la calidad en el nombre, así que una imagen que no
+cambió nunca se vuelve a codificar; cambiar --formato o --calidad genera
+variantes nuevas. Los srcset que apuntan a imagenes/_variantes/ se
+regeneran en cada ejecución, así que al editar una imagen o cambiar --anchos
+las páginas no quedan apuntando a variantes borradas. Requiere Pillow
+(pip install Pillow).
+
+El sizes de cada <img> es el ancho con que lo muestra el CSS: el de su clase
+en SIZES_POR_CLASE (avatares y miniaturas de tamaño fijo) o, si no, --sizes.
+El atributo width no sirve para esto: es el ancho intrínseco de la imagen que
+escribe add_image_dimensions.py, no el que ocupa en pantalla.
+"""
+
+import io
+import json
+import re
+import sys
+from functools import partial
+from pathlib import Path
+from urllib.parse import quote
+
+from build_manifest import hash_bytes
+from build_output import escribir_bytes, escribir_json, escribir_texto
+from build_utils import MODIFICADO, ERROR, crear_parser, procesar_archivos, ruta_local
+from html_regions import (
+    agregar_atributos, iter_etiquetas, leer_atributos, quitar_atributos, reemplazar_regiones,
+)
+from site_graph import grafo_actualizado
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+DIRECTORIO_IMAGENES = 'imagenes'
+DIRECTORIO_VARIANTES = 'imagenes/_variantes'
+INDICE_VARIANTES = 'imagenes/_variantes/variantes.json'
+EXTENSIONES = {'.png', '.jpg', '.jpeg', '.webp'}
+
+ANCHOS_POR_DEFECTO = [320, 640, 960, 1280]
+SIZES_POR_DEFECTO = '100vw'
+
+# Ancho que el CSS le da a cada clase de <img> (el máximo entre sus media
+# queries). Si el <img> tiene varias, manda la última (los modificadores van
+# después de la clase base).
+SIZES_POR_CLASE = {
+    'c-result-card__media': '120px',
+    'comment-avatar': '32px',
+    'create-post-avatar': '48px',
+    'feed-profile-avatar': '60px',
+    'listings-card__avatar': '48px',
+    'listings-card__avatar--large': '80px',
+    'modal-author-avatar': '48px',
+    'nav-profile-img': '32px',
+    'post-activity-user-icon': '25px',
+    'post-avatar': '48px',
+    'service-avatar': '48px',
+    'service-avatar--large': '80px',
+    'suggestion-avatar': '40px',
+}
+
+def _nombre_seguro(stem):
+    return re.sub(r'[^A-Za-z0-9_-]+', '-', stem).strip('-') or 'imagen'
+
+def generar_variantes(ruta, base_dir, anchos, formato, calidad):
+    """Genera las variantes de una imagen que todavía no existan.
+
+    Devuelve (modificado, entrada_de_indice).
+    """
+    datos = ruta.read_bytes()
+    hash_imagen = hash_bytes(datos)[:12]
+    destino = base_dir / DIRECTORIO_VARIANTES
+    destino.mkdir(parents=True, exist_ok=True)
+
+    with Image.open(io.BytesIO(datos)) as original:
+        imagen = ImageOps.exif_transpose(original)
+        ancho, alto = imagen.size
+        extension = ruta.suffix.lower().lstrip('.') if formato == 'original' else formato
+        if extension == 'jpg':
+            extension = 'jpeg'
+
+        # Nunca se amplía: solo anchos menores al original, más el original acotado
+        objetivos = sorted({a for a in anchos if a < ancho} | {min(ancho, max(anchos))})
+
+        variantes = {}
+        generadas = 0
+        for objetivo in objetivos:
+            nombre = f"{_nombre_seguro(ruta.stem)}-{hash_imagen}-{objetivo}w-q{calidad}.{extension}"
+            salida = destino / nombre
+            variantes[str(objetivo)] = salida.relative_to(base_dir).as_posix()
+            if salida.exists():
+                continue
+
+            copia = imagen
+            if objetivo != ancho:
+                copia = imagen.resize((objetivo, max(1, round(alto * objetivo / ancho))), Image.LANCZOS)
+            if extension == 'jpeg' and copia.mode not in ('RGB', 'L'):
+                copia = copia.convert('RGB')
+            elif copia.mode == 'P':
+                copia = copia.convert('RGBA')
+
+            datos = io.BytesIO()
+            copia.save(datos, format=extension.upper(), quality=calidad, optimize=True)
+            escribir_bytes(salida, datos.getvalue())
+            generadas += 1
+
+    stat = ruta.stat()
+    entrada = {
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'hash': hash_imagen,
+        'ancho': ancho,
+        'alto': alto,
+        'formato': formato,
+        'calidad': calidad,
+        'variantes': variantes,
+    }
+    if generadas:
+        print(f"✓ {ruta.name} - {generadas} variantes generadas")
+    return generadas > 0, entrada
+
+def cargar_indice(base_dir):
+    try:
+        with open(base_dir / INDICE_VARIANTES, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def guardar_indice(base_dir, indice):
+    escribir_json(base_dir / INDICE_VARIANTES, indice, indent=1, sort_keys=True)
+
+def _vigente(entrada, ruta, base_dir, anchos, formato, calidad):
+    """True si la entrada del índice corresponde a la imagen y a las opciones
+    de esta ejecución, y sus variantes existen"""
+    if entrada is None or entrada.get('formato') != formato or entrada.get('calidad') != calidad:
+        return False
+    stat = ruta.stat()
+    if entrada['mtime_ns'] != stat.st_mtime_ns or entrada['size'] != stat.st_size:
+        return False
+    esperados = {str(a) for a in anchos if a < entrada['ancho']}
+    esperados.add(str(min(entrada['ancho'], max(anchos))))
+    return (
+        set(entrada['variantes']) == esperados
+        and all((base_dir / v).exists() for v in entrada['variantes'].values())
+    )
+
+def _srcset_generado(srcset, base_dir):
+    """True si todas las URLs del srcset son variantes generadas por este script"""
+    urls = [candidato.split()[0] for candidato in srcset.split(',') if candidato.strip()]
+    prefijo = (base_dir.resolve() / DIRECTORIO_VARIANTES).as_posix() + '/'
+    rutas = [ruta_local(base_dir, url) for url in urls]
+    return bool(rutas) and all(ruta is not None and ruta.as_posix().startswith(prefijo) for ruta in rutas)
+
+def sizes_de(atributos, sizes=SIZES_POR_DEFECTO):
+    """sizes para un <img>: el de su clase o el valor por defecto"""
+    for clase in reversed(atributos.get('class', '').split()):
+        if clase in SIZES_POR_CLASE:
+            return SIZES_POR_CLASE[clase]
+    return sizes
+
+def agregar_srcset_html(contenido, base_dir, indice, sizes=SIZES_POR_DEFECTO):
+    """Devuelve el HTML con srcset/sizes en los <img> que tienen variantes.
+
+    Un srcset escrito a mano se respeta; uno que apunta a imagenes/_variantes/
+    se vuelve a calcular (o se quita si la imagen ya no tiene variantes).
+    """
+    base_resuelta = base_dir.resolve()
+    reemplazos = []
+    for token in iter_etiquetas(contenido, 'img'):
+        etiqueta = contenido[token.inicio:token.fin]
+        atributos = leer_atributos(etiqueta)
+        if 'src' not in atributos:
+            continue
+        if 'srcset' in atributos:
+            if not _srcset_generado(atributos['srcset'], base_dir):
+                continue
+            etiqueta = quitar_atributos(etiqueta, ('srcset', 'sizes'))
+        ruta = ruta_local(base_dir, atributos['src'])
+        entrada = None if ruta is None else indice.get(ruta.relative_to(base_resuelta).as_posix())
+
+        if entrada is not None:
+            srcset = ', '.join(
+                f"{quote(variante)} {ancho}w"
+                for ancho, variante in sorted(entrada['variantes'].items(), key=lambda v: int(v[0]))
+            )
+            etiqueta = agregar_atributos(etiqueta, {'srcset': srcset, 'sizes': sizes_de(atributos, sizes)})
+        if etiqueta != contenido[token.inicio:token.fin]:
+            reemplazos.append((token.inicio, token.fin, etiqueta))
+
+    return reemplazar_regiones(contenido, reemplazos)
+
+def agregar_srcset_archivo(filepath, indice, sizes=SIZES_POR_DEFECTO):
+    """Agrega srcset/sizes a los <img> de un archivo HTML"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    new_content = agregar_srcset_html(content, filepath.parent, indice, sizes)
+
+    if new_content != content:
+        escribir_texto(filepath, new_content)
+        print(f"✓ {filepath.name} - srcset actualizado")
+        return True
+    return False
+
+def main():
+    """Generar variantes y actualizar los <img> de todas las páginas"""
+    parser = crear_parser(__doc__)
+    parser.add_argument(
+        '--anchos', default=','.join(map(str, ANCHOS_POR_DEFECTO)),
+        help='anchos de las variantes separados por coma (por defecto %(default)s)'
+    )
+    parser.add_argument(
+        '--formato', default='webp', choices=['webp', 'jpeg', 'png', 'original'],
+        help='formato de las variantes (por defecto %(default)s)'
+    )
+    parser.add_argument('--calidad', type=int, default=80, help='calidad de codificación')
+    parser.add_argument('--sizes', default=SIZES_POR_DEFECTO, help='atributo sizes por defecto')
+    args = parser.parse_args()
+
+    if Image is None:
+        print("✗ Pillow no está instalado: pip install Pillow")
+        sys.exit(1)
+
+    base_dir = Path(__file__).parent
+    anchos = sorted({int(a) for a in args.anchos.split(',') if a.strip()})
+    variantes_dir = base_dir / DIRECTORIO_VARIANTES
+
+    imagenes = sorted(
+        ruta for ruta in (base_dir / DIRECTORIO_IMAGENES).rglob('*')
+        if ruta.suffix.lower() in EXTENSIONES and variantes_dir not in ruta.parents
+    )
+    indice_previo = cargar_indice(base_dir)
+    indice = {}
+    pendientes = []
+    for ruta in imagenes:
+        clave = ruta.relative_to(base_dir).as_posix()
+        entrada = indice_previo.get(clave)
+        if _vigente(entrada, ruta, base_dir, anchos, args.formato, args.calidad):
+            indice[clave] = entrada
+        else:
+            pendientes.append(ruta)
+
+    print(f"\n🖼  Generando variantes de {len(pendientes)} de {len(imagenes)} imágenes...\n")
+
+    generar = partial(
+        generar_variantes, base_dir=base_dir, anchos=anchos,
+        formato=args.formato, calidad=args.calidad,
+    )
+    resultados = procesar_archivos(generar, pendientes, args.jobs, con_datos=True)
+    for ruta, (estado, entrada) in zip(pendientes, resultados):
+        if estado != ERROR:
+            indice[ruta.relative_to(base_dir).as_posix()] = entrada
+
+    # Variantes huérfanas (imágenes borradas o modificadas)
+    en_uso = {v for entrada in indice.values() for v in entrada['variantes'].values()}
+    for variante in variantes_dir.iterdir() if variantes_dir.exists() else []:
+        if variante.suffix != '.json' and variante.relative_to(base_dir).as_posix() not in en_uso:
+            variante.unlink()
+
+    guardar_indice(base_dir, indice)
+
+    html_files = grafo_actualizado(base_dir).archivos('imagenes')
+    estados = procesar_archivos(
+        partial(agregar_srcset_archivo, indice=indice, sizes=args.sizes),
+        html_files, args.jobs,
+    )
+
+    print(f"\n✅ Proceso completado: {sum(e == MODIFICADO for e, _ in resultados)} imágenes "
+          f"codificadas, {estados.count(MODIFICADO)} archivos HTML actualizados\n")
+
+if __name__ == '__main__':
+    main()
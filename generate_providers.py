@@ -0,0 +1,627 @@
+#!/usr/bin/env python3
+"""
+Script para generar una página estática por proveedor a partir de proveedor.html
+
+proveedor.html es la plantilla y los datos salen de un export del modelo User
+del backend: un array JSON (mongoexport --jsonArray) o JSONL, un usuario por
+línea. Se toman los usuarios con accountType "proveedor"; además de los campos
+de User.toPublic() se usan, si vienen, services, rating, reviewCount, reviews
+y coordinates ({lat, lng}). Cada página queda en proveedores/<nombre>-<id>.html.
+
+La plantilla pasa una sola vez por las etapas de build_site.py (scripts, PWA,
+navbar...) y por SeoRenderer con marcas en lugar de valores; el resultado se
+parte en literales y campos, así que cada página se arma concatenando cadenas,
+sin volver a recorrer el HTML. Los registros se leen en streaming y se reparten
+en lotes entre procesos. .proveedores-state.json guarda el hash de la plantilla
+y el de los datos de cada proveedor: solo se reescriben las páginas cuyo
+registro cambió (todas si cambió la plantilla) y se eliminan las de proveedores
+que ya no están en el dataset.
+"""
+
+import html
+import json
+import os
+import re
+import time
+import unicodedata
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from urllib.parse import quote, urljoin, urlsplit
+
+import add_schema_script
+from add_schema_script import insertar_jsonld, renderer as schema
+from build_manifest import hash_archivo, hash_json
+from build_output import escribir_json, escribir_texto, escrituras, registrar_salidas
+from build_site import ETAPAS, aplicar_etapas
+from build_utils import crear_parser
+from generate_sitemap import DIRECTORIO_PROVEEDORES
+from html_regions import (
+    ABRE, agregar_atributos, iter_tokens, leer_atributos, reemplazar_regiones, region_anidada,
+)
+from site_graph import grafo_actualizado
+from update_seo_tags import renderer as seo
+
+PLANTILLA = 'proveedor.html'
+DATOS_POR_DEFECTO = 'proveedores.jsonl'
+ESTADO_PROVEEDORES = '.proveedores-state.json'
+TAMANO_LOTE = 500
+
+# Datos de ejemplo escritos en proveedor.html que pasan a ser campos
+MUESTRA_NOMBRE = 'Carlos Martínez'
+MUESTRA_NOMBRE_CORTO = 'Carlos'
+MUESTRA_UBICACION = 'Zona Centro, Ciudad de México'
+MUESTRA_CALIFICACION = 'Calificación 4.5 de 5'
+MUESTRA_ESTRELLAS = '★★★★☆'
+
+# Mismo valor por defecto que el campo avatar del modelo User
+AVATAR_POR_DEFECTO = 'imagenes/perfile/images%20(1).png'
+UBICACION_POR_DEFECTO = 'su zona'
+DESCRIPCION_POR_DEFECTO = 'Proveedor de servicios en ServiLocal'
+
+# Separa literales de campos; no puede aparecer en un HTML válido
+MARCA = '\x00'
+
+_ATRIBUTO_URL = re.compile(r'''(\s(?:src|href|data-large|action|poster)\s*=\s*)(["'])(.*?)\2''')
+_URL_CSS = re.compile(r'''url\(\s*(["']?)([^"')]+)\1\s*\)''')
+
+# pagina, galeria, servicio y resena son listas de (literal, campo)
+Plantilla = namedtuple('Plantilla', ['pagina', 'galeria', 'servicio', 'resena'])
+
+def _marca(campo):
+    return f"{MARCA}{campo}{MARCA}"
+
+def _compilar(texto):
+    """[(literal, campo)] a partir de un texto con marcas; el último campo es None"""
+    partes = texto.split(MARCA)
+    if len(partes) % 2 == 0:
+        raise ValueError("marca de campo sin cerrar en la plantilla")
+    return [
+        (partes[i], partes[i + 1] if i + 1 < len(partes) else None)
+        for i in range(0, len(partes), 2)
+    ]
+
+def renderizar(plantilla, valores):
+    return ''.join(literal + (valores[campo] if campo else '') for literal, campo in plantilla)
+
+def _url_relativa(url):
+    """True para URLs relativas a la raíz del sitio que se rompen desde proveedores/"""
+    partes = urlsplit(url.strip())
+    return bool(partes.path) and not (
+        partes.scheme or partes.netloc or partes.path.startswith('/') or MARCA in url
+    )
+
+def _rebasar(url):
+    return '../' + url if _url_relativa(url) else url
+
+def rebasar_urls(contenido):
+    """Ajusta las URLs relativas de atributos y <style> a una página de proveedores/"""
+    reemplazos = []
+    en_style = False
+    for token in iter_tokens(contenido):
+        texto = contenido[token.inicio:token.fin]
+        if token.tipo == ABRE:
+            en_style = token.nombre == 'style'
+            nuevo = _ATRIBUTO_URL.sub(
+                lambda m: m.group(1) + m.group(2) + _rebasar(m.group(3)) + m.group(2), texto
+            )
+        elif en_style:
+            nuevo = _URL_CSS.sub(
+                lambda m: f"url({m.group(1)}{_rebasar(m.group(2))}{m.group(1)})", texto
+            )
+        else:
+            continue
+        if nuevo != texto:
+            reemplazos.append((token.inicio, token.fin, nuevo))
+    return reemplazar_regiones(contenido, reemplazos)
+
+def _primer_hijo(contenido, region, clase=None, nombre=None):
+    """Región del primer elemento dentro de region con esa clase o etiqueta"""
+    for token in iter_tokens(contenido, region.fin_apertura):
+        if token.inicio >= region.inicio_cierre:
+            return None
+        if token.tipo != ABRE:
+            continue
+        clases = leer_atributos(contenido[token.inicio:token.fin]).get('class', '').split()
+        if (clase is None or clase in clases) and (nombre is None or token.nombre == nombre):
+            return region_anidada(contenido, token)
+    return None
+
+def _lista(contenido, region, campo, item):
+    """Convierte el contenido de una lista en un campo y devuelve (reemplazo, fragmento).
+
+    El fragmento es el primer ítem de la lista con la sangría que lo precede,
+    para repetirlo una vez por elemento.
+    """
+    if item is None:
+        raise ValueError(f"la plantilla no tiene ítems de ejemplo para '{campo}'")
+    sangria = contenido[region.fin_apertura:item.inicio]
+    fin_items = region.inicio_cierre
+    while fin_items > item.fin and contenido[fin_items - 1] in ' \t\n':
+        fin_items -= 1
+    reemplazo = (region.fin_apertura, region.inicio_cierre,
+                 _marca(campo) + contenido[fin_items:region.inicio_cierre])
+    return reemplazo, sangria + contenido[item.inicio:item.fin]
+
+def _marcar_atributos(etiqueta, valores):
+    """Reemplaza el valor de los atributos indicados de una etiqueta"""
+    for atributo, valor in valores.items():
+        etiqueta = re.sub(
+            r'(\s%s\s*=\s*)"[^"]*"' % re.escape(atributo),
+            lambda m: f'{m.group(1)}"{valor}"', etiqueta, count=1,
+        )
+    return etiqueta
+
+def _marcar_galeria(item):
+    inicio = item.find('<img')
+    fin = item.find('>', inicio) + 1
+    etiqueta = _marcar_atributos(item[inicio:fin], {
+        'src': _marca('src'), 'data-large': _marca('src'), 'alt': _marca('alt'),
+    })
+    return item[:inicio] + etiqueta + item[fin:]
+
+def _marcar_resena(item):
+    item = re.sub(r'<strong>[^<]*</strong>', f'<strong>{_marca("autor")}</strong>', item, count=1)
+    item = re.sub(r'Calificación \S+ de 5', f'Calificación {_marca("calificacion")} de 5', item)
+    item = re.sub(r'(<span aria-hidden="true">)[★☆]+', r'\g<1>' + _marca('estrellas'), item, count=1)
+    item = re.sub(
+        r'(<time[^>]*datetime=")[^"]*("[^>]*>)[^<]*',
+        r'\g<1>' + _marca('fecha') + r'\g<2>' + _marca('fecha_texto'), item, count=1,
+    )
+    item = re.sub(r'(<blockquote[^>]*>)[^<]*', r'\g<1>' + _marca('texto'), item, count=1)
+    item = re.sub(r'No útil \(\d+\)', f'No útil ({_marca("no_utiles")})', item)
+    item = re.sub(r'(?<!No )Útil \(\d+\)', f'Útil ({_marca("utiles")})', item)
+    return item
+
+def marcar_plantilla(contenido):
+    """Reemplaza los datos de ejemplo del <main> de proveedor.html por marcas.
+
+    Devuelve (contenido, fragmentos) con los fragmentos de galería, servicio y
+    reseña, también con marcas.
+    """
+    main = next((region_anidada(contenido, t) for t in iter_tokens(contenido)
+                 if t.tipo == ABRE and t.nombre == 'main'), None)
+    if main is None:
+        raise ValueError("la plantilla no tiene <main>")
+
+    reemplazos = []
+    fragmentos = {}
+    fin_reemplazo = 0
+    for token in iter_tokens(contenido, main.fin_apertura):
+        if token.inicio >= main.inicio_cierre:
+            break
+        if token.tipo != ABRE or token.inicio < fin_reemplazo:
+            continue
+        etiqueta = contenido[token.inicio:token.fin]
+        atributos = leer_atributos(etiqueta)
+        clases = atributos.get('class', '').split()
+        identificador = atributos.get('id')
+
+        campo = None
+        if 'c-avatar__image' in clases:
+            reemplazos.append((token.inicio, token.fin, _marcar_atributos(etiqueta, {
+                'src': _marca('avatar'), 'alt': f"Foto de perfil de {_marca('nombre')}",
+            })))
+            continue
+        if identificador == 'map':
+            etiqueta = agregar_atributos(etiqueta, {'data-ubicacion': _marca('ubicacion')})
+            reemplazos.append((token.inicio, token.fin, etiqueta[:-1] + _marca('coordenadas') + '>'))
+            continue
+        if identificador == 'perfil-heading':
+            campo = 'nombre'
+        elif 'c-profile-description' in clases:
+            campo = 'descripcion'
+        elif identificador == 'calificacion-promedio':
+            campo = 'calificacion'
+        elif identificador in ('contador-resenas-header', 'contador-resenas'):
+            campo = 'resenas'
+
+        listas = {
+            'galleryContainer': ('galeria', 'c-gallery__item', None),
+            'c-simple-list': ('servicios', None, 'li'),
+            'c-review-list': ('lista_resenas', 'c-review', None),
+        }
+        lista = listas.get(identificador) or next(
+            (listas[c] for c in clases if c in listas), None
+        )
+
+        if campo is None and lista is None:
+            continue
+        region = region_anidada(contenido, token)
+        if region is None:
+            continue
+        if lista is not None:
+            campo_lista, clase, nombre = lista
+            item = _primer_hijo(contenido, region, clase, nombre)
+            reemplazo, fragmentos[campo_lista] = _lista(contenido, region, campo_lista, item)
+            reemplazos.append(reemplazo)
+        else:
+            reemplazos.append((region.fin_apertura, region.inicio_cierre, _marca(campo)))
+        fin_reemplazo = region.fin
+
+    faltantes = {'galeria', 'servicios', 'lista_resenas'} - set(fragmentos)
+    if faltantes:
+        raise ValueError(f"la plantilla no tiene las listas {', '.join(sorted(faltantes))}")
+
+    cuerpo = reemplazar_regiones(contenido[main.inicio:main.fin], [
+        (inicio - main.inicio, fin - main.inicio, texto) for inicio, fin, texto in reemplazos
+    ])
+    # Menciones sueltas en textos y aria-label
+    cuerpo = cuerpo.replace(MUESTRA_CALIFICACION, f"Calificación {_marca('calificacion')} de 5")
+    cuerpo = cuerpo.replace(MUESTRA_ESTRELLAS, _marca('estrellas'))
+    cuerpo = cuerpo.replace(MUESTRA_NOMBRE, _marca('nombre'))
+    cuerpo = cuerpo.replace(MUESTRA_UBICACION, _marca('ubicacion'))
+    cuerpo = re.sub(r'\b%s\b' % re.escape(MUESTRA_NOMBRE_CORTO), _marca('nombre_corto'), cuerpo)
+
+    fragmentos['galeria'] = _marcar_galeria(fragmentos['galeria'])
+    fragmentos['servicios'] = re.sub(r'(<li[^>]*>).*?(</li>)', r'\g<1>' + _marca('servicio') + r'\2',
+                                     fragmentos['servicios'], count=1, flags=re.DOTALL)
+    fragmentos['lista_resenas'] = _marcar_resena(fragmentos['lista_resenas'])
+    return contenido[:main.inicio] + cuerpo + contenido[main.fin:], fragmentos
+
+_ENTRADA_SEO = {'title': _marca('title'), 'description': _marca('description'),
+                'keywords': _marca('keywords')}
+
+def compilar_plantilla(base_dir):
+    """Plantilla de página de proveedor con las etapas de build_site ya aplicadas"""
+    contenido = (base_dir / PLANTILLA).read_text(encoding='utf-8')
+    contenido, fragmentos = marcar_plantilla(contenido)
+
+    # El SEO va primero y con la entrada del proveedor: reemplaza todo el
+    # <head> hasta las fuentes, y las etapas siguientes (PWA) vuelven a agregar
+    # lo suyo
+    contenido = seo.actualizar_head(contenido, _marca('ruta'), _ENTRADA_SEO)
+    if contenido is None:
+        raise ValueError(f"{PLANTILLA} no tiene <head>")
+    # Los hints de la plantilla salen del índice del sitio
+    grafo_actualizado(base_dir)
+    etapas = [etapa for etapa in ETAPAS if etapa.nombre not in ('seo', 'schema')]
+    contenido, _, errores = aplicar_etapas(contenido, PLANTILLA, etapas)
+    if errores:
+        raise ValueError(f"{PLANTILLA}: {'; '.join(errores)}")
+    # El JSON-LD es propio de cada proveedor: un solo campo con todos los <script>
+    contenido = insertar_jsonld(contenido, _marca('jsonld'))
+    contenido = rebasar_urls(contenido)
+
+    return Plantilla(
+        _compilar(contenido),
+        _compilar(fragmentos['galeria']),
+        _compilar(fragmentos['servicios']),
+        _compilar(fragmentos['lista_resenas']),
+    )
+
+def hash_plantilla(plantilla):
+    """Cambia si cambia la plantilla compilada o el código que la rellena"""
+    return hash_json([
+        list(plantilla), hash_archivo(__file__), hash_archivo(add_schema_script.__file__),
+    ])
+
+def _iter_array_json(f, tamano=1 << 16):
+    """Elementos de un array JSON, decodificados de a uno a medida que se leen"""
+    decodificador = json.JSONDecoder()
+    buffer = f.read(tamano).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError("se esperaba un array JSON o un archivo .jsonl")
+    buffer = buffer[1:]
+    fin_archivo = False
+    while True:
+        buffer = buffer.lstrip()
+        if buffer.startswith(','):
+            buffer = buffer[1:].lstrip()
+        if buffer.startswith(']'):
+            return
+        try:
+            valor, fin = decodificador.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if fin_archivo:
+                raise
+            trozo = f.read(tamano)
+            fin_archivo = not trozo
+            buffer += trozo
+            continue
+        yield valor
+        buffer = buffer[fin:]
+
+def iter_registros(ruta):
+    """Registros del dataset uno a uno: JSONL (.jsonl/.ndjson) o un array JSON"""
+    with open(ruta, 'r', encoding='utf-8') as f:
+        if Path(ruta).suffix in ('.jsonl', '.ndjson'):
+            for linea in f:
+                if linea.strip():
+                    yield json.loads(linea)
+        else:
+            yield from _iter_array_json(f)
+
+def _id(valor):
+    """Id como texto; mongoexport lo escribe como {"$oid": "..."}"""
+    if isinstance(valor, dict):
+        valor = valor.get('$oid')
+    return str(valor) if valor else None
+
+def slug(texto):
+    texto = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', texto.lower()).strip('-')
+
+def normalizar(registro):
+    """Datos del proveedor que aparecen en su página, o None si no es un proveedor.
+
+    Solo se toman los campos que se publican: email, teléfono, lastSeen y el
+    resto no entran en el hash, así que no provocan re-renders.
+    """
+    if registro.get('accountType') != 'proveedor':
+        return None
+    identificador = _id(registro.get('_id') or registro.get('id'))
+    nombre = (registro.get('userName') or '').strip()
+    if not identificador or not nombre:
+        return None
+    resenas = [r for r in registro.get('reviews') or [] if isinstance(r, dict)]
+    coordenadas = registro.get('coordinates') or {}
+    return {
+        'id': identificador,
+        'nombre': nombre,
+        'avatar': registro.get('avatar') or AVATAR_POR_DEFECTO,
+        'ubicacion': (registro.get('location') or '').strip(),
+        'descripcion': (registro.get('about') or '').strip(),
+        'galeria': [u for u in registro.get('gallery') or [] if isinstance(u, str) and u],
+        'servicios': [s for s in registro.get('services') or [] if isinstance(s, str) and s],
+        'calificacion': registro.get('rating'),
+        'cantidad_resenas': registro.get('reviewCount'),
+        'resenas': [
+            {
+                'autor': r.get('author') or r.get('userName') or 'Cliente',
+                'calificacion': r.get('rating') or 0,
+                'texto': r.get('comment') or r.get('text') or '',
+                'fecha': str(r.get('createdAt') or r.get('date') or '')[:10],
+                'utiles': r.get('helpful') or 0,
+                'no_utiles': r.get('notHelpful') or 0,
+            }
+            for r in resenas
+        ],
+        'coordenadas': [coordenadas['lat'], coordenadas['lng']]
+        if isinstance(coordenadas, dict) and 'lat' in coordenadas and 'lng' in coordenadas else None,
+    }
+
+def nombre_archivo(proveedor):
+    return f"{slug(proveedor['nombre']) or 'proveedor'}-{slug(proveedor['id'])[-8:]}.html"
+
+def _numero(valor):
+    return f"{round(float(valor), 1):g}"
+
+def _estrellas(calificacion):
+    llenas = max(0, min(5, int(calificacion)))
+    return '★' * llenas + '☆' * (5 - llenas)
+
+def _fecha_texto(fecha):
+    partes = fecha.split('-')
+    return '/'.join(reversed(partes)) if len(partes) == 3 else fecha
+
+def resumen(texto, limite=155):
+    if len(texto) <= limite:
+        return texto
+    return texto[:limite].rsplit(' ', 1)[0].rstrip(',.;:') + '…'
+
+def calificacion_y_resenas(proveedor):
+    """(calificación, cantidad de reseñas); sin rating se promedian las reseñas"""
+    resenas = proveedor['resenas']
+    calificacion = proveedor['calificacion']
+    if calificacion is None:
+        calificacion = sum(r['calificacion'] for r in resenas) / len(resenas) if resenas else 0
+    cantidad = proveedor['cantidad_resenas']
+    if cantidad is None:
+        cantidad = len(resenas)
+    return float(calificacion), int(cantidad)
+
+def valores_proveedor(proveedor, plantilla, ruta):
+    """Valores de los campos de la plantilla, ya escapados para HTML"""
+    e = html.escape
+    nombre = proveedor['nombre']
+    ubicacion = proveedor['ubicacion'] or UBICACION_POR_DEFECTO
+    descripcion = proveedor['descripcion'] or DESCRIPCION_POR_DEFECTO
+    resenas = proveedor['resenas']
+    calificacion, cantidad = calificacion_y_resenas(proveedor)
+
+    galeria = ''.join(
+        renderizar(plantilla.galeria, {
+            'src': e(_rebasar(url)), 'alt': e(f"Trabajo de {nombre} {i}"),
+        })
+        for i, url in enumerate(proveedor['galeria'], 1)
+    )
+    servicios = ''.join(
+        renderizar(plantilla.servicio, {'servicio': e(servicio)})
+        for servicio in proveedor['servicios']
+    )
+    lista_resenas = ''.join(
+        renderizar(plantilla.resena, {
+            'autor': e(r['autor']),
+            'calificacion': _numero(r['calificacion']),
+            'estrellas': _estrellas(r['calificacion']),
+            'fecha': e(r['fecha']),
+            'fecha_texto': e(_fecha_texto(r['fecha'])),
+            'texto': e(r['texto']),
+            'utiles': str(int(r['utiles'])),
+            'no_utiles': str(int(r['no_utiles'])),
+        })
+        for r in resenas
+    )
+
+    coordenadas = ''
+    if proveedor['coordenadas']:
+        lat, lng = proveedor['coordenadas']
+        coordenadas = f' data-lat="{float(lat)}" data-lng="{float(lng)}"'
+
+    titulo = f"{nombre} - Proveedor en {ubicacion} | ServiLocal" if proveedor['ubicacion'] \
+        else f"{nombre} - Proveedor | ServiLocal"
+    palabras_clave = ', '.join(proveedor['servicios'][:5] + [seo.config['defaultKeywords']])
+    sitio = seo.config['siteUrl'].rstrip('/') + '/'
+    jsonld = schema.bloque(schema.entidades_proveedor({
+        'nombre': nombre,
+        'descripcion': descripcion,
+        'imagen': urljoin(sitio, proveedor['avatar']),
+        'ubicacion': ubicacion,
+        'url': sitio + quote(ruta),
+        'calificacion': calificacion,
+        'cantidad_resenas': cantidad,
+        'resenas': resenas,
+    }))
+
+    return {
+        'title': e(titulo),
+        'description': e(resumen(descripcion)),
+        'keywords': e(palabras_clave),
+        'ruta': quote(ruta),
+        'nombre': e(nombre),
+        'nombre_corto': e(nombre.split()[0]),
+        'ubicacion': e(ubicacion),
+        'avatar': e(_rebasar(proveedor['avatar'])),
+        'descripcion': e(descripcion),
+        'calificacion': _numero(calificacion),
+        'estrellas': _estrellas(calificacion),
+        'resenas': str(int(cantidad)),
+        'galeria': galeria,
+        'servicios': servicios,
+        'lista_resenas': lista_resenas,
+        'coordenadas': coordenadas,
+        'jsonld': jsonld,
+    }
+
+# Estado de cada proceso del pool, fijado una vez por _inicializar
+_plantilla = None
+_salida = None
+
+def _inicializar(plantilla, salida):
+    global _plantilla, _salida
+    _plantilla, _salida = plantilla, salida
+
+def _generar_lote(lote):
+    """Genera las páginas de un lote de (proveedor, archivo). Devuelve los errores
+    y los archivos escritos, para que el proceso principal los anote"""
+    errores = []
+    for proveedor, archivo in lote:
+        try:
+            ruta = f"{DIRECTORIO_PROVEEDORES}/{archivo}"
+            contenido = renderizar(_plantilla.pagina, valores_proveedor(proveedor, _plantilla, ruta))
+            escribir_texto(_salida / archivo, contenido)
+        except Exception as e:
+            errores.append((proveedor['id'], f"{archivo} - Error: {e}"))
+    return len(lote), errores, escrituras.extraer()
+
+def _lotes(pendientes, tamano):
+    pendientes = iter(pendientes)
+    while True:
+        lote = list(islice(pendientes, tamano))
+        if not lote:
+            return
+        yield lote
+
+def generar_lotes(lotes, plantilla, salida, jobs):
+    """Resultado de _generar_lote para cada lote, en orden.
+
+    Con varios procesos se mantienen como mucho 2 lotes por proceso en vuelo,
+    así que los registros se siguen leyendo a medida que se consumen.
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if jobs == 1:
+        _inicializar(plantilla, salida)
+        for lote in lotes:
+            yield _generar_lote(lote)
+        return
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_inicializar, initargs=(plantilla, salida)
+    ) as executor:
+        en_vuelo = deque()
+        for lote in lotes:
+            en_vuelo.append(executor.submit(_generar_lote, lote))
+            if len(en_vuelo) >= jobs * 2:
+                yield en_vuelo.popleft().result()
+        while en_vuelo:
+            yield en_vuelo.popleft().result()
+
+def cargar_estado(base_dir):
+    try:
+        with open(base_dir / ESTADO_PROVEEDORES, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'plantilla': None, 'proveedores': {}}
+
+def main():
+    """Generar las páginas de los proveedores nuevos o modificados"""
+    parser = crear_parser(__doc__)
+    parser.set_defaults(jobs=0)
+    parser.add_argument(
+        'datos', nargs='?', default=DATOS_POR_DEFECTO,
+        help=f'export de usuarios en JSON o JSONL (por defecto {DATOS_POR_DEFECTO})'
+    )
+    parser.add_argument(
+        '--force', action='store_true',
+        help='regenerar todas las páginas ignorando el estado anterior'
+    )
+    args = parser.parse_args()
+    base_dir = Path(__file__).parent
+    datos = Path(args.datos)
+    if not datos.is_absolute():
+        datos = base_dir / datos
+    if not datos.is_file():
+        print(f"✗ No se encontró el dataset {args.datos}")
+        return
+
+    inicio = time.perf_counter()
+    plantilla = compilar_plantilla(base_dir)
+    hash_actual = hash_plantilla(plantilla)
+    estado = cargar_estado(base_dir)
+    anteriores = estado['proveedores']
+    misma_plantilla = not args.force and estado['plantilla'] == hash_actual
+
+    salida = base_dir / DIRECTORIO_PROVEEDORES
+    salida.mkdir(exist_ok=True)
+    existentes = {entrada.name for entrada in os.scandir(salida) if entrada.name.endswith('.html')}
+
+    print(f"\n🏭 Generando páginas de proveedores desde {datos.name}"
+          f"{'' if misma_plantilla else ' (plantilla nueva: se regeneran todas)'}...\n")
+
+    actuales = {}
+    sin_cambios = 0
+
+    def pendientes():
+        nonlocal sin_cambios
+        for registro in iter_registros(datos):
+            proveedor = normalizar(registro)
+            if proveedor is None:
+                continue
+            archivo = nombre_archivo(proveedor)
+            registro_estado = {'hash': hash_json(proveedor), 'archivo': archivo}
+            actuales[proveedor['id']] = registro_estado
+            if misma_plantilla and anteriores.get(proveedor['id']) == registro_estado \
+                    and archivo in existentes:
+                sin_cambios += 1
+                continue
+            yield proveedor, archivo
+
+    generadas = 0
+    for procesadas, errores, escritos in generar_lotes(
+        _lotes(pendientes(), TAMANO_LOTE), plantilla, salida, args.jobs
+    ):
+        escrituras.agregar(escritos)
+        generadas += procesadas - len(errores)
+        for identificador, mensaje in errores:
+            print(f"✗ {mensaje}")
+            # Sin entrada en el estado se reintenta en la próxima ejecución
+            actuales.pop(identificador, None)
+
+    # Páginas de proveedores que ya no están (o cambiaron de nombre)
+    vigentes = {datos_proveedor['archivo'] for datos_proveedor in actuales.values()}
+    eliminadas = 0
+    for archivo in existentes - vigentes:
+        (salida / archivo).unlink(missing_ok=True)
+        eliminadas += 1
+
+    escribir_json(base_dir / ESTADO_PROVEEDORES, {'plantilla': hash_actual, 'proveedores': actuales}, sort_keys=True)
+    registrar_salidas(base_dir, 'proveedores', DIRECTORIO_PROVEEDORES)
+
+    segundos = time.perf_counter() - inicio
+    print(f"✓ {generadas} páginas generadas, {sin_cambios} sin cambios, {eliminadas} eliminadas")
+    print(f"\n✅ Proceso completado: {len(actuales)} proveedores en {segundos:.1f} s\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Script para generar sitemap.xml a partir de las páginas del sitio
+
+Entran las páginas con meta tags SEO (site_graph.PAGINAS_PRINCIPALES y las
+entradas de seo-config.json) y las páginas generadas de proveedores/, salvo
+las que robots.txt bloquea o las marcadas con noindex. El <lastmod> de cada
+URL es la fecha de modificación de la página la última vez que cambió su
+contenido (hash), no la de cada build.
+
+El hash, el lastmod y el shard de cada URL se guardan en .sitemap-state.json,
+que va en git junto con sitemap.xml: en un checkout nuevo (el deploy de CI)
+las páginas tienen otra fecha de modificación pero el mismo hash, así que
+conservan su lastmod y ningún shard cambia. La fecha y el tamaño de cada
+archivo con su hash van aparte, en .sitemap-stat.json (local), para no releer
+las páginas que no se tocaron.
+
+Hasta 50.000 URLs se escribe un único sitemap.xml; por encima, sitemap.xml
+pasa a ser un índice de sitemaps/sitemap-N.xml. Cada URL queda asignada a un
+shard la primera vez que aparece (.sitemap-state.json), así que agregar
+páginas no desplaza las demás, y solo se reescriben los shards cuyo contenido
+cambió. El XML se escribe en el archivo a medida que se genera (con
+build_output.escribir_lineas), sin armar el documento en memoria.
+"""
+
+import json
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from build_manifest import hash_bytes
+from build_output import escribir_json, escribir_lineas, registrar_salidas
+from build_utils import crear_parser
+from site_graph import PAGINAS_PRINCIPALES
+from update_seo_tags import renderer as seo
+
+SITEMAP = 'sitemap.xml'
+DIRECTORIO_SHARDS = 'sitemaps'
+ESTADO_SITEMAP = '.sitemap-state.json'
+CACHE_STAT = '.sitemap-stat.json'
+DIRECTORIO_PROVEEDORES = 'proveedores'
+
+# Límite del protocolo de sitemaps por archivo
+MAX_URLS = 50000
+
+# (changefreq, priority) por página; el resto usa los valores por defecto
+PRIORIDADES = {
+    'index.html': ('daily', '1.0'),
+    'buscar.html': ('daily', '0.9'),
+    'todos_los_servicios.html': ('weekly', '0.8'),
+    'proveedor.html': ('weekly', '0.8'),
+    'ferreteria.html': ('weekly', '0.6'),
+    'corralon.html': ('weekly', '0.6'),
+    'politicas.html': ('monthly', '0.3'),
+}
+PRIORIDAD_POR_DEFECTO = ('weekly', '0.7')
+PRIORIDAD_PROVEEDOR = ('weekly', '0.6')
+
+_NOINDEX = re.compile(r'<meta\s+name="robots"\s+content="[^"]*noindex', re.IGNORECASE)
+
+def rutas_bloqueadas(base_dir):
+    """Prefijos Disallow de robots.txt para User-agent: *"""
+    try:
+        lineas = (base_dir / 'robots.txt').read_text(encoding='utf-8').splitlines()
+    except OSError:
+        return []
+    bloqueadas = []
+    aplica = False
+    for linea in lineas:
+        clave, _, valor = linea.split('#', 1)[0].partition(':')
+        clave, valor = clave.strip().lower(), valor.strip()
+        if clave == 'user-agent':
+            aplica = valor == '*'
+        elif clave == 'disallow' and aplica and valor:
+            bloqueadas.append(valor)
+    return bloqueadas
+
+def descubrir_paginas(base_dir):
+    """Rutas relativas de las páginas a publicar en el sitemap, en orden"""
+    candidatas = list(dict.fromkeys(list(PAGINAS_PRINCIPALES) + list(seo.config['pages'])))
+    proveedores = base_dir / DIRECTORIO_PROVEEDORES
+    if proveedores.is_dir():
+        for raiz, subdirs, nombres in os.walk(proveedores):
+            subdirs.sort()
+            candidatas.extend(
+                (Path(raiz) / nombre).relative_to(base_dir).as_posix()
+                for nombre in sorted(nombres) if nombre.endswith('.html')
+            )
+
+    bloqueadas = rutas_bloqueadas(base_dir)
+    return [
+        pagina for pagina in candidatas
+        if (base_dir / pagina).is_file()
+        and not any(('/' + pagina).startswith(prefijo) for prefijo in bloqueadas)
+    ]
+
+def _prioridad(pagina):
+    if pagina.startswith(DIRECTORIO_PROVEEDORES + '/'):
+        return PRIORIDAD_PROVEEDOR
+    return PRIORIDADES.get(pagina, PRIORIDAD_POR_DEFECTO)
+
+def _fecha(mtime_ns):
+    return datetime.fromtimestamp(mtime_ns / 1e9, tz=timezone.utc).strftime('%Y-%m-%d')
+
+def cargar_estado(base_dir):
+    try:
+        with open(base_dir / ESTADO_SITEMAP, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'urls': {}, 'shards': {}, 'siguiente': 0}
+
+def cargar_cache(base_dir):
+    try:
+        with open(base_dir / CACHE_STAT, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def actualizar_urls(base_dir, paginas, estado, cache):
+    """Actualiza hash/lastmod de cada página; devuelve las que cambiaron.
+
+    cache ({página: [mtime_ns, size, hash]}) evita leer las páginas cuyo stat
+    no cambió.
+    """
+    urls = {}
+    cambiadas = []
+    for pagina in paginas:
+        ruta = base_dir / pagina
+        stat = ruta.stat()
+        previo = estado['urls'].get(pagina)
+        conocido = cache.get(pagina)
+        datos = None
+        if conocido and conocido[:2] == [stat.st_mtime_ns, stat.st_size]:
+            contenido = conocido[2]
+        else:
+            datos = ruta.read_bytes()
+            contenido = hash_bytes(datos)
+            cache[pagina] = [stat.st_mtime_ns, stat.st_size, contenido]
+        if previo and previo['hash'] == contenido:
+            # También después de un checkout o un touch: se conserva el lastmod
+            urls[pagina] = previo
+            continue
+        if datos is None:
+            datos = ruta.read_bytes()
+        urls[pagina] = {
+            'hash': contenido,
+            'lastmod': _fecha(stat.st_mtime_ns),
+            'orden': previo['orden'] if previo else estado['siguiente'],
+            'shard': previo['shard'] if previo else None,
+            'noindex': _NOINDEX.search(datos.decode('utf-8', 'replace')) is not None,
+        }
+        if not previo:
+            estado['siguiente'] += 1
+        cambiadas.append(pagina)
+    estado['urls'] = urls
+    for pagina in cache.keys() - urls.keys():
+        del cache[pagina]
+    return cambiadas
+
+def asignar_shards(estado):
+    """Asigna un shard a las URLs nuevas: el primero con lugar libre"""
+    ocupacion = {}
+    for datos in estado['urls'].values():
+        if datos['shard'] is not None:
+            ocupacion[datos['shard']] = ocupacion.get(datos['shard'], 0) + 1
+    shard = 0
+    for pagina in sorted(estado['urls'], key=lambda p: estado['urls'][p]['orden']):
+        datos = estado['urls'][pagina]
+        if datos['shard'] is not None:
+            continue
+        # Se deja un lugar libre para la URL raíz que acompaña a index.html
+        while ocupacion.get(shard, 0) >= MAX_URLS - 1:
+            shard += 1
+        datos['shard'] = shard
+        ocupacion[shard] = ocupacion.get(shard, 0) + 1
+    return sorted(ocupacion)
+
+def _url(sitio, pagina):
+    return f"{sitio}/{quote(pagina)}"
+
+def lineas_urlset(sitio, entradas):
+    """XML de un <urlset>, línea a línea. entradas: [(pagina, datos)] en orden"""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for pagina, datos in entradas:
+        changefreq, priority = _prioridad(pagina)
+        urls = [_url(sitio, pagina)]
+        if pagina == 'index.html':
+            # La raíz sirve index.html
+            urls.insert(0, f"{sitio}/")
+        for url in urls:
+            yield (
+                f"  <url>\n"
+                f"    <loc>{escape(url)}</loc>\n"
+                f"    <lastmod>{datos['lastmod']}</lastmod>\n"
+                f"    <changefreq>{changefreq}</changefreq>\n"
+                f"    <priority>{priority}</priority>\n"
+                f"  </url>\n"
+            )
+    yield '</urlset>\n'
+
+def lineas_indice(sitio, shards):
+    """XML de un <sitemapindex>. shards: [(ruta relativa, lastmod)]"""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for ruta, lastmod in shards:
+        yield (
+            f"  <sitemap>\n"
+            f"    <loc>{escape(_url(sitio, ruta))}</loc>\n"
+            f"    <lastmod>{lastmod}</lastmod>\n"
+            f"  </sitemap>\n"
+        )
+    yield '</sitemapindex>\n'
+
+def escribir_si_cambia(ruta, lineas, hash_previo):
+    """Escribe las líneas a medida que se generan. Devuelve (hash, escrito)"""
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    return escribir_lineas(ruta, lineas, hash_previo)
+
+def main():
+    """Regenerar el sitemap con los shards que cambiaron"""
+    crear_parser(__doc__).parse_args()
+    base_dir = Path(__file__).parent
+    sitio = seo.config['siteUrl'].rstrip('/')
+
+    paginas = descubrir_paginas(base_dir)
+    print(f"\n🗺  Generando sitemap de {len(paginas)} páginas...\n")
+
+    estado = cargar_estado(base_dir)
+    cache = cargar_cache(base_dir)
+    cambiadas = actualizar_urls(base_dir, paginas, estado, cache)
+    shards = asignar_shards(estado)
+
+    por_shard = {shard: [] for shard in shards}
+    for pagina, datos in estado['urls'].items():
+        if not datos['noindex']:
+            por_shard[datos['shard']].append((pagina, datos))
+    for entradas in por_shard.values():
+        entradas.sort(key=lambda e: e[1]['orden'])
+
+    hashes_previos = estado.get('shards', {})
+    hashes = {}
+    escritos = 0
+
+    if len(shards) <= 1:
+        archivos = [(SITEMAP, por_shard.get(0, []))]
+    else:
+        archivos = [(f"{DIRECTORIO_SHARDS}/sitemap-{shard}.xml", por_shard[shard]) for shard in shards]
+
+    for ruta, entradas in archivos:
+        hashes[ruta], escrito = escribir_si_cambia(
+            base_dir / ruta, lineas_urlset(sitio, entradas), hashes_previos.get(ruta)
+        )
+        if escrito:
+            escritos += 1
+            print(f"✓ {ruta} - {len(entradas)} URLs")
+
+    if len(archivos) > 1:
+        indice = [
+            (ruta, max(datos['lastmod'] for _, datos in entradas))
+            for ruta, entradas in archivos if entradas
+        ]
+        hashes[SITEMAP], escrito = escribir_si_cambia(
+            base_dir / SITEMAP, lineas_indice(sitio, indice), hashes_previos.get(SITEMAP)
+        )
+        if escrito:
+            escritos += 1
+            print(f"✓ {SITEMAP} - índice de {len(indice)} sitemaps")
+
+    # Shards que ya no se usan
+    for ruta in set(hashes_previos) - set(hashes):
+        (base_dir / ruta).unlink(missing_ok=True)
+
+    estado['shards'] = hashes
+    escribir_json(base_dir / ESTADO_SITEMAP, estado, indent=1, sort_keys=True)
+    escribir_json(base_dir / CACHE_STAT, cache, sort_keys=True)
+    # robots.txt no lo genera esta etapa, pero se publica con el sitemap
+    registrar_salidas(base_dir, 'sitemap', SITEMAP, DIRECTORIO_SHARDS, 'robots.txt')
+
+    print(f"\n✅ Proceso completado: {len(paginas)} páginas ({len(cambiadas)} con cambios), "
+          f"{escritos} de {len(archivos) + (len(archivos) > 1)} archivos reescritos\n")
+
+if __name__ == '__main__':
+    main()
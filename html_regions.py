@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Tokenizador HTML incremental para localizar regiones de una página.
+
+Las transformaciones no necesitan un DOM: solo el <head>, el <header> del
+navbar, el bloque de scripts antes de </body> o las etiquetas <a>. iter_tokens
+recorre el documento de forma perezosa con búsquedas lineales (str.find), sin
+regex DOTALL que retrocedan, y cada función de región deja de leer en cuanto
+encuentra lo que busca. El contenido de <script> y <style> se trata como texto,
+así que un '</head>' dentro de un JSON inline no corta la región.
+"""
+
+import re
+from collections import namedtuple
+
+ABRE = 'abre'
+CIERRA = 'cierra'
+TEXTO = 'texto'
+COMENTARIO = 'comentario'
+OTRO = 'otro'
+
+# nombre en minúsculas para etiquetas, None para el resto
+Token = namedtuple('Token', ['tipo', 'inicio', 'fin', 'nombre'])
+
+# apertura = html[inicio:fin_apertura], cierre = html[inicio_cierre:fin]
+Region = namedtuple('Region', ['inicio', 'fin_apertura', 'inicio_cierre', 'fin'])
+
+_NOMBRE = re.compile(r'[A-Za-z][A-Za-z0-9-]*')
+# Atributos hasta el '>' final; las alternativas empiezan por caracteres
+# distintos, así que no hay retroceso aunque la etiqueta esté mal cerrada
+_RESTO_ETIQUETA = re.compile(r'''(?:[^>"']|"[^"]*"|'[^']*')*>''')
+_CIERRES_RAW = {
+    'script': re.compile(r'</script', re.IGNORECASE),
+    'style': re.compile(r'</style', re.IGNORECASE),
+}
+
+def _fin_etiqueta(html, pos):
+    m = _RESTO_ETIQUETA.match(html, pos)
+    if m:
+        return m.end()
+    gt = html.find('>', pos)
+    return len(html) if gt == -1 else gt + 1
+
+def iter_tokens(html, pos=0):
+    """Genera los tokens de html a partir de pos, solo a medida que se piden"""
+    n = len(html)
+    while pos < n:
+        lt = html.find('<', pos)
+        if lt == -1:
+            yield Token(TEXTO, pos, n, None)
+            return
+        if lt > pos:
+            yield Token(TEXTO, pos, lt, None)
+
+        if html.startswith('<!--', lt):
+            fin = html.find('-->', lt + 4)
+            fin = n if fin == -1 else fin + 3
+            yield Token(COMENTARIO, lt, fin, None)
+            pos = fin
+            continue
+
+        if html.startswith('</', lt):
+            m = _NOMBRE.match(html, lt + 2)
+            if m:
+                fin = html.find('>', m.end())
+                fin = n if fin == -1 else fin + 1
+                yield Token(CIERRA, lt, fin, m.group().lower())
+                pos = fin
+            else:
+                yield Token(TEXTO, lt, lt + 1, None)
+                pos = lt + 1
+            continue
+
+        if html.startswith('<!', lt) or html.startswith('<?', lt):
+            fin = html.find('>', lt)
+            fin = n if fin == -1 else fin + 1
+            yield Token(OTRO, lt, fin, None)
+            pos = fin
+            continue
+
+        m = _NOMBRE.match(html, lt + 1)
+        if not m:
+            yield Token(TEXTO, lt, lt + 1, None)
+            pos = lt + 1
+            continue
+
+        nombre = m.group().lower()
+        fin = _fin_etiqueta(html, m.end())
+        yield Token(ABRE, lt, fin, nombre)
+        pos = fin
+
+        # Texto crudo: se salta hasta el cierre sin tokenizar el contenido
+        cierre_raw = _CIERRES_RAW.get(nombre)
+        if cierre_raw is not None:
+            m = cierre_raw.search(html, pos)
+            cierre = n if m is None else m.start()
+            if cierre > pos:
+                yield Token(TEXTO, pos, cierre, None)
+            pos = cierre
+
+def iter_etiquetas(html, nombre, pos=0):
+    """Tokens de apertura de las etiquetas <nombre ...>"""
+    for token in iter_tokens(html, pos):
+        if token.tipo == ABRE and token.nombre == nombre:
+            yield token
+
+def _region_desde(html, apertura, nombre):
+    """Completa la región de un elemento a partir de su token de apertura"""
+    for token in iter_tokens(html, apertura.fin):
+        if token.tipo == CIERRA and token.nombre == nombre:
+            return Region(apertura.inicio, apertura.fin, token.inicio, token.fin)
+    return None
+
+def region_anidada(html, apertura):
+    """Como _region_desde, pero saltando los elementos del mismo nombre anidados
+    (un <div> dentro de otro <div>)"""
+    profundidad = 0
+    for token in iter_tokens(html, apertura.fin):
+        if token.nombre != apertura.nombre:
+            continue
+        if token.tipo == ABRE and not html.endswith('/>', token.inicio, token.fin):
+            profundidad += 1
+        elif token.tipo == CIERRA:
+            if profundidad == 0:
+                return Region(apertura.inicio, apertura.fin, token.inicio, token.fin)
+            profundidad -= 1
+    return None
+
+def buscar_head(html):
+    """Región del primer <head> literal (sin atributos), o None.
+
+    Deja de tokenizar al encontrar </head>: el <body> no se lee.
+    """
+    for token in iter_tokens(html):
+        if token.tipo == ABRE and token.nombre == 'head':
+            if html[token.inicio:token.fin] != '<head>':
+                continue
+            return _region_desde(html, token, 'head')
+        if token.tipo == ABRE and token.nombre == 'body':
+            return None
+    return None
+
+def iter_elementos(html, nombre, prefijo):
+    """Regiones de los elementos <nombre> cuya apertura empieza por prefijo.
+
+    Como un '.*?' no goloso, cada región termina en el primer cierre del mismo
+    nombre; la búsqueda continúa después de esa región.
+    """
+    pos = 0
+    while True:
+        region = None
+        for token in iter_etiquetas(html, nombre, pos):
+            if html.startswith(prefijo, token.inicio):
+                region = _region_desde(html, token, nombre)
+                break
+        if region is None:
+            return
+        yield region
+        pos = region.fin
+
+def _retroceder_espacios(html, pos):
+    while pos > 0 and html[pos - 1].isspace():
+        pos -= 1
+    return pos
+
+def bloque_scripts_final(html):
+    """Región de los <script> consecutivos justo antes del último </body>, o None.
+
+    Se busca hacia atrás desde </body>, así que el resto del documento no se lee.
+    Region.inicio es el primer <script> del bloque y Region.inicio_cierre el </body>.
+    """
+    cierre_body = html.rfind('</body>')
+    if cierre_body == -1:
+        return None
+    inicio = None
+    pos = _retroceder_espacios(html, cierre_body)
+    while html.endswith('</script>', 0, pos):
+        apertura = html.rfind('<script', 0, pos - len('</script>'))
+        if apertura == -1:
+            break
+        inicio = apertura
+        pos = _retroceder_espacios(html, apertura)
+    if inicio is None:
+        return None
+    return Region(inicio, inicio, cierre_body, cierre_body + len('</body>'))
+
+def reemplazar_regiones(html, reemplazos):
+    """Aplica [(inicio, fin, texto), ...] ordenados y sin solaparse"""
+    partes = []
+    pos = 0
+    for inicio, fin, texto in reemplazos:
+        partes.append(html[pos:inicio])
+        partes.append(texto)
+        pos = fin
+    partes.append(html[pos:])
+    return ''.join(partes)
+
+_ATRIBUTO = re.compile(
+    r'''([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?'''
+)
+
+def leer_atributos(etiqueta):
+    """Atributos de una etiqueta de apertura ('<img src="a" alt=b>') como dict"""
+    m = _NOMBRE.match(etiqueta, 1)
+    if not m:
+        return {}
+    atributos = {}
+    for a in _ATRIBUTO.finditer(etiqueta, m.end(), len(etiqueta) - 1):
+        nombre = a.group(1).lower()
+        if nombre not in atributos:
+            valor = next((v for v in a.group(2, 3, 4) if v is not None), '')
+            atributos[nombre] = valor
+    return atributos
+
+def agregar_atributos(etiqueta, nuevos):
+    """Devuelve la etiqueta con los atributos nuevos antes del '>' (o '/>') final"""
+    texto = ''.join(f' {nombre}="{valor}"' for nombre, valor in nuevos.items())
+    fin = len(etiqueta) - 1
+    if etiqueta.endswith('/>'):
+        fin -= 1
+        if etiqueta[fin - 1] == ' ':
+            fin -= 1
+    return etiqueta[:fin] + texto + etiqueta[fin:]
+
+def quitar_atributos(etiqueta, nombres):
+    """Devuelve la etiqueta sin esos atributos (con el espacio que los precede)"""
+    m = _NOMBRE.match(etiqueta, 1)
+    if not m:
+        return etiqueta
+    nombres = {nombre.lower() for nombre in nombres}
+    partes = []
+    pos = m.end()
+    for a in _ATRIBUTO.finditer(etiqueta, m.end(), len(etiqueta) - 1):
+        if a.group(1).lower() in nombres:
+            partes.append(etiqueta[pos:_retroceder_espacios(etiqueta, a.start())])
+            pos = a.end()
+    partes.append(etiqueta[pos:])
+    return etiqueta[:m.end()] + ''.join(partes)
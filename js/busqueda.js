@@ -189,6 +189,10 @@
     }
   ];
 
+  // Índice generado por build_search_index.py; sin él se filtra profesionalesDB
+  const DIRECTORIO_INDICE = 'busqueda/';
+  const RESULTADOS_POR_PAGINA = 24;
+
   // Estado de la búsqueda
   let estadoBusqueda = {
     categoria: '',
@@ -200,6 +204,15 @@
   // Referencias a elementos del DOM
   let elementos = {};
 
+  // Promesa de indice.json (null si no hay índice) y shards ya pedidos
+  let indicePromesa = null;
+  const shards = new Map();
+  let ultimaConsulta = 0;
+
+  // Resultados de la consulta actual que ya se muestran, para "Ver más"
+  let mostrados = [];
+  let totalResultados = 0;
+
   // Inicialización
   document.addEventListener('DOMContentLoaded', () => {
     inicializarElementos();
@@ -219,10 +232,30 @@
       ubicacionInput: document.getElementById('ubicacion'),
       ordenSelect: document.getElementById('orden'),
       resultadosList: document.querySelector('.c-result-list'),
-      contadorResultados: document.getElementById('resultados-count')
+      contadorResultados: document.getElementById('resultados-count'),
+      verMasButton: crearBotonVerMas()
     };
   }
 
+  /**
+   * Agrega el botón "Ver más resultados" debajo de la lista (oculto hasta
+   * que haya más resultados que los mostrados)
+   */
+  function crearBotonVerMas() {
+    const lista = document.querySelector('.c-result-list');
+    if (!lista) return null;
+
+    const boton = document.createElement('button');
+    boton.type = 'button';
+    boton.className = 'c-button c-button--secondary';
+    boton.style.marginTop = 'var(--espacio-medio)';
+    boton.textContent = 'Ver más resultados';
+    boton.hidden = true;
+    boton.addEventListener('click', verMas);
+    lista.after(boton);
+    return boton;
+  }
+
   /**
    * Configura listeners de eventos
    */
@@ -325,9 +358,266 @@
   }
 
   /**
-   * Aplica filtros y ordena resultados
+   * Aplica filtros y ordena resultados, con el índice si está disponible
    */
   function aplicarFiltros() {
+    const consulta = ++ultimaConsulta;
+
+    obtenerIndice()
+      .then(indice => {
+        if (!indice) {
+          filtrarEnMemoria();
+          return;
+        }
+        return buscarEnIndice(indice, estadoBusqueda, 0).then(({ resultados, total }) => {
+          // Descarta respuestas de consultas que ya fueron reemplazadas
+          if (consulta !== ultimaConsulta) return;
+          mostrados = resultados;
+          totalResultados = total;
+          renderizarResultados(mostrados);
+          actualizarContador(total, mostrados.length);
+        });
+      })
+      .catch(error => {
+        console.error('Error al consultar el índice de búsqueda:', error);
+        filtrarEnMemoria();
+      });
+  }
+
+  /**
+   * Agrega la página siguiente de la consulta actual a los resultados
+   */
+  function verMas() {
+    const consulta = ultimaConsulta;
+    elementos.verMasButton.disabled = true;
+
+    obtenerIndice()
+      .then(indice => buscarEnIndice(indice, estadoBusqueda, mostrados.length))
+      .then(({ resultados, total }) => {
+        if (consulta !== ultimaConsulta) return;
+        mostrados = mostrados.concat(resultados);
+        totalResultados = total;
+        renderizarResultados(mostrados, false);
+        actualizarContador(total, mostrados.length);
+      })
+      .catch(error => console.error('Error al cargar más resultados:', error))
+      .finally(() => { elementos.verMasButton.disabled = false; });
+  }
+
+  /**
+   * Carga indice.json una sola vez; null si el sitio no tiene índice
+   */
+  function obtenerIndice() {
+    if (!indicePromesa) {
+      indicePromesa = fetch(`${DIRECTORIO_INDICE}indice.json`, { cache: 'no-cache' })
+        .then(respuesta => respuesta.ok ? respuesta.json() : null)
+        .catch(() => null);
+    }
+    return indicePromesa;
+  }
+
+  /**
+   * Descarga un shard del índice (una sola vez por versión)
+   */
+  function cargarShard(indice, nombre) {
+    if (!shards.has(nombre)) {
+      const promesa = fetch(`${DIRECTORIO_INDICE}${nombre}?v=${indice.version}`)
+        .then(respuesta => {
+          if (!respuesta.ok) throw new Error(`${nombre}: ${respuesta.status}`);
+          return nombre.endsWith('.json') ? respuesta.json() : respuesta.text();
+        });
+      // Si falla se vuelve a pedir en la próxima consulta
+      promesa.catch(() => shards.delete(nombre));
+      shards.set(nombre, promesa);
+    }
+    return shards.get(nombre);
+  }
+
+  /**
+   * Normaliza el texto igual que build_search_index.py: sin tildes y en minúsculas
+   */
+  function plegar(texto) {
+    return texto.normalize('NFD').replace(/[\u0300-\u036f]/g, '').toLowerCase();
+  }
+
+  function raiz(palabra, indice) {
+    for (const sufijo of indice.sufijos) {
+      if (palabra.endsWith(sufijo) && palabra.length - sufijo.length >= indice.raizMinima) {
+        return palabra.slice(0, -sufijo.length);
+      }
+    }
+    return palabra;
+  }
+
+  /**
+   * Términos de la consulta. La última palabra, si no terminó de escribirse,
+   * se busca como prefijo.
+   */
+  function tokenizarConsulta(texto, indice) {
+    const plegado = plegar(texto);
+    const palabras = plegado.match(/[a-z0-9]+/g) || [];
+    const abierta = /[a-z0-9]$/.test(plegado);
+    const vacias = new Set(indice.vacias);
+
+    return palabras
+      .map((palabra, i) => ({
+        palabra,
+        raiz: raiz(palabra, indice),
+        prefijo: abierta && i === palabras.length - 1
+      }))
+      .filter(termino => termino.palabra.length >= indice.largoPrefijo &&
+        (termino.prefijo || !vacias.has(termino.palabra)));
+  }
+
+  /**
+   * Lista de ids a partir de las diferencias en base 36
+   */
+  function decodificarPostings(texto) {
+    const ids = [];
+    let actual = 0;
+    if (!texto) return ids;
+    for (const parte of texto.split(',')) {
+      actual += parseInt(parte, 36);
+      ids.push(actual);
+    }
+    return ids;
+  }
+
+  function intersectar(a, b) {
+    const resultado = [];
+    let i = 0;
+    let j = 0;
+    while (i < a.length && j < b.length) {
+      if (a[i] === b[j]) {
+        resultado.push(a[i]);
+        i++;
+        j++;
+      } else if (a[i] < b[j]) {
+        i++;
+      } else {
+        j++;
+      }
+    }
+    return resultado;
+  }
+
+  function unir(listas) {
+    if (listas.length === 1) return listas[0];
+    const todos = [].concat(...listas).sort((a, b) => a - b);
+    return todos.filter((id, i) => i === 0 || id !== todos[i - 1]);
+  }
+
+  /**
+   * Ids (en orden creciente) que contienen el término
+   */
+  async function postingsDeTermino(indice, termino) {
+    const prefijo = termino.raiz.slice(0, indice.largoPrefijo);
+    if (!indice.prefijos.includes(prefijo)) return [];
+
+    const shard = await cargarShard(indice, `t-${prefijo}.json`);
+    if (!termino.prefijo) {
+      return decodificarPostings(shard[termino.raiz]);
+    }
+    const listas = Object.keys(shard)
+      .filter(t => t.startsWith(termino.raiz) ||
+        (termino.palabra.startsWith(t) && t.length >= indice.raizMinima))
+      .map(t => decodificarPostings(shard[t]));
+    return listas.length ? unir(listas) : [];
+  }
+
+  /**
+   * Ids de las posiciones [desde, desde + cantidad) en el orden pedido.
+   * ids null = todos los documentos.
+   */
+  async function paginaOrdenada(indice, ids, orden, desde, cantidad) {
+    const columna = indice.ordenes.indexOf(orden);
+
+    if (ids === null) {
+      // Sin filtros: el orden completo ya viene calculado, por bloques
+      const hasta = Math.min(desde + cantidad, indice.documentos);
+      if (hasta <= desde) return [];
+      const bloques = [];
+      for (let b = Math.floor(desde / indice.bloqueClaves); b <= Math.floor((hasta - 1) / indice.bloqueClaves); b++) {
+        bloques.push(cargarShard(indice, `o-${orden}-${b}.txt`));
+      }
+      const inicio = Math.floor(desde / indice.bloqueClaves) * indice.bloqueClaves;
+      return (await Promise.all(bloques))
+        .join(',')
+        .split(',')
+        .slice(desde - inicio, hasta - inicio)
+        .map(id => parseInt(id, 36));
+    }
+
+    const bloques = [...new Set(ids.map(id => Math.floor(id / indice.bloqueClaves)))];
+    const claves = new Map();
+    await Promise.all(bloques.map(async bloque => {
+      const texto = await cargarShard(indice, `k-${bloque}.txt`);
+      claves.set(bloque, texto.split('\n')[columna]);
+    }));
+
+    const ancho = indice.anchoClave;
+    const rango = id => {
+      const posicion = (id % indice.bloqueClaves) * ancho;
+      return parseInt(claves.get(Math.floor(id / indice.bloqueClaves)).substr(posicion, ancho), 36);
+    };
+    return ids
+      .map(id => [rango(id), id])
+      .sort((a, b) => a[0] - b[0])
+      .slice(desde, desde + cantidad)
+      .map(par => par[1]);
+  }
+
+  /**
+   * Datos de tarjeta de los ids pedidos, en el mismo orden
+   */
+  async function cargarDocumentos(indice, ids) {
+    const bloques = [...new Set(ids.map(id => Math.floor(id / indice.bloqueDocumentos)))];
+    const documentos = new Map();
+    await Promise.all(bloques.map(async bloque => {
+      const filas = await cargarShard(indice, `d-${bloque}.json`);
+      for (const fila of filas) {
+        const documento = {};
+        indice.campos.forEach((campo, i) => { documento[campo] = fila[i]; });
+        documentos.set(documento.id, documento);
+      }
+    }));
+    return ids.map(id => documentos.get(id));
+  }
+
+  /**
+   * Resuelve la búsqueda descargando solo los shards que la consulta necesita.
+   * Devuelve la página de resultados que empieza en la posición desde.
+   */
+  async function buscarEnIndice(indice, estado, desde) {
+    const terminos = tokenizarConsulta(estado.ubicacion, indice);
+    const listas = [];
+
+    if (estado.categoria) {
+      listas.push(estado.categoria in indice.categorias
+        ? cargarShard(indice, `c-${estado.categoria}.txt`).then(decodificarPostings)
+        : Promise.resolve([]));
+    }
+    for (const termino of terminos) {
+      listas.push(postingsDeTermino(indice, termino));
+    }
+
+    // null = todos los documentos
+    let ids = null;
+    for (const lista of await Promise.all(listas)) {
+      ids = ids === null ? lista : intersectar(ids, lista);
+    }
+
+    const total = ids === null ? indice.documentos : ids.length;
+    const orden = indice.ordenes.includes(estado.orden) ? estado.orden : 'recomendados';
+    const pagina = await paginaOrdenada(indice, ids, orden, desde, RESULTADOS_POR_PAGINA);
+
+    return { resultados: await cargarDocumentos(indice, pagina), total };
+  }
+
+  /**
+   * Filtrado lineal de profesionalesDB, para cuando no hay índice
+   */
+  function filtrarEnMemoria() {
     let resultados = [...profesionalesDB];
 
     // Filtrar por categoría
@@ -350,6 +640,8 @@
     resultados = ordenarResultados(resultados, estadoBusqueda.orden);
 
     // Renderizar
+    mostrados = resultados;
+    totalResultados = resultados.length;
     renderizarResultados(resultados);
     actualizarContador(resultados.length);
   }
@@ -388,14 +680,20 @@
   }
 
   /**
-   * Renderiza la lista de resultados
+   * Renderiza la lista de resultados (con fundido, salvo al agregar una página)
    */
-  function renderizarResultados(resultados) {
+  function renderizarResultados(resultados, animar = true) {
     if (!elementos.resultadosList) return;
 
+    if (elementos.verMasButton) {
+      elementos.verMasButton.hidden = resultados.length >= totalResultados;
+    }
+
     // Fade out
-    elementos.resultadosList.style.opacity = '0';
     elementos.resultadosList.style.transition = 'opacity 0.3s ease';
+    if (animar) {
+      elementos.resultadosList.style.opacity = '0';
+    }
 
     setTimeout(() => {
       if (resultados.length === 0) {
@@ -425,14 +723,22 @@
 
       // Fade in
       elementos.resultadosList.style.opacity = '1';
-    }, 300);
+    }, animar ? 300 : 0);
   }
 
   /**
    * Crea el HTML de una tarjeta de resultado
    */
-  function crearTarjetaResultado(profesional) {
-    const estrellas = generarEstrellas(profesional.calificacion);
+  function crearTarjetaResultado(datos) {
+    // Los datos del índice vienen de los perfiles: se escapan antes de insertarlos
+    const profesional = escaparCampos(datos);
+    // En el índice, id es el número interno del documento; el del proveedor va aparte
+    const proveedorId = profesional.proveedor !== undefined ? profesional.proveedor : profesional.id;
+    const perfilURL = profesional.url || `proveedor.html?id=${proveedorId}`;
+    const distanciaHTML = datos.distancia === null || datos.distancia === undefined
+      ? ''
+      : ` (${profesional.distancia} km)`;
+    const estrellas = generarEstrellas(datos.calificacion);
     const imagenHTML = profesional.imagen 
       ? `<img src="${profesional.imagen}" alt="Foto de perfil de ${profesional.nombre}" class="c-result-card__media" loading="lazy">`
       : `<div class="c-result-card__media" aria-hidden="true"></div>`;
@@ -450,12 +756,12 @@
       : '';
 
     return `
-      <article class="c-result-card" data-profesional-id="${profesional.id}">
+      <article class="c-result-card" data-profesional-id="${proveedorId}">
         ${imagenHTML}
         <div class="c-result-card__body">
           <header class="c-result-card__header">
             <h3 class="c-result-card__title">
-              <a href="proveedor.html?id=${profesional.id}" class="c-result-card__link">
+              <a href="${perfilURL}" class="c-result-card__link">
                 ${profesional.nombre} – ${profesional.categoriaDisplay}
               </a>
             </h3>
@@ -472,7 +778,7 @@
               ${badgeVerificado}
               ${badgeDestacado}
               <span class="c-chip c-chip--neutral" style="font-size: 0.75rem;">
-                <i class="fas fa-map-marker-alt" aria-hidden="true"></i> ${profesional.ubicacion} (${profesional.distancia} km)
+                <i class="fas fa-map-marker-alt" aria-hidden="true"></i> ${profesional.ubicacion}${distanciaHTML}
               </span>
             </div>
           </header>
@@ -483,20 +789,20 @@
             <button 
               class="c-button js-contactar-proveedor" 
               type="button"
-              data-proveedor-id="${profesional.id}"
+              data-proveedor-id="${proveedorId}"
               data-proveedor-nombre="${profesional.nombre}"
               data-proveedor-avatar="${profesional.imagen || 'imagenes/perfile/images%20(1).png'}"
               aria-label="Contactar a ${profesional.nombre}">
               <i class="fas fa-comment-dots c-icon-left" aria-hidden="true"></i>
               Contactar
             </button>
-            <a class="c-button c-button--secondary" href="proveedor.html?id=${profesional.id}" aria-label="Ver perfil completo de ${profesional.nombre}">
+            <a class="c-button c-button--secondary" href="${perfilURL}" aria-label="Ver perfil completo de ${profesional.nombre}">
               Ver perfil
             </a>
             <button 
               class="c-button c-button--secondary c-button--icon" 
               type="button" 
-              data-favorito-id="${profesional.id}"
+              data-favorito-id="${proveedorId}"
               aria-label="Agregar a favoritos"
               aria-pressed="false"
             >
@@ -508,6 +814,19 @@
     `;
   }
 
+  /**
+   * Copia del profesional con los textos escapados para HTML
+   */
+  function escaparCampos(profesional) {
+    const escapado = {};
+    for (const [campo, valor] of Object.entries(profesional)) {
+      escapado[campo] = typeof valor === 'string'
+        ? valor.replace(/[&<>"']/g, c => ({ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' })[c])
+        : valor;
+    }
+    return escapado;
+  }
+
   /**
    * Genera estrellas de calificación
    */
@@ -526,14 +845,16 @@
   /**
    * Actualiza el contador de resultados
    */
-  function actualizarContador(cantidad) {
+  function actualizarContador(cantidad, mostrados = cantidad) {
     if (!elementos.contadorResultados) return;
 
     const texto = cantidad === 0 
       ? 'No hay profesionales disponibles'
       : cantidad === 1 
         ? 'Mostrando 1 profesional'
-        : `Mostrando ${cantidad} profesionales`;
+        : mostrados < cantidad
+          ? `Mostrando ${mostrados} de ${cantidad} profesionales`
+          : `Mostrando ${cantidad} profesionales`;
 
     elementos.contadorResultados.textContent = texto;
     anunciarAccesibilidad(`Búsqueda actualizada. ${texto}.`);
@@ -17,7 +17,12 @@ function initProveedorMap(lat = 19.4326, lng = -99.1332, containerId = 'map') {
 
     // Agregar marcador para la ubicación del proveedor
     const marker = L.marker([lat, lng]).addTo(map);
-    marker.bindPopup('<b>Ubicación del proveedor</b><br>Zona Centro, Ciudad de México').openPopup();
+    // Las páginas generadas por generate_providers.py traen la ubicación en data-ubicacion
+    const popup = document.createElement('div');
+    const titulo = document.createElement('b');
+    titulo.textContent = 'Ubicación del proveedor';
+    popup.append(titulo, document.createElement('br'), mapContainer.dataset.ubicacion || 'Zona Centro, Ciudad de México');
+    marker.bindPopup(popup).openPopup();
 
     return map;
 }
@@ -25,7 +30,14 @@ function initProveedorMap(lat = 19.4326, lng = -99.1332, containerId = 'map') {
 // Función para inicializar el mapa en la página de proveedor
 document.addEventListener('DOMContentLoaded', function() {
     // Solo inicializar si estamos en la página de proveedor
-    if (document.getElementById('map')) {
-        initProveedorMap();
+    const mapContainer = document.getElementById('map');
+    if (mapContainer) {
+        const lat = parseFloat(mapContainer.dataset.lat);
+        const lng = parseFloat(mapContainer.dataset.lng);
+        if (isNaN(lat) || isNaN(lng)) {
+            initProveedorMap();
+        } else {
+            initProveedorMap(lat, lng);
+        }
     }
 });
\ No newline at end of file
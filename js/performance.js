@@ -60,31 +60,6 @@
     lazyImages.forEach(img => cargarImagen(img));
   }
 
-  /**
-   * Preconnect a dominios externos críticos
-   */
-  function addResourceHints() {
-    const hints = [
-      { rel: 'preconnect', href: 'https://fonts.googleapis.com' },
-      { rel: 'preconnect', href: 'https://fonts.gstatic.com', crossorigin: true },
-      { rel: 'preconnect', href: 'https://cdnjs.cloudflare.com' },
-      { rel: 'dns-prefetch', href: 'https://unpkg.com' }
-    ];
-
-    hints.forEach(hint => {
-      const existente = document.querySelector(`link[rel="${hint.rel}"][href="${hint.href}"]`);
-      if (!existente) {
-        const link = document.createElement('link');
-        link.rel = hint.rel;
-        link.href = hint.href;
-        if (hint.crossorigin) {
-          link.crossOrigin = 'anonymous';
-        }
-        document.head.appendChild(link);
-      }
-    });
-  }
-
   /**
    * Optimización de fuentes con font-display: swap
    */
@@ -209,28 +184,6 @@
     }
   }
 
-  /**
-   * Prefetch de páginas probables
-   */
-  function prefetchProbablePages() {
-    const linksToPrefetch = [
-      { url: '/buscar.html', probability: 0.8 },
-      { url: '/perfil.html', probability: 0.5 }
-    ];
-
-    optimizarRenderizado(() => {
-      linksToPrefetch.forEach(({ url, probability }) => {
-        if (Math.random() < probability) {
-          const link = document.createElement('link');
-          link.rel = 'prefetch';
-          link.href = url;
-          link.as = 'document';
-          document.head.appendChild(link);
-        }
-      });
-    }, { timeout: 3000 });
-  }
-
   /**
    * Medir Web Vitals (Core Web Vitals)
    */
@@ -313,25 +266,21 @@
   // Auto-inicializar optimizaciones
   if (document.readyState === 'loading') {
     document.addEventListener('DOMContentLoaded', () => {
-      addResourceHints();
       initLazyLoading();
       optimizarFuentes();
       respectarPreferenciasMotion();
       verificarSoporteCompresion();
       cargarRecursosBajaPrioridad();
-      prefetchProbablePages();
       
       if (process.env.NODE_ENV !== 'production') {
         medirWebVitals();
       }
     });
   } else {
-    addResourceHints();
     initLazyLoading();
     optimizarFuentes();
     respectarPreferenciasMotion();
     verificarSoporteCompresion();
     cargarRecursosBajaPrioridad();
-    prefetchProbablePages();
   }
 })();
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Script para podar las reglas CSS que ninguna página usa
+
+Se construye un índice de las etiquetas, ids y clases que aparecen en todas
+las páginas HTML (incluidos sus <script> inline) y en las cadenas de js/*.js,
+que es donde los componentes arman sus clases (className = 'c-result-card',
+classList.add(...), templates). Cada selector de css/*.css se compara contra
+ese índice: los selectores sin uso se quitan de su regla y las reglas sin
+ningún selector en uso se eliminan, igual que los @keyframes que ya nadie
+referencia.
+
+Las hojas podadas se escriben en css-podado/ (las originales no se tocan) junto
+con informe.json, que detalla por regla los bytes que ocupa y las páginas o
+scripts que la usan. La comparación ignora combinadores y pseudoclases, así
+que ante la duda una regla se conserva.
+"""
+
+import re
+from functools import partial
+from pathlib import Path
+
+from build_output import escribir_json, escribir_texto
+from build_utils import ERROR, crear_parser, procesar_archivos, ruta_local
+from bundle_assets import minificar_css
+from css_rules import compilar_selector, parsear_css, partir_selectores, texto_regla
+from fingerprint_assets import nombre_original
+from html_regions import ABRE, TEXTO, iter_tokens, leer_atributos
+from site_graph import grafo_actualizado
+
+DIRECTORIO_SALIDA = 'css-podado'
+INFORME = 'informe.json'
+
+# Elementos que existen en toda página aunque el HTML no los escriba
+ETIQUETAS_IMPLICITAS = {'html', 'head', 'body'}
+
+_CADENA_JS = re.compile(r'''"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`''')
+_PALABRA = re.compile(r'[A-Za-z_-][\w-]*')
+_ANIMACION = re.compile(r'animation(?:-name)?\s*:([^;}]*)', re.IGNORECASE)
+
+class IndiceUso:
+    """Dónde aparece cada etiqueta, id y clase.
+
+    origenes_por_* asigna a cada nombre el conjunto de orígenes (páginas o
+    archivos JS) que lo usan. Las cadenas de JS que terminan en '-' o '--'
+    ('c-btn--' + variante) se guardan como prefijos: cualquier clase que
+    empiece así se considera usada por ese archivo.
+    """
+
+    def __init__(self):
+        self.etiquetas = {}
+        self.ids = {}
+        self.clases = {}
+        self.palabras_js = {}
+        self.prefijos_js = {}
+
+    @staticmethod
+    def _agregar(mapa, nombre, origen):
+        mapa.setdefault(nombre, set()).add(origen)
+
+    def agregar_js(self, codigo, origenes):
+        for cadena in _CADENA_JS.finditer(codigo):
+            texto = cadena.group()[1:-1]
+            for m in _PALABRA.finditer(texto):
+                palabra = m.group()
+                for origen in origenes:
+                    if palabra.endswith('-') and m.end() < len(texto):
+                        # Concatenación o ${...} a continuación
+                        self._agregar(self.prefijos_js, palabra, origen)
+                    self._agregar(self.palabras_js, palabra, origen)
+
+    def agregar_html(self, contenido, origen, base_dir, scripts):
+        """Indexa una página. scripts es {ruta relativa de js/: código}"""
+        for etiqueta in ETIQUETAS_IMPLICITAS:
+            self._agregar(self.etiquetas, etiqueta, origen)
+        tokens = iter_tokens(contenido)
+        for token in tokens:
+            if token.tipo != ABRE:
+                continue
+            self._agregar(self.etiquetas, token.nombre, origen)
+            atributos = leer_atributos(contenido[token.inicio:token.fin])
+            if atributos.get('id'):
+                self._agregar(self.ids, atributos['id'], origen)
+            for clase in atributos.get('class', '').split():
+                self._agregar(self.clases, clase, origen)
+            if token.nombre == 'script':
+                ruta = ruta_local(base_dir, atributos.get('src', ''))
+                if ruta is not None:
+                    # Los JS que carga la página también cuentan para ella
+                    relativa = nombre_original(ruta.relative_to(base_dir.resolve()).as_posix())
+                    if relativa in scripts:
+                        self.agregar_js(scripts[relativa], [origen])
+                siguiente = next(tokens, None)
+                if siguiente is not None and siguiente.tipo == TEXTO:
+                    self.agregar_js(contenido[siguiente.inicio:siguiente.fin], [origen])
+
+    def _origenes_nombre(self, mapa, nombre, es_clase=False):
+        origenes = set(mapa.get(nombre, ()))
+        origenes |= self.palabras_js.get(nombre, set())
+        if es_clase:
+            for prefijo, de_prefijo in self.prefijos_js.items():
+                if nombre.startswith(prefijo):
+                    origenes |= de_prefijo
+        return origenes
+
+    def origenes_selector(self, selector):
+        """Orígenes donde el selector puede coincidir, o None si no se pudo analizar"""
+        partes = compilar_selector(selector)
+        if partes is None:
+            return None
+        origenes = None
+        for _, compuesto in partes:
+            conjuntos = []
+            if compuesto.etiqueta is not None:
+                conjuntos.append(self._origenes_nombre(self.etiquetas, compuesto.etiqueta))
+            if compuesto.id is not None:
+                conjuntos.append(self._origenes_nombre(self.ids, compuesto.id))
+            for clase in compuesto.clases:
+                conjuntos.append(self._origenes_nombre(self.clases, clase, es_clase=True))
+            for conjunto in conjuntos:
+                origenes = conjunto if origenes is None else origenes & conjunto
+                if not origenes:
+                    return set()
+        # Sin etiqueta, id ni clase (*, [atributo], :root...): en todas partes
+        return origenes if origenes is not None else {'*'}
+
+def podar_hoja(css, indice):
+    """Devuelve (css_podado, entradas_del_informe)"""
+    reglas = parsear_css(css)
+    conservadas = []
+    informe = []
+    usados = []
+
+    for regla in reglas:
+        entrada = {
+            'selector': regla.prelude,
+            'medios': list(regla.medios),
+            'bytes': regla.fin - regla.inicio,
+        }
+        informe.append(entrada)
+        if regla.tipo != 'estilo':
+            conservadas.append((regla, entrada))
+            continue
+
+        selectores = []
+        origenes = set()
+        for selector in partir_selectores(regla.prelude):
+            de_selector = indice.origenes_selector(selector)
+            if de_selector is None or de_selector:
+                selectores.append(selector)
+                origenes |= de_selector or {'*'}
+
+        entrada['usado_en'] = sorted(origenes)
+        entrada['eliminada'] = not selectores
+        if len(selectores) < len(partir_selectores(regla.prelude)) and selectores:
+            entrada['selectores_eliminados'] = [
+                s for s in partir_selectores(regla.prelude) if s not in selectores
+            ]
+        if selectores:
+            conservadas.append((regla._replace(prelude=', '.join(selectores)), entrada))
+            usados.append(regla.cuerpo)
+
+    # @keyframes que ninguna regla conservada ni ningún JS nombra
+    nombres_animacion = set()
+    for cuerpo in usados:
+        for m in _ANIMACION.finditer(cuerpo):
+            nombres_animacion.update(_PALABRA.findall(m.group(1)))
+    nombres_animacion |= set(indice.palabras_js)
+    finales = []
+    for regla, entrada in conservadas:
+        nombre = regla.prelude.split()
+        if regla.tipo == 'at' and nombre[0].lower().endswith('keyframes') and len(nombre) > 1 \
+                and nombre[1] not in nombres_animacion:
+            entrada['eliminada'] = True
+            continue
+        finales.append(regla)
+
+    return _serializar(finales), informe
+
+def _serializar(reglas):
+    """CSS de las reglas, agrupando en un solo @media las reglas consecutivas que comparten contexto"""
+    bloques = []
+    for regla in reglas:
+        if bloques and bloques[-1][0] == regla.medios and regla.medios:
+            bloques[-1][1].append(regla)
+        else:
+            bloques.append((regla.medios, [regla]))
+    partes = []
+    for medios, grupo in bloques:
+        texto = '\n'.join(texto_regla(r._replace(medios=())) for r in grupo)
+        for medio in reversed(medios):
+            texto = f"{medio}{{{texto}}}"
+        partes.append(texto)
+    return minificar_css('\n'.join(partes)) + '\n'
+
+def construir_indice(base_dir):
+    """IndiceUso de todas las páginas y de js/*.js"""
+    indice = IndiceUso()
+    scripts = {}
+    for ruta in sorted((base_dir / 'js').glob('*.js')):
+        relativa = ruta.relative_to(base_dir).as_posix()
+        if nombre_original(relativa) != relativa:
+            continue
+        codigo = ruta.read_text(encoding='utf-8')
+        scripts[relativa] = codigo
+        indice.agregar_js(codigo, [relativa])
+
+    for pagina in grafo_actualizado(base_dir).archivos():
+        contenido = pagina.read_text(encoding='utf-8')
+        indice.agregar_html(contenido, pagina.name, base_dir, scripts)
+    return indice
+
+def _kb(n):
+    return f"{n / 1024:.1f} KB"
+
+def podar_archivo(hoja, indice, salida):
+    """Escribe la hoja podada en salida y devuelve (modificado, informe de la hoja)"""
+    css = hoja.read_text(encoding='utf-8')
+    podado, reglas = podar_hoja(css, indice)
+    modificado = escribir_texto(salida / hoja.name, podado)
+
+    original = len(css.encode('utf-8'))
+    final = len(podado.encode('utf-8'))
+    eliminadas = sum(1 for r in reglas if r.get('eliminada'))
+    print(f"✓ {hoja.parent.name}/{hoja.name} - {_kb(original)} → {_kb(final)} "
+          f"({eliminadas} de {len(reglas)} reglas eliminadas)")
+    return modificado, {'bytes': original, 'bytes_podado': final, 'reglas': reglas}
+
+def main():
+    """Analizar el uso de CSS y escribir las hojas podadas y el informe"""
+    parser = crear_parser(__doc__)
+    parser.add_argument('--salida', default=DIRECTORIO_SALIDA, help='directorio de las hojas podadas')
+    parser.add_argument('--top', type=int, default=10, help='reglas más pesadas a mostrar')
+    args = parser.parse_args()
+
+    base_dir = Path(__file__).parent
+    salida = base_dir / args.salida
+    salida.mkdir(exist_ok=True)
+
+    print("\n✂️  Analizando el uso de CSS en páginas y scripts...\n")
+    indice = construir_indice(base_dir)
+
+    hojas = []
+    for hoja in sorted((base_dir / 'css').glob('*.css')):
+        relativa = hoja.relative_to(base_dir).as_posix()
+        if nombre_original(relativa) == relativa:
+            hojas.append(hoja)
+    resultados = procesar_archivos(
+        partial(podar_archivo, indice=indice, salida=salida), hojas, args.jobs, con_datos=True
+    )
+    informe = {
+        hoja.relative_to(base_dir).as_posix(): datos
+        for hoja, (estado, datos) in zip(hojas, resultados) if estado != ERROR
+    }
+    total_original = sum(datos['bytes'] for datos in informe.values())
+    total_podado = sum(datos['bytes_podado'] for datos in informe.values())
+
+    escribir_json(salida / INFORME, informe, indent=1, ensure_ascii=False)
+
+    if args.top:
+        print(f"\n📊 Reglas conservadas más pesadas:")
+        pesadas = sorted(
+            ((r['bytes'], hoja, r) for hoja, datos in informe.items()
+             for r in datos['reglas'] if not r.get('eliminada') and 'usado_en' in r),
+            key=lambda x: -x[0],
+        )[:args.top]
+        for bytes_regla, hoja, regla in pesadas:
+            usos = regla['usado_en']
+            donde = 'todas' if '*' in usos else f"{len(usos)} orígenes"
+            print(f"   - {hoja} {regla['selector'][:60]} - {bytes_regla} bytes ({donde})")
+
+    ahorro = 100 - round(100 * total_podado / total_original) if total_original else 0
+    print(f"\n✅ Proceso completado: {_kb(total_original)} → {_kb(total_podado)} (-{ahorro}%)")
+    print(f"   Informe en {args.salida}/{INFORME}\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Script para renderizar los parciales (navbar, footer, scripts, PWA) en las páginas HTML
+
+Los fragmentos compartidos viven en partials/<nombre>.html y cada página declara
+dónde van con un par de comentarios:
+
+  <!-- parcial:navbar activo="buscar.html" -->
+  ...
+  <!-- /parcial:navbar -->
+
+Lo que hay entre ambos se reemplaza por el parcial renderizado con esos
+parámetros: {{clave}} se completa con el valor escapado y activo marca con
+aria-current="page" el enlace a esa página. Cada fragmento se renderiza una sola
+vez por (hash del parcial, parámetros) y build_site usa ese hash como
+dependencia de la página, así que al cambiar un parcial solo se reescriben las
+páginas que lo incluyen.
+
+Con --adoptar, los bloques de una página idénticos a un parcial (sin
+parámetros) se convierten en puntos de inclusión.
+"""
+
+import html
+import re
+from collections import namedtuple
+from pathlib import Path
+
+from build_manifest import hash_json, hash_texto
+from build_output import escribir_texto
+from build_utils import MODIFICADO, crear_parser, procesar_archivos
+from html_regions import agregar_atributos, iter_etiquetas, leer_atributos, reemplazar_regiones
+
+DIRECTORIO_PARCIALES = 'partials'
+
+_APERTURA = re.compile(r'<!-- parcial:([\w-]+)((?:\s+[\w-]+="[^"]*")*)\s*-->')
+_PARAMETRO = re.compile(r'([\w-]+)="([^"]*)"')
+_CAMPO = re.compile(r'\{\{([\w-]+)\}\}')
+
+# inicio y fin delimitan lo que hay entre los dos comentarios; bloque, los
+# comentarios incluidos
+Inclusion = namedtuple(
+    'Inclusion', ['nombre', 'parametros', 'sangria', 'inicio_bloque', 'inicio', 'fin', 'fin_bloque']
+)
+
+def cierre(nombre):
+    return f'<!-- /parcial:{nombre} -->'
+
+def apertura(nombre, parametros=()):
+    atributos = ''.join(f' {clave}="{html.escape(valor)}"' for clave, valor in parametros)
+    return f'<!-- parcial:{nombre}{atributos} -->'
+
+def punto_inclusion(nombre, sangria='  ', parametros=()):
+    """Par de comentarios vacío; el contenido lo completa la etapa de parciales"""
+    return f"{apertura(nombre, parametros)}\n{sangria}{cierre(nombre)}"
+
+def iter_inclusiones(contenido):
+    """Puntos de inclusión de la página, en orden"""
+    pos = 0
+    while True:
+        m = _APERTURA.search(contenido, pos)
+        if m is None:
+            return
+        nombre = m.group(1)
+        fin = contenido.find(cierre(nombre), m.end())
+        if fin == -1:
+            raise ValueError(f"falta {cierre(nombre)}")
+        inicio_linea = contenido.rfind('\n', 0, m.start()) + 1
+        sangria = contenido[inicio_linea:m.start()]
+        if sangria.strip():
+            sangria = ''
+        parametros = tuple(sorted(
+            (clave, html.unescape(valor)) for clave, valor in _PARAMETRO.findall(m.group(2))
+        ))
+        fin_bloque = fin + len(cierre(nombre))
+        yield Inclusion(nombre, parametros, sangria, m.start(), m.end(), fin, fin_bloque)
+        pos = fin_bloque
+
+def extraer_inclusiones(contenido):
+    """(contenido sin los puntos de inclusión, [cada punto con sus comentarios])"""
+    inclusiones = list(iter_inclusiones(contenido))
+    bloques = [contenido[i.inicio_bloque:i.fin_bloque] for i in inclusiones]
+    resto = reemplazar_regiones(contenido, [(i.inicio_bloque, i.fin_bloque, '') for i in inclusiones])
+    return resto, bloques
+
+def tiene_parcial(contenido, nombre):
+    return f'<!-- parcial:{nombre} ' in contenido or f'<!-- parcial:{nombre}-->' in contenido
+
+def _marcar_activo(texto, activo):
+    """Agrega aria-current="page" a los enlaces a la página activa"""
+    reemplazos = []
+    for etiqueta in iter_etiquetas(texto, 'a'):
+        original = texto[etiqueta.inicio:etiqueta.fin]
+        atributos = leer_atributos(original)
+        if atributos.get('href') == activo and 'aria-current' not in atributos:
+            reemplazos.append((
+                etiqueta.inicio, etiqueta.fin,
+                agregar_atributos(original, {'aria-current': 'page'}),
+            ))
+    return reemplazar_regiones(texto, reemplazos)
+
+class Parciales:
+    """Lee los parciales y guarda los fragmentos ya renderizados.
+
+    Cada archivo de partials/ se lee una sola vez por proceso (importar el
+    módulo no hace I/O). Los fragmentos se guardan por (nombre, hash del
+    parcial, parámetros): las páginas que incluyen el mismo parcial con los
+    mismos parámetros reutilizan el texto y su hash sin volver a renderizar.
+    """
+
+    def __init__(self, directorio=None):
+        self.directorio = Path(directorio or Path(__file__).parent / DIRECTORIO_PARCIALES)
+        self._fuentes = {}
+        self._fragmentos = {}
+
+    def nombres(self):
+        return sorted(ruta.stem for ruta in self.directorio.glob('*.html'))
+
+    def fuente(self, nombre):
+        """(texto, hash) de partials/<nombre>.html"""
+        fuente = self._fuentes.get(nombre)
+        if fuente is None:
+            ruta = self.directorio / f"{nombre}.html"
+            try:
+                texto = ruta.read_text(encoding='utf-8')
+            except FileNotFoundError:
+                raise ValueError(f"no existe el parcial {nombre} ({ruta.name})") from None
+            if not texto.endswith('\n'):
+                texto += '\n'
+            fuente = (texto, hash_texto(texto))
+            self._fuentes[nombre] = fuente
+        return fuente
+
+    def recargar(self, nombre):
+        """Vuelve a leer partials/<nombre>.html en el próximo uso (los fragmentos
+        ya renderizados se guardan por hash, así que siguen sirviendo)"""
+        self._fuentes.pop(nombre, None)
+
+    def _renderizar(self, nombre, parametros):
+        texto, _ = self.fuente(nombre)
+        valores = dict(parametros)
+
+        def campo(m):
+            clave = m.group(1)
+            if clave not in valores:
+                raise ValueError(f"el parcial {nombre} necesita el parámetro {clave}")
+            return html.escape(valores[clave])
+
+        texto = _CAMPO.sub(campo, texto)
+        if 'activo' in valores:
+            texto = _marcar_activo(texto, valores['activo'])
+        return texto, hash_texto(texto)
+
+    def fragmento(self, nombre, parametros=()):
+        """(texto, hash) del parcial renderizado con los parámetros"""
+        clave = (nombre, self.fuente(nombre)[1], tuple(parametros))
+        fragmento = self._fragmentos.get(clave)
+        if fragmento is None:
+            fragmento = self._renderizar(nombre, parametros)
+            self._fragmentos[clave] = fragmento
+        return fragmento
+
+    def aplicar(self, contenido):
+        """Devuelve el HTML con cada punto de inclusión renderizado"""
+        reemplazos = []
+        for inclusion in iter_inclusiones(contenido):
+            texto, _ = self.fragmento(inclusion.nombre, inclusion.parametros)
+            reemplazos.append((inclusion.inicio, inclusion.fin, '\n' + texto + inclusion.sangria))
+        return reemplazar_regiones(contenido, reemplazos)
+
+    def dependencias(self, inclusiones):
+        """Hash de los fragmentos [(nombre, parametros), ...] que usa una página:
+        cambia solo si cambia alguno"""
+        return hash_json([
+            [nombre, parametros, self.fragmento(nombre, tuple(parametros))[1]]
+            for nombre, parametros in inclusiones
+        ])
+
+    def adoptar(self, contenido):
+        """Convierte en puntos de inclusión los bloques idénticos a un parcial"""
+        for nombre in self.nombres():
+            if tiene_parcial(contenido, nombre):
+                continue
+            try:
+                texto, _ = self.fragmento(nombre)
+            except ValueError:
+                # Necesita parámetros: no se puede reconocer en la página
+                continue
+            pos = contenido.find(texto)
+            # Solo bloques de líneas completas
+            if pos == -1 or (pos > 0 and contenido[pos - 1] != '\n'):
+                continue
+            sangria = texto[:len(texto) - len(texto.lstrip(' \t'))]
+            contenido = (
+                contenido[:pos] + sangria + apertura(nombre) + '\n' + texto
+                + sangria + cierre(nombre) + '\n' + contenido[pos + len(texto):]
+            )
+        return contenido
+
+# Instancia compartida: no lee partials/ hasta el primer uso
+renderer = Parciales()
+
+def renderizar_parciales(archivo_html, adoptar=False):
+    """Renderiza los puntos de inclusión de la página"""
+
+    with open(archivo_html, 'r', encoding='utf-8') as f:
+        contenido = f.read()
+
+    nuevo_contenido = renderer.adoptar(contenido) if adoptar else contenido
+    nuevo_contenido = renderer.aplicar(nuevo_contenido)
+
+    if nuevo_contenido == contenido:
+        print(f"○ {archivo_html.name} - Sin cambios necesarios")
+        return False
+
+    escribir_texto(archivo_html, nuevo_contenido)
+
+    nombres = ', '.join(inclusion.nombre for inclusion in iter_inclusiones(nuevo_contenido))
+    print(f"✓ {archivo_html.name} - {nombres}")
+    return True
+
+def renderizar_y_adoptar(archivo_html):
+    return renderizar_parciales(archivo_html, adoptar=True)
+
+def main():
+    """Procesar todos los archivos HTML"""
+    parser = crear_parser(__doc__)
+    parser.add_argument(
+        '--adoptar', action='store_true',
+        help='convertir en puntos de inclusión los bloques idénticos a un parcial'
+    )
+    args = parser.parse_args()
+    base_dir = Path(__file__).parent
+    # site_graph importa este módulo: se importa recién acá
+    from site_graph import grafo_actualizado
+    html_files = grafo_actualizado(base_dir).archivos('parciales')
+
+    print(f"\n🧩 Renderizando parciales en {len(html_files)} archivos HTML...\n")
+
+    funcion = renderizar_y_adoptar if args.adoptar else renderizar_parciales
+    estados = procesar_archivos(funcion, html_files, args.jobs)
+    updated_count = estados.count(MODIFICADO)
+
+    print(f"\n✅ Proceso completado: {updated_count} archivos actualizados\n")
+
+if __name__ == '__main__':
+    main()
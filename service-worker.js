@@ -5,8 +5,10 @@
 
 const CACHE_NAME = 'servilocal-v1';
 const OFFLINE_URL = '/index.html';
+const VERSIONED_ASSET = /\.[0-9a-f]{10}\.(css|js)$/;
 
-// Recursos críticos para cachear al instalar
+// Recursos críticos para cachear al instalar (fingerprint_assets.py regenera
+// esta lista y CACHE_NAME a partir de los hashes de css/ y js/)
 const CRITICAL_RESOURCES = [
   '/',
   '/index.html',
@@ -20,7 +22,6 @@ const CRITICAL_RESOURCES = [
   '/js/cookies.js',
   '/js/favoritos.js',
   '/js/busqueda.js',
-  '/js/schema.js',
   '/manifest.json',
   'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.0/css/all.min.css',
   'https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap'
@@ -34,7 +35,15 @@ self.addEventListener('install', (event) => {
     caches.open(CACHE_NAME)
       .then((cache) => {
         console.log('[SW] Cacheando recursos críticos');
-        return cache.addAll(CRITICAL_RESOURCES);
+        // Los assets versionados (nombre.<hash>.css/js) no cambian nunca:
+        // si ya están en una caché anterior se copian en vez de descargarse
+        return Promise.all(CRITICAL_RESOURCES.map((url) => {
+          if (!VERSIONED_ASSET.test(url)) {
+            return cache.add(url);
+          }
+          return caches.match(url)
+            .then((cached) => cached ? cache.put(url, cached) : cache.add(url));
+        }));
       })
       .catch((error) => {
         console.error('[SW] Error al cachear recursos:', error);
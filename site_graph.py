@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Índice del sitio compartido por todas las transformaciones
+
+Guarda en .site-graph.json, por cada página HTML de la raíz, los enlaces a
+otras páginas, las hojas de estilo, scripts e imágenes locales que referencia
+(más el manifest y los íconos de sus <link>), los orígenes externos de los que
+carga recursos, los parciales que incluye y el peso de su contenido propio.
+Cada página se analiza una sola
+vez con el tokenizador de html_regions; en las ejecuciones siguientes solo se
+vuelven a leer las páginas cuyo tamaño o fecha de modificación cambió.
+
+También es el único lugar que decide qué transformación se aplica a qué
+página (REGLAS): los scripts y build_site piden grafo.paginas('seo') en lugar
+de llevar cada uno su propia lista.
+"""
+
+import argparse
+import json
+import re
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from build_manifest import hash_archivo
+from build_output import escribir_json
+from build_utils import ruta_local
+from html_regions import (
+    ABRE, buscar_head, iter_etiquetas, iter_tokens, leer_atributos, reemplazar_regiones,
+)
+from render_partials import extraer_inclusiones, iter_inclusiones
+
+GRAFO_FILE = '.site-graph.json'
+
+# Páginas de demostración: ninguna transformación las toca
+PAGINAS_DEMO = ('componentes.html',)
+
+# Páginas públicas: reciben SEO, PWA y datos estructurados (este orden es el del
+# sitemap)
+PAGINAS_PRINCIPALES = (
+    'index.html',
+    'buscar.html',
+    'perfil.html',
+    'login.html',
+    'registro.html',
+    'proveedor.html',
+    'todos_los_servicios.html',
+    'jardineria.html',
+    'plomeria.html',
+    'electricidad.html',
+    'limpieza.html',
+    'construccion.html',
+    'abogacia.html',
+    'contaduria.html',
+    'veterinaria.html',
+    'politicas.html',
+    'corralon.html',
+    'ferreteria.html',
+    'mecanica.html',
+)
+
+def todas_menos(*excluidas):
+    return lambda pagina: pagina not in excluidas
+
+def solo(paginas):
+    paginas = frozenset(paginas)
+    return lambda pagina: pagina in paginas
+
+# Transformación -> páginas a las que se aplica
+REGLAS = {
+    'scripts': todas_menos(*PAGINAS_DEMO),
+    'navbar': todas_menos(*PAGINAS_DEMO),
+    'seo': solo(PAGINAS_PRINCIPALES),
+    'pwa': solo(PAGINAS_PRINCIPALES),
+    'parciales': todas_menos(),
+    'politicas': todas_menos('politicas.html', *PAGINAS_DEMO),
+    'schema': solo(PAGINAS_PRINCIPALES),
+    'imagenes': todas_menos(*PAGINAS_DEMO),
+    'css_critico': todas_menos(*PAGINAS_DEMO),
+    'hints': todas_menos(*PAGINAS_DEMO),
+    'presupuestos': todas_menos(*PAGINAS_DEMO),
+}
+
+TIPOS_ASSET = ('estilos', 'scripts', 'imagenes')
+# <link> que cargan un archivo que no es una hoja de estilo. Van a 'otros', que
+# no está en TIPOS_ASSET: no forman parte de la carga inicial de la página
+_RELS_OTROS = {'manifest', 'icon', 'apple-touch-icon', 'apple-touch-startup-image', 'mask-icon'}
+
+def _relativa(base_dir, url):
+    """Ruta del archivo local relativa a base_dir ('css/x.css'), o None"""
+    ruta = ruta_local(base_dir, url)
+    if ruta is None:
+        return None
+    return ruta.relative_to(base_dir.resolve()).as_posix()
+
+def _urls_srcset(valor):
+    return [candidato.split()[0] for candidato in valor.split(',') if candidato.strip()]
+
+def origen_externo(url):
+    """'https://cdn.socket.io' para una URL http(s) absoluta, o None"""
+    partes = urlsplit(url.strip())
+    if partes.netloc and partes.scheme in ('http', 'https', ''):
+        return f"{partes.scheme or 'https'}://{partes.netloc}"
+    return None
+
+_ESPACIOS = re.compile(r'\s+')
+
+def peso_propio(contenido):
+    """Bytes (sin contar espacios) de lo que la página tiene fuera del <head>,
+    de los parciales y de los <script>, que es lo que escriben las etapas de
+    build_site: construir la página no lo cambia, editarla sí"""
+    head = buscar_head(contenido)
+    if head is not None:
+        contenido = contenido[:head.inicio] + contenido[head.fin:]
+    try:
+        contenido, _ = extraer_inclusiones(contenido)
+    except ValueError:
+        pass
+    scripts = []
+    for token in iter_etiquetas(contenido, 'script'):
+        cierre = contenido.find('</script>', token.fin)
+        scripts.append((token.inicio, token.fin if cierre == -1 else cierre + len('</script>'), ''))
+    return len(_ESPACIOS.sub('', reemplazar_regiones(contenido, scripts)).encode('utf-8'))
+
+def analizar_pagina(contenido, base_dir):
+    """Hechos de una página: enlaces, estilos, scripts, imágenes, otros
+    archivos de sus <link>, orígenes externos, parciales y peso propio"""
+    hechos = {
+        'enlaces': [], 'estilos': [], 'scripts': [], 'imagenes': [], 'otros': [], 'origenes': [],
+        'parciales': [],
+    }
+
+    def agregar(tipo, url):
+        relativa = _relativa(base_dir, url)
+        if relativa is None:
+            origen = origen_externo(url)
+            if origen is not None and tipo != 'enlaces' and origen not in hechos['origenes']:
+                hechos['origenes'].append(origen)
+        elif relativa not in hechos[tipo]:
+            hechos[tipo].append(relativa)
+
+    for token in iter_tokens(contenido):
+        if token.tipo != ABRE or token.nombre not in ('a', 'link', 'script', 'img', 'source'):
+            continue
+        atributos = leer_atributos(contenido[token.inicio:token.fin])
+        if token.nombre == 'a':
+            href = atributos.get('href', '')
+            if href.split('#')[0].split('?')[0].endswith('.html'):
+                agregar('enlaces', href)
+        elif token.nombre == 'link':
+            rel = set(atributos.get('rel', '').lower().split())
+            if 'stylesheet' in rel:
+                agregar('estilos', atributos.get('href', ''))
+            elif rel & _RELS_OTROS:
+                # Solo locales: un ícono externo no es un origen del que se cargan recursos
+                relativa = _relativa(base_dir, atributos.get('href', ''))
+                if relativa is not None and relativa not in hechos['otros']:
+                    hechos['otros'].append(relativa)
+        elif token.nombre == 'script':
+            if atributos.get('src'):
+                agregar('scripts', atributos['src'])
+        else:
+            for url in [atributos.get('src', '')] + _urls_srcset(atributos.get('srcset', '')):
+                if url:
+                    agregar('imagenes', url)
+
+    try:
+        hechos['parciales'] = [[i.nombre, [list(p) for p in i.parametros]] for i in iter_inclusiones(contenido)]
+    except ValueError:
+        # Punto de inclusión sin cerrar: la etapa de parciales lo informa
+        hechos['parciales'] = None
+    hechos['peso'] = peso_propio(contenido)
+    return hechos
+
+class SiteGraph:
+    """Índice persistente de páginas y de lo que referencia cada una.
+
+    actualizar() solo vuelve a analizar las páginas nuevas o modificadas;
+    guardar() escribe el archivo solo si algo cambió. El índice inverso
+    (asset -> páginas) se arma en memoria la primera vez que se consulta.
+    """
+
+    def __init__(self, base_dir, paginas=None):
+        self.base_dir = Path(base_dir)
+        self.ruta = self.base_dir / GRAFO_FILE
+        self._paginas = paginas if paginas is not None else {}
+        self._inverso = None
+        self._modificado = paginas is None
+
+    @staticmethod
+    def _version():
+        # Si cambia el análisis, el índice guardado deja de servir
+        return hash_archivo(__file__)
+
+    @classmethod
+    def cargar(cls, base_dir):
+        """Índice guardado, o uno vacío si no existe o es de otra versión"""
+        ruta = Path(base_dir) / GRAFO_FILE
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+            if datos.get('version') == cls._version():
+                return cls(base_dir, datos['paginas'])
+        except (OSError, ValueError, KeyError):
+            pass
+        return cls(base_dir)
+
+    def _entrada_actual(self, archivo, stat):
+        """(entrada, analizada): la guardada si el archivo no cambió"""
+        entrada = self._paginas.get(archivo.name)
+        if entrada is not None and entrada['mtime'] == stat.st_mtime_ns and entrada['tamano'] == stat.st_size:
+            return entrada, False
+        entrada = analizar_pagina(archivo.read_text(encoding='utf-8'), self.base_dir)
+        entrada.update(mtime=stat.st_mtime_ns, tamano=stat.st_size)
+        return entrada, True
+
+    def actualizar(self):
+        """Analiza las páginas nuevas o modificadas y olvida las borradas.
+
+        Devuelve la cantidad de páginas analizadas.
+        """
+        analizadas = 0
+        actuales = {}
+        for archivo in sorted(self.base_dir.glob('*.html')):
+            entrada, analizada = self._entrada_actual(archivo, archivo.stat())
+            analizadas += analizada
+            actuales[archivo.name] = entrada
+        if analizadas or actuales.keys() != self._paginas.keys():
+            self._modificado = True
+            self._inverso = None
+        self._paginas = actuales
+        return analizadas
+
+    def actualizar_paginas(self, nombres):
+        """Como actualizar(), pero solo revisa esas páginas (para quien ya sabe
+        qué archivos cambiaron). Devuelve la cantidad de páginas analizadas."""
+        analizadas = 0
+        cambio = False
+        for nombre in nombres:
+            archivo = self.base_dir / nombre
+            try:
+                stat = archivo.stat()
+            except FileNotFoundError:
+                cambio |= self._paginas.pop(nombre, None) is not None
+                continue
+            entrada, analizada = self._entrada_actual(archivo, stat)
+            if analizada:
+                self._paginas[nombre] = entrada
+                analizadas += 1
+                cambio = True
+        if cambio:
+            self._modificado = True
+            self._inverso = None
+        return analizadas
+
+    def guardar(self):
+        if not self._modificado:
+            return False
+        escribir_json(self.ruta, {'version': self._version(), 'paginas': self._paginas}, sort_keys=True)
+        self._modificado = False
+        return True
+
+    # Consultas
+
+    def __contains__(self, pagina):
+        return pagina in self._paginas
+
+    def paginas(self, transformacion=None):
+        """Nombres de las páginas, o solo las que reciben esa transformación"""
+        nombres = sorted(self._paginas)
+        if transformacion is None:
+            return nombres
+        aplica = REGLAS[transformacion]
+        return [nombre for nombre in nombres if aplica(nombre)]
+
+    def archivos(self, transformacion=None):
+        """Como paginas(), pero con la ruta completa"""
+        return [self.base_dir / nombre for nombre in self.paginas(transformacion)]
+
+    def transformaciones_de(self, pagina):
+        return [nombre for nombre, aplica in REGLAS.items() if aplica(pagina)]
+
+    def enlaces_de(self, pagina):
+        return list(self._paginas[pagina]['enlaces'])
+
+    def inclusiones_de(self, pagina):
+        """[(nombre, parametros), ...] de los parciales de la página, o None si
+        tiene un punto de inclusión mal formado"""
+        parciales = self._paginas[pagina]['parciales']
+        if parciales is None:
+            return None
+        return [(nombre, tuple(tuple(p) for p in parametros)) for nombre, parametros in parciales]
+
+    def tamano(self, pagina):
+        """Bytes de la página la última vez que se analizó"""
+        return self._paginas[pagina]['tamano']
+
+    def peso(self, pagina):
+        """peso_propio() de la página la última vez que se analizó"""
+        return self._paginas[pagina]['peso']
+
+    def origenes_de(self, pagina):
+        return list(self._paginas[pagina]['origenes'])
+
+    def assets_de(self, pagina, *tipos):
+        """Assets locales de la página, de los tipos pedidos (por defecto todos)"""
+        entrada = self._paginas[pagina]
+        return [ruta for tipo in tipos or TIPOS_ASSET for ruta in entrada[tipo]]
+
+    def _indice_inverso(self):
+        if self._inverso is None:
+            inverso = {}
+            for pagina, entrada in self._paginas.items():
+                for tipo in TIPOS_ASSET + ('otros', 'enlaces'):
+                    for ruta in entrada[tipo]:
+                        inverso.setdefault(ruta, []).append(pagina)
+                for nombre in dict.fromkeys(nombre for nombre, _ in entrada['parciales'] or ()):
+                    inverso.setdefault(f"parcial:{nombre}", []).append(pagina)
+            self._inverso = inverso
+        return self._inverso
+
+    def paginas_que_referencian(self, ruta):
+        """Páginas que cargan o enlazan el archivo ('js/busqueda.js', 'buscar.html')"""
+        return sorted(self._indice_inverso().get(ruta.lstrip('/'), ()))
+
+    def paginas_con_parcial(self, nombre):
+        return sorted(self._indice_inverso().get(f"parcial:{nombre}", ()))
+
+_grafos = {}
+
+def grafo_actualizado(base_dir):
+    """Carga el índice, lo pone al día y lo guarda"""
+    grafo = SiteGraph.cargar(base_dir)
+    grafo.actualizar()
+    grafo.guardar()
+    _grafos[Path(base_dir).resolve()] = grafo
+    return grafo
+
+def grafo_guardado(base_dir):
+    """El índice que dejó el último grafo_actualizado(): en el mismo proceso, el
+    mismo objeto; en los procesos del pool, leído del archivo una sola vez"""
+    clave = Path(base_dir).resolve()
+    if clave not in _grafos:
+        _grafos[clave] = SiteGraph.cargar(base_dir)
+    return _grafos[clave]
+
+def main():
+    """Actualizar el índice y responder consultas"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--referencian', metavar='RUTA', help='páginas que referencian el archivo')
+    parser.add_argument('--assets', metavar='PAGINA', help='assets de la página')
+    args = parser.parse_args()
+    base_dir = Path(__file__).parent
+
+    grafo = SiteGraph.cargar(base_dir)
+    analizadas = grafo.actualizar()
+    grafo.guardar()
+
+    if args.referencian:
+        for pagina in grafo.paginas_que_referencian(args.referencian):
+            print(pagina)
+        return
+    if args.assets:
+        if args.assets not in grafo.paginas():
+            print(f"✗ {args.assets} - No está en el índice")
+            return
+        for ruta in grafo.assets_de(args.assets):
+            print(ruta)
+        return
+
+    paginas = grafo.paginas()
+    assets = {ruta for pagina in paginas for ruta in grafo.assets_de(pagina)}
+    print(f"\n🗺  Índice del sitio ({GRAFO_FILE})\n")
+    for transformacion in REGLAS:
+        print(f"   - {transformacion}: {len(grafo.paginas(transformacion))} páginas")
+
+    print(f"\n✅ Proceso completado:")
+    print(f"   - Páginas: {len(paginas)} ({analizadas} analizadas, {len(paginas) - analizadas} sin cambios)")
+    print(f"   - Assets referenciados: {len(assets)}\n")
+
+if __name__ == '__main__':
+    main()
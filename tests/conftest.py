@@ -0,0 +1,58 @@
+"""
+Fixtures de los tests de los scripts de build
+
+Los scripts son módulos sueltos en la raíz del repositorio; los tests que los
+ejecutan enteros (build_site.py, bundle_assets.py...) lo hacen sobre una copia
+del sitio en un directorio temporal, porque escriben las páginas en su lugar.
+"""
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from render_partials import iter_inclusiones  # noqa: E402
+
+# Lo que leen los scripts de build (imagenes/ no: pesa y ninguna etapa de
+# build_site la necesita)
+DIRECTORIOS_SITIO = ('css', 'js', 'partials')
+ARCHIVOS_SITIO = ('seo-config.json', 'manifest.json', 'service-worker.js', 'presupuestos.json')
+
+@pytest.fixture
+def sitio(tmp_path):
+    """Copia de los scripts y las fuentes del sitio"""
+    for patron in ('*.py', '*.html'):
+        for ruta in RAIZ.glob(patron):
+            shutil.copy2(ruta, tmp_path / ruta.name)
+    for nombre in ARCHIVOS_SITIO:
+        if (RAIZ / nombre).exists():
+            shutil.copy2(RAIZ / nombre, tmp_path / nombre)
+    for nombre in DIRECTORIOS_SITIO:
+        shutil.copytree(RAIZ / nombre, tmp_path / nombre)
+    return tmp_path
+
+@pytest.fixture
+def ejecutar(sitio):
+    """ejecutar('build_site.py', '-j', '2') corre el script en la copia y
+    devuelve lo que imprimió; falla si termina con error"""
+    def ejecutar(script, *args):
+        resultado = subprocess.run(
+            [sys.executable, script, *args], cwd=sitio, capture_output=True, text=True,
+        )
+        assert resultado.returncode == 0, resultado.stdout + resultado.stderr
+        return resultado.stdout
+    return ejecutar
+
+def paginas(sitio):
+    """{nombre: contenido} de las páginas de la copia"""
+    return {ruta.name: ruta.read_text(encoding='utf-8') for ruta in sitio.glob('*.html')}
+
+def marcadores_balanceados(contenido):
+    """True si cada <!-- parcial:... --> tiene su cierre"""
+    inclusiones = list(iter_inclusiones(contenido))
+    return len(inclusiones) == contenido.count('<!-- /parcial:')
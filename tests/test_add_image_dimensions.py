@@ -0,0 +1,48 @@
+import struct
+
+from add_image_dimensions import CacheDimensiones, agregar_dimensiones_html, leer_dimensiones
+from html_regions import iter_etiquetas, leer_atributos
+
+def _jpeg(ancho, alto, orientacion=None):
+    """Cabecera JPEG mínima: APP1 Exif opcional y un SOF0"""
+    datos = b'\xff\xd8'
+    if orientacion is not None:
+        tiff = b'MM\x00\x2a' + struct.pack('>I', 8) + struct.pack('>H', 1)
+        tiff += struct.pack('>HHIHH', 0x0112, 3, 1, orientacion, 0) + struct.pack('>I', 0)
+        app1 = b'Exif\x00\x00' + tiff
+        datos += b'\xff\xe1' + struct.pack('>H', len(app1) + 2) + app1
+    sof = b'\x08' + struct.pack('>HH', alto, ancho) + b'\x03' + b'\x00' * 9
+    return datos + b'\xff\xc0' + struct.pack('>H', len(sof) + 2) + sof + b'\xff\xd9'
+
+def _png(ancho, alto):
+    ihdr = b'IHDR' + struct.pack('>II', ancho, alto) + b'\x08\x02\x00\x00\x00'
+    return b'\x89PNG\r\n\x1a\n' + struct.pack('>I', 13) + ihdr
+
+def test_orientacion_exif(tmp_path):
+    casos = {None: (400, 300), 1: (400, 300), 3: (400, 300), 6: (300, 400), 8: (300, 400)}
+    for orientacion, esperado in casos.items():
+        ruta = tmp_path / f'foto-{orientacion}.jpg'
+        ruta.write_bytes(_jpeg(400, 300, orientacion))
+        assert leer_dimensiones(ruta) == esperado, orientacion
+
+def _atributos(html):
+    return [leer_atributos(html[t.inicio:t.fin]) for t in iter_etiquetas(html, 'img')]
+
+def test_principal_y_lazy(tmp_path):
+    (tmp_path / 'grande.png').write_bytes(_png(800, 600))
+    (tmp_path / 'chica.png').write_bytes(_png(40, 40))
+    html = (
+        '<header><img src="chica.png"></header>'
+        '<img src="chica.png" class="avatar"><img src="grande.png"><img src="grande.png">'
+    )
+    imagenes = _atributos(agregar_dimensiones_html(html, tmp_path, CacheDimensiones()))
+    assert [i.get('loading') for i in imagenes] == ['lazy', 'lazy', None, 'lazy']
+    assert imagenes[2]['fetchpriority'] == 'high'
+    assert imagenes[2]['width'] == '800' and imagenes[2]['height'] == '600'
+
+def test_lazy_sin_imagen_principal(tmp_path):
+    (tmp_path / 'chica.png').write_bytes(_png(40, 40))
+    html = '<img src="chica.png"><img src="chica.png">'
+    imagenes = _atributos(agregar_dimensiones_html(html, tmp_path, CacheDimensiones()))
+    assert [i.get('loading') for i in imagenes] == ['lazy', 'lazy']
+    assert not any('fetchpriority' in i for i in imagenes)
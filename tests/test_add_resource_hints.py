@@ -0,0 +1,54 @@
+from add_resource_hints import MARCA, PRESUPUESTO_BYTES, ResourceHints
+from site_graph import SiteGraph
+
+def _sitio(tmp_path, cuerpo_b='<p>b</p>', generado_b=''):
+    (tmp_path / 'css').mkdir(exist_ok=True)
+    (tmp_path / 'css' / 'tokens.css').write_text(':root { --a: 1; }\n', encoding='utf-8')
+    (tmp_path / 'css' / 'components.css').write_text('@import "tokens.css";\n', encoding='utf-8')
+    (tmp_path / 'a.html').write_text(
+        '<html>\n<head>\n  <link rel="stylesheet" href="css/components.css">\n</head>\n<body>\n'
+        '  <a href="b.html">b</a> <a href="b.html">b</a> <a href="c.html">c</a> <a href="d.html">d</a>\n'
+        '</body>\n</html>\n', encoding='utf-8'
+    )
+    (tmp_path / 'b.html').write_text(
+        f'<html><head>{generado_b}</head><body>{cuerpo_b}<script>{generado_b}</script></body></html>',
+        encoding='utf-8',
+    )
+    (tmp_path / 'c.html').write_text('<a href="d.html">d</a>', encoding='utf-8')
+    (tmp_path / 'd.html').write_text('<p>d</p>', encoding='utf-8')
+    grafo = SiteGraph(tmp_path)
+    grafo.actualizar()
+    return grafo
+
+def test_hints(tmp_path):
+    grafo = _sitio(tmp_path)
+    hints = ResourceHints(navegacion={})
+    contenido = (tmp_path / 'a.html').read_text(encoding='utf-8')
+    assert hints.calcular(contenido, 'a.html', grafo) == [
+        ('preload', 'css/tokens.css', ' as="style"'),
+        ('prefetch', 'b.html', ''),
+        # c.html y d.html tienen un enlace cada una: d.html es la más enlazada del sitio
+        ('prefetch', 'd.html', ''),
+    ]
+    resultado = hints.aplicar(contenido, 'a.html', grafo)
+    assert resultado.count(MARCA) == 3
+    assert hints.aplicar(resultado, 'a.html', grafo) == resultado
+
+def test_no_dependen_de_lo_que_el_build_escribe_en_otras_paginas(tmp_path):
+    """Si los hints cambiaran con lo que build_site escribe en b.html (<head>,
+    parciales, scripts), el build que reescribe b.html dejaría a.html
+    desactualizada hasta la pasada siguiente"""
+    hints = ResourceHints(navegacion={})
+    grafo = _sitio(tmp_path)
+    contenido = (tmp_path / 'a.html').read_text(encoding='utf-8')
+    antes = hints.calcular(contenido, 'a.html', grafo), hints.dependencias('a.html', grafo)
+
+    grafo = _sitio(tmp_path, generado_b='x' * 200 * 1024)
+    assert (hints.calcular(contenido, 'a.html', grafo), hints.dependencias('a.html', grafo)) == antes
+
+def test_prefetch_dentro_del_presupuesto(tmp_path):
+    grafo = _sitio(tmp_path, cuerpo_b='<p>' + 'x' * PRESUPUESTO_BYTES + '</p>')
+    contenido = (tmp_path / 'a.html').read_text(encoding='utf-8')
+    # b.html no entra en el presupuesto: se saltea y entran las siguientes
+    assert [href for rel, href, _ in ResourceHints(navegacion={}).calcular(contenido, 'a.html', grafo)
+            if rel == 'prefetch'] == ['d.html', 'c.html']
@@ -0,0 +1,29 @@
+import json
+import re
+
+from add_schema_script import _json, agregar_schema_html
+
+PAGINA = (
+    '<html>\n<head>\n  <title>Plomería</title>\n  <script src="js/schema.js"></script>\n'
+    '</head>\n<body></body>\n</html>\n'
+)
+
+def test_json_ld_valido():
+    texto = _json({'name': 'a <!-- b </script> c'})
+    assert '<' not in texto
+    assert json.loads(texto) == {'name': 'a <!-- b </script> c'}
+
+def test_incrusta_el_json_ld_en_el_head():
+    resultado = agregar_schema_html(PAGINA, 'plomeria.html')
+    assert 'js/schema.js' not in resultado
+    head = resultado[:resultado.index('</head>')]
+    tipos = [
+        json.loads(texto)['@type']
+        for texto in re.findall(r'<script type="application/ld\+json" data-schema>(.*?)</script>', head)
+    ]
+    assert tipos == ['Organization', 'Service', 'BreadcrumbList']
+    # Volver a ejecutarlo reemplaza los bloques en lugar de duplicarlos
+    assert agregar_schema_html(resultado, 'plomeria.html') == resultado
+
+def test_sin_head():
+    assert agregar_schema_html('<p>sin head</p>', 'plomeria.html') is None
@@ -0,0 +1,22 @@
+from add_scripts import add_scripts_to_html
+
+def test_agrega_los_scripts_al_final_del_body():
+    html = (
+        '<body>\n  <p>hola</p>\n  <script src="js/app.js"></script>\n'
+        "  <script>const plantilla = '</body>';</script>\n</body>\n</html>"
+    )
+    nuevo = add_scripts_to_html(html)
+    assert nuevo == (
+        '<body>\n  <p>hola</p>\n  <script src="js/app.js"></script>\n'
+        "  <script>const plantilla = '</body>';</script>\n"
+        '  <script src="js/accesibilidad.js"></script>\n'
+        '  <script src="js/componentes.js"></script>\n</body>\n</html>'
+    )
+    assert add_scripts_to_html(nuevo) == nuevo
+
+def test_componentes_despues_de_accesibilidad():
+    html = '<body>\n  <script src="js/accesibilidad.js"></script>\n</body>'
+    assert add_scripts_to_html(html) == (
+        '<body>\n  <script src="js/accesibilidad.js"></script>\n'
+        '  <script src="js/componentes.js"></script>\n</body>'
+    )
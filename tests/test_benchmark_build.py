@@ -0,0 +1,47 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from benchmark_build import comparar, leer_mezcla, sospechosos, tipos_corpus
+
+def test_mezcla():
+    assert leer_mezcla('chica=3,grande=1') == {'chica': 0.75, 'grande': 0.25}
+    with pytest.raises(ValueError):
+        leer_mezcla('enorme=1')
+    tipos = tipos_corpus(10, leer_mezcla('chica=90,script=8,grande=2'))
+    assert len(tipos) == 10 and tipos.count('chica') == 9 and tipos.count('script') == 1
+
+def test_comparar():
+    anterior = {'corpus': 1, 'etapas': {'seo': {'paginas_s': 100}}, 'pipeline': {'paginas_s': 50}}
+    actual = {'corpus': 1, 'etapas': {'seo': {'paginas_s': 85}}, 'pipeline': {'paginas_s': 49}}
+    assert comparar(anterior, actual, tolerancia=10) == ['etapa seo']
+    assert comparar(anterior, actual, tolerancia=20) == []
+
+def test_sospechosos():
+    patologicos = {'caso': {
+        'lineal': {'crecimiento': 4.1, 'segundos': [0.1, 0.41]},
+        'cuadratica': {'crecimiento': 16.0, 'segundos': [0.1, 1.6]},
+        'ruido': {'crecimiento': 20.0, 'segundos': [0.0001, 0.002]},
+    }}
+    assert [etapa for _, etapa, _ in sospechosos(patologicos)] == ['cuadratica']
+
+def test_benchmark(ejecutar, sitio):
+    argumentos = ('--paginas', '20', '--mb-grande', '0.05', '--kb-script', '8', '--kb-patologico', '1')
+    salida = ejecutar('benchmark_build.py', *argumentos, '--salida', 'a.json')
+    assert '20 páginas' in salida
+    resultados = json.loads((sitio / 'a.json').read_text(encoding='utf-8'))
+    assert resultados['pipeline']['errores'] == 0
+    assert {'scripts', 'seo', 'hints'} <= set(resultados['etapas'])
+    assert all(datos['errores'] == 0 for datos in resultados['etapas'].values())
+
+    # Un resultado anterior mucho más rápido es una regresión: termina con error
+    resultados['pipeline']['paginas_s'] *= 100
+    (sitio / 'a.json').write_text(json.dumps(resultados), encoding='utf-8')
+    proceso = subprocess.run(
+        [sys.executable, 'benchmark_build.py', *argumentos, '--salida', 'b.json', '--comparar', 'a.json'],
+        cwd=sitio, capture_output=True, text=True,
+    )
+    assert proceso.returncode == 1
+    assert 'Regresiones' in proceso.stdout and 'pipeline' in proceso.stdout
@@ -0,0 +1,90 @@
+"""
+Escritura de salidas: sin cambios no se toca, reemplazo atómico, lista de
+modificados y salidas publicadas
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from build_output import (
+    escribir_bytes, escribir_lineas, escribir_texto, registrar_salidas, salidas_publicadas,
+)
+
+def test_mismo_contenido_no_se_toca(tmp_path):
+    ruta = tmp_path / 'a.txt'
+    assert escribir_texto(ruta, 'hola')
+    os.utime(ruta, ns=(1_000_000_000, 1_000_000_000))
+    assert not escribir_texto(ruta, 'hola')
+    assert ruta.stat().st_mtime_ns == 1_000_000_000
+    assert escribir_texto(ruta, 'chau')
+    assert ruta.read_text(encoding='utf-8') == 'chau'
+    assert [r.name for r in tmp_path.iterdir()] == ['a.txt']
+
+def test_conserva_el_modo(tmp_path):
+    ruta = tmp_path / 'script.sh'
+    ruta.write_bytes(b'echo 1\n')
+    ruta.chmod(0o755)
+    assert escribir_bytes(ruta, b'echo 2\n')
+    assert ruta.stat().st_mode & 0o777 == 0o755
+
+def test_error_no_deja_el_temporal(tmp_path):
+    ruta = tmp_path / 'a.txt'
+    ruta.write_text('anterior', encoding='utf-8')
+
+    def lineas():
+        yield 'nueva\n'
+        raise RuntimeError('cortado')
+
+    with pytest.raises(RuntimeError):
+        escribir_lineas(ruta, lineas())
+    assert ruta.read_text(encoding='utf-8') == 'anterior'
+    assert [r.name for r in tmp_path.iterdir()] == ['a.txt']
+
+def test_escribir_lineas_por_hash(tmp_path):
+    ruta = tmp_path / 'a.xml'
+    hash_, escrito = escribir_lineas(ruta, iter(['<a>\n', '</a>\n']))
+    assert escrito and ruta.read_text(encoding='utf-8') == '<a>\n</a>\n'
+    assert escribir_lineas(ruta, iter(['<a>\n', '</a>\n'])) == (hash_, False)
+    # Sin el hash previo se compara el contenido
+    assert escribir_lineas(ruta, iter(['<a>\n', '</a>\n']), hash_previo='otro') == (hash_, False)
+    nuevo, escrito = escribir_lineas(ruta, iter(['<b/>\n']), hash_previo=hash_)
+    assert escrito and nuevo != hash_
+    assert [r.name for r in tmp_path.iterdir()] == ['a.xml']
+
+def test_salidas_publicadas(tmp_path):
+    (tmp_path / 'indice').mkdir()
+    (tmp_path / 'indice' / 'a.json').write_text('{}', encoding='utf-8')
+    (tmp_path / 'indice' / '.estado.json').write_text('{}', encoding='utf-8')
+    (tmp_path / 'sitemap.xml').write_text('<x/>', encoding='utf-8')
+
+    registrar_salidas(tmp_path, 'busqueda', 'indice')
+    registrar_salidas(tmp_path, 'sitemap', 'sitemap.xml', 'no-existe.xml')
+    assert salidas_publicadas(tmp_path) == [tmp_path / 'indice' / 'a.json', tmp_path / 'sitemap.xml']
+
+    # Cada etapa reemplaza lo que anotó antes
+    registrar_salidas(tmp_path, 'busqueda')
+    assert salidas_publicadas(tmp_path) == [tmp_path / 'sitemap.xml']
+
+def test_lista_de_modificados(sitio):
+    (sitio / 'escribir.py').write_text(
+        "from build_output import escribir_texto\n"
+        "escribir_texto('a.txt', 'a')\n"
+        "escribir_texto('.oculto.json', '{}')\n"
+        "escribir_texto('b.txt', 'b')\n",
+        encoding='utf-8',
+    )
+
+    def escribir():
+        subprocess.run([sys.executable, 'escribir.py'], cwd=sitio, check=True)
+        return (sitio / '.changed-files.txt').read_text(encoding='utf-8').splitlines()
+
+    assert escribir() == ['a.txt', 'b.txt']
+    (sitio / 'b.txt').write_text('otro', encoding='utf-8')
+    # Sin cambios en a.txt y b.txt ya listado: no se repite
+    assert escribir() == ['a.txt', 'b.txt']
+
+    subprocess.run([sys.executable, 'build_output.py', '--vaciar'], cwd=sitio, check=True, capture_output=True)
+    assert not (sitio / '.changed-files.txt').exists()
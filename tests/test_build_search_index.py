@@ -0,0 +1,62 @@
+import json
+
+from build_search_index import (
+    BLOQUE_CLAVES, ORDENES, construir_indice, plegar, tokenizar,
+)
+
+CATEGORIAS = {'plomeria': 'Plomería', 'jardineria': 'Jardinería'}
+
+def _registro(id_, nombre, rating, category='plomeria', **extra):
+    return dict(
+        accountType='proveedor', id=id_, userName=nombre, rating=rating, reviewCount=10,
+        category=category, location='Monterrey', about='Reparaciones de cañerías', **extra,
+    )
+
+def _decodificar(texto):
+    ids, actual = [], 0
+    for parte in texto.split(','):
+        actual += int(parte, 36)
+        ids.append(actual)
+    return ids
+
+def _documentos(archivos):
+    return {fila[0]: fila[1] for fila in json.loads(archivos['d-0.json'])}
+
+def test_documento_con_id_del_proveedor():
+    archivos = construir_indice([_registro('abc123', 'Ana', 4.0)], CATEGORIAS, (0, 0), {'ids': {}, 'siguiente': 0})
+    campos = json.loads(archivos['indice.json'])['campos']
+    fila = dict(zip(campos, json.loads(archivos['d-0.json'])[0]))
+    # El id del documento es el interno; contactar y favoritos usan el del proveedor
+    assert fila['id'] == 0 and fila['proveedor'] == 'abc123'
+
+def test_normalizacion():
+    assert plegar('Plomería') == 'plomeria'
+    assert tokenizar('Plomeros de la plomería') == ['plom', 'plom']
+
+def test_ids_estables():
+    estado = {'ids': {}, 'siguiente': 0}
+    registros = [_registro('a', 'Ana', 4.0), _registro('b', 'Beto', 4.5), _registro('c', 'Caro', 3.0)]
+    archivos = construir_indice(registros, CATEGORIAS, (0, 0), estado)
+    assert _documentos(archivos) == {0: 'Ana', 1: 'Beto', 2: 'Caro'}
+    # Los postings van por id; el orden recomendado viene aparte
+    assert _decodificar(archivos['c-plomeria.txt']) == [0, 1, 2]
+    assert archivos['o-recomendados-0.txt'] == '1,0,2'
+
+    # Una calificación nueva y un proveedor nuevo no renumeran a los demás
+    registros[2] = _registro('c', 'Caro', 5.0)
+    registros.insert(0, _registro('d', 'Dani', 4.8, category='jardineria'))
+    del registros[1]
+    nuevos = construir_indice(registros, CATEGORIAS, (0, 0), estado)
+    assert _documentos(nuevos) == {1: 'Beto', 2: 'Caro', 3: 'Dani'}
+    assert estado == {'ids': {'b': 1, 'c': 2, 'd': 3}, 'siguiente': 4}
+    assert nuevos['o-recomendados-0.txt'] == '2,3,1'
+    assert _decodificar(nuevos['c-jardineria.txt']) == [3]
+
+    # Clave de rango de cada id en cada orden; el id 0 ya no existe
+    indice = json.loads(nuevos['indice.json'])
+    assert indice['documentos'] == 3 and indice['ordenes'] == ORDENES
+    columnas = nuevos['k-0.txt'].split('\n')
+    ancho = indice['anchoClave']
+    rango = lambda orden, i: int(columnas[ORDENES.index(orden)][i * ancho:(i + 1) * ancho], 36)
+    assert sorted([1, 2, 3], key=lambda i: rango('recomendados', i)) == [2, 3, 1]
+    assert len(columnas[0]) == 4 * ancho <= BLOQUE_CLAVES * ancho
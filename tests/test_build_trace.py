@@ -0,0 +1,37 @@
+import json
+import re
+
+from build_trace import PatronMedido, Traza
+
+def test_sin_traza_no_mide():
+    traza = Traza()
+    with traza.medir('a.html', 'archivo'):
+        pass
+    assert traza.eventos == [] and traza.extraer() is None
+
+def test_patron_medido():
+    traza = Traza()
+    patron = PatronMedido(re.compile(r'\d+'), 'modulo._NUMERO', traza)
+    assert patron.findall('a1 b22') == ['1', '22']
+    assert patron.sub('#', 'a1') == 'a#'
+    assert patron.pattern == r'\d+'
+    duracion, llamadas = traza.regex['modulo._NUMERO']
+    assert llamadas == 2 and duracion >= 0
+    # finditer mide cada paso: una vez por coincidencia y una al terminar
+    assert [m.group() for m in patron.finditer('1 2 3')] == ['1', '2', '3']
+    assert traza.regex['modulo._NUMERO'][1] == 6
+
+def test_traza_de_build_site(ejecutar, sitio):
+    salida = ejecutar('build_site.py', '--force', '-j', '2', '--traza', 'traza.json')
+    assert 'Resumen de la traza' in salida and 'Etapas (total)' in salida
+
+    eventos = json.loads((sitio / 'traza.json').read_text(encoding='utf-8'))['traceEvents']
+    medidos = [e for e in eventos if e['ph'] == 'X']
+    archivos = {e['name'] for e in medidos if e['cat'] == 'archivo'}
+    etapas = {e['name'] for e in medidos if e['cat'] == 'etapa'}
+    assert 'index.html' in archivos
+    assert {'scripts', 'seo', 'parciales', 'hints'} <= etapas
+    assert all({'cpu_ms', 'regex_ms'} <= e['args'].keys() for e in medidos if e['cat'] == 'archivo')
+    # Los eventos de los procesos del pool llegan al principal
+    assert len({e['pid'] for e in medidos}) > 1
+    assert [e for e in medidos if e['cat'] == 'script'][0]['args']['argv'][0] == '--force'
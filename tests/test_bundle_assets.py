@@ -0,0 +1,85 @@
+"""
+Bundles de CSS/JS, junto con un build_site posterior y su vuelta atrás
+"""
+
+from bundle_assets import agrupar_html, desagrupar_html, grupos_de_pagina, minificar_css, minificar_js
+from conftest import marcadores_balanceados, paginas
+
+def _fuentes(base_dir, *nombres):
+    (base_dir / 'js').mkdir(exist_ok=True)
+    for nombre in nombres:
+        (base_dir / 'js' / nombre).write_text(f'window.{nombre[0]} = 1;\n', encoding='utf-8')
+
+def _arbol(sitio):
+    arbol = paginas(sitio)
+    arbol.update({
+        ruta.relative_to(sitio).as_posix(): ruta.read_text(encoding='utf-8')
+        for ruta in (sitio / 'partials').glob('*.html')
+    })
+    return arbol
+
+def test_minificar():
+    css = 'a  >  b { color: red; }\n/* x */ p{content:"  a  "}'
+    assert minificar_css(css) == 'a>b{color:red}p{content:"  a  "}'
+    js = '// c\nconst a = "  //  ";\n\n  let b = /x\\/y/g;  /* z */\n'
+    assert minificar_js(js) == 'const a = "  //  ";\nlet b = /x\\/y/g;\n'
+
+def test_regex_o_division():
+    # Después de la condición de un if el '/' empieza un regex: su '//' no es comentario
+    js = 'if (ok) /https?:\\/\\//.test(u) && f();\n'
+    assert minificar_js(js) == js
+    assert minificar_js('x = (a + b) / 2; // mitad\n') == 'x = (a + b) / 2;\n'
+    # Después de '}' no se sabe: el archivo queda como está
+    js = 'const o = {}\n/a\\//.test(s) // x\n'
+    assert minificar_js(js) == js
+
+def test_un_comentario_corta_el_grupo(tmp_path):
+    _fuentes(tmp_path, 'a.js', 'b.js', 'c.js')
+    html = (
+        '<body>\n  <script src="js/a.js"></script>\n  <!-- parcial:scripts -->\n'
+        '  <script src="js/b.js"></script>\n  <script src="js/c.js"></script>\n'
+        '  <!-- /parcial:scripts -->\n</body>'
+    )
+    grupos = grupos_de_pagina(html, tmp_path, {})
+    assert [fuentes for _, _, _, fuentes in grupos] == [['js/a.js'], ['js/b.js', 'js/c.js']]
+    assert all('<!--' not in html[inicio:fin] for _, inicio, fin, _ in grupos)
+
+    agrupado = agrupar_html(html, tmp_path, {}, {})
+    assert agrupado.count('<!-- parcial:scripts -->') == agrupado.count('<!-- /parcial:scripts -->') == 1
+    assert 'data-fuentes="js/b.js js/c.js"' in agrupado
+
+def test_desagrupar(tmp_path):
+    _fuentes(tmp_path, 'a.js', 'b.js')
+    html = '<body>\n    <script src="js/a.js"></script>\n\n    <script src="js/b.js"></script>\n</body>'
+    originales = {}
+    agrupado = agrupar_html(html, tmp_path, {}, {}, originales)
+    assert agrupado.count('<script') == 1
+    assert desagrupar_html(agrupado, originales) == html
+    # Sin el texto guardado, una etiqueta por archivo con la misma sangría
+    assert desagrupar_html(agrupado, {}) == (
+        '<body>\n    <script src="js/a.js"></script>\n    <script src="js/b.js"></script>\n</body>'
+    )
+
+def test_bundle_y_despues_build(ejecutar, sitio):
+    ejecutar('bundle_assets.py')
+    assert 'bundles/' in (sitio / 'partials' / 'scripts.html').read_text(encoding='utf-8')
+
+    salida = ejecutar('build_site.py')
+    assert '✗' not in salida
+    for nombre, contenido in paginas(sitio).items():
+        assert marcadores_balanceados(contenido), nombre
+        # Los scripts agrupados no se vuelven a agregar sueltos
+        assert '<script src="js/componentes.js">' not in contenido, nombre
+
+    assert '0 archivos actualizados' in ejecutar('build_site.py')
+    assert '0 archivos HTML actualizados' in ejecutar('bundle_assets.py')
+
+def test_agrupar_y_deshacer(ejecutar, sitio):
+    antes = _arbol(sitio)
+    ejecutar('bundle_assets.py', '-j', '2')
+    ejecutar('bundle_assets.py')
+    assert _arbol(sitio) != antes
+
+    ejecutar('bundle_assets.py', '--deshacer')
+    assert _arbol(sitio) == antes
+    assert not (sitio / 'bundles').exists()
@@ -0,0 +1,84 @@
+"""
+Control de presupuestos: medición de una página, límites y salida con error
+"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from check_budgets import CacheTamanos, cargar_presupuestos, excesos, medir_pagina
+
+PRESUPUESTOS = {
+    'predeterminados': {'peticiones': 3, 'scripts': 1},
+    'paginas': {'grande.html': {'peticiones': 10}},
+}
+
+def _metricas(**valores):
+    return dict({'peso': 0, 'peso_comprimido': 0, 'imagenes': 0, 'peticiones': 0,
+                 'bloqueantes': 0, 'scripts': 0, 'origenes_externos': 0}, **valores)
+
+def test_excesos_con_limites_por_pagina():
+    metricas = _metricas(peticiones=5, scripts=1)
+    assert excesos('chica.html', metricas, PRESUPUESTOS) == [('peticiones', 5, 3)]
+    assert excesos('grande.html', metricas, PRESUPUESTOS) == []
+
+def test_excesos_en_kb_y_limite_anulado():
+    presupuestos = {'predeterminados': {'peso_kb': 1, 'scripts': 0}, 'paginas': {'a.html': {'scripts': None}}}
+    metricas = _metricas(peso=1536, scripts=2)
+    assert excesos('a.html', metricas, presupuestos) == [('peso_kb', 1.5, 1)]
+
+def test_limite_desconocido(tmp_path):
+    ruta = tmp_path / 'presupuestos.json'
+    ruta.write_text(json.dumps({'predeterminados': {'peso_mb': 1}}), encoding='utf-8')
+    with pytest.raises(ValueError, match='peso_mb'):
+        cargar_presupuestos(ruta)
+
+def test_medir_pagina(tmp_path):
+    (tmp_path / 'estilo.css').write_text('@import "base.css";\nbody { color: red; }\n', encoding='utf-8')
+    (tmp_path / 'base.css').write_text('html { margin: 0; }\n', encoding='utf-8')
+    (tmp_path / 'app.js').write_text('console.log(1);\n', encoding='utf-8')
+    contenido = (
+        '<html><head>'
+        '<link rel="stylesheet" href="estilo.css">'
+        '<link rel="stylesheet" href="print.css" media="print">'
+        '<script src="app.js"></script>'
+        '<script src="https://cdn.example.com/lib.js" defer></script>'
+        '</head><body><img src="falta.png"></body></html>'
+    )
+    pagina = tmp_path / 'pagina.html'
+    pagina.write_text(contenido, encoding='utf-8')
+
+    metricas = medir_pagina(contenido, pagina, CacheTamanos(tmp_path))
+    # html, estilo.css, base.css (@import), print.css, app.js, falta.png y el externo
+    assert metricas['peticiones'] == 7
+    # estilo.css, base.css y app.js; print.css no bloquea y el externo es defer
+    assert metricas['bloqueantes'] == 3
+    assert metricas['scripts'] == 2
+    assert metricas['origenes_externos'] == 1
+    assert metricas['por_tipo']['estilos']['bytes'] == sum(
+        (tmp_path / nombre).stat().st_size for nombre in ('estilo.css', 'base.css')
+    )
+    assert metricas['faltantes'] == ['falta.png', 'print.css']
+
+def test_control_del_sitio(ejecutar, sitio):
+    salida = ejecutar('check_budgets.py')
+    assert '✗' not in salida
+    informe = json.loads((sitio / '.budget-report.json').read_text(encoding='utf-8'))
+    assert 'index.html' in informe
+
+    # La segunda vez los tamaños salen de la caché y no hay cambios que informar
+    assert 'Cambios desde el último control: ninguno' in ejecutar('check_budgets.py')
+
+def test_exceso_corta_el_build(sitio):
+    (sitio / 'ajustado.json').write_text(
+        json.dumps({'predeterminados': {'peticiones': 1}}), encoding='utf-8'
+    )
+    resultado = subprocess.run(
+        [sys.executable, 'check_budgets.py', '--presupuestos', 'ajustado.json'],
+        cwd=sitio, capture_output=True, text=True,
+    )
+    assert resultado.returncode == 1
+    assert 'páginas superan su presupuesto' in resultado.stdout
+    assert 'peticiones:' in resultado.stdout
@@ -0,0 +1,29 @@
+import gzip
+
+from build_output import registrar_salidas
+from compress_assets import brotli
+
+def test_comprime_lo_publicado(ejecutar, sitio):
+    (sitio / 'nueva-etapa').mkdir()
+    (sitio / 'nueva-etapa' / 'datos.json').write_text('[' + '1, ' * 200 + '1]', encoding='utf-8')
+    registrar_salidas(sitio, 'nueva-etapa', 'nueva-etapa')
+
+    salida = ejecutar('compress_assets.py', '-j', '2')
+    resumen = salida.strip().splitlines()[-1]
+    # Sin brotli el resumen no inventa un total de .br
+    assert 'gz ' in resumen and ('br ' in resumen) == (brotli is not None)
+    publicados = ('index.html', 'js/componentes.js', 'css/tokens.css', 'manifest.json', 'nueva-etapa/datos.json')
+    for relativa in publicados:
+        comprimido = sitio / f'{relativa}.gz'
+        assert comprimido.exists(), relativa
+        assert gzip.decompress(comprimido.read_bytes()) == (sitio / relativa).read_bytes()
+    # Ninguna página lo carga
+    assert not (sitio / 'presupuestos.json.gz').exists()
+
+    assert '0 assets comprimidos' in ejecutar('compress_assets.py')
+
+    # La etapa deja de publicar el directorio: su .gz se borra
+    registrar_salidas(sitio, 'nueva-etapa')
+    ejecutar('compress_assets.py')
+    assert not (sitio / 'nueva-etapa' / 'datos.json.gz').exists()
+    assert (sitio / 'index.html.gz').exists()
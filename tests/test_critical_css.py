@@ -0,0 +1,43 @@
+"""
+CSS crítico inline, junto con un build_site posterior
+"""
+
+import json
+import re
+
+from conftest import RAIZ, marcadores_balanceados, paginas
+from critical_css import MARCA, agregar_css_critico_html
+from update_seo_tags import renderer as seo
+
+def _hojas_asincronas(contenido):
+    return len(re.findall(r'<link [^>]*%s><noscript %s>' % (MARCA, MARCA), contenido))
+
+def test_css_critico_fuera_del_bloque_seo():
+    contenido = (RAIZ / 'abogacia.html').read_text(encoding='utf-8')
+    con_critico = agregar_css_critico_html(contenido, RAIZ)
+    assert f'<style {MARCA}>' in con_critico
+
+    entrada = dict(seo.entrada('abogacia.html'), description='Otra descripción')
+    nuevo = seo.actualizar_head(con_critico, 'abogacia.html', entrada)
+    assert 'Otra descripción' in nuevo
+    assert f'<style {MARCA}>' in nuevo
+    assert _hojas_asincronas(nuevo) == _hojas_asincronas(con_critico) > 0
+
+def test_css_critico_y_despues_build(ejecutar, sitio):
+    ejecutar('critical_css.py')
+    antes = paginas(sitio)
+
+    config = json.loads((sitio / 'seo-config.json').read_text(encoding='utf-8'))
+    config['pages']['abogacia.html']['description'] = 'Otra descripción'
+    (sitio / 'seo-config.json').write_text(json.dumps(config, ensure_ascii=False), encoding='utf-8')
+
+    salida = ejecutar('build_site.py')
+    assert '✗' not in salida
+    for nombre, contenido in paginas(sitio).items():
+        assert contenido.count(f'<style {MARCA}>') == antes[nombre].count(f'<style {MARCA}>'), nombre
+        assert _hojas_asincronas(contenido) == _hojas_asincronas(antes[nombre]), nombre
+        assert marcadores_balanceados(contenido), nombre
+    assert 'Otra descripción' in (sitio / 'abogacia.html').read_text(encoding='utf-8')
+
+    assert '0 archivos actualizados' in ejecutar('build_site.py')
+    assert '0 archivos HTML actualizados' in ejecutar('critical_css.py')
@@ -0,0 +1,74 @@
+import random
+
+from dedup_images import ArbolBK, _distancia, agrupar, destino_unico, reescribir_referencias
+
+def _entrada(sha, dhash=None, ancho=100, alto=50, bytes_=1000, alfa=False):
+    return {
+        'sha': sha, 'bytes': bytes_, 'dhash': None if dhash is None else f"{dhash:016x}",
+        'ancho': ancho, 'alto': alto, 'alfa': alfa,
+    }
+
+def test_arbol_bk_encuentra_lo_mismo_que_comparar_todo():
+    azar = random.Random(3)
+    claves = [azar.getrandbits(64) for _ in range(300)]
+    claves += [clave ^ (1 << azar.randrange(64)) for clave in claves[:50]]
+    arbol = ArbolBK()
+    for i, clave in enumerate(claves):
+        arbol.agregar(clave, i)
+    for consulta in claves[:20]:
+        esperado = sorted(i for i, clave in enumerate(claves) if _distancia(consulta, clave) <= 4)
+        assert sorted(i for _, i in arbol.buscar(consulta, 4)) == esperado
+
+def test_agrupar():
+    base = 0x0F0F_F0F0_1234_5678
+    entradas = {
+        'imagenes/a.png': _entrada('s1', base, bytes_=5000),
+        'imagenes/b.png': _entrada('s1', base, bytes_=5000),
+        # La misma foto como JPEG, más liviana y con un bit distinto
+        'imagenes/a.jpg': _entrada('s2', base ^ 1, bytes_=800),
+        # Parecida pero con otra proporción o transparencia: no se une
+        'imagenes/recorte.jpg': _entrada('s3', base ^ 2, alto=100),
+        'imagenes/transparente.png': _entrada('s4', base ^ 2, alfa=True),
+        'imagenes/otra.png': _entrada('s5', ~base & (2 ** 64 - 1)),
+        # Sin hash perceptual (SVG): solo copias exactas
+        'imagenes/x.svg': _entrada('s6'), 'imagenes/y.svg': _entrada('s6'),
+    }
+    assert sorted(agrupar(entradas)) == [
+        ['imagenes/a.jpg', 'imagenes/a.png', 'imagenes/b.png'],
+        ['imagenes/x.svg', 'imagenes/y.svg'],
+    ]
+    assert sorted(agrupar(entradas, umbral=-1)) == [
+        ['imagenes/a.png', 'imagenes/b.png'], ['imagenes/x.svg', 'imagenes/y.svg'],
+    ]
+    assert destino_unico({'imagenes/f.JPEG': _entrada('ab' * 20)}, 'imagenes/f.JPEG') == \
+        'imagenes/_unicas/abababababababab.jpg'
+
+def test_reescribir_referencias(tmp_path):
+    archivo = tmp_path / 'pagina.html'
+    archivo.write_text(
+        '<img src="imagenes/perfile/images%20(1).png"> <img src="imagenes/a.png">\n'
+        '<img src="imagenes/a.png.bak"> url(imagenes/perfile/images (1).png)',
+        encoding='utf-8',
+    )
+    alias = (('imagenes/a.png', 'imagenes/_unicas/1.png'), ('imagenes/perfile/images (1).png', 'imagenes/_unicas/2.png'))
+    assert reescribir_referencias(archivo, alias)
+    assert archivo.read_text(encoding='utf-8') == (
+        '<img src="imagenes/_unicas/2.png"> <img src="imagenes/_unicas/1.png">\n'
+        '<img src="imagenes/a.png.bak"> url(imagenes/_unicas/2.png)'
+    )
+    assert not reescribir_referencias(archivo, alias)
+
+def test_unificar_copias_exactas(ejecutar, sitio):
+    (sitio / 'imagenes').mkdir()
+    (sitio / 'imagenes' / 'uno.svg').write_text('<svg width="1" height="1"/>', encoding='utf-8')
+    (sitio / 'imagenes' / 'dos.svg').write_text('<svg width="1" height="1"/>', encoding='utf-8')
+    (sitio / 'pagina.html').write_text('<img src="imagenes/dos.svg">', encoding='utf-8')
+
+    assert 'Grupos repetidos: 1 (1 copias)' in ejecutar('dedup_images.py')
+    assert (sitio / 'imagenes' / 'dos.svg').exists()
+
+    ejecutar('dedup_images.py', '--aplicar')
+    unicas = list((sitio / 'imagenes' / '_unicas').glob('*.svg'))
+    assert len(unicas) == 1 and not (sitio / 'imagenes' / 'dos.svg').exists()
+    assert (sitio / 'pagina.html').read_text(encoding='utf-8') == \
+        f'<img src="imagenes/_unicas/{unicas[0].name}">'
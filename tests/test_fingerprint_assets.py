@@ -0,0 +1,45 @@
+"""
+Versionado de assets y su vuelta atrás con --deshacer
+"""
+
+from add_scripts import add_scripts_to_html
+from fingerprint_assets import nombre_original
+
+def _arbol(sitio):
+    """Páginas, parciales, service-worker.js y la lista de archivos de css/ y js/"""
+    archivos = sorted(sitio.glob('*.html')) + sorted((sitio / 'partials').glob('*.html'))
+    arbol = {ruta.relative_to(sitio).as_posix(): ruta.read_text(encoding='utf-8') for ruta in archivos}
+    arbol['service-worker.js'] = (sitio / 'service-worker.js').read_text(encoding='utf-8')
+    arbol['assets'] = sorted(
+        ruta.relative_to(sitio).as_posix() for d in ('css', 'js') for ruta in (sitio / d).rglob('*')
+    )
+    return arbol
+
+def test_nombre_original():
+    assert nombre_original('css/tokens.1a2b3c4d5e.css') == 'css/tokens.css'
+    assert nombre_original('js/pwa.js') == 'js/pwa.js'
+
+def test_un_script_versionado_no_se_vuelve_a_agregar():
+    html = (
+        '<body>\n  <script src="js/accesibilidad.0123456789.js"></script>\n'
+        '  <script src="/js/componentes.abcdef0123.js"></script>\n</body>'
+    )
+    assert add_scripts_to_html(html) == html
+
+def test_versionar_build_y_deshacer(ejecutar, sitio):
+    antes = _arbol(sitio)
+
+    ejecutar('fingerprint_assets.py')
+    index = (sitio / 'index.html').read_text(encoding='utf-8')
+    assert '<script src="js/componentes.js">' not in index
+    assert index.count('js/componentes.') == 1
+
+    salida = ejecutar('build_site.py')
+    assert '✗' not in salida
+    for ruta in sitio.glob('*.html'):
+        contenido = ruta.read_text(encoding='utf-8')
+        assert '<script src="js/componentes.js">' not in contenido, ruta.name
+        assert '<script src="js/pwa.js">' not in contenido, ruta.name
+
+    ejecutar('fingerprint_assets.py', '--deshacer')
+    assert _arbol(sitio) == antes
@@ -0,0 +1,73 @@
+import pytest
+
+from generate_image_variants import _vigente, agregar_srcset_html
+from html_regions import leer_atributos, quitar_atributos
+
+def _indice(*anchos, hash_imagen='aaaaaaaaaaaa'):
+    return {'imagenes/foto.jpg': {'variantes': {
+        str(a): f'imagenes/_variantes/foto-{hash_imagen}-{a}w.webp' for a in anchos
+    }}}
+
+def _img(html):
+    inicio = html.index('<img')
+    return leer_atributos(html[inicio:html.index('>', inicio) + 1])
+
+def test_quitar_atributos():
+    assert quitar_atributos('<img src="a" srcset="b 1w" sizes=100vw alt="">', ('srcset', 'sizes')) \
+        == '<img src="a" alt="">'
+
+def test_agrega_srcset(tmp_path):
+    html = agregar_srcset_html('<img src="imagenes/foto.jpg" width="300">', tmp_path, _indice(320, 640))
+    assert _img(html)['srcset'] == (
+        'imagenes/_variantes/foto-aaaaaaaaaaaa-320w.webp 320w, '
+        'imagenes/_variantes/foto-aaaaaaaaaaaa-640w.webp 640w'
+    )
+    # width es el ancho intrínseco (add_image_dimensions), no el que ocupa
+    assert _img(html)['sizes'] == '100vw'
+
+def test_sizes_por_clase(tmp_path):
+    html = agregar_srcset_html(
+        '<img src="imagenes/foto.jpg" class="service-avatar service-avatar--large" width="1600">',
+        tmp_path, _indice(320),
+    )
+    assert _img(html)['sizes'] == '80px'
+    html = agregar_srcset_html('<img src="imagenes/foto.jpg" class="post-avatar">', tmp_path, _indice(320))
+    assert _img(html)['sizes'] == '48px'
+
+def test_regenera_el_srcset_de_variantes(tmp_path):
+    html = agregar_srcset_html('<img src="imagenes/foto.jpg" alt="x">', tmp_path, _indice(320, 640))
+
+    # La imagen cambió y --anchos también
+    nuevo = agregar_srcset_html(html, tmp_path, _indice(480, hash_imagen='bbbbbbbbbbbb'), sizes='50vw')
+    assert _img(nuevo) == {
+        'src': 'imagenes/foto.jpg', 'alt': 'x',
+        'srcset': 'imagenes/_variantes/foto-bbbbbbbbbbbb-480w.webp 480w', 'sizes': '50vw',
+    }
+    assert agregar_srcset_html(nuevo, tmp_path, _indice(480, hash_imagen='bbbbbbbbbbbb'), sizes='50vw') == nuevo
+
+    # Sin variantes (la imagen se borró del índice) el srcset se quita
+    assert agregar_srcset_html(nuevo, tmp_path, {}) == '<img src="imagenes/foto.jpg" alt="x">'
+
+def test_respeta_un_srcset_escrito_a_mano(tmp_path):
+    html = '<img src="imagenes/foto.jpg" srcset="imagenes/foto@2x.jpg 2x">'
+    assert agregar_srcset_html(html, tmp_path, _indice(320)) == html
+
+def test_cambiar_formato_o_calidad_regenera(tmp_path):
+    ruta = tmp_path / 'imagenes' / 'foto.jpg'
+    variante = tmp_path / 'imagenes' / '_variantes' / 'foto-aaaaaaaaaaaa-320w-q80.webp'
+    variante.parent.mkdir(parents=True)
+    ruta.write_bytes(b'jpg')
+    variante.write_bytes(b'webp')
+    stat = ruta.stat()
+    entrada = {
+        'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'ancho': 320, 'formato': 'webp',
+        'calidad': 80, 'variantes': {'320': variante.relative_to(tmp_path).as_posix()},
+    }
+    assert _vigente(entrada, ruta, tmp_path, [320], 'webp', 80)
+    assert not _vigente(entrada, ruta, tmp_path, [320], 'jpeg', 80)
+    assert not _vigente(entrada, ruta, tmp_path, [320], 'webp', 60)
+
+def test_sin_imagenes_no_falla(ejecutar, sitio):
+    pytest.importorskip('PIL')
+    # La copia del sitio no tiene imagenes/: nunca se crea imagenes/_variantes/
+    assert '0 imágenes codificadas' in ejecutar('generate_image_variants.py')
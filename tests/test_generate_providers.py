@@ -0,0 +1,43 @@
+import json
+
+from generate_providers import iter_registros, nombre_archivo, normalizar
+
+def _usuario(id_, nombre, **extra):
+    return dict(_id={'$oid': id_}, accountType='proveedor', userName=nombre, location='Rosario', **extra)
+
+def _escribir(ruta, usuarios):
+    ruta.write_text(''.join(json.dumps(u, ensure_ascii=False) + '\n' for u in usuarios), encoding='utf-8')
+
+def test_registros_y_normalizacion(tmp_path):
+    usuarios = [_usuario('64f0a1b2c3d4e5f6a7b8c9d0', 'Ana Pérez'), {'accountType': 'cliente', 'userName': 'x'}]
+    (tmp_path / 'a.json').write_text(json.dumps(usuarios), encoding='utf-8')
+    _escribir(tmp_path / 'a.jsonl', usuarios)
+    assert list(iter_registros(tmp_path / 'a.json')) == list(iter_registros(tmp_path / 'a.jsonl')) == usuarios
+
+    proveedor = normalizar(usuarios[0])
+    assert proveedor['id'] == '64f0a1b2c3d4e5f6a7b8c9d0'
+    assert proveedor['nombre'] == 'Ana Pérez' and proveedor['ubicacion'] == 'Rosario'
+    assert nombre_archivo(proveedor) == 'ana-perez-a7b8c9d0.html'
+    assert normalizar(usuarios[1]) is None
+
+def test_genera_solo_lo_que_cambio(ejecutar, sitio):
+    datos = sitio / 'proveedores.jsonl'
+    usuarios = [
+        _usuario('000000000000000000000001', 'Ana <Pérez>', about='Plomería & gas'),
+        _usuario('000000000000000000000002', 'Beto', services=['Cortes', 'Podas']),
+    ]
+    _escribir(datos, usuarios)
+    assert '2 páginas generadas, 0 sin cambios' in ejecutar('generate_providers.py')
+    ana = (sitio / 'proveedores' / 'ana-perez-00000001.html').read_text(encoding='utf-8')
+    assert 'Ana &lt;Pérez&gt;' in ana and 'Ana <Pérez>' not in ana
+    assert 'Carlos Martínez' not in ana
+    beto = (sitio / 'proveedores' / 'beto-00000002.html').read_text(encoding='utf-8')
+    assert 'Cortes' in beto and 'Podas' in beto
+
+    assert '0 páginas generadas, 2 sin cambios' in ejecutar('generate_providers.py')
+
+    usuarios[1]['location'] = 'Córdoba'
+    _escribir(datos, usuarios[1:])
+    assert '1 páginas generadas, 0 sin cambios, 1 eliminadas' in ejecutar('generate_providers.py')
+    assert not (sitio / 'proveedores' / 'ana-perez-00000001.html').exists()
+    assert 'Córdoba' in (sitio / 'proveedores' / 'beto-00000002.html').read_text(encoding='utf-8')
@@ -0,0 +1,60 @@
+import os
+
+import generate_sitemap
+from build_output import escribir_lineas
+
+def test_escribir_lineas(tmp_path):
+    ruta = tmp_path / 'sitemap.xml'
+    lineas = ['<a>\n', '  <b/>\n', '</a>\n']
+    hash_, escrito = escribir_lineas(ruta, iter(lineas))
+    assert escrito and ruta.read_text(encoding='utf-8') == ''.join(lineas)
+
+    mtime = ruta.stat().st_mtime_ns
+    assert escribir_lineas(ruta, iter(lineas), hash_) == (hash_, False)
+    # Sin el hash previo compara el archivo: tampoco lo reescribe
+    assert escribir_lineas(ruta, iter(lineas)) == (hash_, False)
+    assert ruta.stat().st_mtime_ns == mtime
+    assert list(tmp_path.iterdir()) == [ruta]
+
+    assert escribir_lineas(ruta, iter(lineas[:1]), hash_)[1]
+    assert ruta.read_text(encoding='utf-8') == '<a>\n'
+
+def test_shards_estables(sitio, monkeypatch):
+    monkeypatch.setattr(generate_sitemap, 'MAX_URLS', 4)
+    (sitio / 'proveedores').mkdir()
+    for i in range(5):
+        (sitio / 'proveedores' / f'p{i}.html').write_text(f'<p>{i}</p>', encoding='utf-8')
+    estado = {'urls': {}, 'shards': {}, 'siguiente': 0}
+    generate_sitemap.actualizar_urls(sitio, generate_sitemap.descubrir_paginas(sitio), estado, {})
+    generate_sitemap.asignar_shards(estado)
+    antes = {pagina: datos['shard'] for pagina, datos in estado['urls'].items()}
+
+    # Una página nueva que en orden alfabético va primero no desplaza a las demás
+    (sitio / 'proveedores' / 'a.html').write_text('<p>a</p>', encoding='utf-8')
+    generate_sitemap.actualizar_urls(sitio, generate_sitemap.descubrir_paginas(sitio), estado, {})
+    generate_sitemap.asignar_shards(estado)
+    assert {pagina: estado['urls'][pagina]['shard'] for pagina in antes} == antes
+    assert estado['urls']['proveedores/a.html']['shard'] >= max(antes.values())
+
+def test_sitemap(ejecutar, sitio):
+    salida = ejecutar('generate_sitemap.py')
+    sitemap = (sitio / 'sitemap.xml').read_text(encoding='utf-8')
+    assert '<loc>https://servilocal.com/</loc>' in sitemap
+    assert sitemap.count('<url>') == sitemap.count('</url>') > 1
+    assert '1 de 1 archivos reescritos' in salida
+
+    assert '0 de 1 archivos reescritos' in ejecutar('generate_sitemap.py')
+
+def test_checkout_nuevo_conserva_lastmod(ejecutar, sitio):
+    ejecutar('generate_sitemap.py')
+    sitemap = (sitio / 'sitemap.xml').read_text(encoding='utf-8')
+    estado = (sitio / '.sitemap-state.json').read_text(encoding='utf-8')
+
+    # Un checkout nuevo (el estado va en git): sin la caché local y con otra fecha en cada página
+    (sitio / '.sitemap-stat.json').unlink()
+    for pagina in sitio.glob('*.html'):
+        os.utime(pagina, ns=(1_000_000_000, 1_000_000_000))
+    assert '0 de 1 archivos reescritos' in ejecutar('generate_sitemap.py')
+    assert (sitio / 'sitemap.xml').read_text(encoding='utf-8') == sitemap
+    # El estado no depende de las fechas de los archivos: no cambia en git
+    assert (sitio / '.sitemap-state.json').read_text(encoding='utf-8') == estado
@@ -0,0 +1,91 @@
+from html_regions import (
+    ABRE, CIERRA, COMENTARIO, OTRO, TEXTO, agregar_atributos, bloque_scripts_final, buscar_head,
+    iter_elementos, iter_tokens, leer_atributos, reemplazar_regiones, region_anidada,
+)
+
+def _tipos(html):
+    return [(t.tipo, t.nombre, html[t.inicio:t.fin]) for t in iter_tokens(html)]
+
+def test_los_tokens_cubren_todo_el_documento():
+    html = '<!DOCTYPE html><html><head><title>a < b</title></head><body x=1>hola<br/></body></html>'
+    tokens = list(iter_tokens(html))
+    assert ''.join(html[t.inicio:t.fin] for t in tokens) == html
+    assert all(a.fin == b.inicio for a, b in zip(tokens, tokens[1:]))
+
+def test_tipos_de_token():
+    html = '<!DOCTYPE html><!-- nota --><p class="a">x</p>'
+    assert _tipos(html) == [
+        (OTRO, None, '<!DOCTYPE html>'),
+        (COMENTARIO, None, '<!-- nota -->'),
+        (ABRE, 'p', '<p class="a">'),
+        (TEXTO, None, 'x'),
+        (CIERRA, 'p', '</p>'),
+    ]
+
+def test_script_y_style_son_texto_crudo():
+    html = '<script>if (a < b) { x = "<div>" }</script><style>a>b{}</style>'
+    assert _tipos(html) == [
+        (ABRE, 'script', '<script>'),
+        (TEXTO, None, 'if (a < b) { x = "<div>" }'),
+        (CIERRA, 'script', '</script>'),
+        (ABRE, 'style', '<style>'),
+        (TEXTO, None, 'a>b{}'),
+        (CIERRA, 'style', '</style>'),
+    ]
+
+def test_mayor_dentro_de_un_atributo_no_cierra_la_etiqueta():
+    html = '<a title="1 > 0" href=\'x\'>y</a>'
+    primero = next(iter_tokens(html))
+    assert html[primero.inicio:primero.fin] == '<a title="1 > 0" href=\'x\'>'
+
+def test_menor_suelto_es_texto():
+    tokens = list(iter_tokens('a < b </ c'))
+    assert {t.tipo for t in tokens} == {TEXTO}
+    assert ''.join('a < b </ c'[t.inicio:t.fin] for t in tokens) == 'a < b </ c'
+
+def test_comentario_sin_cerrar_llega_al_final():
+    html = '<p><!-- sin cierre'
+    assert _tipos(html)[-1] == (COMENTARIO, None, '<!-- sin cierre')
+
+def test_buscar_head_ignora_cierres_en_json_y_comentarios():
+    html = (
+        '<html><head><!-- </head> -->'
+        '<script type="application/ld+json">{"a":"</head>"}</script>'
+        '</head><body></body></html>'
+    )
+    head = buscar_head(html)
+    assert html[head.inicio_cierre:head.fin] == '</head>'
+    assert html[head.fin:].startswith('<body>')
+
+def test_buscar_head_solo_el_literal():
+    assert buscar_head('<header><h1>x</h1></header><body>') is None
+    assert buscar_head('<html><body><head></head></body>') is None
+
+def test_region_anidada():
+    html = '<div id="a"><div>x</div><br/></div><div>y</div>'
+    apertura = next(iter_tokens(html))
+    region = region_anidada(html, apertura)
+    assert html[region.inicio:region.fin] == '<div id="a"><div>x</div><br/></div>'
+
+def test_iter_elementos_con_prefijo():
+    html = '<nav class="a">1</nav><nav class="b">2</nav><nav class="a">3</nav>'
+    regiones = list(iter_elementos(html, 'nav', '<nav class="a"'))
+    assert [html[r.fin_apertura:r.inicio_cierre] for r in regiones] == ['1', '3']
+
+def test_bloque_scripts_final():
+    html = '<body><p>x</p>\n  <script src="a.js"></script>\n  <script>b()</script>\n</body>'
+    region = bloque_scripts_final(html)
+    assert html[region.inicio:].startswith('<script src="a.js">')
+    assert html[region.inicio_cierre:region.fin] == '</body>'
+    assert bloque_scripts_final('<body><p>x</p></body>') is None
+
+def test_leer_atributos():
+    atributos = leer_atributos('<img SRC="a.png" alt=\'b c\' width=10 hidden data-x="">')
+    assert atributos == {'src': 'a.png', 'alt': 'b c', 'width': '10', 'hidden': '', 'data-x': ''}
+
+def test_agregar_atributos():
+    assert agregar_atributos('<img src="a">', {'alt': ''}) == '<img src="a" alt="">'
+    assert agregar_atributos('<img src="a" />', {'alt': 'x'}) == '<img src="a" alt="x" />'
+
+def test_reemplazar_regiones():
+    assert reemplazar_regiones('abcdef', [(1, 2, 'X'), (4, 4, '-')]) == 'aXcd-ef'
@@ -0,0 +1,30 @@
+from prune_css import IndiceUso, podar_hoja
+
+def _indice(tmp_path, html, js=''):
+    indice = IndiceUso()
+    indice.agregar_js(js, ['js/app.js'])
+    indice.agregar_html(html, 'index.html', tmp_path, {})
+    return indice
+
+def test_poda_selectores_y_reglas_sin_uso(tmp_path):
+    indice = _indice(tmp_path, '<div class="tarjeta" id="main"><p>x</p></div>')
+    css = '.tarjeta { color: red; }\n.otra, p { margin: 0; }\n#nada { top: 0; }\n:root { --a: 1; }\n'
+    podado, reglas = podar_hoja(css, indice)
+    assert podado == '.tarjeta{color:red}p{margin:0}:root{--a:1}\n'
+    eliminadas = [r['selector'] for r in reglas if r.get('eliminada')]
+    assert eliminadas == ['#nada']
+
+def test_clases_armadas_en_js(tmp_path):
+    indice = _indice(tmp_path, '<div></div>', js='el.className = `c-btn--${variante}`;')
+    podado, _ = podar_hoja('.c-btn--primario { color: red; }\n.c-otro { color: blue; }\n', indice)
+    assert podado == '.c-btn--primario{color:red}\n'
+
+def test_keyframes_sin_uso(tmp_path):
+    indice = _indice(tmp_path, '<div class="a"></div>')
+    css = (
+        '.a { animation: girar 1s; }\n'
+        '@keyframes girar { to { opacity: 1; } }\n@keyframes nada { to { opacity: 0; } }\n'
+    )
+    podado, _ = podar_hoja(css, indice)
+    assert 'girar' in podado.split('@keyframes')[1]
+    assert 'nada' not in podado
@@ -0,0 +1,67 @@
+import pytest
+
+from conftest import marcadores_balanceados, paginas
+from render_partials import (
+    Parciales, extraer_inclusiones, iter_inclusiones, punto_inclusion, tiene_parcial,
+)
+
+@pytest.fixture
+def parciales(tmp_path):
+    (tmp_path / 'menu.html').write_text(
+        '  <a href="index.html">Inicio</a>\n  <a href="buscar.html">{{titulo}}</a>\n', encoding='utf-8'
+    )
+    (tmp_path / 'pie.html').write_text('  <footer>pie</footer>', encoding='utf-8')
+    return Parciales(tmp_path)
+
+def test_iter_inclusiones():
+    html = (
+        '<body>\n  <!-- parcial:menu activo="buscar.html" titulo="A &amp; B" -->\n  viejo\n'
+        '  <!-- /parcial:menu -->\n  <!-- parcial:pie -->\n  <!-- /parcial:pie -->\n</body>'
+    )
+    menu, pie = iter_inclusiones(html)
+    assert menu.nombre == 'menu'
+    assert menu.parametros == (('activo', 'buscar.html'), ('titulo', 'A & B'))
+    assert menu.sangria == '  '
+    assert html[menu.inicio_bloque:menu.fin_bloque].endswith('<!-- /parcial:menu -->')
+    assert html[menu.inicio:menu.fin] == '\n  viejo\n  '
+    assert pie.nombre == 'pie' and pie.parametros == ()
+
+def test_falta_el_cierre():
+    with pytest.raises(ValueError, match='falta <!-- /parcial:menu -->'):
+        list(iter_inclusiones('<!-- parcial:menu -->\n<p>x</p>'))
+
+def test_aplicar_renderiza_y_es_idempotente(parciales):
+    html = '<body>\n  ' + punto_inclusion('menu', parametros=[('activo', 'buscar.html'), ('titulo', 'A<B')]) + '\n</body>'
+    una = parciales.aplicar(html)
+    assert '<a href="buscar.html" aria-current="page">A&lt;B</a>' in una
+    assert '<a href="index.html">Inicio</a>' in una
+    assert una.count('<!-- parcial:menu') == una.count('<!-- /parcial:menu -->') == 1
+    assert parciales.aplicar(una) == una
+
+def test_parametro_faltante(parciales):
+    with pytest.raises(ValueError, match='necesita el parámetro titulo'):
+        parciales.aplicar(punto_inclusion('menu'))
+
+def test_extraer_inclusiones():
+    html = '<head>\n  <link rel="a">\n  ' + punto_inclusion('pie') + '\n</head>'
+    resto, bloques = extraer_inclusiones(html)
+    assert bloques == [punto_inclusion('pie')]
+    assert 'parcial' not in resto and '<link rel="a">' in resto
+
+def test_tiene_parcial():
+    assert tiene_parcial('<!-- parcial:pie -->', 'pie')
+    assert tiene_parcial('<!-- parcial:pie activo="x" -->', 'pie')
+    assert not tiene_parcial('<!-- parcial:pie-grande -->', 'pie')
+
+def test_adoptar(parciales):
+    html = '<body>\n  <footer>pie</footer>\n</body>'
+    adoptado = parciales.adoptar(html)
+    assert '<!-- parcial:pie -->' in adoptado and '<!-- /parcial:pie -->' in adoptado
+    assert parciales.aplicar(adoptado) == adoptado
+
+def test_las_paginas_del_repositorio_no_cambian(ejecutar, sitio):
+    """Las páginas versionadas son el punto fijo del pipeline"""
+    antes = paginas(sitio)
+    assert all(marcadores_balanceados(contenido) for contenido in antes.values())
+    ejecutar('build_site.py')
+    assert paginas(sitio) == antes
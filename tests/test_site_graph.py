@@ -0,0 +1,71 @@
+import os
+
+from site_graph import GRAFO_FILE, SiteGraph, analizar_pagina, grafo_actualizado
+
+PAGINA = '''<html>
+<head>
+  <link rel="stylesheet" href="css/a.css">
+  <link rel="manifest" href="manifest.json">
+  <link rel="icon" href="https://cdn.test/favicon.ico">
+  <script src="https://cdn.socket.io/socket.io.js"></script>
+  <!-- parcial:pie -->
+  <!-- /parcial:pie -->
+</head>
+<body>
+  <a href="b.html#arriba">b</a> <a href="https://otro.test/x.html">x</a>
+  <script src="js/a.js"></script>
+  <img src="imagenes/a.png" srcset="imagenes/a-1.png 1x, imagenes/a-2.png 2x">
+</body>
+</html>
+'''
+
+def test_analizar_pagina(tmp_path):
+    hechos = analizar_pagina(PAGINA, tmp_path)
+    assert hechos == {
+        'enlaces': ['b.html'],
+        'estilos': ['css/a.css'],
+        'scripts': ['js/a.js'],
+        'imagenes': ['imagenes/a.png', 'imagenes/a-1.png', 'imagenes/a-2.png'],
+        'otros': ['manifest.json'],
+        'origenes': ['https://cdn.socket.io'],
+        'parciales': [['pie', []]],
+        # Sin el <head>, los parciales ni los <script>, y sin contar espacios
+        'peso': len(
+            '<html><body><ahref="b.html#arriba">b</a><ahref="https://otro.test/x.html">x</a>'
+            '<imgsrc="imagenes/a.png"srcset="imagenes/a-1.png1x,imagenes/a-2.png2x"></body></html>'
+        ),
+    }
+    assert analizar_pagina('<!-- parcial:pie -->', tmp_path)['parciales'] is None
+
+def test_indice_incremental(tmp_path):
+    (tmp_path / 'a.html').write_text(PAGINA, encoding='utf-8')
+    (tmp_path / 'b.html').write_text('<link rel="stylesheet" href="css/a.css">', encoding='utf-8')
+    grafo = grafo_actualizado(tmp_path)
+    assert grafo.paginas() == ['a.html', 'b.html']
+    assert grafo.paginas_que_referencian('css/a.css') == ['a.html', 'b.html']
+    assert grafo.paginas_que_referencian('b.html') == ['a.html']
+    assert grafo.paginas_con_parcial('pie') == ['a.html']
+    assert grafo.assets_de('a.html', 'scripts') == ['js/a.js']
+    assert 'manifest.json' not in grafo.assets_de('a.html')
+    assert (tmp_path / GRAFO_FILE).exists()
+
+    # Solo se vuelve a analizar la página que cambió
+    grafo = SiteGraph.cargar(tmp_path)
+    assert grafo.actualizar() == 0
+    (tmp_path / 'b.html').write_text('<script src="js/b.js"></script>', encoding='utf-8')
+    os.utime(tmp_path / 'b.html', ns=(1, 1))
+    assert grafo.actualizar() == 1
+    assert grafo.paginas_que_referencian('css/a.css') == ['a.html']
+    assert grafo.guardar() and not grafo.guardar()
+
+    (tmp_path / 'a.html').unlink()
+    assert grafo.actualizar_paginas(['a.html']) == 0
+    assert grafo.paginas() == ['b.html'] and grafo.paginas_que_referencian('b.html') == []
+
+def test_reglas(tmp_path):
+    for nombre in ('index.html', 'componentes.html', 'politicas.html'):
+        (tmp_path / nombre).write_text('<p></p>', encoding='utf-8')
+    grafo = grafo_actualizado(tmp_path)
+    assert grafo.paginas('seo') == ['index.html', 'politicas.html']
+    assert grafo.paginas('politicas') == ['index.html']
+    assert grafo.paginas('parciales') == ['componentes.html', 'index.html', 'politicas.html']
@@ -0,0 +1,63 @@
+import json
+
+from update_seo_tags import SeoRenderer
+
+CONFIG = {
+    'siteName': 'Sitio', 'siteUrl': 'https://sitio.test', 'defaultTitle': 'Título por defecto',
+    'defaultDescription': 'Descripción por defecto', 'defaultKeywords': 'a, b',
+    'twitterHandle': '@sitio', 'defaultImage': '/og.png', 'locale': 'es_AR', 'type': 'website',
+    'pages': {
+        'a.html': {'title': 'Página A', 'description': 'Sobre A'},
+        'sin-titulo.html': {'description': 'Sin título'},
+    },
+}
+
+def test_config_perezosa(tmp_path):
+    ruta = tmp_path / 'seo-config.json'
+    seo = SeoRenderer(ruta_config=ruta)
+    # Crear el renderer no lee nada
+    ruta.write_text(json.dumps(CONFIG), encoding='utf-8')
+    assert '<title>Página A</title>' in seo.bloque('a.html')
+
+    ruta.write_text(json.dumps(dict(CONFIG, pages={'a.html': {'title': 'Otra'}})), encoding='utf-8')
+    assert '<title>Página A</title>' in seo.bloque('a.html')
+    seo.recargar()
+    assert '<title>Otra</title>' in seo.bloque('a.html')
+
+def test_bloque():
+    seo = SeoRenderer(CONFIG)
+    bloque = seo.bloque('a.html')
+    assert '<meta name="description" content="Sobre A">' in bloque
+    assert '<meta name="keywords" content="a, b">' in bloque
+    assert '<meta name="author" content="Sitio">' in bloque
+    assert 'https://sitio.test/a.html' in bloque
+    assert seo.bloque('a.html') is bloque
+    # Sin 'title' en la entrada se conserva el del documento
+    assert '<title>Actual</title>' in seo.bloque('sin-titulo.html', 'Actual')
+    assert '<title>Título por defecto</title>' in seo.bloque('otra.html', 'Actual')
+    assert '<title>Generada</title>' in seo.bloque('p.html', entrada={'title': 'Generada'})
+
+def test_actualizar_head():
+    seo = SeoRenderer(CONFIG)
+    html = (
+        '<html>\n<head>\n  <title>Vieja</title>\n  <meta name="description" content="x">\n'
+        '  <link rel="stylesheet" href="css/a.css">\n</head>\n<body><p>cuerpo</p></body>\n</html>\n'
+    )
+    nuevo = seo.actualizar_head(html, 'a.html')
+    assert '<title>Página A</title>' in nuevo and 'Vieja' not in nuevo
+    assert '<link rel="stylesheet" href="css/a.css">' in nuevo
+    assert nuevo.endswith('</head>\n<body><p>cuerpo</p></body>\n</html>\n')
+    assert seo.actualizar_head('<p>sin head</p>', 'a.html') is None
+
+def test_actualizar_head_con_preconnect():
+    """Con la estructura de las páginas del sitio solo se reemplaza el bloque
+    anterior al primer preconnect"""
+    seo = SeoRenderer(CONFIG)
+    html = (
+        '<html>\n<head>\n  <meta charset="UTF-8" />\n  <meta name="viewport" content="x"/>\n'
+        '  <title>Vieja</title>\n  <link rel="preconnect" href="https://fonts.googleapis.com">\n'
+        '  <link rel="stylesheet" href="css/a.css">\n</head>\n<body></body>\n</html>\n'
+    )
+    nuevo = seo.actualizar_head(html, 'a.html')
+    assert nuevo.startswith('<html>\n<head>\n' + seo.bloque('a.html') + '\n  <link rel="preconnect"')
+    assert seo.actualizar_head(nuevo, 'a.html') == nuevo
@@ -0,0 +1,79 @@
+"""
+Modo vigilancia, manejado desde un script en la copia del sitio (los módulos
+de build_site leen el sitio del directorio donde están)
+"""
+
+import json
+
+from watch_site import diferencias
+
+PAGINA = '<html>\n<head>\n  <title>{titulo}</title>\n</head>\n<body>\n{cuerpo}</body>\n</html>\n'
+
+VIGILAR = '''
+import json, sys
+from pathlib import Path
+from watch_site import Vigilancia, escanear
+
+vigilancia = Vigilancia(Path('.'))
+vigilancia.construir_todo()
+pasos = []
+for cambios in json.loads(sys.argv[1]):
+    for ruta, contenido in cambios.items():
+        if contenido is None:
+            Path(ruta).unlink()
+        else:
+            Path(ruta).write_text(contenido, encoding='utf-8')
+    cambiados = vigilancia.esperar_cambios() if cambios else set()
+    pasos.append(sorted(cambiados))
+    vigilancia.procesar(cambiados)
+    pasos.append(sorted(escanear(Path('.')).keys() - vigilancia.estado.keys()))
+print(json.dumps(pasos))
+'''
+
+def _pagina(titulo, *enlaces):
+    cuerpo = ''.join(f'  <a href="{enlace}">{enlace}</a>\n' for enlace in enlaces)
+    return PAGINA.format(titulo=titulo, cuerpo=cuerpo)
+
+def _prefetch(sitio, pagina):
+    contenido = (sitio / pagina).read_text(encoding='utf-8')
+    return [
+        linea.split('href="')[1].split('"')[0]
+        for linea in contenido.splitlines() if 'rel="prefetch"' in linea
+    ]
+
+def test_diferencias():
+    anterior = {'a.html': (1, 10), 'b.html': (1, 10)}
+    actual = {'a.html': (2, 10), 'c.html': (1, 5), 'b.html': (1, 10)}
+    assert diferencias(anterior, actual) == {'a.html', 'c.html'}
+
+def test_vigilancia(ejecutar, sitio):
+    paginas = {
+        'w-a.html': _pagina('A', 'w-b.html', 'w-c.html'),
+        'w-b.html': _pagina('B'),
+        'w-c.html': _pagina('C'),
+        'w-d.html': _pagina('D', 'w-c.html'),
+        'w-e.html': _pagina('E'),
+    }
+    for nombre, contenido in paginas.items():
+        (sitio / nombre).write_text(contenido, encoding='utf-8')
+    (sitio / 'vigilar.py').write_text(VIGILAR, encoding='utf-8')
+
+    pasos = [
+        # w-e.html pasa a enlazar w-b.html: w-b.html queda tan enlazada como
+        # w-c.html y cambia el orden de los prefetch de w-a.html, que no enlaza a w-e.html
+        {'w-e.html': _pagina('E', 'w-b.html')},
+        # Un parcial: se reescriben las páginas que lo incluyen
+        {'partials/footer.html': (sitio / 'partials' / 'footer.html').read_text(encoding='utf-8')
+            .replace('</footer>', '<!-- pie nuevo --></footer>')},
+    ]
+    salida = ejecutar('vigilar.py', json.dumps(pasos))
+    resultado = json.loads(salida.strip().splitlines()[-1])
+    assert resultado[0] == ['w-e.html'] and resultado[2] == ['partials/footer.html']
+    # Lo que escribió la vigilancia no cuenta como cambio pendiente
+    assert resultado[1] == resultado[3] == []
+
+    assert _prefetch(sitio, 'w-a.html') == ['w-b.html', 'w-c.html']
+    assert '<!-- pie nuevo -->' in (sitio / 'contacto.html').read_text(encoding='utf-8')
+    assert '<!-- pie nuevo -->' not in (sitio / 'index.html').read_text(encoding='utf-8')
+    # Lo que dejó la vigilancia es lo mismo que haría un build
+    assert '0 archivos actualizados' in ejecutar('build_site.py')
@@ -1,50 +1,39 @@
 #!/usr/bin/env python3
 """
 Script para actualizar el navbar en todas las páginas HTML de ServiLocal
+
+El markup del navbar está en partials/navbar.html: el header de cada página se
+reemplaza por un punto de inclusión de ese parcial y se renderiza.
 """
 
-import os
-import re
 from pathlib import Path
 
-# Navbar moderno con hamburguesa
-MODERN_NAVBAR = '''  <header class="c-navbar">
-    <div class="container c-navbar__inner">
-      <a class="c-navbar__brand" href="index.html">
-        <i class="fas fa-map-marker-alt c-navbar__brand-icon"></i>
-        ServiLocal
-      </a>
-      
-      <!-- Botón hamburguesa para móvil -->
-      <button class="c-navbar__toggle" type="button" aria-label="Abrir menú de navegación" aria-expanded="false" aria-controls="navbar-menu">
-        <span class="c-navbar__toggle-line"></span>
-        <span class="c-navbar__toggle-line"></span>
-        <span class="c-navbar__toggle-line"></span>
-      </button>
-      
-      <!-- Menú de navegación -->
-      <nav class="c-navbar__menu" id="navbar-menu">
-        <div class="c-navbar__links">
-          <a class="c-navbar__link" href="index.html">
-            <i class="fas fa-home c-navbar__link-icon"></i>
-            Inicio
-          </a>
-          <a class="c-navbar__link" href="buscar.html">
-            <i class="fas fa-search c-navbar__link-icon"></i>
-            Buscar
-          </a>
-          <a class="c-navbar__link" href="todos_los_servicios.html">
-            <i class="fas fa-th-large c-navbar__link-icon"></i>
-            Servicios
-          </a>
-          <a class="c-navbar__link" href="perfil.html">
-            <i class="fas fa-user c-navbar__link-icon"></i>
-            Mi perfil
-          </a>
-        </div>
-      </nav>
-    </div>
-  </header>'''
+from build_output import escribir_texto
+from build_utils import MODIFICADO, crear_parser, procesar_archivos
+from html_regions import iter_elementos, reemplazar_regiones
+from render_partials import punto_inclusion, renderer as parciales, tiene_parcial
+from site_graph import grafo_actualizado
+
+def update_navbar_html(content, pagina=None):
+    """Devuelve el HTML con el header reemplazado por el punto de inclusión del
+    parcial navbar (partials/navbar.html), con la página como enlace activo"""
+    # Verificar si ya incluye el parcial
+    if tiene_parcial(content, 'navbar'):
+        return content
+    
+    # Headers completos (incluyendo variantes con role="banner")
+    regiones = iter_elementos(content, 'header', '<header class="c-navbar"')
+    parametros = (('activo', pagina),) if pagina else ()
+    
+    # Reemplazar el navbar; el contenido lo completa render_partials
+    reemplazos = []
+    for region in regiones:
+        inicio_linea = content.rfind('\n', 0, region.inicio) + 1
+        sangria = content[inicio_linea:region.inicio]
+        if sangria.strip():
+            sangria = ''
+        reemplazos.append((region.inicio, region.fin, punto_inclusion('navbar', sangria, parametros)))
+    return reemplazar_regiones(content, reemplazos)
 
 def update_navbar_in_file(filepath):
     """Actualiza el navbar en un archivo HTML"""
@@ -52,20 +41,15 @@ def update_navbar_in_file(filepath):
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        # Patrón para encontrar el header completo (incluyendo variantes con role="banner")
-        pattern = r'<header class="c-navbar"[^>]*>.*?</header>'
-        
-        # Verificar si ya tiene el navbar moderno
-        if 'c-navbar__toggle' in content:
-            print(f"✓ {filepath.name} - Ya tiene navbar moderno")
+        # Verificar si ya incluye el parcial
+        if tiene_parcial(content, 'navbar'):
+            print(f"✓ {filepath.name} - Ya incluye el navbar")
             return False
         
-        # Reemplazar el navbar
-        new_content = re.sub(pattern, MODERN_NAVBAR, content, flags=re.DOTALL)
+        new_content = parciales.aplicar(update_navbar_html(content, filepath.name))
         
         if new_content != content:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(new_content)
+            escribir_texto(filepath, new_content)
             print(f"✓ {filepath.name} - Navbar actualizado")
             return True
         else:
@@ -78,18 +62,14 @@ def update_navbar_in_file(filepath):
 
 def main():
     """Procesar todos los archivos HTML"""
+    args = crear_parser(__doc__).parse_args()
     base_dir = Path(__file__).parent
-    html_files = list(base_dir.glob('*.html'))
-    
-    # Excluir componentes.html si existe (página de demostración)
-    html_files = [f for f in html_files if f.name != 'componentes.html']
+    html_files = grafo_actualizado(base_dir).archivos('navbar')
     
     print(f"\n🔧 Actualizando navbars en {len(html_files)} archivos HTML...\n")
     
-    updated_count = 0
-    for html_file in sorted(html_files):
-        if update_navbar_in_file(html_file):
-            updated_count += 1
+    estados = procesar_archivos(update_navbar_in_file, html_files, args.jobs)
+    updated_count = estados.count(MODIFICADO)
     
     print(f"\n✅ Proceso completado: {updated_count} archivos actualizados\n")
 
@@ -6,31 +6,47 @@ Script para actualizar enlaces de políticas de privacidad para que abran en nue
 import re
 from pathlib import Path
 
+from build_output import escribir_texto
+from build_utils import MODIFICADO, crear_parser, procesar_archivos
+from html_regions import iter_etiquetas, reemplazar_regiones
+from site_graph import grafo_actualizado
+
+def update_politicas_html(content):
+    """Devuelve el HTML con los enlaces a políticas abriendo en nueva pestaña"""
+    # Patrón para encontrar enlaces a politicas.html que no tengan target="_blank"
+    # (se aplica solo al inicio de cada etiqueta <a>)
+    pattern = re.compile(r'<a\s+([^>]*?)href="politicas\.html"([^>]*?)>')
+    
+    reemplazos = []
+    for etiqueta in iter_etiquetas(content, 'a'):
+        match = pattern.match(content, etiqueta.inicio)
+        if not match:
+            continue
+        before = match.group(1)
+        after = match.group(2)
+        
+        # Si ya tiene target="_blank", no hacer nada
+        if 'target="_blank"' in before or 'target="_blank"' in after:
+            continue
+        
+        # Agregar target y rel
+        reemplazos.append((
+            match.start(), match.end(),
+            f'<a {before}href="politicas.html" target="_blank" rel="noopener noreferrer"{after}>'
+        ))
+    
+    return reemplazar_regiones(content, reemplazos)
+
 def update_politicas_link(filepath):
     """Actualiza el enlace de políticas para que abra en nueva pestaña"""
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        # Patrón para encontrar enlaces a politicas.html que no tengan target="_blank"
-        pattern = r'<a\s+([^>]*?)href="politicas\.html"([^>]*?)>'
-        
-        def replace_link(match):
-            before = match.group(1)
-            after = match.group(2)
-            
-            # Si ya tiene target="_blank", no hacer nada
-            if 'target="_blank"' in before or 'target="_blank"' in after:
-                return match.group(0)
-            
-            # Agregar target y rel
-            return f'<a {before}href="politicas.html" target="_blank" rel="noopener noreferrer"{after}>'
-        
-        new_content = re.sub(pattern, replace_link, content)
+        new_content = update_politicas_html(content)
         
         if new_content != content:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(new_content)
+            escribir_texto(filepath, new_content)
             print(f"✓ {filepath.name} - Enlaces actualizados")
             return True
         else:
@@ -43,18 +59,14 @@ def update_politicas_link(filepath):
 
 def main():
     """Procesar todos los archivos HTML"""
+    args = crear_parser(__doc__).parse_args()
     base_dir = Path(__file__).parent
-    html_files = list(base_dir.glob('*.html'))
-    
-    # Excluir politicas.html y componentes.html
-    html_files = [f for f in html_files if f.name not in ['politicas.html', 'componentes.html']]
+    html_files = grafo_actualizado(base_dir).archivos('politicas')
     
     print(f"\n🔗 Actualizando enlaces a políticas en {len(html_files)} archivos HTML...\n")
     
-    updated_count = 0
-    for html_file in sorted(html_files):
-        if update_politicas_link(html_file):
-            updated_count += 1
+    estados = procesar_archivos(update_politicas_link, html_files, args.jobs)
+    updated_count = estados.count(MODIFICADO)
     
     print(f"\n✅ Proceso completado: {updated_count} archivos actualizados\n")
 
@@ -7,47 +7,45 @@ Incluye: description, keywords, Open Graph, Twitter Cards, canonical
 import re
 import json
 from pathlib import Path
+from string import Formatter
 
-# Cargar configuración SEO
-with open('seo-config.json', 'r', encoding='utf-8') as f:
-    config = json.load(f)
+from build_output import escribir_texto
+from build_utils import MODIFICADO, crear_parser, procesar_archivos
+from html_regions import buscar_head
+from render_partials import extraer_inclusiones
+from site_graph import grafo_actualizado
 
-def generate_meta_tags(page_name, config):
-    """Genera los meta tags para una página específica"""
-    
-    page_config = config['pages'].get(page_name, {})
-    title = page_config.get('title', config['defaultTitle'])
-    description = page_config.get('description', config['defaultDescription'])
-    keywords = page_config.get('keywords', config['defaultKeywords'])
-    url = f"{config['siteUrl']}/{page_name}"
-    image = config['defaultImage']
-    
-    meta_tags = f'''  <meta charset="UTF-8" />
+CONFIG_FILE = Path(__file__).parent / 'seo-config.json'
+
+
+# Los campos de config se completan una vez al compilar; title, description,
+# keywords y url se completan en cada página
+PLANTILLA_HEAD = '''  <meta charset="UTF-8" />
   <meta name="viewport" content="width=device-width, initial-scale=1.0"/>
   
   <!-- SEO Meta Tags -->
   <meta name="description" content="{description}">
   <meta name="keywords" content="{keywords}">
-  <meta name="author" content="{config['siteName']}">
+  <meta name="author" content="{siteName}">
   <meta name="robots" content="index, follow">
   <link rel="canonical" href="{url}">
   
   <!-- Open Graph / Facebook -->
-  <meta property="og:type" content="{config['type']}">
+  <meta property="og:type" content="{type}">
   <meta property="og:url" content="{url}">
   <meta property="og:title" content="{title}">
   <meta property="og:description" content="{description}">
-  <meta property="og:image" content="{config['siteUrl']}{image}">
-  <meta property="og:locale" content="{config['locale']}">
-  <meta property="og:site_name" content="{config['siteName']}">
+  <meta property="og:image" content="{siteUrl}{defaultImage}">
+  <meta property="og:locale" content="{locale}">
+  <meta property="og:site_name" content="{siteName}">
   
   <!-- Twitter -->
   <meta name="twitter:card" content="summary_large_image">
   <meta name="twitter:url" content="{url}">
   <meta name="twitter:title" content="{title}">
   <meta name="twitter:description" content="{description}">
-  <meta name="twitter:image" content="{config['siteUrl']}{image}">
-  <meta name="twitter:site" content="{config['twitterHandle']}">
+  <meta name="twitter:image" content="{siteUrl}{defaultImage}">
+  <meta name="twitter:site" content="{twitterHandle}">
   
   <!-- Favicon -->
   <link rel="icon" type="image/x-icon" href="/favicon.ico">
@@ -56,95 +54,176 @@ def generate_meta_tags(page_name, config):
   <link rel="icon" type="image/png" sizes="16x16" href="/favicon-16x16.png">
   
   <title>{title}</title>'''
-    
-    return meta_tags
 
-def update_html_file(file_path, config):
-    """Actualiza un archivo HTML con los meta tags apropiados"""
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    page_name = file_path.name
-    new_meta_tags = generate_meta_tags(page_name, config)
-    
-    # Patrón para encontrar la sección <head> completa hasta el primer <link> de fonts
-    # Buscamos desde <meta charset> hasta justo antes de <link rel="preconnect">
-    pattern = r'(<head>\s*)(<meta charset[^>]*>\s*<meta name="viewport"[^>]*/>)(.*?)(<link rel="preconnect")'
-    
-    def replacer(match):
-        return match.group(1) + new_meta_tags + '\n  ' + match.group(4)
-    
-    # Intentar reemplazar
-    new_content, count = re.subn(pattern, replacer, content, count=1, flags=re.DOTALL)
-    
-    if count == 0:
-        # Si no encuentra el patrón, intentar con un patrón más simple
-        # Buscar <head> hasta <title>
-        pattern2 = r'(<head>\s*)(.*?)(</head>)'
+CAMPOS_PAGINA = {'title', 'description', 'keywords', 'url'}
+
+_ESTRUCTURA_HEAD = re.compile(r'<meta charset[^>]*>\s*<meta name="viewport"[^>]*/>')
+# Para los <head> sin esa estructura
+_TITULO = re.compile(r'<title>([^<]+)</title>')
+# Los <link> (con el <noscript> que les agrega critical_css), <style> y <noscript>
+_CONSERVAR = re.compile(
+    r'<link[^>]*>(?:<noscript\b.*?</noscript>)?|<style\b.*?</style>|<noscript\b.*?</noscript>',
+    re.DOTALL,
+)
+
+class SeoRenderer:
+    """Genera el bloque de meta tags SEO del <head> de cada página.
+
+    seo-config.json se lee recién la primera vez que se necesita (importar el
+    módulo no hace I/O), la plantilla se compila una sola vez con los valores
+    globales ya completados y cada bloque generado se guarda por página y
+    entrada de configuración: mientras la entrada no cambie, la página no se
+    vuelve a renderizar. La configuración nunca se modifica.
+
+    Otras transformaciones pueden usar bloque(pagina) para obtener el HTML o
+    actualizar_head(contenido, pagina) para reescribir un documento completo.
+    """
+
+    def __init__(self, config=None, ruta_config=CONFIG_FILE):
+        self._config = config
+        self.ruta_config = Path(ruta_config)
+        self._plantilla = None
+        self._bloques = {}
+
+    @property
+    def config(self):
+        if self._config is None:
+            with open(self.ruta_config, 'r', encoding='utf-8') as f:
+                self._config = json.load(f)
+        return self._config
+
+    def recargar(self):
+        """Olvida la configuración leída y los bloques generados con ella"""
+        self._config = None
+        self._plantilla = None
+        self._bloques = {}
+
+    def entrada(self, pagina):
+        """Entrada de la página en config['pages'], o None"""
+        return self.config['pages'].get(pagina)
+
+    def _compilar(self):
+        """Lista de (literal, campo) con los valores globales ya incorporados al literal"""
+        if self._plantilla is None:
+            partes = []
+            literal = ''
+            for texto, campo, _, _ in Formatter().parse(PLANTILLA_HEAD):
+                literal += texto
+                if campo is None:
+                    continue
+                if campo in CAMPOS_PAGINA:
+                    partes.append((literal, campo))
+                    literal = ''
+                else:
+                    literal += str(self.config[campo])
+            partes.append((literal, None))
+            self._plantilla = partes
+        return self._plantilla
+
+    def bloque(self, pagina, titulo_actual=None, entrada=None):
+        """Meta tags de la página.
+
+        titulo_actual solo se usa si la página tiene entrada sin 'title' (es el
+        <title> que ya tenía el documento). entrada reemplaza a la de
+        seo-config.json, para páginas generadas que no figuran en él.
+        """
+        if entrada is None:
+            entrada = self.entrada(pagina)
+        if entrada is None or 'title' in entrada:
+            titulo_actual = None
+        clave = (pagina, tuple(sorted(entrada.items())) if entrada else None, titulo_actual)
+        bloque = self._bloques.get(clave)
+        if bloque is None:
+            entrada = entrada or {}
+            valores = {
+                'title': entrada.get('title', titulo_actual or self.config['defaultTitle']),
+                'description': entrada.get('description', self.config['defaultDescription']),
+                'keywords': entrada.get('keywords', self.config['defaultKeywords']),
+                'url': f"{self.config['siteUrl']}/{pagina}",
+            }
+            bloque = ''.join(
+                literal + (valores[campo] if campo else '')
+                for literal, campo in self._compilar()
+            )
+            self._bloques[clave] = bloque
+        return bloque
+
+    def actualizar_head(self, content, page_name, entrada=None):
+        """Devuelve el HTML con los meta tags apropiados, o None si no se encontró el <head>"""
         
-        # Buscar el <title> actual
-        title_match = re.search(r'<title>([^<]+)</title>', content)
-        current_title = title_match.group(1) if title_match else config['defaultTitle']
+        # Solo se trabaja dentro del <head>; el resto del documento no se recorre
+        head = buscar_head(content)
+        if head is None:
+            return None
         
-        # Actualizar el título en config si es necesario
-        page_config = config['pages'].get(page_name, {})
-        if 'title' not in page_config:
-            page_config['title'] = current_title
+        # Inicio del contenido del <head>, después de los espacios iniciales
+        inicio = head.fin_apertura
+        while inicio < head.inicio_cierre and content[inicio].isspace():
+            inicio += 1
+        # El bloque trae su propia sangría: se reemplaza también la de la línea
+        # (si no, crece en cada ejecución)
+        inicio_linea = max(content.rfind('\n', head.fin_apertura, inicio) + 1, head.fin_apertura)
         
-        new_meta_tags_full = generate_meta_tags(page_name, config)
+        # Sección desde <meta charset> hasta justo antes del primer <link rel="preconnect"> de fonts
+        preconnect = content.find('<link rel="preconnect"', inicio, head.inicio_cierre)
         
-        def replacer2(match):
-            # Mantener solo los links después del título
-            old_head_content = match.group(2)
-            links = re.findall(r'<link[^>]*>', old_head_content)
-            links_str = '\n  '.join(links)
-            return match.group(1) + new_meta_tags_full + '\n  ' + links_str + '\n' + match.group(3)
+        if _ESTRUCTURA_HEAD.match(content, inicio) and preconnect != -1:
+            return content[:inicio_linea] + self.bloque(page_name, entrada=entrada) + '\n  ' + content[preconnect:]
         
-        new_content, count = re.subn(pattern2, replacer2, content, count=1, flags=re.DOTALL)
+        # Si no encuentra esa estructura, reemplazar todo el contenido del <head>
+        old_head_content = content[inicio:head.inicio_cierre]
+        
+        # El <title> actual se conserva si la configuración de la página no trae uno
+        title_match = _TITULO.search(old_head_content)
+        current_title = title_match.group(1) if title_match else None
+        
+        # Mantener solo los links, estilos y noscript (en orden) y los parciales enteros
+        old_head_content, parciales = extraer_inclusiones(old_head_content)
+        links = _CONSERVAR.findall(old_head_content)
+        links_str = '\n  '.join(links + parciales)
+        return (
+            content[:inicio_linea] + self.bloque(page_name, current_title, entrada) + '\n  ' + links_str + '\n'
+            + content[head.inicio_cierre:]
+        )
+
+# Instancia compartida: no lee seo-config.json hasta el primer uso
+renderer = SeoRenderer()
+
+def generate_meta_tags(page_name, config):
+    """Genera los meta tags para una página específica"""
+    return SeoRenderer(config).bloque(page_name)
+
+def update_head_html(content, page_name, config):
+    """Devuelve el HTML con los meta tags apropiados, o None si no se encontró el <head>"""
+    return SeoRenderer(config).actualizar_head(content, page_name)
+
+def update_html_file(file_path, seo=renderer):
+    """Actualiza un archivo HTML con los meta tags apropiados"""
+    
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    new_content = seo.actualizar_head(content, file_path.name)
     
-    if count > 0:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
-        return True
-    else:
+    if new_content is None:
         print(f"⚠️  No se pudo actualizar {file_path.name}")
         return False
+    if not escribir_texto(file_path, new_content):
+        print(f"○ {file_path.name} - Sin cambios necesarios")
+        return False
+    print(f"✓ {file_path.name} actualizado")
+    return True
 
 def main():
     """Procesa todos los archivos HTML en el directorio"""
+    args = crear_parser(__doc__).parse_args()
+    
+    base_dir = Path(__file__).parent
     
-    html_files = [
-        'index.html',
-        'buscar.html',
-        'perfil.html',
-        'login.html',
-        'registro.html',
-        'proveedor.html',
-        'todos_los_servicios.html',
-        'jardineria.html',
-        'plomeria.html',
-        'electricidad.html',
-        'limpieza.html',
-        'construccion.html',
-        'abogacia.html',
-        'contaduria.html',
-        'veterinaria.html',
-        'politicas.html',
-        'corralon.html',
-        'ferreteria.html',
-        'mecanica.html',
-    ]
+    file_paths = grafo_actualizado(base_dir).archivos('seo')
     
-    updated = 0
-    for filename in html_files:
-        file_path = Path(filename)
-        if file_path.exists():
-            if update_html_file(file_path, config):
-                print(f"✓ {filename} actualizado")
-                updated += 1
-        else:
-            print(f"⚠️  {filename} no encontrado")
+    estados = procesar_archivos(update_html_file, file_paths, args.jobs)
+    updated = estados.count(MODIFICADO)
     
     print(f"\n✅ {updated} archivos actualizados con meta tags SEO")
 
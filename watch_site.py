@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Modo vigilancia: reescribe las páginas afectadas cada vez que se guarda un archivo
+
+Primero hace el mismo build incremental que build_site.py y después revisa cada
+INTERVALO_S el stat de las páginas, de partials/, seo-config.json,
+navegacion.json, css/, js/ e imagenes/. seo-config.json, los parciales, el
+índice del sitio y el manifest quedan en memoria entre un cambio y otro; cuando
+algo cambia (y pasan DEBOUNCE_S sin más cambios, para no leer un archivo a
+medio guardar) solo se revisan las páginas a las que afecta:
+
+- una página: primero ella misma (también las dimensiones de sus <img>) y
+  después las que la enlazan (si se creó o se borró, sus prefetch cambian) y
+  las que enlazan a las mismas páginas que ella antes o después del cambio
+  (los prefetch se ordenan por cuántas páginas enlazan a cada destino);
+- partials/<nombre>.html: las páginas que incluyen ese parcial;
+- seo-config.json: todas, pero solo se reescriben aquellas cuya entrada o los
+  valores globales cambiaron;
+- navegacion.json: las páginas con hints;
+- una hoja de css/: las que la cargan o cargan una hoja que la importa;
+- una imagen de imagenes/: las que la usan (add_image_dimensions).
+
+Entre esas páginas, el manifest de build_site decide cuáles cambiaron de verdad.
+Ninguna transformación lee el contenido de js/: sus cambios solo se informan.
+El CSS crítico, el fingerprinting y los bundles son pasos de publicación y no
+se ejecutan acá.
+
+Se revisa el stat en lugar de usar inotify para no depender de nada fuera de la
+biblioteca estándar: con miles de archivos cada revisión tarda unos pocos
+milisegundos.
+"""
+
+import os
+import time
+from pathlib import Path
+
+import add_image_dimensions as dimensiones
+from add_resource_hints import NAVEGACION_FILE, renderer as hints
+from build_manifest import crear_registro, hash_texto
+from build_output import escrituras
+from build_site import (
+    ETAPAS, cargar_manifest_previo, paginas_del_sitio, paginas_pendientes, reconstruir,
+    recargar_configuracion,
+)
+from build_utils import crear_parser
+from css_rules import imports_css
+from render_partials import DIRECTORIO_PARCIALES, renderer as parciales
+from site_graph import REGLAS, grafo_actualizado
+from update_seo_tags import CONFIG_FILE
+
+INTERVALO_S = 0.1
+DEBOUNCE_S = 0.03
+# Con cambios continuos (una copia grande), se procesa igual pasado este tiempo
+ESPERA_MAXIMA_S = 1.0
+# Con menos páginas que estas, un pool de procesos tarda más de lo que ahorra
+MINIMO_PARALELO = 8
+
+DIRECTORIOS = ('css', 'js', 'imagenes', DIRECTORIO_PARCIALES)
+# Generados por otros scripts: no los edita nadie
+EXCLUIDOS = ('imagenes/_variantes/',)
+CONFIGURACION = (CONFIG_FILE.name, NAVEGACION_FILE.name)
+
+def _escanear_directorio(directorio, prefijo, estado):
+    try:
+        entradas = os.scandir(directorio)
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    with entradas:
+        for entrada in entradas:
+            if entrada.name.startswith('.'):
+                # Temporales de build_output y archivos ocultos de los editores
+                continue
+            ruta = prefijo + entrada.name
+            try:
+                if entrada.is_dir(follow_symlinks=False):
+                    if not (ruta + '/').startswith(EXCLUIDOS):
+                        _escanear_directorio(entrada.path, ruta + '/', estado)
+                elif entrada.is_file():
+                    stat = entrada.stat()
+                    estado[ruta] = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                continue
+
+def escanear(base_dir):
+    """{ruta relativa: (mtime_ns, tamaño)} de los archivos vigilados"""
+    estado = {}
+    with os.scandir(base_dir) as entradas:
+        for entrada in entradas:
+            if entrada.name.endswith('.html') or entrada.name in CONFIGURACION:
+                try:
+                    if entrada.is_file():
+                        stat = entrada.stat()
+                        estado[entrada.name] = (stat.st_mtime_ns, stat.st_size)
+                except FileNotFoundError:
+                    continue
+    for directorio in DIRECTORIOS:
+        _escanear_directorio(base_dir / directorio, directorio + '/', estado)
+    return estado
+
+def diferencias(anterior, actual):
+    """Rutas creadas, modificadas o borradas"""
+    return {
+        ruta for ruta in anterior.keys() | actual.keys()
+        if anterior.get(ruta) != actual.get(ruta)
+    }
+
+class Vigilancia:
+    """Estado del sitio entre un cambio y otro"""
+
+    def __init__(self, base_dir, jobs=1):
+        self.base_dir = Path(base_dir)
+        self.jobs = jobs
+        self.grafo = grafo_actualizado(self.base_dir)
+        self.manifest = cargar_manifest_previo(self.base_dir)
+        self.cache_dimensiones = dimensiones.cache_proceso(self.base_dir)
+        self.estado = escanear(self.base_dir)
+
+    def _recordar(self, archivos):
+        """Las páginas que escribimos no cuentan como cambios"""
+        for archivo in archivos:
+            stat = archivo.stat()
+            self.estado[archivo.name] = (stat.st_mtime_ns, stat.st_size)
+
+    def _agregar_dimensiones(self, nombres):
+        """add_image_dimensions sobre esas páginas; devuelve las reescritas"""
+        reescritas = []
+        for nombre in nombres:
+            if nombre not in self.grafo or not REGLAS['imagenes'](nombre):
+                continue
+            archivo = self.base_dir / nombre
+            modificado, _ = dimensiones.agregar_dimensiones(archivo)
+            if not modificado:
+                continue
+            reescritas.append(archivo)
+            # La salida del build ahora es la página con dimensiones: sin esto
+            # el próximo build la volvería a procesar
+            registro = self.manifest.paginas.get(nombre)
+            if registro is not None:
+                self.manifest.registrar(nombre, crear_registro(
+                    archivo.stat(), registro['entrada'],
+                    hash_texto(archivo.read_text(encoding='utf-8')), registro['dependencias'],
+                ))
+        return reescritas
+
+    def reconstruir(self, nombres, con_dimensiones=False):
+        """Procesa las páginas que cambiaron entre esas; devuelve las reescritas"""
+        archivos = [
+            self.base_dir / nombre for nombre in sorted(nombres)
+            if nombre in self.grafo and any(etapa.aplica(nombre) for etapa in ETAPAS)
+        ]
+        pendientes = paginas_pendientes(archivos, self.manifest)
+        jobs = self.jobs if len(pendientes) >= MINIMO_PARALELO else 1
+        if jobs != 1:
+            # Los procesos del pool leen el índice del archivo si no lo heredan
+            self.grafo.guardar()
+        reescritas = reconstruir(pendientes, self.manifest, jobs)
+        if con_dimensiones:
+            reescritas += self._agregar_dimensiones(nombres)
+        reescritas = list(dict.fromkeys(reescritas))
+        self.grafo.actualizar_paginas(archivo.name for archivo in reescritas)
+        self._recordar(reescritas)
+        return reescritas
+
+    def construir_todo(self):
+        """Build incremental de todo el sitio, como build_site.py"""
+        archivos = paginas_del_sitio(self.grafo)
+        pendientes = paginas_pendientes(archivos, self.manifest)
+        print(f"\n🔧 Procesando {len(pendientes)} de {len(archivos)} archivos HTML ({len(ETAPAS)} etapas)...\n")
+        reescritas = reconstruir(pendientes, self.manifest, self.jobs)
+        self.grafo.actualizar_paginas(archivo.name for archivo in reescritas)
+        self._recordar(reescritas)
+        self.guardar()
+        return reescritas
+
+    def _paginas_con_hoja(self, ruta):
+        """Páginas que cargan la hoja o una hoja que la importa"""
+        paginas = set(self.grafo.paginas_que_referencian(ruta))
+        destino = (self.base_dir / ruta).resolve()
+        hojas = {hoja for pagina in self.grafo.paginas() for hoja in self.grafo.assets_de(pagina, 'estilos')}
+        for hoja in hojas:
+            if hoja != ruta and destino in imports_css(self.base_dir / hoja, self.base_dir):
+                paginas.update(self.grafo.paginas_que_referencian(hoja))
+        return paginas
+
+    def _destinos(self, nombres):
+        """Páginas a las que enlazan esas páginas, según el índice"""
+        return {
+            destino for nombre in nombres if nombre in self.grafo
+            for destino in self.grafo.enlaces_de(nombre)
+        }
+
+    def procesar(self, cambios):
+        """Reescribe lo afectado por los archivos que cambiaron"""
+        inicio = time.perf_counter()
+        editadas = set()
+        revisar = set()
+        con_imagenes = set()
+        sin_efecto = []
+        for ruta in sorted(cambios):
+            if '/' not in ruta and ruta.endswith('.html'):
+                editadas.add(ruta)
+            elif ruta == CONFIG_FILE.name:
+                recargar_configuracion()
+                revisar.update(self.grafo.paginas())
+            elif ruta == NAVEGACION_FILE.name:
+                hints.recargar()
+                revisar.update(self.grafo.paginas('hints'))
+            elif ruta.startswith(DIRECTORIO_PARCIALES + '/'):
+                nombre = Path(ruta).stem
+                parciales.recargar(nombre)
+                revisar.update(self.grafo.paginas_con_parcial(nombre))
+            elif ruta.startswith('css/'):
+                revisar.update(self._paginas_con_hoja(ruta))
+            elif ruta.startswith('imagenes/'):
+                con_imagenes.update(self.grafo.paginas_que_referencian(ruta))
+            else:
+                sin_efecto.append(ruta)
+        if sin_efecto:
+            resto = f" y {len(sin_efecto) - 3} más" if len(sin_efecto) > 3 else ''
+            print(f"○ {', '.join(sin_efecto[:3])}{resto} - Ninguna transformación depende de su contenido")
+
+        # Las páginas guardadas primero: son las que se están mirando
+        destinos = self._destinos(editadas)
+        self.grafo.actualizar_paginas(editadas)
+        for nombre in editadas - set(self.grafo.paginas()):
+            self.manifest.paginas.pop(nombre, None)
+            print(f"○ {nombre} - Borrada")
+        reescritas = self.reconstruir(editadas, con_dimensiones=True)
+        editadas_ms = (time.perf_counter() - inicio) * 1000
+
+        for nombre in editadas | destinos | self._destinos(editadas):
+            revisar.update(self.grafo.paginas_que_referencian(nombre))
+        reescritas += self.reconstruir(revisar - editadas)
+        reescritas += self._agregar_dimensiones(sorted(con_imagenes))
+        self._recordar(reescritas)
+        total_ms = (time.perf_counter() - inicio) * 1000
+
+        detalle = f" (las editadas en {editadas_ms:.0f} ms)" if editadas and total_ms - editadas_ms >= 1 else ''
+        print(f"⚡ {len(set(reescritas))} páginas reescritas en {total_ms:.0f} ms{detalle}\n")
+        self.guardar()
+
+    def guardar(self):
+        self.manifest.conservar(archivo.name for archivo in paginas_del_sitio(self.grafo))
+        self.manifest.guardar()
+        self.grafo.guardar()
+        if self.cache_dimensiones.nuevas:
+            self.cache_dimensiones.guardar(self.base_dir / dimensiones.CACHE_DIMENSIONES)
+            self.cache_dimensiones.nuevas = {}
+        # El proceso no termina: las páginas reescritas se anotan en cada cambio
+        escrituras.confirmar()
+
+    def esperar_cambios(self):
+        """Bloquea hasta que algo cambie y devuelve las rutas que cambiaron"""
+        while True:
+            time.sleep(INTERVALO_S)
+            actual = escanear(self.base_dir)
+            cambios = diferencias(self.estado, actual)
+            if cambios:
+                break
+        # Esperar a que el editor termine de guardar
+        limite = time.perf_counter() + ESPERA_MAXIMA_S
+        while time.perf_counter() < limite:
+            time.sleep(DEBOUNCE_S)
+            siguiente = escanear(self.base_dir)
+            nuevos = diferencias(actual, siguiente)
+            actual = siguiente
+            if not nuevos:
+                break
+            cambios |= nuevos
+        self.estado = actual
+        return cambios
+
+def main():
+    """Build inicial y después reconstruir en cada cambio"""
+    args = crear_parser(__doc__).parse_args()
+    base_dir = Path(__file__).parent
+
+    vigilancia = Vigilancia(base_dir, args.jobs)
+    vigilancia.construir_todo()
+    print(f"\n👀 Vigilando {len(vigilancia.estado)} archivos (Ctrl+C para terminar)...\n")
+
+    try:
+        while True:
+            cambios = vigilancia.esperar_cambios()
+            try:
+                vigilancia.procesar(cambios)
+            except Exception as e:
+                print(f"✗ Error al procesar {', '.join(sorted(cambios))}: {e}\n")
+    except KeyboardInterrupt:
+        vigilancia.guardar()
+        print(f"\n✅ Vigilancia terminada\n")
+
+if __name__ == '__main__':
+    main()